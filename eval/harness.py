@@ -1,6 +1,6 @@
 """Harness: runs ONE sample through the full orchestrator pipeline.
 
-Sets up a fresh orchestrator + temp DB, sends the image, captures
+Sets up a fresh orchestrator + in-memory store, sends the image, captures
 everything (workflow, transcript, tool calls, tokens, timing), and
 returns an EvalResult.
 """
@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import logging
 import os
-import tempfile
 import threading
 import time
 import uuid
@@ -208,90 +207,88 @@ def run_sample(
     transcript: List[Dict[str, Any]] = []
 
     try:
-        with tempfile.TemporaryDirectory(prefix="lemon_eval_") as tmp_dir:
-            # Late imports to avoid loading backend at module level.
-            from src.backend.agents.orchestrator_factory import build_orchestrator
-            from src.backend.storage.workflows import WorkflowStore
-
-            # Fresh DB + workflow record.
-            db_path = Path(tmp_dir) / "eval.sqlite"
-            store = WorkflowStore(db_path)
-            workflow_id = f"eval_{run_id}"
-            user_id = "eval_user"
-            store.create_workflow(
-                workflow_id=workflow_id,
-                user_id=user_id,
-                name=f"Eval: {sample.name}",
-                description=f"Eval run {run_id}",
+        # Late imports to avoid loading backend at module level.
+        from src.backend.agents.orchestrator_factory import build_orchestrator
+        from src.backend.storage.memory import InMemoryWorkflowStore
+
+        # Fresh in-memory store + workflow record — no disk I/O per tool call.
+        store = InMemoryWorkflowStore()
+        workflow_id = f"eval_{run_id}"
+        user_id = "eval_user"
+        store.create_workflow(
+            workflow_id=workflow_id,
+            user_id=user_id,
+            name=f"Eval: {sample.name}",
+            description=f"Eval run {run_id}",
+        )
+
+        # Build orchestrator with real tools.
+        orchestrator = build_orchestrator(_REPO_ROOT)
+
+        # Replace ask_question with mock.
+        orchestrator.tools._tools["ask_question"] = MockAskQuestion()
+
+        # Wire session context (same as ws_chat does for real requests).
+        orchestrator.workflow_store = store
+        orchestrator.user_id = user_id
+        orchestrator.current_workflow_id = workflow_id
+        orchestrator.current_workflow_name = f"Eval: {sample.name}"
+        orchestrator.repo_root = _REPO_ROOT
+
+        # Prepare image file info.
+        has_files = [{
+            "path": str(sample.image_path),
+            "name": sample.image_path.name,
+            "file_type": "image",
+        }]
+
+        # Build scaffold overrides.
+        respond_kwargs: Dict[str, Any] = {
+            "user_message": scaffold.user_message,
+            "has_files": has_files,
+            "allow_tools": True,
+            "on_tool_event": on_tool_event,
+        }
+        if scaffold.thinking_budget is not None:
+            respond_kwargs["thinking_budget"] = scaffold.thinking_budget
+
+        # Run the full extraction.
+        logger.info(
+            "Starting eval: sample=%s model=%s run=%s",
+            sample.name, model, run_id,
+        )
+        llm_response = orchestrator.respond(**respond_kwargs)
+
+        # Refinement passes — follow-up messages with full tool access.
+        for i, msg in enumerate(scaffold.refinement_messages):
+            if llm_response.startswith("LLM error:"):
+                break  # Don't refine a failed extraction.
+            logger.info(
+                "Refinement %d/%d: sample=%s",
+                i + 1, len(scaffold.refinement_messages), sample.name,
             )
-
-            # Build orchestrator with real tools.
-            orchestrator = build_orchestrator(_REPO_ROOT)
-
-            # Replace ask_question with mock.
-            orchestrator.tools._tools["ask_question"] = MockAskQuestion()
-
-            # Wire session context (same as ws_chat does for real requests).
-            orchestrator.workflow_store = store
-            orchestrator.user_id = user_id
-            orchestrator.current_workflow_id = workflow_id
-            orchestrator.current_workflow_name = f"Eval: {sample.name}"
-            orchestrator.repo_root = _REPO_ROOT
-
-            # Prepare image file info.
-            has_files = [{
-                "path": str(sample.image_path),
-                "name": sample.image_path.name,
-                "file_type": "image",
-            }]
-
-            # Build scaffold overrides.
-            respond_kwargs: Dict[str, Any] = {
-                "user_message": scaffold.user_message,
-                "has_files": has_files,
+            refine_kwargs: Dict[str, Any] = {
+                "user_message": msg,
                 "allow_tools": True,
                 "on_tool_event": on_tool_event,
             }
             if scaffold.thinking_budget is not None:
-                respond_kwargs["thinking_budget"] = scaffold.thinking_budget
-
-            # Run the full extraction.
-            logger.info(
-                "Starting eval: sample=%s model=%s run=%s",
-                sample.name, model, run_id,
-            )
-            llm_response = orchestrator.respond(**respond_kwargs)
-
-            # Refinement passes — follow-up messages with full tool access.
-            for i, msg in enumerate(scaffold.refinement_messages):
-                if llm_response.startswith("LLM error:"):
-                    break  # Don't refine a failed extraction.
-                logger.info(
-                    "Refinement %d/%d: sample=%s",
-                    i + 1, len(scaffold.refinement_messages), sample.name,
-                )
-                refine_kwargs: Dict[str, Any] = {
-                    "user_message": msg,
-                    "allow_tools": True,
-                    "on_tool_event": on_tool_event,
-                }
-                if scaffold.thinking_budget is not None:
-                    refine_kwargs["thinking_budget"] = scaffold.thinking_budget
-                llm_response = orchestrator.respond(**refine_kwargs)
-
-            # Detect orchestrator-swallowed errors (returns "LLM error: ..."
-            # instead of raising).
-            if llm_response.startswith("LLM error:"):
-                error = llm_response
-
-            # Capture results.
-            workflow = {
-                "nodes": orchestrator.workflow.get("nodes", []),
-                "edges": orchestrator.workflow.get("edges", []),
-                "variables": orchestrator.workflow.get("variables", []),
-                "outputs": orchestrator.workflow.get("outputs", []),
-            }
-            transcript = list(orchestrator.conversation.history)
+                refine_kwargs["thinking_budget"] = scaffold.thinking_budget
+            llm_response = orchestrator.respond(**refine_kwargs)
+
+        # Detect orchestrator-swallowed errors (returns "LLM error: ..."
+        # instead of raising).
+        if llm_response.startswith("LLM error:"):
+            error = llm_response
+
+        # Capture results.
+        workflow = {
+            "nodes": orchestrator.workflow.get("nodes", []),
+            "edges": orchestrator.workflow.get("edges", []),
+            "variables": orchestrator.workflow.get("variables", []),
+            "outputs": orchestrator.workflow.get("outputs", []),
+        }
+        transcript = list(orchestrator.conversation.history)
 
     except Exception as exc:
         error = f"{type(exc).__name__}: {exc}"
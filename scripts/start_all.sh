@@ -7,4 +7,6 @@ set -euo pipefail
 # Use "python -m uvicorn" instead of bare "uvicorn" because Azure Oryx
 # creates a venv with --copies whose shebang points to a temp build dir
 # that doesn't exist at runtime (causes "bad interpreter" exit code 127).
+# uvicorn reads the worker count from WEB_CONCURRENCY; with more than one
+# the backend coordinates tasks through coordination.sqlite in the data dir.
 exec python -m uvicorn src.backend.api_server:app --host=0.0.0.0 --port="${PORT}" --timeout-keep-alive=600
@@ -37,6 +37,15 @@ class ConversationManager:
         self._conversation_logger: Optional[Any] = None
         self._conversation_id: Optional[str] = None
 
+    @property
+    def conversation_id(self) -> Optional[str]:
+        """Id of the conversation this history belongs to, once bound."""
+        return self._conversation_id
+
+    @conversation_id.setter
+    def conversation_id(self, value: Optional[str]) -> None:
+        self._conversation_id = value
+
     # ------------------------------------------------------------------
     # Context-window tracking
     # ------------------------------------------------------------------
@@ -199,6 +208,7 @@ class ConversationManager:
                 ],
                 caller="conversation_manager",
                 request_tag="compaction",
+                conversation_id=self._conversation_id,
             ).text
             # Replace history with summary + recent messages
             original_len = len(self.history)
@@ -9,13 +9,15 @@ Single class that manages the LLM conversation loop:
 
 from __future__ import annotations
 
-import base64
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import functools
 import json
 import logging
 from pathlib import Path
+import threading
 import time
-from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 from ..tools import ToolRegistry
 from ..tools.constants import WORKFLOW_EDIT_TOOLS, WORKFLOW_INPUT_TOOLS, WORKFLOW_BOUND_TOOLS
@@ -24,7 +26,7 @@ from .conversation_manager import ConversationManager
 from .system_prompt import build_system_prompt
 from ..tools.schema_gen import generate_all_schemas
 from ..utils.cancellation import CancellationError
-from ..utils.image import detect_image_media_type
+from ..utils.content_blocks import get_content_block_cache
 from ..validation.workflow_validator import WorkflowValidator
 from ..events.bus import EventBus
 from ..events.types import TOOL_STARTED, TOOL_COMPLETED, TOOL_BATCH_COMPLETE
@@ -34,9 +36,26 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-_MAX_FILE_BYTES = {"image": 4_500_000, "pdf": 32_000_000}
 _MAX_TOOL_ITERATIONS = 50
 _MAX_TOOL_MESSAGES = 200
+# Read-only tool calls from one model message run concurrently on this pool
+_READ_TOOL_WORKERS = 8
+# Tools followed by refresh_workflow_from_db; they always run alone
+_REFRESHING_TOOLS = WORKFLOW_EDIT_TOOLS | WORKFLOW_INPUT_TOOLS
+
+_read_tool_pool: Optional[ThreadPoolExecutor] = None
+_read_tool_pool_lock = threading.Lock()
+
+
+def _read_tool_executor() -> ThreadPoolExecutor:
+    """The shared pool for concurrent read-only tool calls, created on first use."""
+    global _read_tool_pool
+    with _read_tool_pool_lock:
+        if _read_tool_pool is None:
+            _read_tool_pool = ThreadPoolExecutor(
+                max_workers=_READ_TOOL_WORKERS, thread_name_prefix="read-tool",
+            )
+        return _read_tool_pool
 
 
 @dataclass
@@ -99,6 +118,15 @@ class Orchestrator:
                 if isinstance(value.get(key), list):
                     self.workflow[key] = value[key]
 
+    @property
+    def guidance(self) -> List[Dict[str, Any]]:
+        """Items found by extract_guidance, kept for later turns' prompts."""
+        return self._guidance
+
+    @guidance.setter
+    def guidance(self, value: List[Dict[str, Any]]) -> None:
+        self._guidance = list(value) if isinstance(value, list) else []
+
     # --- Workflow sync ---
 
     def sync_workflow(self, provider: Optional[Callable[[], Dict[str, Any]]] = None) -> None:
@@ -173,7 +201,9 @@ class Orchestrator:
         )
         result = _normalize_tool_result(tool_name, data)
 
-        if result.success and tool_name in (WORKFLOW_EDIT_TOOLS | WORKFLOW_INPUT_TOOLS):
+        # These never run concurrently (see _group_tool_calls), so the
+        # refresh cannot race another call reading orchestrator state.
+        if result.success and tool_name in _REFRESHING_TOOLS:
             self.refresh_workflow_from_db()
             if tool_name in WORKFLOW_EDIT_TOOLS:
                 result = self._post_tool_validate(result)
@@ -189,6 +219,42 @@ class Orchestrator:
         })
         return result
 
+    def _start_tool_group(
+        self,
+        group: List[Tuple[int, str, Dict[str, Any]]],
+        *,
+        should_cancel: Optional[Callable[[], bool]],
+        on_tool_event: Optional[Callable[..., Any]],
+    ) -> Tuple[List[Callable[[], Tuple[ToolResult, float]]], Callable[[], None]]:
+        """Start a group of tool calls; returns one waiter per call, in order.
+
+        A single call runs inline when its waiter is called.  A group of
+        several (always read-only) calls is submitted to the shared pool at
+        once; each waiter returns its call's ``(result, duration_ms)`` or
+        re-raises its exception.  The second value cancels the calls that
+        have not started yet, for when the batch stops early.
+        """
+        def call(tool_name: str, args: Dict[str, Any]) -> Tuple[ToolResult, float]:
+            tool_start = time.perf_counter()
+            result = self.run_tool(
+                tool_name, args, stream=None, should_cancel=should_cancel,
+                on_progress=lambda s, n=tool_name: on_tool_event and on_tool_event("tool_progress", n, {"status": s}, None),
+                on_thinking=lambda c, n=tool_name: on_tool_event and on_tool_event("tool_thinking", n, {"chunk": c}, None),
+            )
+            return result, (time.perf_counter() - tool_start) * 1000
+
+        if len(group) == 1:
+            _, tool_name, args = group[0]
+            return [functools.partial(call, tool_name, args)], lambda: None
+        executor = _read_tool_executor()
+        futures = [executor.submit(call, tool_name, args) for _, tool_name, args in group]
+
+        def cancel_unstarted() -> None:
+            for future in futures:
+                future.cancel()  # no-op once running or done
+
+        return [future.result for future in futures], cancel_unstarted
+
     def _post_tool_validate(self, result: ToolResult) -> ToolResult:
         """Non-strict validation after a workflow edit tool succeeds."""
         nodes = self.workflow.get("nodes", [])
@@ -281,6 +347,7 @@ class Orchestrator:
                 tools=tool_desc, tool_choice=None if allow_tools else "none",
                 on_delta=on_delta if stream else None,
                 caller="orchestrator", request_tag="initial",
+                conversation_id=self.conversation.conversation_id,
                 should_cancel=should_cancel,
                 thinking=thinking, on_thinking=on_thinking,
             )
@@ -334,64 +401,69 @@ class Orchestrator:
             else:
                 turn_tool_messages.append(persist_msg)
 
-            # Execute each tool in the batch
+            # Execute the batch: consecutive read-only calls run concurrently,
+            # everything else one at a time; results are recorded in order.
             tool_failure = None
             skipped_calls: List[Dict[str, Any]] = []
-            for idx, tc in enumerate(tool_calls):
+            for group in _group_tool_calls(tool_calls, self.tools):
                 if is_cancelled():
                     return finalize_cancel()
-
-                # Tool calls are native Anthropic format: {id, name, input: dict}
-                tool_name = tc.get("name")
-                args = tc.get("input") or {}
-
+                stop = False
+                tool_name = group[0][1]
                 try:
                     if on_tool_event:
-                        on_tool_event("tool_start", tool_name, args, None)
+                        for _, tool_name, args in group:
+                            on_tool_event("tool_start", tool_name, args, None)
 
-                    tool_start = time.perf_counter()
-                    result = self.run_tool(
-                        tool_name, args, stream=None, should_cancel=should_cancel,
-                        on_progress=lambda s, n=tool_name: on_tool_event and on_tool_event("tool_progress", n, {"status": s}, None),
-                        on_thinking=lambda c, n=tool_name: on_tool_event and on_tool_event("tool_thinking", n, {"chunk": c}, None),
+                    pending, cancel_pending = self._start_tool_group(
+                        group, should_cancel=should_cancel, on_tool_event=on_tool_event,
                     )
-                    duration_ms = (time.perf_counter() - tool_start) * 1000
-                    tool_results.append(result)
-
-                    # Image blocks pass through directly; otherwise json.dumps
-                    raw_content = result.data.get("content")
-                    tool_content = raw_content if isinstance(raw_content, list) else json.dumps(result.data)
-                    # Native Anthropic format: tool results are user messages
-                    # with tool_result content blocks
-                    tool_msg = {
-                        "role": "user",
-                        "content": [{
-                            "type": "tool_result",
-                            "tool_use_id": tc.get("id"),
-                            "content": tool_content,
-                        }],
-                    }
-                    messages.append(tool_msg)
-
-                    if turn:
-                        turn.add_tool_result(
-                            tc.get("id"), tool_name, args, result.data,
-                            success=result.success, duration_ms=duration_ms,
-                            content=tool_content,
-                        )
-                    else:
-                        turn_tool_messages.append(tool_msg)
-
-                    if on_tool_event:
-                        on_tool_event("tool_complete", tool_name, args, result.data)
-
-                    if tool_name == "ask_question" and result.success:
-                        asked_question = True
-                        break
-                    if not result.success:
-                        tool_failure = result
-                        skipped_calls = tool_calls[idx + 1:]
-                        break
+                    try:
+                        for (idx, tool_name, args), wait in zip(group, pending):
+                            tc = tool_calls[idx]
+                            result, duration_ms = wait()
+                            tool_results.append(result)
+
+                            # Image blocks pass through directly; otherwise json.dumps
+                            raw_content = result.data.get("content")
+                            tool_content = raw_content if isinstance(raw_content, list) else json.dumps(result.data)
+                            # Native Anthropic format: tool results are user messages
+                            # with tool_result content blocks
+                            tool_msg = {
+                                "role": "user",
+                                "content": [{
+                                    "type": "tool_result",
+                                    "tool_use_id": tc.get("id"),
+                                    "content": tool_content,
+                                }],
+                            }
+                            messages.append(tool_msg)
+
+                            if turn:
+                                turn.add_tool_result(
+                                    tc.get("id"), tool_name, args, result.data,
+                                    success=result.success, duration_ms=duration_ms,
+                                    content=tool_content,
+                                )
+                            else:
+                                turn_tool_messages.append(tool_msg)
+
+                            if on_tool_event:
+                                on_tool_event("tool_complete", tool_name, args, result.data)
+
+                            if tool_name == "ask_question" and result.success:
+                                asked_question = True
+                                stop = True
+                                break
+                            if not result.success:
+                                tool_failure = result
+                                skipped_calls = tool_calls[idx + 1:]
+                                stop = True
+                                break
+                    finally:
+                        # A failure stops the batch: reads still queued behind
+                        # it would only run unobserved.
+                        cancel_pending()
                 except CancellationError:
                     return finalize_cancel()
                 except Exception as exc:
@@ -400,6 +472,8 @@ class Orchestrator:
                         raise  # Caller handles via turn.fail()
                     self.conversation.save_error(user_message, f"Tool error ({tool_name}): {exc}")
                     return f"Tool error ({tool_name}): {exc}"
+                if stop:
+                    break
 
             # Inject skipped-tool placeholders
             for skipped in skipped_calls:
@@ -445,6 +519,7 @@ class Orchestrator:
                     messages, tools=tool_desc,
                     on_delta=on_delta if stream else None,
                     caller="orchestrator", request_tag="post_tool",
+                    conversation_id=self.conversation.conversation_id,
                     should_cancel=should_cancel,
                     thinking=thinking, on_thinking=on_thinking,
                 )
@@ -482,6 +557,33 @@ class Orchestrator:
 # --- Module helpers ---
 
 
+def _group_tool_calls(
+    tool_calls: List[Dict[str, Any]], registry: ToolRegistry,
+) -> List[List[Tuple[int, str, Dict[str, Any]]]]:
+    """Split a batch into runs of read-only calls and single other calls.
+
+    Read-only tools that refresh the workflow from the DB afterwards
+    (``list_workflow_variables``) also run alone.
+
+    Each entry is ``(index in batch, tool name, args)``.  Args dicts are
+    created once here so every event and the tool itself see the same
+    object (run_tool fills in workflow_id).
+    """
+    def concurrent(name: str) -> bool:
+        return registry.is_read_only(name) and name not in _REFRESHING_TOOLS
+
+    groups: List[List[Tuple[int, str, Dict[str, Any]]]] = []
+    for idx, tc in enumerate(tool_calls):
+        # Tool calls are native Anthropic format: {id, name, input: dict}
+        entry = (idx, tc.get("name"), tc.get("input") or {})
+        if concurrent(entry[1]) and groups \
+                and all(concurrent(name) for _, name, _ in groups[-1]):
+            groups[-1].append(entry)
+        else:
+            groups.append([entry])
+    return groups
+
+
 def _build_user_content(user_message: str, files: List[Dict[str, Any]]) -> Any:
     """Build LLM message content, injecting base64 files for new uploads."""
     if not files:
@@ -498,24 +600,11 @@ def _build_user_content(user_message: str, files: List[Dict[str, Any]]) -> Any:
 
 
 def _encode_file(file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Encode an image or PDF as a base64 content block."""
-    file_type = file_info.get("file_type", "")
-    path = Path(file_info.get("path", ""))
-    if not path.exists():
-        logger.warning("File not found: %s", path)
-        return None
-    raw = path.read_bytes()
-    max_bytes = _MAX_FILE_BYTES.get(file_type, 0)
-    if max_bytes and len(raw) > max_bytes:
-        logger.warning("File %s too large (%d bytes), skipping", path.name, len(raw))
-        return None
-    b64 = base64.b64encode(raw).decode()
-    if file_type == "image":
-        media = detect_image_media_type(raw, path.suffix)
-        return {"type": "image", "source": {"type": "base64", "media_type": media, "data": b64}}
-    elif file_type == "pdf":
-        return {"type": "document", "source": {"type": "base64", "media_type": "application/pdf", "data": b64}}
-    return None
+    """Content block for an uploaded image or PDF, from the shared block cache."""
+    entry = get_content_block_cache().get(
+        Path(file_info.get("path", "")), file_info.get("file_type", ""),
+    )
+    return entry.to_message_block() if entry is not None else None
 
 
 def _normalize_tool_result(tool_name: str, data: Any) -> ToolResult:
@@ -5,9 +5,8 @@ from __future__ import annotations
 from pathlib import Path
 
 from .orchestrator import Orchestrator
-from ..tools import build_tool_registry
+from ..tools import shared_tool_registry
 
 
 def build_orchestrator(repo_root: Path) -> Orchestrator:
-    registry = build_tool_registry(repo_root)
-    return Orchestrator(registry)
+    return Orchestrator(shared_tool_registry(repo_root))
@@ -214,7 +214,8 @@ def _image_analysis_protocol() -> str:
         "- At each node during DFS, ASK YOURSELF: \"What are the outgoing edges?\" and build ALL of them.\n"
         "- EVERY end node MUST have an `output` value. NEVER create an end node without setting its output.\n"
         "- NEVER skip Step 9 (self-review). You MUST call `get_current_workflow` + `view_image` and verify your work before responding.\n"
-        "- To re-examine the image at any point: call `view_image`.\n"
+        "- To re-examine the image at any point: call `view_image`. Large images come back as an overview; "
+        "pass `region` (and optionally `zoom`) to read small text in one part.\n"
     )
 
 
@@ -19,6 +19,8 @@ import time
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
+from ..utils.content_blocks import reference_uploads
+
 logger = logging.getLogger(__name__)
 
 
@@ -346,6 +348,20 @@ class Turn:
             len(conversation_manager.history),
         )
 
+        # Periodic checkpoint of the committed history so a reload replays
+        # only the entries logged after it (the logger decides when it's due
+        # and writes it off this thread).  Uploads are stored by reference.
+        if self._logger:
+            try:
+                self._logger.checkpoint_history(
+                    self.conversation_id, reference_uploads(conversation_manager.history),
+                )
+            except Exception:
+                logger.error(
+                    "Turn: failed to checkpoint history conv=%s",
+                    self.conversation_id, exc_info=True,
+                )
+
 
 class InvalidTransitionError(Exception):
     """Raised when an invalid state transition is attempted."""
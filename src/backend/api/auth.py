@@ -2,21 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
+import multiprocessing
 import os
 import re
 import secrets
+import threading
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Iterable, Optional, Tuple
+from typing import Any, Callable, Iterable, Optional, Tuple
 from uuid import uuid4
 
 from starlette.responses import JSONResponse, Response
 
 from ..storage.auth import AuthSession, AuthStore, AuthUser
+from ..storage.coordination import get_coordinator
 
 PASSWORD_HASH_ALGO = "pbkdf2_sha256"
 DEFAULT_PASSWORD_ITERATIONS = 390_000
@@ -25,6 +30,9 @@ DEFAULT_REMEMBER_TTL_HOURS = 24 * 14
 DEFAULT_MIN_PASSWORD_LENGTH = 10
 DEFAULT_MAX_PASSWORD_LENGTH = 256
 DEFAULT_MAX_SESSIONS_PER_USER = 5
+DEFAULT_HASH_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_HASH_QUEUE_SIZE = 16
+DEFAULT_HASH_TIMEOUT_SECONDS = 10
 
 SESSION_COOKIE_NAME = "lemon_session"
 
@@ -41,9 +49,18 @@ class AuthConfig:
     max_sessions_per_user: int
     cookie_secure: bool
     cookie_samesite: str
+    hash_workers: int = DEFAULT_HASH_WORKERS
+    hash_queue_size: int = DEFAULT_HASH_QUEUE_SIZE
+    hash_timeout_seconds: int = DEFAULT_HASH_TIMEOUT_SECONDS
 
 
 class LoginRateLimiter:
+    """Per-identifier failure counter with a temporary block.
+
+    Counts live in this process unless a shared coordinator is installed
+    (several workers), in which case every worker sees the same counts.
+    """
+
     def __init__(self, *, limit: int, window_seconds: int, block_seconds: int):
         self.limit = limit
         self.window_seconds = window_seconds
@@ -53,6 +70,13 @@ class LoginRateLimiter:
 
     def is_allowed(self, key: str) -> Tuple[bool, int]:
         now = time.time()
+        coordinator = get_coordinator()
+        if coordinator.is_shared:
+            shared = coordinator.get("login_attempts", key)
+            blocked_until = shared.get("blocked_until", 0) if shared else 0
+            if blocked_until > now:
+                return False, int(blocked_until - now)
+            return True, 0
 
         # Periodic cleanup: every 100 calls, sweep all expired entries
         # so keys that never retry don't accumulate in memory forever
@@ -84,17 +108,24 @@ class LoginRateLimiter:
 
     def add_failure(self, key: str) -> None:
         now = time.time()
-        entry = self._attempts.get(key)
+        coordinator = get_coordinator()
+        if coordinator.is_shared:
+            coordinator.update(
+                "login_attempts", key, lambda entry: self._count_failure(entry, now),
+                ttl=self.window_seconds + self.block_seconds,
+            )
+            return
+        self._attempts[key] = self._count_failure(self._attempts.get(key), now)
+
+    def _count_failure(self, entry: Optional[dict], now: float) -> dict:
         if not entry or now > entry.get("reset_at", 0):
-            entry = {
-                "count": 0,
-                "reset_at": now + self.window_seconds,
-                "blocked_until": 0,
-            }
-            self._attempts[key] = entry
+            entry = {"count": 0, "reset_at": now + self.window_seconds, "blocked_until": 0}
+        else:
+            entry = dict(entry)
         entry["count"] = entry.get("count", 0) + 1
         if entry["count"] >= self.limit:
             entry["blocked_until"] = now + self.block_seconds
+        return entry
 
 
 login_rate_limiter = LoginRateLimiter(limit=8, window_seconds=10 * 60, block_seconds=10 * 60)
@@ -136,6 +167,11 @@ def get_auth_config() -> AuthConfig:
         max_sessions_per_user=_get_int_env("LEMON_AUTH_MAX_SESSIONS", DEFAULT_MAX_SESSIONS_PER_USER),
         cookie_secure=_get_cookie_secure(),
         cookie_samesite=_get_cookie_samesite(),
+        hash_workers=_get_int_env("LEMON_PASSWORD_HASH_WORKERS", DEFAULT_HASH_WORKERS),
+        hash_queue_size=_get_int_env("LEMON_PASSWORD_HASH_QUEUE", DEFAULT_HASH_QUEUE_SIZE),
+        hash_timeout_seconds=_get_int_env(
+            "LEMON_PASSWORD_HASH_TIMEOUT_SECONDS", DEFAULT_HASH_TIMEOUT_SECONDS,
+        ),
     )
 
 
@@ -202,6 +238,100 @@ def verify_password(password: str, stored_hash: str) -> bool:
     return hmac.compare_digest(computed, expected)
 
 
+def needs_rehash(stored_hash: str, config: AuthConfig) -> bool:
+    """True when *stored_hash* was made with other parameters than *config*'s."""
+    try:
+        algo, iterations_raw, _salt, _hash = stored_hash.split("$", 3)
+    except ValueError:
+        return True
+    return algo != PASSWORD_HASH_ALGO or iterations_raw != str(config.password_iterations)
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing pool is saturated, or a queued job timed out."""
+
+
+class PasswordHasher:
+    """Runs PBKDF2 hashing and verification on a bounded process pool.
+
+    hashlib only partly releases the GIL, so 390k-iteration hashes on the
+    event loop (or its threadpool) stall unrelated requests.  At most
+    ``max_workers + max_pending`` jobs are admitted; past that callers get
+    :class:`PasswordHashingBusy` at once instead of queueing behind a login
+    burst, and so do admitted jobs still unfinished after ``timeout_seconds``.
+    The pool is started on first use.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        max_pending: int,
+        timeout_seconds: float,
+        executor_factory: Optional[Callable[[int], Executor]] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor_factory = executor_factory or _process_pool
+        self._executor: Optional[Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    async def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._inflight >= self.max_workers + self.max_pending:
+                raise PasswordHashingBusy("Password hashing queue is full.")
+            self._inflight += 1
+            if self._executor is None:
+                self._executor = self._executor_factory(self.max_workers)
+            executor = self._executor
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        # Released when the job really ends, not when a caller gives up on
+        # it, so timed-out jobs still count against the cap.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise PasswordHashingBusy("Password hashing timed out.") from None
+
+    async def hash(self, password: str, *, config: AuthConfig) -> str:
+        return await self._run(hash_password, password, config=config)
+
+    async def verify(self, password: str, stored_hash: str) -> bool:
+        return await self._run(verify_password, password, stored_hash)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _process_pool(max_workers: int) -> Executor:
+    # spawn, not fork: the server process has writer/maintenance threads.
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def build_password_hasher(config: AuthConfig) -> PasswordHasher:
+    return PasswordHasher(
+        max_workers=config.hash_workers,
+        max_pending=config.hash_queue_size,
+        timeout_seconds=config.hash_timeout_seconds,
+    )
+
+
 def generate_session_token() -> str:
     return secrets.token_urlsafe(32)
 
@@ -11,16 +11,28 @@ in api_server.py. No module-level globals.
 
 from __future__ import annotations
 
+from typing import Optional, Tuple
+
 from fastapi import HTTPException, Request
 
-from ..storage.auth import AuthUser
-from .auth import get_session_from_cookies
+from ..storage.async_facade import run_blocking
+from ..storage.auth import AuthSession, AuthUser
+from .auth import SESSION_COOKIE_NAME, get_session_from_cookies, hash_session_token
+
+
+async def _session_from_request(request: Request) -> Optional[Tuple[AuthSession, AuthUser]]:
+    """Validate the session cookie; SQLite lookups (cache misses) run off the loop."""
+    auth_store = request.app.state.auth_store
+    cookies = dict(request.cookies)
+    token = cookies.get(SESSION_COOKIE_NAME)
+    if not token or auth_store.has_cached_session(hash_session_token(token)):
+        return get_session_from_cookies(auth_store, cookies)
+    return await run_blocking(get_session_from_cookies, auth_store, cookies)
 
 
 async def require_auth(request: Request) -> AuthUser:
     """FastAPI dependency — rejects with 401 if not authenticated."""
-    auth_store = request.app.state.auth_store
-    session_info = get_session_from_cookies(auth_store, dict(request.cookies))
+    session_info = await _session_from_request(request)
     if not session_info:
         raise HTTPException(status_code=401, detail="Authentication required.")
     _session, user = session_info
@@ -29,8 +41,7 @@ async def require_auth(request: Request) -> AuthUser:
 
 async def optional_auth(request: Request) -> AuthUser | None:
     """FastAPI dependency — returns None instead of 401 for public routes."""
-    auth_store = request.app.state.auth_store
-    session_info = get_session_from_cookies(auth_store, dict(request.cookies))
+    session_info = await _session_from_request(request)
     if not session_info:
         return None
     _session, user = session_info
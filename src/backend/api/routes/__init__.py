@@ -19,6 +19,7 @@ from fastapi import FastAPI
 from typing import Optional
 
 from ...tasks.conversations import ConversationStore
+from ..auth import PasswordHasher
 from ...storage.auth import AuthStore
 from ...storage.conversation_log import ConversationLogger
 from ...storage.workflows import WorkflowStore
@@ -49,6 +50,7 @@ def register_routes(
     auth_store: AuthStore,
     workflow_store: WorkflowStore,
     conversation_logger: Optional[ConversationLogger] = None,
+    password_hasher: Optional[PasswordHasher] = None,
 ) -> None:
     """Register all HTTP routes on the FastAPI app.
 
@@ -61,6 +63,7 @@ def register_routes(
         repo_root: Repository root path.
         auth_store: Auth store for user/session persistence.
         workflow_store: Workflow storage backend.
+        password_hasher: Process pool for password hashing (auth routes).
     """
     # Middleware (request logging) — must be registered first
     app.add_middleware(RequestLoggingMiddleware)
@@ -69,7 +72,7 @@ def register_routes(
     register_info_route(app)
 
     # Authentication (register, login, logout, me)
-    register_auth_routes(app, auth_store=auth_store)
+    register_auth_routes(app, auth_store=auth_store, password_hasher=password_hasher)
 
     # Chat (send message, get conversation)
     register_chat_routes(
@@ -84,7 +87,9 @@ def register_routes(
     register_workflow_routes(app, workflow_store=workflow_store, repo_root=repo_root)
 
     # Search and domain listing
-    register_search_routes(app, workflow_store=workflow_store)
+    register_search_routes(
+        app, workflow_store=workflow_store, conversation_logger=conversation_logger
+    )
 
     # Dev tools (list/execute tools)
     register_dev_tools_routes(
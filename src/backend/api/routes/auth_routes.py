@@ -6,30 +6,46 @@ management, and current-user queries.
 
 from __future__ import annotations
 
+import logging
 import sqlite3
-from typing import Dict
+from typing import Dict, Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import JSONResponse
 
 from ..auth import (
+    PasswordHasher,
+    PasswordHashingBusy,
     apply_login_rate_limit,
+    build_password_hasher,
     clear_session_cookie,
     get_auth_config,
     hash_password,
     issue_session,
     is_registration_allowed,
+    needs_rehash,
     note_login_failure,
     normalize_email,
     set_session_cookie,
     validate_email,
     validate_password,
-    verify_password,
 )
 from ..deps import require_auth
+from ...storage.async_facade import AsyncStore, run_blocking
 from ...storage.auth import AuthStore, AuthUser
 
+logger = logging.getLogger("backend.auth")
+
+
+def _hashing_busy_response() -> JSONResponse:
+    """503 for a saturated hashing pool — cheap to send, safe to retry."""
+    return JSONResponse(
+        {"error": "Too many sign-in requests right now. Try again shortly."},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
 
 def _serialize_user(user: AuthUser) -> Dict[str, str]:
     """Serialize an AuthUser to a JSON-safe dict."""
@@ -40,15 +56,24 @@ def _serialize_user(user: AuthUser) -> Dict[str, str]:
     }
 
 
-def register_auth_routes(app: FastAPI, *, auth_store: AuthStore) -> None:
+def register_auth_routes(
+    app: FastAPI,
+    *,
+    auth_store: AuthStore,
+    password_hasher: Optional[PasswordHasher] = None,
+) -> None:
     """Register authentication endpoints on the FastAPI app.
 
     Args:
         app: FastAPI application instance.
         auth_store: Auth store for user/session persistence.
+        password_hasher: Pool that runs password hashing off the event
+            loop; built from the auth config when omitted.
     """
     router = APIRouter()
+    store = AsyncStore(auth_store)
     auth_config = get_auth_config()
+    hasher = password_hasher or build_password_hasher(auth_config)
     # Pre-computed dummy hash for constant-time comparison on unknown emails
     dummy_password_hash = hash_password("dummy-password", config=auth_config)
     allow_registration = is_registration_allowed()
@@ -79,13 +104,17 @@ def register_auth_routes(app: FastAPI, *, auth_store: AuthStore) -> None:
             return JSONResponse({"error": errors[0], "errors": errors}, status_code=400)
 
         user_id = f"user_{uuid4().hex}"
-        password_hash = hash_password(password, config=auth_config)
         try:
-            auth_store.create_user(user_id, email, name, password_hash)
+            password_hash = await hasher.hash(password, config=auth_config)
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
+        try:
+            await store.create_user(user_id, email, name, password_hash)
         except sqlite3.IntegrityError:
             return JSONResponse({"error": "Email is already registered."}, status_code=409)
 
-        token, expires_at = issue_session(
+        token, expires_at = await run_blocking(
+            issue_session,
             auth_store,
             user_id=user_id,
             remember=remember,
@@ -114,25 +143,37 @@ def register_auth_routes(app: FastAPI, *, auth_store: AuthStore) -> None:
         if email_error:
             return JSONResponse({"error": email_error}, status_code=400)
 
-        # Use client IP for rate-limiting identifier
+        # Use client IP for rate-limiting identifier. Blocked clients are
+        # turned away here, before they can take a hashing pool slot.
         client_host = request.client.host if request.client else "unknown"
         identifier = f"{client_host}:{email}"
         rate_limit_response = apply_login_rate_limit(identifier)
         if rate_limit_response is not None:
             return rate_limit_response
 
-        user = auth_store.get_user_by_email(email)
-        if not user:
-            verify_password(password, dummy_password_hash)
-            note_login_failure(identifier)
-            return JSONResponse({"error": "Invalid email or password."}, status_code=401)
-
-        if not verify_password(password, user.password_hash):
+        user = await store.get_user_by_email(email)
+        try:
+            verified = await hasher.verify(
+                password, user.password_hash if user else dummy_password_hash,
+            )
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
+        if not user or not verified:
             note_login_failure(identifier)
             return JSONResponse({"error": "Invalid email or password."}, status_code=401)
 
-        auth_store.update_last_login(user.id)
-        token, expires_at = issue_session(
+        if needs_rehash(user.password_hash, auth_config):
+            # Hash parameters changed for this deployment: upgrade the stored
+            # hash now that we have the plaintext. Best effort.
+            try:
+                new_hash = await hasher.hash(password, config=auth_config)
+                await store.update_password_hash(user.id, new_hash, revoke_sessions=False)
+            except Exception:
+                logger.warning("Rehash on login failed for user %s", user.id, exc_info=True)
+
+        await store.update_last_login(user.id)
+        token, expires_at = await run_blocking(
+            issue_session,
             auth_store,
             user_id=user.id,
             remember=remember,
@@ -150,7 +191,7 @@ def register_auth_routes(app: FastAPI, *, auth_store: AuthStore) -> None:
         token = request.cookies.get("lemon_session")
         if token:
             token_hash = hash_session_token(token)
-            auth_store.delete_session_by_token_hash(token_hash)
+            await store.delete_session_by_token_hash(token_hash)
         response = JSONResponse({"success": True})
         clear_session_cookie(response, config=auth_config)
         response.headers["Cache-Control"] = "no-store"
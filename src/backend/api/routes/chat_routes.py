@@ -11,7 +11,6 @@ from __future__ import annotations
 
 import json
 import logging
-import threading
 from pathlib import Path
 from typing import Any, Dict, Optional
 from uuid import uuid4
@@ -24,15 +23,17 @@ from ...tasks.conversations import ConversationStore
 from ...tasks.chat_task import ChatTask
 from ..deps import require_auth
 from ..response_utils import extract_flowchart, extract_tool_calls, summarize_response
-from ...tasks.sse import EventSink
+from ...tasks.sse import EventSink, parse_last_event_id
+from ...tasks.executor import TaskKind, TaskRejected, task_executor
 from ...tasks.registry import task_registry
 from ...agents.turn import Turn
+from ...storage.async_facade import run_blocking
 from ...storage.auth import AuthUser
 from ...storage.conversation_log import ConversationLogger
 from ...storage.workflows import WorkflowStore
 from ...utils.uploads import save_uploaded_image
 from ...workflow_persistence import persist_workflow_snapshot
-from .helpers import api_error
+from .helpers import api_error, task_rejected_response
 
 logger = logging.getLogger("backend.api")
 
@@ -102,13 +103,16 @@ def register_chat_routes(
             conversation_logger=conversation_logger,
         )
 
-        # Register and set building=True BEFORE spawning the thread.
-        # Eliminates the race where a page refresh between thread spawn
-        # and thread execution finds building=false and no active task.
-        task_registry.register(task)
+        # Register and set building=True BEFORE submitting the task.
+        # Eliminates the race where a page refresh between submission
+        # and execution finds building=false and no active task.
+        # Registering announces the task through the coordinator (SQLite
+        # with several workers), so it runs off the loop too.
+        await run_blocking(task_registry.register, task)
         if workflow_store and current_workflow_id:
-            try:
-                workflow_data = payload.get("workflow") or {}
+            workflow_data = payload.get("workflow") or {}
+
+            def mark_building() -> None:
                 persist_workflow_snapshot(
                     workflow_store,
                     workflow_id=current_workflow_id,
@@ -123,16 +127,37 @@ def register_chat_routes(
                     is_draft=True,
                 )
                 workflow_store.update_workflow(current_workflow_id, user.id, building=True)
+
+            try:
+                await run_blocking(mark_building)
             except Exception:
                 logger.error(
-                    "Failed to set building=True for %s before thread spawn",
+                    "Failed to set building=True for %s before task submit",
                     current_workflow_id, exc_info=True,
                 )
 
-        # Spawn background thread — it pushes events to the sink
-        threading.Thread(
-            target=task.run, daemon=True, name=f"chat-{task_id}",
-        ).start()
+        # Run on the shared executor — it pushes events to the sink
+        try:
+            task_executor.submit(
+                TaskKind.CHAT, task.run, user_id=user.id, name=f"chat-{task_id}",
+            )
+        except TaskRejected as exc:
+            await run_blocking(task_registry.unregister, task)
+            # Nothing will stream from it; release its event log and any
+            # pending flush with it
+            sink.close()
+            if workflow_store and current_workflow_id:
+                try:
+                    await run_blocking(
+                        workflow_store.update_workflow,
+                        current_workflow_id, user.id, building=False,
+                    )
+                except Exception:
+                    logger.error(
+                        "Failed to clear building flag for %s after rejection",
+                        current_workflow_id, exc_info=True,
+                    )
+            return task_rejected_response(exc)
 
         # Return the sink as an SSE stream — the HTTP response stays open
         # until task.run() calls sink.close() or the client disconnects
@@ -160,13 +185,9 @@ def register_chat_routes(
         if not isinstance(task_id, str) or not task_id.strip():
             return api_error("task_id is required")
 
-        task = task_registry.cancel(task_id)
-        if task and task_registry.mark_notified(task_id):
-            # Push cancellation event to the task's SSE stream
-            cancel_payload: Dict[str, Any] = {"task_id": task_id}
-            if task.current_workflow_id:
-                cancel_payload["workflow_id"] = task.current_workflow_id
-            task.sink.push("chat_cancelled", cancel_payload)
+        # Cancels locally or forwards to the worker running the task; the
+        # owner pushes chat_cancelled to the task's SSE stream
+        await run_blocking(task_registry.request_cancel, task_id)
 
         return JSONResponse({"ok": True})
 
@@ -180,6 +201,9 @@ def register_chat_routes(
         If a task is still running for the given workflow, creates a new
         EventSink, swaps it into the task (replaying accumulated content),
         and returns an SSE stream. If no active task, returns JSON.
+
+        A ``Last-Event-ID`` header (or ``last_event_id`` body field) limits
+        the replay to the events the client missed, when still buffered.
         """
         try:
             payload = await request.json()
@@ -192,14 +216,19 @@ def register_chat_routes(
 
         task = task_registry.get_by_workflow(user.id, workflow_id)
 
+        last_event_id = parse_last_event_id(
+            request.headers.get("Last-Event-ID", payload.get("last_event_id"))
+        )
+
         if task and not task.done.is_set():
-            # Create a new sink, swap it into the running task
-            new_sink = EventSink()
-            task.swap_sink(new_sink)
+            # Create a new sink sharing the task's event log (so ids continue),
+            # swap it into the running task
+            new_sink = EventSink(log=task.sink.log)
+            task.swap_sink(new_sink, last_event_id)
             logger.info(
-                "resume: reconnected workflow=%s task=%s "
+                "resume: reconnected workflow=%s task=%s last_event_id=%s "
                 "replay_thinking=%d replay_stream=%d",
-                workflow_id, task.task_id,
+                workflow_id, task.task_id, last_event_id,
                 len("".join(task.thinking_chunks)), len(task.stream_buffer),
             )
             return StreamingResponse(
@@ -210,13 +239,62 @@ def register_chat_routes(
                     "X-Accel-Buffering": "no",
                 },
             )
-        else:
-            # Task already finished — tell the frontend to fetch conversation history
+
+        remote = None
+        if not task:
+            remote = await run_blocking(task_registry.locate_remote, user.id, workflow_id)
+        if remote:
+            # Running on another worker: relay its events through this one
             logger.info(
-                "resume: no active task for workflow=%s, sending no_active_task",
-                workflow_id,
+                "resume: attaching workflow=%s task=%s on worker %s",
+                workflow_id, remote["task_id"], remote["worker_id"],
             )
+            attached = await run_blocking(task_registry.attach_remote, remote, last_event_id)
+            return StreamingResponse(
+                attached,
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "X-Accel-Buffering": "no",
+                },
+            )
+
+        # Task already finished — tell the frontend to fetch conversation history
+        logger.info(
+            "resume: no active task for workflow=%s, sending no_active_task",
+            workflow_id,
+        )
+        return JSONResponse({"status": "no_active_task", "workflow_id": workflow_id})
+
+    @router.post("/api/chat/resync")
+    async def resync_workflow_state(
+        request: Request,
+        user: AuthUser = Depends(require_auth),
+    ) -> JSONResponse:
+        """Return the running task's latest workflow state as a full snapshot.
+
+        Called by the frontend when a ``workflow_state_patch`` does not apply
+        to the version it holds (a missed event). The returned ``version``
+        is the base for the patches that follow.
+        """
+        try:
+            payload = await request.json()
+        except (json.JSONDecodeError, ValueError) as e:
+            return api_error(f"Invalid JSON: {e}")
+
+        workflow_id = payload.get("workflow_id")
+        if not workflow_id:
+            return api_error("workflow_id is required")
+
+        task = task_registry.get_by_workflow(user.id, workflow_id)
+        snapshot = task.workflow_state_snapshot() if task else None
+        if not task:
+            remote = await run_blocking(task_registry.locate_remote, user.id, workflow_id)
+            if remote:
+                snapshot = await run_blocking(task_registry.remote_snapshot, remote)
+        if not snapshot:
             return JSONResponse({"status": "no_active_task", "workflow_id": workflow_id})
+        return JSONResponse({"status": "ok", **snapshot, "workflow_id": workflow_id})
 
     @router.post("/api/chat")
     async def chat(
@@ -302,7 +380,8 @@ def register_chat_routes(
         history). Falls back to the ConversationLogger SQLite DB which
         persists across server restarts.
         """
-        convo = conversation_store.get(conversation_id)
+        # Both may hit SQLite (the claim check, the log flush); keep them off the loop
+        convo = await run_blocking(conversation_store.get, conversation_id)
         if convo and convo.orchestrator.conversation.history:
             messages = []
             pending_user: dict | None = None
@@ -365,7 +444,8 @@ def register_chat_routes(
             )
 
         if conversation_logger:
-            entries = conversation_logger.get_conversation_timeline(
+            entries = await run_blocking(
+                conversation_logger.get_conversation_timeline,
                 conversation_id,
                 entry_types=["user_message", "assistant_response", "tool_call"],
             )
@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import JSONResponse
 
 from ..deps import require_auth
+from ...storage.async_facade import run_blocking
 from ...storage.auth import AuthUser
 from ...storage.workflows import WorkflowStore
 
@@ -88,8 +89,9 @@ def register_compilation_routes(
         def _fetch_subworkflow(sub_id: str):
             return workflow_store.get_workflow(sub_id, user.id)
 
-        # Compile workflow to Python
-        result = compile_workflow_to_python(
+        # Compile off the loop: subflow lookups hit the store
+        result = await run_blocking(
+            compile_workflow_to_python,
             nodes=nodes,
             edges=edges,
             variables=variables,
@@ -15,6 +15,7 @@ from starlette.responses import JSONResponse
 from ..deps import require_auth
 from ...storage.auth import AuthUser
 from ...storage.workflows import WorkflowStore
+from ...tools import shared_tool_registry
 
 logger = logging.getLogger("backend.api")
 
@@ -43,10 +44,8 @@ def register_dev_tools_routes(
         Returns array of tools, each with name, description, and inputSchema.
         Used by the DevTools panel to show available tools for execution.
         """
-        from ...tools import build_tool_registry
-
         try:
-            registry = build_tool_registry(repo_root)
+            registry = shared_tool_registry(repo_root)
             tools = []
             for tool in registry.all_tools():
                 # Convert List[ToolParameter] to JSON Schema format
@@ -86,8 +85,6 @@ def register_dev_tools_routes(
         authenticated session, so tools work the same as via the orchestrator.
         Returns the tool execution result.
         """
-        from ...tools import build_tool_registry
-
         try:
             payload = await request.json()
         except Exception:
@@ -105,8 +102,7 @@ def register_dev_tools_routes(
         }
 
         try:
-            # Build a fully populated registry with all discovered tools
-            tools = build_tool_registry(repo_root)
+            tools = shared_tool_registry(repo_root)
             result = tools.execute(
                 tool_name,
                 payload,
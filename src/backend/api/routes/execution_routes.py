@@ -7,19 +7,96 @@ returns the execution result including subflow outputs.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from typing import Any, Dict, Tuple
 
 from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import JSONResponse
 
 from ..deps import require_auth
+from .helpers import task_rejected_response
+from ...storage.async_facade import AsyncStore
 from ...storage.auth import AuthUser
 from ...execution.preparation import prepare_record_execution
-from ...storage.workflows import WorkflowStore
+from ...storage.workflows import WorkflowRecord, WorkflowStore
+from ...tasks.executor import TaskKind, TaskRejected, task_executor
 
 logger = logging.getLogger("backend.api")
 
 
+def _run_workflow(
+    workflow_id: str,
+    workflow: WorkflowRecord,
+    payload: Dict[str, Any],
+    workflow_store: WorkflowStore,
+    user_id: str,
+) -> Tuple[Dict[str, Any], int]:
+    """Validate and execute *workflow*; returns (response body, status code).
+
+    Runs on a task-executor worker, never on the event loop.
+    """
+    from ...execution.interpreter import TreeInterpreter
+
+    tree, preparation_error, validation_errors = prepare_record_execution(workflow)
+    if preparation_error:
+        response: Dict[str, Any] = {
+            "success": False,
+            "error": preparation_error,
+            "path": [],
+            "context": {},
+        }
+        if validation_errors:
+            response["validation_errors"] = [
+                {"code": e.code, "message": e.message, "node_id": e.node_id}
+                for e in validation_errors
+            ]
+        return response, 400
+
+    # Convert input names to input IDs for the interpreter
+    # User provides: {"Age": 25} -> interpreter needs: {"input_age_int": 25}
+    input_values = {}
+    for inp in workflow.inputs:
+        inp_name = inp.get("name")
+        inp_id = inp.get("id")
+
+        if inp_name in payload:
+            input_values[inp_id] = payload[inp_name]
+        elif inp_id in payload:
+            # Also accept input IDs directly
+            input_values[inp_id] = payload[inp_id]
+
+    # Create interpreter with workflow_store for subflow support
+    interpreter = TreeInterpreter(
+        tree=tree,
+        variables=workflow.inputs,  # Storage field is 'inputs', maps to variables param
+        outputs=workflow.outputs,
+        workflow_id=workflow_id,
+        call_stack=[],
+        workflow_store=workflow_store,
+        user_id=user_id,
+        output_type=workflow.output_type or "string",
+    )
+
+    # Execute workflow
+    result = interpreter.execute(input_values)
+
+    # Build response
+    response = {
+        "success": result.success,
+        "output": result.output,
+        "path": result.path,
+        "context": result.context,
+        "error": result.error,
+    }
+
+    # Include subflow execution details if any
+    if result.subflow_results:
+        response["subflow_results"] = result.subflow_results
+
+    return response, 200
+
+
 def register_execution_routes(
     app: FastAPI,
     *,
@@ -32,6 +109,7 @@ def register_execution_routes(
         workflow_store: Workflow storage backend for loading workflows.
     """
     router = APIRouter()
+    store = AsyncStore(workflow_store)
 
     @router.post("/api/execute/{workflow_id}")
     async def execute_workflow(
@@ -51,10 +129,8 @@ def register_execution_routes(
         Supports subprocess nodes that reference other workflows.
         Subflow outputs are injected as new inputs for subsequent decisions.
         """
-        from ...execution.interpreter import TreeInterpreter
-
         # Load the workflow
-        workflow = workflow_store.get_workflow(workflow_id, user.id)
+        workflow = await store.get_workflow(workflow_id, user.id)
         if not workflow:
             return JSONResponse(
                 {
@@ -66,68 +142,23 @@ def register_execution_routes(
                 status_code=404,
             )
 
-        tree, preparation_error, validation_errors = prepare_record_execution(workflow)
-        if preparation_error:
-            response = {
-                "success": False,
-                "error": preparation_error,
-                "path": [],
-                "context": {},
-            }
-            if validation_errors:
-                response["validation_errors"] = [
-                    {"code": e.code, "message": e.message, "node_id": e.node_id}
-                    for e in validation_errors
-                ]
-            return JSONResponse(response, status_code=400)
-
         # Get input values from request
         try:
             payload = await request.json()
         except Exception:
             payload = {}
 
-        # Convert input names to input IDs for the interpreter
-        # User provides: {"Age": 25} -> interpreter needs: {"input_age_int": 25}
-        input_values = {}
-        for inp in workflow.inputs:
-            inp_name = inp.get("name")
-            inp_id = inp.get("id")
-
-            if inp_name in payload:
-                input_values[inp_id] = payload[inp_name]
-            elif inp_id in payload:
-                # Also accept input IDs directly
-                input_values[inp_id] = payload[inp_id]
-
-        # Create interpreter with workflow_store for subflow support
-        interpreter = TreeInterpreter(
-            tree=tree,
-            variables=workflow.inputs,  # Storage field is 'inputs', maps to variables param
-            outputs=workflow.outputs,
-            workflow_id=workflow_id,
-            call_stack=[],
-            workflow_store=workflow_store,
-            user_id=user.id,
-            output_type=workflow.output_type or "string",
-        )
-
-        # Execute workflow
-        result = interpreter.execute(input_values)
-
-        # Build response
-        response = {
-            "success": result.success,
-            "output": result.output,
-            "path": result.path,
-            "context": result.context,
-            "error": result.error,
-        }
-
-        # Include subflow execution details if any
-        if result.subflow_results:
-            response["subflow_results"] = result.subflow_results
-
-        return JSONResponse(response)
+        # Validation and interpretation are CPU-bound (and subflows hit the
+        # store), so the whole run goes to the executor's bulk pool
+        try:
+            job = task_executor.submit(
+                TaskKind.BULK, _run_workflow,
+                workflow_id, workflow, payload, workflow_store, user.id,
+                user_id=user.id, name=f"execute-{workflow_id}",
+            )
+        except TaskRejected as exc:
+            return task_rejected_response(exc)
+        response, status_code = await asyncio.wrap_future(job)
+        return JSONResponse(response, status_code=status_code)
 
     app.include_router(router)
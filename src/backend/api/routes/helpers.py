@@ -11,6 +11,7 @@ from typing import Any, Dict, List
 from starlette.responses import JSONResponse
 
 from ...storage.workflows import WorkflowRecord
+from ...tasks.executor import TaskRejected
 
 
 def api_error(message: str, status_code: int = 400) -> JSONResponse:
@@ -26,6 +27,15 @@ def api_error(message: str, status_code: int = 400) -> JSONResponse:
     return JSONResponse({"error": message}, status_code=status_code)
 
 
+def task_rejected_response(exc: TaskRejected) -> JSONResponse:
+    """429 for a job the task executor refused — safe to retry after a delay."""
+    return JSONResponse(
+        {"error": f"{exc} — try again shortly."},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def _infer_outputs_from_nodes(
     nodes: List[Dict[str, Any]],
     workflow_output_type: str = "string",
@@ -1,17 +1,23 @@
 """Search and domain listing routes.
 
-Handles workflow search with filters (GET /api/search) and
-domain enumeration (GET /api/domains).
+Handles workflow search with filters (GET /api/search), domain
+enumeration (GET /api/domains) and full-text search over the caller's
+conversation log (GET /api/conversations/search).
 """
 
 from __future__ import annotations
 
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import JSONResponse
 
 from ..deps import require_auth
+from ...storage.async_facade import AsyncStore
 from ...storage.auth import AuthUser
-from .helpers import serialize_workflow_summary
+from .helpers import api_error, serialize_workflow_summary
+from ...storage.conversation_log import ConversationLogger
 from ...storage.workflows import WorkflowStore
 
 
@@ -19,14 +25,18 @@ def register_search_routes(
     app: FastAPI,
     *,
     workflow_store: WorkflowStore,
+    conversation_logger: Optional[ConversationLogger] = None,
 ) -> None:
     """Register search endpoints on the FastAPI app.
 
     Args:
         app: FastAPI application instance.
         workflow_store: Workflow storage backend.
+        conversation_logger: Conversation audit log; conversation search
+            returns 503 when it is not configured.
     """
     router = APIRouter()
+    store = AsyncStore(workflow_store)
 
     @router.get("/api/search")
     async def search_workflows(
@@ -54,7 +64,7 @@ def register_search_routes(
         if validated is not None:
             validated_bool = validated.lower() in ("true", "1", "yes")
 
-        workflows, total_count = workflow_store.search_workflows(
+        workflows, total_count = await store.search_workflows(
             user.id,
             query=query,
             domain=domain,
@@ -71,7 +81,58 @@ def register_search_routes(
         user: AuthUser = Depends(require_auth),
     ) -> JSONResponse:
         """Get list of unique domains used in user's workflows."""
-        domains = workflow_store.get_domains(user.id)
+        domains = await store.get_domains(user.id)
         return JSONResponse({"domains": domains})
 
+    # Plain ``def``: FastAPI runs it in the threadpool, so a slow FTS query
+    # never blocks the event loop serving chat streams.
+    @router.get("/api/conversations/search")
+    def search_conversations(
+        request: Request,
+        user: AuthUser = Depends(require_auth),
+    ) -> JSONResponse:
+        """Full-text search over the user's messages, replies and tool arguments.
+
+        Query params: ``q`` (required), ``workflow_id``, ``since`` / ``until``
+        (inclusive ``YYYY-MM-DD``), ``limit`` (max 100) and ``offset``.
+        """
+        if conversation_logger is None:
+            return api_error("Conversation log is not enabled", 503)
+        query = (request.query_params.get("q") or "").strip()
+        if not query:
+            return api_error("q is required")
+        since = request.query_params.get("since")
+        until = request.query_params.get("until")
+        for name, value in (("since", since), ("until", until)):
+            if value is not None:
+                try:
+                    date.fromisoformat(value)
+                except ValueError:
+                    return api_error(f"{name} must be a YYYY-MM-DD date")
+        try:
+            limit = max(min(int(request.query_params.get("limit", 20)), 100), 1)
+        except (ValueError, TypeError):
+            limit = 20
+        try:
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+        except (ValueError, TypeError):
+            offset = 0
+
+        # One extra row tells us whether another page exists without a COUNT.
+        hits = conversation_logger.search_entries(
+            query,
+            user_id=user.id,
+            workflow_id=request.query_params.get("workflow_id"),
+            since=since,
+            until=until,
+            limit=limit + 1,
+            offset=offset,
+        )
+        return JSONResponse({
+            "results": hits[:limit],
+            "offset": offset,
+            "limit": limit,
+            "has_more": len(hits) > limit,
+        })
+
     app.include_router(router)
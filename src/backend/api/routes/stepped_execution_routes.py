@@ -4,28 +4,39 @@ POST /api/workflows/{workflow_id}/execute  — SSE stream of execution events
 POST /api/executions/{execution_id}/pause  — pause a running execution
 POST /api/executions/{execution_id}/resume — resume a paused execution
 POST /api/executions/{execution_id}/stop   — stop a running execution
+POST /api/executions/{execution_id}/step   — play one step while paused
+POST /api/executions/{execution_id}/seek   — jump to a frame of the trace
+POST /api/executions/{execution_id}/speed  — change the delay between steps
 
 These routes replace the older socket-based execute_workflow / pause_execution /
-resume_execution / stop_execution events.
+resume_execution / stop_execution events.  The workflow is recorded up front;
+playback runs on event-loop timers (see tasks/execution_playback.py).
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import threading
+from typing import Any
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import JSONResponse, StreamingResponse
 
 from ..deps import require_auth
+from .helpers import task_rejected_response
+from ...tasks.executor import TaskKind, TaskRejected, task_executor
 from ...tasks.sse import EventSink
 from ...tasks.execution_task import (
     SteppedExecutionTask,
+    _clear_execution,
     register_execution,
     pause_execution,
     resume_execution,
     stop_execution,
+    step_execution,
+    seek_execution,
+    set_execution_speed,
 )
 from ...execution.preparation import prepare_workflow_execution
 from ...storage.auth import AuthUser
@@ -34,6 +45,13 @@ from ...storage.workflows import WorkflowStore
 logger = logging.getLogger("backend.api")
 
 
+def _clamp_speed(speed_ms: Any) -> int:
+    """Clamp a requested step delay to 0..2000 ms."""
+    if not isinstance(speed_ms, int) or speed_ms < 0:
+        return 0
+    return min(speed_ms, 2000)
+
+
 def register_stepped_execution_routes(
     app: FastAPI,
     *,
@@ -50,7 +68,10 @@ def register_stepped_execution_routes(
     ) -> StreamingResponse:
         """Start a visual step-through execution, returning an SSE stream.
 
-        Body: {workflow, inputs, speed_ms, execution_id}
+        Body: {workflow, inputs, speed_ms, execution_id, compact}
+
+        ``compact`` (default true) selects the compact event stream; pass
+        false for the verbose one.
         """
         payload = await request.json()
         workflow = payload.get("workflow")
@@ -97,10 +118,7 @@ def register_stepped_execution_routes(
             )
 
         # Clamp speed_ms to valid range
-        if not isinstance(speed_ms, int) or speed_ms < 0:
-            speed_ms = 0
-        elif speed_ms > 2000:
-            speed_ms = 2000
+        speed_ms = _clamp_speed(speed_ms)
 
         # Generate execution_id if not provided
         if not isinstance(execution_id, str) or not execution_id.strip():
@@ -119,16 +137,24 @@ def register_stepped_execution_routes(
             workflow=workflow,
             inputs=inputs,
             speed_ms=speed_ms,
+            compact=payload.get("compact", True) is not False,
         )
 
-        # Emit execution_started before spawning the thread so
+        # Emit execution_started before recording so
         # it's the first event the client receives
         sink.push("execution_started", {"execution_id": execution_id})
 
-        # Run the execution in a background thread
-        threading.Thread(
-            target=task.run, daemon=True, name=f"exec-{execution_id}",
-        ).start()
+        # Record the whole run on the executor's bulk pool, then pace the
+        # trace out from loop timers — no thread per execution
+        try:
+            recording = task_executor.submit(
+                TaskKind.BULK, task.record, user_id=user.id, name=f"exec-{execution_id}",
+            )
+        except TaskRejected as exc:
+            _clear_execution(execution_id)
+            return task_rejected_response(exc)
+        await asyncio.wrap_future(recording)
+        task.play(asyncio.get_running_loop())
 
         return StreamingResponse(
             sink, media_type="text/event-stream",
@@ -171,4 +197,41 @@ def register_stepped_execution_routes(
         logger.warning("Failed to stop execution %s — not found", execution_id)
         return JSONResponse({"ok": False, "error": "Execution not found"}, status_code=404)
 
+    @router.post("/api/executions/{execution_id}/step")
+    async def step_execution_endpoint(
+        execution_id: str,
+        user: AuthUser = Depends(require_auth),
+    ) -> JSONResponse:
+        """Play the next step of a paused execution."""
+        if step_execution(execution_id):
+            return JSONResponse({"ok": True})
+        return JSONResponse({"ok": False, "error": "Execution not found"}, status_code=404)
+
+    @router.post("/api/executions/{execution_id}/seek")
+    async def seek_execution_endpoint(
+        execution_id: str,
+        request: Request,
+        user: AuthUser = Depends(require_auth),
+    ) -> JSONResponse:
+        """Jump to a frame of the recorded trace.  Body: {frame}"""
+        payload = await request.json()
+        frame = payload.get("frame")
+        if not isinstance(frame, int) or isinstance(frame, bool):
+            return JSONResponse({"ok": False, "error": "frame must be an integer"}, status_code=400)
+        if seek_execution(execution_id, frame):
+            return JSONResponse({"ok": True})
+        return JSONResponse({"ok": False, "error": "Execution not found"}, status_code=404)
+
+    @router.post("/api/executions/{execution_id}/speed")
+    async def speed_execution_endpoint(
+        execution_id: str,
+        request: Request,
+        user: AuthUser = Depends(require_auth),
+    ) -> JSONResponse:
+        """Change the delay between steps.  Body: {speed_ms}"""
+        payload = await request.json()
+        if set_execution_speed(execution_id, _clamp_speed(payload.get("speed_ms"))):
+            return JSONResponse({"ok": True})
+        return JSONResponse({"ok": False, "error": "Execution not found"}, status_code=404)
+
     app.include_router(router)
@@ -17,6 +17,7 @@ from fastapi import APIRouter, Depends, FastAPI, Request
 from starlette.responses import FileResponse, JSONResponse
 
 from ..deps import require_auth
+from ...storage.async_facade import AsyncStore
 from ...storage.auth import AuthUser
 from .helpers import _calculate_confidence, _infer_outputs_from_nodes
 from ...storage.workflows import WorkflowStore
@@ -51,6 +52,7 @@ def register_workflow_routes(
         repo_root: Repository root for resolving upload paths.
     """
     router = APIRouter()
+    store = AsyncStore(workflow_store)
 
     @router.get("/api/workflows")
     async def list_workflows(
@@ -72,7 +74,7 @@ def register_workflow_routes(
         except (ValueError, TypeError):
             offset = 0
 
-        workflows, total_count = workflow_store.list_workflows(
+        workflows, total_count = await store.list_workflows(
             user.id,
             limit=limit,
             offset=offset,
@@ -143,7 +145,7 @@ def register_workflow_routes(
             )
 
         try:
-            workflow_store.create_workflow(
+            await store.create_workflow(
                 workflow_id=workflow_id,
                 user_id=user.id,
                 name=name,
@@ -163,7 +165,7 @@ def register_workflow_routes(
             )
         except sqlite3.IntegrityError:
             # Workflow ID already exists, try updating instead
-            success = workflow_store.update_workflow(
+            success = await store.update_workflow(
                 workflow_id=workflow_id,
                 user_id=user.id,
                 name=name,
@@ -203,7 +205,7 @@ def register_workflow_routes(
         user: AuthUser = Depends(require_auth),
     ) -> JSONResponse:
         """Get a specific workflow by ID."""
-        workflow = workflow_store.get_workflow(workflow_id, user.id)
+        workflow = await store.get_workflow(workflow_id, user.id)
 
         if not workflow:
             return JSONResponse({"error": "Workflow not found"}, status_code=404)
@@ -246,7 +248,7 @@ def register_workflow_routes(
         user: AuthUser = Depends(require_auth),
     ) -> JSONResponse:
         """Delete a workflow."""
-        success = workflow_store.delete_workflow(workflow_id, user.id)
+        success = await store.delete_workflow(workflow_id, user.id)
 
         if not success:
             return JSONResponse(
@@ -274,7 +276,7 @@ def register_workflow_routes(
             payload = {}
 
         # Check workflow exists and belongs to user
-        existing = workflow_store.get_workflow(workflow_id, user.id)
+        existing = await store.get_workflow(workflow_id, user.id)
         if not existing:
             return JSONResponse(
                 {"error": "Workflow not found or unauthorized"}, status_code=404
@@ -301,7 +303,7 @@ def register_workflow_routes(
 
         # Attempt the update (preserves is_draft by not passing it)
         try:
-            success = workflow_store.update_workflow(
+            success = await store.update_workflow(
                 workflow_id, user.id, **update_kwargs
             )
             if not success:
@@ -337,7 +339,7 @@ def register_workflow_routes(
             payload = {}
 
         # Check workflow exists and belongs to user
-        existing = workflow_store.get_workflow(workflow_id, user.id)
+        existing = await store.get_workflow(workflow_id, user.id)
         if not existing:
             return JSONResponse(
                 {"error": "Workflow not found or unauthorized"}, status_code=404
@@ -399,7 +401,7 @@ def register_workflow_routes(
             )
 
         # Update workflow - also marks as non-draft (saved)
-        success = workflow_store.update_workflow(
+        success = await store.update_workflow(
             workflow_id=workflow_id,
             user_id=user.id,
             name=name,
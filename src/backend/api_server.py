@@ -13,24 +13,51 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from .api.app import create_app
+from .api.auth import build_password_hasher, get_auth_config
 from .api.common import repo_root
 from .tasks.conversations import ConversationStore
 from .api.frontend import register_frontend_routes
 from .api.routes import register_routes
+from .storage.async_facade import shutdown_store_io
 from .storage.auth import AuthStore
 from .storage.conversation_log import ConversationLogger
+from .storage.coordination import build_coordinator, set_coordinator
+from .storage.maintenance import MaintenanceScheduler
 from .storage.workflows import WorkflowStore
+from .tools import shared_tool_registry
+from .utils.content_blocks import ContentBlockCache, set_content_block_cache
 from .utils.paths import lemon_data_dir
 
 _repo_root = repo_root()
 _data_dir = lemon_data_dir(_repo_root)
 
 # Shared instances -- created once at import time
+# Tool discovery + schema generation, done once instead of per conversation
+tool_registry = shared_tool_registry(_repo_root)
 conversation_logger = ConversationLogger(_data_dir / "conversation_log.sqlite")
-# Pass conversation_logger so ConversationStore can reload history after backend restart
-conversation_store = ConversationStore(_repo_root, conversation_logger=conversation_logger)
+# Pass conversation_logger so ConversationStore can reload history after backend restart;
+# conversations evicted from the in-memory cache spill to disk for fast reload
+conversation_store = ConversationStore(
+    _repo_root,
+    conversation_logger=conversation_logger,
+    spill_dir=_data_dir / "conversation_spill",
+)
 auth_store = AuthStore(_data_dir / "auth.sqlite")
+# PBKDF2 runs on a bounded process pool, started on the first login
+password_hasher = build_password_hasher(get_auth_config())
 workflow_store = WorkflowStore(_data_dir / "workflows.sqlite")
+# Task ownership, execution controls and rate limits; shared between
+# workers through a SQLite broker when running more than one
+coordinator = build_coordinator(_data_dir)
+set_coordinator(coordinator)
+# Encoded upload blocks, shared by all conversations and kept across restarts
+set_content_block_cache(ContentBlockCache(_data_dir / "content_blocks"))
+# Retention + SQLite housekeeping; started/stopped by the lifespan below
+maintenance_scheduler = MaintenanceScheduler(
+    auth_store=auth_store,
+    conversation_logger=conversation_logger,
+    workflow_store=workflow_store,
+)
 
 _startup_logger = logging.getLogger("backend.api")
 _startup_logger.info(
@@ -40,10 +67,22 @@ _startup_logger.info(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """FastAPI lifespan -- cleans up stale state on startup."""
+    """FastAPI lifespan -- cleans up stale state and runs background maintenance."""
     # Clear building=True flags left by daemon threads that died on last shutdown
     workflow_store.clear_stale_building_flags()
-    yield
+    maintenance_scheduler.start()
+    try:
+        yield
+    finally:
+        # Let in-flight store calls from async routes finish before closing
+        shutdown_store_io(wait=True)
+        maintenance_scheduler.stop()
+        # Commit any conversation log entries still queued for the writer
+        conversation_logger.close()
+        # Write session last-used times still waiting for the batch flush
+        auth_store.close()
+        password_hasher.shutdown()
+        coordinator.close()
 
 
 # Build the FastAPI app with lifespan
@@ -60,6 +99,7 @@ register_routes(
     auth_store=auth_store,
     workflow_store=workflow_store,
     conversation_logger=conversation_logger,
+    password_hasher=password_hasher,
 )
 
 # Serve frontend static files (SPA catch-all) -- must come after API routes
@@ -60,6 +60,7 @@ def call_llm(
     effort: str = "high",
     caller: Optional[str] = None,
     request_tag: Optional[str] = None,
+    conversation_id: Optional[str] = None,
 ) -> LLMResponse:
     """Unified LLM call. Handles text, streaming, and tool use.
 
@@ -74,6 +75,7 @@ def call_llm(
         effort: Thinking effort level ("low", "medium", "high", "max"). Default "high".
         caller: Tag for token usage tracking.
         request_tag: Sub-tag for token usage tracking.
+        conversation_id: Conversation the call belongs to, for per-conversation usage.
     """
     client = get_anthropic_client()
     system, converted = _to_anthropic_messages(messages)
@@ -177,7 +179,7 @@ def call_llm(
     ))
     _record_tokens(
         request_id=request_id, message=message, model=payload["model"],
-        caller=caller, request_tag=request_tag,
+        caller=caller, request_tag=request_tag, conversation_id=conversation_id,
         tool_choice=tool_choice, tool_count=len(tools) if tools else 0,
         message_count=len(messages), elapsed_ms=elapsed_ms,
         tool_names=tool_names,
@@ -259,6 +261,7 @@ def _record_tokens(
     model: str,
     caller: Optional[str],
     request_tag: Optional[str],
+    conversation_id: Optional[str],
     tool_choice: Optional[str],
     tool_count: int,
     message_count: int,
@@ -272,6 +275,7 @@ def _record_tokens(
         "model": model,
         "caller": caller or "unknown",
         "request_tag": request_tag or "",
+        "conversation_id": conversation_id,
         "function": "call_llm",
         "streaming": True,
         "tool_choice": tool_choice or "",
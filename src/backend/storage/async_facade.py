@@ -0,0 +1,72 @@
+"""Awaitable facade over the blocking SQLite stores.
+
+WorkflowStore and AuthStore open a connection per call and block on disk
+I/O (and on SQLite's write lock).  Called from ``async def`` routes they
+stall the event loop, and with it every SSE stream and playback timer.
+``AsyncStore`` wraps a store so its methods can be awaited instead; the
+calls run on one dedicated, bounded thread pool so a burst of slow
+queries cannot grow threads without limit or starve the threadpool that
+Starlette uses for sync routes.
+
+    store = AsyncStore(workflow_store)
+    workflow = await store.get_workflow(workflow_id, user.id)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_STORE_IO_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def store_io_executor() -> ThreadPoolExecutor:
+    """The shared store-I/O pool, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_STORE_IO_WORKERS, thread_name_prefix="store-io",
+        )
+    return _executor
+
+
+def shutdown_store_io(wait: bool = False) -> None:
+    """Stop the store-I/O pool; the next call starts a fresh one."""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await ``fn(*args, **kwargs)`` on the store-I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        store_io_executor(), functools.partial(fn, *args, **kwargs),
+    )
+
+
+class AsyncStore:
+    """Wraps a blocking store; its methods become coroutine functions.
+
+    Non-callable attributes are passed through unchanged.  The wrapped
+    store stays available as ``.sync`` for code that already runs off the
+    loop (e.g. the interpreter resolving subflows in a worker thread).
+    """
+
+    def __init__(self, store: Any) -> None:
+        self.sync = store
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_blocking(attr, *args, **kwargs)
+
+        return call
@@ -1,14 +1,28 @@
-"""SQLite-backed auth store for users and sessions."""
+"""SQLite-backed auth store for users and sessions.
+
+Validated sessions are cached in-process for a short TTL, keyed by token
+hash, so authenticated requests (SSE reconnects, canvas polling) don't each
+run the sessions/users join.  Every method that deletes a session or
+changes a user invalidates the affected entries, here and — through the
+coordinator — in every other worker's store for the same database.  ``touch_session`` only
+records the time; a background thread writes pending touches in one batch
+every ``touch_interval_seconds``.
+"""
 
 from __future__ import annotations
 
 import logging
 import sqlite3
+import threading
+import time
+import weakref
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .coordination import broadcast, on_control
 
 
 @dataclass(frozen=True)
@@ -32,11 +46,33 @@ class AuthSession:
 
 
 class AuthStore:
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        session_cache_ttl_seconds: float = 30.0,
+        session_cache_size: int = 10_000,
+        touch_interval_seconds: float = 30.0,
+    ):
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Identifies the database in invalidations broadcast between workers
+        self._db_key = str(Path(db_path).resolve())
         self._logger = logging.getLogger("backend.auth")
+        # token_hash -> (monotonic deadline, session, user); 0 TTL disables.
+        self._session_cache: Dict[str, Tuple[float, AuthSession, AuthUser]] = {}
+        self._cache_ttl = session_cache_ttl_seconds
+        self._cache_size = session_cache_size
+        # session_id -> last_used_at not yet written.
+        self._pending_touches: Dict[str, str] = {}
+        # Bumped by every invalidation; a lookup that raced one doesn't cache.
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        self._touch_interval = touch_interval_seconds
+        self._touch_stop = threading.Event()
+        self._touch_thread: Optional[threading.Thread] = None
         self._init_schema()
+        _stores.add(self)
 
     def _init_schema(self) -> None:
         with self._conn() as conn:
@@ -123,6 +159,38 @@ class AuthStore:
                 "UPDATE users SET last_login_at = ? WHERE id = ?",
                 (now, user_id),
             )
+        self._invalidate_sessions(user_id=user_id)
+
+    def update_password_hash(
+        self, user_id: str, password_hash: str, *, revoke_sessions: bool = True,
+    ) -> int:
+        """Replace the user's password hash, signing out all their sessions.
+
+        Pass ``revoke_sessions=False`` when only the hash parameters changed
+        (rehash on login), not the password.  Returns the number of sessions
+        revoked.
+        """
+        self._invalidate_sessions(user_id=user_id)
+        revoked = 0
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (password_hash, user_id),
+            )
+            if revoke_sessions:
+                revoked = conn.execute(
+                    "DELETE FROM sessions WHERE user_id = ?", (user_id,),
+                ).rowcount
+        self._invalidate_sessions(user_id=user_id)
+        return revoked
+
+    def delete_user(self, user_id: str) -> bool:
+        """Delete the user; their sessions go with them (FK cascade)."""
+        self._invalidate_sessions(user_id=user_id)
+        with self._conn() as conn:
+            result = conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        self._invalidate_sessions(user_id=user_id)
+        return result.rowcount > 0
 
     def create_session(
         self,
@@ -146,6 +214,14 @@ class AuthStore:
         self,
         token_hash: str,
     ) -> Optional[Tuple[AuthSession, AuthUser]]:
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._session_cache.get(token_hash)
+            if cached is not None:
+                if cached[0] > now:
+                    return cached[1], cached[2]
+                del self._session_cache[token_hash]
+            generation = self._cache_generation
         with self._conn() as conn:
             row = conn.execute(
                 """
@@ -186,35 +262,144 @@ class AuthStore:
             created_at=row["user_created_at"],
             last_login_at=row["last_login_at"],
         )
+        if self._cache_ttl > 0:
+            with self._cache_lock:
+                if generation != self._cache_generation:
+                    return session, user
+                if len(self._session_cache) >= self._cache_size:
+                    # Dicts keep insertion order: drop the oldest entry.
+                    del self._session_cache[next(iter(self._session_cache))]
+                self._session_cache[token_hash] = (now + self._cache_ttl, session, user)
         return session, user
 
+    def has_cached_session(self, token_hash: str) -> bool:
+        """True if looking up *token_hash* would be answered without SQLite."""
+        with self._cache_lock:
+            cached = self._session_cache.get(token_hash)
+            return cached is not None and cached[0] > time.monotonic()
+
     def touch_session(self, session_id: str) -> None:
+        """Record that the session was used; written by the next batch flush."""
         now = datetime.now(timezone.utc).isoformat()
+        with self._cache_lock:
+            self._pending_touches[session_id] = now
+            if self._touch_thread is None and self._touch_interval > 0:
+                self._touch_stop.clear()
+                self._touch_thread = threading.Thread(
+                    target=self._touch_loop, name="auth-session-touch", daemon=True,
+                )
+                self._touch_thread.start()
+        if self._touch_interval <= 0:
+            self.flush_session_touches()
+
+    def _touch_loop(self) -> None:
+        while not self._touch_stop.wait(self._touch_interval):
+            try:
+                self.flush_session_touches()
+            except Exception:
+                self._logger.warning("Failed to flush session touches", exc_info=True)
+
+    def flush_session_touches(self) -> int:
+        """Write all pending ``last_used_at`` updates in one transaction."""
+        with self._cache_lock:
+            pending, self._pending_touches = self._pending_touches, {}
+        if not pending:
+            return 0
         with self._conn() as conn:
-            conn.execute(
+            conn.executemany(
                 "UPDATE sessions SET last_used_at = ? WHERE id = ?",
-                (now, session_id),
+                [(used_at, session_id) for session_id, used_at in pending.items()],
             )
+        return len(pending)
+
+    def close(self) -> None:
+        """Stop the touch thread and write any pending touches."""
+        with self._cache_lock:
+            thread, self._touch_thread = self._touch_thread, None
+        if thread is not None:
+            self._touch_stop.set()
+            thread.join()
+        self.flush_session_touches()
+
+    def _invalidate_sessions(
+        self,
+        *,
+        token_hash: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_ids: Iterable[str] = (),
+    ) -> None:
+        """Drop cached sessions here, then tell the other workers to as well."""
+        session_ids = list(session_ids)
+        self._drop_cached_sessions(
+            token_hash=token_hash, user_id=user_id, session_ids=session_ids,
+        )
+        try:
+            broadcast(_INVALIDATE_KIND, {
+                "db": self._db_key,
+                "token_hash": token_hash,
+                "user_id": user_id,
+                "session_ids": session_ids,
+            })
+        except Exception:
+            # Other workers' entries still expire within the cache TTL
+            self._logger.warning("Failed to broadcast session invalidation", exc_info=True)
+
+    def _drop_cached_sessions(
+        self,
+        *,
+        token_hash: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_ids: Iterable[str] = (),
+    ) -> None:
+        session_ids = set(session_ids)
+        with self._cache_lock:
+            self._cache_generation += 1
+            if token_hash is not None:
+                self._session_cache.pop(token_hash, None)
+            if user_id is not None or session_ids:
+                for key, (_, session, _user) in list(self._session_cache.items()):
+                    if session.user_id == user_id or session.id in session_ids:
+                        del self._session_cache[key]
+            for session_id in session_ids:
+                self._pending_touches.pop(session_id, None)
 
     def delete_session_by_token_hash(self, token_hash: str) -> None:
+        self._invalidate_sessions(token_hash=token_hash)
         with self._conn() as conn:
             conn.execute(
                 "DELETE FROM sessions WHERE token_hash = ?",
                 (token_hash,),
             )
 
-    def delete_expired_sessions(self) -> int:
+    def delete_expired_sessions(self, *, limit: Optional[int] = None) -> int:
+        """Delete expired sessions, at most *limit* rows when given.
+
+        The background maintenance job passes a small limit so each call is
+        a short transaction that never holds the write lock for long.
+        """
         now = datetime.now(timezone.utc).isoformat()
         with self._conn() as conn:
-            result = conn.execute(
-                "DELETE FROM sessions WHERE expires_at <= ?",
-                (now,),
-            )
+            if limit is None:
+                result = conn.execute(
+                    "DELETE FROM sessions WHERE expires_at <= ?",
+                    (now,),
+                )
+            else:
+                result = conn.execute(
+                    """
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at <= ? LIMIT ?
+                    )
+                    """,
+                    (now, limit),
+                )
         return result.rowcount if result else 0
 
     def prune_sessions(self, user_id: str, *, max_sessions: int) -> int:
         if max_sessions <= 0:
             return 0
+        # Rank by up-to-date last_used_at, not the last batch flush.
+        self.flush_session_touches()
         with self._conn() as conn:
             rows = conn.execute(
                 """
@@ -232,6 +417,7 @@ class AuthStore:
                 "DELETE FROM sessions WHERE id = ?",
                 [(session_id,) for session_id in ids_to_delete],
             )
+        self._invalidate_sessions(session_ids=ids_to_delete)
         return len(ids_to_delete)
 
     @staticmethod
@@ -246,3 +432,22 @@ class AuthStore:
             created_at=row["created_at"],
             last_login_at=row["last_login_at"],
         )
+
+
+_INVALIDATE_KIND = "auth_sessions_invalidated"
+# Live stores, so an invalidation from another worker reaches the ones
+# caching sessions of the same database file.
+_stores: "weakref.WeakSet[AuthStore]" = weakref.WeakSet()
+
+
+def _on_sessions_invalidated(payload: Dict[str, Any]) -> None:
+    for store in list(_stores):
+        if store._db_key == payload.get("db"):
+            store._drop_cached_sessions(
+                token_hash=payload.get("token_hash"),
+                user_id=payload.get("user_id"),
+                session_ids=payload.get("session_ids") or (),
+            )
+
+
+on_control(_INVALIDATE_KIND, _on_sessions_invalidated)
@@ -7,38 +7,261 @@ can be evaluated after the fact.
 Follows the same patterns as WorkflowStore: one connection per operation via
 a ``_conn()`` context manager, WAL mode for concurrent reads/writes, and
 thread-safe sequence numbering.
+
+Entry writes are group-committed: the ``log_*`` writers assign the sequence
+number in memory and hand the row to a background writer thread through a
+bounded queue, which inserts up to ``batch_size`` rows per transaction.  A
+chat turn therefore costs a handful of commits instead of one per entry.
+The read API calls ``flush()`` first, so readers always see prior writes.
+History checkpoints go through the same queue: the caller only decides
+whether one is due, and the writer serializes, compresses and stores it
+after the rows it covers.
+
+Workflow snapshots are content-addressed: the canonical JSON is hashed and
+stored once, zlib-compressed, in ``snapshot_blobs``; each snapshot entry
+keeps only the hash and the read API re-attaches the JSON.  Unchanged
+workflows (the common case after a failed or no-op edit) cost one small
+entry row.
+
+Tool-call, token and error counts are rolled up per (day, user, tool) in
+``usage_rollups`` inside the same transaction that inserts the entries, so
+analytics reads cost the same no matter how long the log is.
+
+Entries are time-partitioned: each calendar month (UTC) gets its own SQLite
+file under ``<stem>.partitions/``, attached to the main connection only when
+a query needs it.  The main file keeps conversations, snapshot blobs,
+rollups and a ``conversation_partitions`` map of which months each
+conversation has entries in.  Writes only ever touch the current month, and
+retention drops whole months by deleting a file.  Entries written before
+partitioning stay in the main file's ``entries`` table and are read
+alongside the partitions.
+
+User messages, assistant replies and tool arguments are full-text indexed
+(FTS5, external content) by triggers in each file, so the index is built by
+the writer thread inside the same batch transaction and dropped together
+with its partition.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import queue
+import re
 import sqlite3
 import threading
+import time
+import zlib
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 
 _log = logging.getLogger(__name__)
 
+# ``{schema}`` is ``main`` for pre-partitioning rows or ``p`` for the
+# attached month partition.
+_ENTRY_INSERT_SQL = """
+    INSERT INTO {schema}.entries
+        (conversation_id, seq, entry_type,
+         role, content, tool_name, tool_arguments, tool_result,
+         tool_success, tool_duration_ms,
+         input_tokens, output_tokens,
+         cache_creation_tokens, cache_read_tokens,
+         workflow_snapshot, files, task_id, timestamp, snapshot_hash)
+    VALUES (?, ?, ?,
+            ?, ?, ?, ?, ?,
+            ?, ?,
+            ?, ?,
+            ?, ?,
+            ?, ?, ?, ?, ?)
+"""
+
+_BLOB_INSERT_SQL = """
+    INSERT OR IGNORE INTO snapshot_blobs (hash, body, created_at) VALUES (?, ?, ?)
+"""
+
+# Folds entries with id > ? into usage_rollups.  Model turns and errors are
+# counted under tool_name ''.  Used both per write batch and for backfill.
+_ROLLUP_SQL = """
+    INSERT INTO usage_rollups
+        (day, user_id, tool_name,
+         tool_calls, tool_failures, tool_duration_ms,
+         assistant_turns, input_tokens, output_tokens,
+         cache_creation_tokens, cache_read_tokens, errors)
+    SELECT substr(e.timestamp, 1, 10),
+           COALESCE(c.user_id, ''),
+           COALESCE(e.tool_name, ''),
+           SUM(e.entry_type = 'tool_call'),
+           SUM(e.entry_type = 'tool_call' AND COALESCE(e.tool_success, 0) = 0),
+           COALESCE(SUM(CASE WHEN e.entry_type = 'tool_call' THEN e.tool_duration_ms END), 0),
+           SUM(e.entry_type = 'assistant_response'),
+           COALESCE(SUM(e.input_tokens), 0),
+           COALESCE(SUM(e.output_tokens), 0),
+           COALESCE(SUM(e.cache_creation_tokens), 0),
+           COALESCE(SUM(e.cache_read_tokens), 0),
+           SUM(e.entry_type = 'error')
+    FROM {schema}.entries e
+    LEFT JOIN main.conversations c ON c.id = e.conversation_id
+    WHERE e.id > ?
+      AND e.entry_type IN ('tool_call', 'assistant_response', 'error')
+    GROUP BY 1, 2, 3
+    ON CONFLICT(day, user_id, tool_name) DO UPDATE SET
+        tool_calls            = tool_calls + excluded.tool_calls,
+        tool_failures         = tool_failures + excluded.tool_failures,
+        tool_duration_ms      = tool_duration_ms + excluded.tool_duration_ms,
+        assistant_turns       = assistant_turns + excluded.assistant_turns,
+        input_tokens          = input_tokens + excluded.input_tokens,
+        output_tokens         = output_tokens + excluded.output_tokens,
+        cache_creation_tokens = cache_creation_tokens + excluded.cache_creation_tokens,
+        cache_read_tokens     = cache_read_tokens + excluded.cache_read_tokens,
+        errors                = errors + excluded.errors
+"""
+
+_PARTITION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        id                    INTEGER PRIMARY KEY AUTOINCREMENT,
+        conversation_id       TEXT NOT NULL,
+        seq                   INTEGER NOT NULL,
+        entry_type            TEXT NOT NULL,
+        role                  TEXT,
+        content               TEXT,
+        tool_name             TEXT,
+        tool_arguments        TEXT,
+        tool_result           TEXT,
+        tool_success          INTEGER,
+        tool_duration_ms      REAL,
+        input_tokens          INTEGER,
+        output_tokens         INTEGER,
+        cache_creation_tokens INTEGER,
+        cache_read_tokens     INTEGER,
+        workflow_snapshot      TEXT,
+        files                 TEXT,
+        task_id               TEXT,
+        timestamp             TEXT NOT NULL,
+        snapshot_hash         TEXT,
+        UNIQUE(conversation_id, seq)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+
+    CREATE INDEX IF NOT EXISTS idx_entries_snapshot_hash
+        ON entries(snapshot_hash) WHERE snapshot_hash IS NOT NULL;
+"""
+
+# Entry types covered by full-text search.
+_SEARCHABLE_TYPES = ("user_message", "assistant_response", "tool_call")
+
+# Installed in every file that has an ``entries`` table (main + partitions).
+_FTS_SCHEMA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+        content, tool_arguments, content='entries', content_rowid='id'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ai AFTER INSERT ON entries
+    WHEN new.entry_type IN {_SEARCHABLE_TYPES}
+    BEGIN
+        INSERT INTO entries_fts (rowid, content, tool_arguments)
+        VALUES (new.id, new.content, new.tool_arguments);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS entries_fts_ad AFTER DELETE ON entries
+    WHEN old.entry_type IN {_SEARCHABLE_TYPES}
+    BEGIN
+        INSERT INTO entries_fts (entries_fts, rowid, content, tool_arguments)
+        VALUES ('delete', old.id, old.content, old.tool_arguments);
+    END;
+"""
+
+
+def _install_fts(conn: sqlite3.Connection) -> None:
+    """Create the FTS index and triggers, backfilling rows that predate them."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
+    ).fetchone() is not None
+    conn.executescript(_FTS_SCHEMA)
+    if not exists:
+        conn.execute(
+            f"INSERT INTO entries_fts (rowid, content, tool_arguments) "
+            f"SELECT id, content, tool_arguments FROM entries "
+            f"WHERE entry_type IN {_SEARCHABLE_TYPES}"
+        )
+
+
+# Writer-queue control markers (compared by identity).
+_FLUSH = object()
+_STOP = object()
+
+
+class _Checkpoint(NamedTuple):
+    """A history checkpoint queued for the writer thread."""
+    conversation_id: str
+    through_seq: int
+    history: List[Dict[str, Any]]
+    created_at: str
+
 
 class ConversationLogger:
-    """Write-heavy audit log backed by a single SQLite file."""
+    """Write-heavy audit log backed by a main SQLite file plus monthly partitions."""
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        batch_size: int = 64,
+        flush_interval_ms: int = 50,
+        max_pending: int = 10_000,
+        checkpoint_every: int = 50,
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite file to write to.
+            batch_size: Max entries committed per transaction.
+            flush_interval_ms: How long the writer waits to fill a batch.
+            max_pending: Queue bound; writers block once this many entries
+                are waiting (backpressure instead of unbounded growth).
+            checkpoint_every: Entries logged between history checkpoints.
+        """
         self._db_path = Path(db_path)
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._partition_dir = self._db_path.with_name(f"{self._db_path.stem}.partitions")
+        # Months whose partition file exists with schema; guarded by
+        # _partition_lock together with creating and dropping files.
+        self._known_partitions: set[str] = set()
+        self._partition_lock = threading.Lock()
         # Per-conversation monotonic sequence counters.
         self._seq_counters: Dict[str, int] = {}
         self._seq_lock = threading.Lock()
+        # (through_seq, message_count) of the last history checkpoint written
+        # per conversation; guarded by _seq_lock.
+        self._checkpoints: Dict[str, Tuple[int, int]] = {}
+        self._checkpoint_every = max(1, checkpoint_every)
+        # Last committed snapshot hash per conversation — an unchanged
+        # workflow skips compressing and re-sending the blob.  Only set once
+        # the row (and so its blob) is committed; guarded by _seq_lock.
+        self._last_snapshot_hash: Dict[str, str] = {}
+        # Round-robin positions of prune_orphaned_snapshot_blobs and of
+        # prune_orphaned_entries ((source month, "" for legacy; last id)).
+        self._blob_scan_cursor = ""
+        self._entry_scan_cursor: Tuple[str, int] = ("", 0)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._pending: queue.Queue[Any] = queue.Queue(maxsize=max_pending)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         self._init_schema()
 
+    @property
+    def db_path(self) -> Path:
+        """Main SQLite file (partitions live in a sibling directory)."""
+        return self._db_path
+
     @contextmanager
     def _conn(self) -> Iterator[sqlite3.Connection]:
         """Yield a short-lived connection with Row factory."""
@@ -51,9 +274,18 @@ class ConversationLogger:
             conn.close()
 
     def _init_schema(self) -> None:
-        """Create tables if they don't exist and enable WAL mode."""
+        """Create tables if they don't exist and enable WAL mode.
+
+        ``auto_vacuum=INCREMENTAL`` only takes effect on a brand-new file; it
+        lets the maintenance job hand pages freed by retention deletes back
+        to the OS in small steps instead of a blocking full VACUUM.
+        """
         with self._conn() as conn:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
             conn.execute("PRAGMA journal_mode=WAL")
+            had_rollups = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_rollups'"
+            ).fetchone() is not None
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS conversations (
@@ -85,10 +317,179 @@ class ConversationLogger:
                     files                 TEXT,
                     task_id               TEXT,
                     timestamp             TEXT NOT NULL,
+                    snapshot_hash         TEXT,
                     UNIQUE(conversation_id, seq)
                 );
+
+                CREATE INDEX IF NOT EXISTS idx_entries_timestamp
+                    ON entries(timestamp);
+
+                CREATE TABLE IF NOT EXISTS snapshot_blobs (
+                    hash       TEXT PRIMARY KEY,
+                    body       BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS usage_rollups (
+                    day                   TEXT NOT NULL,
+                    user_id               TEXT NOT NULL,
+                    tool_name             TEXT NOT NULL,
+                    tool_calls            INTEGER NOT NULL DEFAULT 0,
+                    tool_failures         INTEGER NOT NULL DEFAULT 0,
+                    tool_duration_ms      REAL NOT NULL DEFAULT 0,
+                    assistant_turns       INTEGER NOT NULL DEFAULT 0,
+                    input_tokens          INTEGER NOT NULL DEFAULT 0,
+                    output_tokens         INTEGER NOT NULL DEFAULT 0,
+                    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+                    cache_read_tokens     INTEGER NOT NULL DEFAULT 0,
+                    errors                INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, user_id, tool_name)
+                );
+
+                CREATE TABLE IF NOT EXISTS conversation_partitions (
+                    conversation_id TEXT NOT NULL,
+                    month           TEXT NOT NULL,
+                    PRIMARY KEY (conversation_id, month)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_conversation_partitions_month
+                    ON conversation_partitions(month);
+
+                CREATE TABLE IF NOT EXISTS history_checkpoints (
+                    conversation_id TEXT PRIMARY KEY,
+                    through_seq     INTEGER NOT NULL,
+                    message_count   INTEGER NOT NULL,
+                    history         BLOB NOT NULL,
+                    created_at      TEXT NOT NULL
+                );
                 """
             )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "snapshot_hash" not in columns:
+                # Pre-dedup databases: older rows keep their inline JSON.
+                conn.execute("ALTER TABLE entries ADD COLUMN snapshot_hash TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_snapshot_hash "
+                "ON entries(snapshot_hash) WHERE snapshot_hash IS NOT NULL"
+            )
+            _install_fts(conn)
+        for month in self._list_partitions():
+            # Brings partitions written by older versions up to date.
+            self._ensure_partition(month)
+        if not had_rollups:
+            # Existing log from before rollups were kept: backfill once.
+            self.rebuild_rollups()
+
+    # ------------------------------------------------------------------
+    # Partitions
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _month(timestamp: str) -> str:
+        """``YYYY-MM`` partition key for an ISO-8601 UTC timestamp."""
+        return timestamp[:7]
+
+    def _partition_path(self, month: str) -> Path:
+        return self._partition_dir / f"entries-{month}.sqlite"
+
+    def _list_partitions(self) -> List[str]:
+        return sorted(
+            path.stem[len("entries-"):]
+            for path in self._partition_dir.glob("entries-*.sqlite")
+        )
+
+    def list_partitions(self) -> List[str]:
+        """Months that have a partition file, oldest first."""
+        self.flush()
+        return self._list_partitions()
+
+    def partition_paths(self) -> List[Path]:
+        """Partition files on disk, oldest first (for maintenance)."""
+        return [self._partition_path(month) for month in self.list_partitions()]
+
+    def _ensure_partition(self, month: str) -> Path:
+        """Create *month*'s partition file and schema if needed."""
+        path = self._partition_path(month)
+        with self._partition_lock:
+            if month in self._known_partitions and path.exists():
+                return path
+            self._partition_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path))
+            try:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_PARTITION_SCHEMA)
+                _install_fts(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            self._known_partitions.add(month)
+        return path
+
+    @contextmanager
+    def _source_conn(self, month: Optional[str]) -> Iterator[Optional[Tuple[sqlite3.Connection, str]]]:
+        """Yield ``(conn, schema)`` for reading one entry source.
+
+        *month* None is the main file's pre-partitioning ``entries`` table
+        (schema ``main``); otherwise that month's partition is attached as
+        ``p``.  Yields None if the partition has been dropped.
+        """
+        with self._conn() as conn:
+            if month is None:
+                yield conn, "main"
+                return
+            path = self._partition_path(month)
+            # Attach under the lock so a concurrent drop can't race ATTACH
+            # into creating an empty file.
+            with self._partition_lock:
+                exists = path.exists()
+                if exists:
+                    conn.execute("ATTACH DATABASE ? AS p", (str(path),))
+            yield (conn, "p") if exists else None
+
+    def _conversation_months(self, conversation_id: str) -> List[str]:
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT month FROM conversation_partitions "
+                "WHERE conversation_id = ? ORDER BY month",
+                (conversation_id,),
+            ).fetchall()
+        return [r["month"] for r in rows]
+
+    def _sources(self, conversation_id: Optional[str] = None) -> List[Optional[str]]:
+        """Entry sources to read, oldest first: legacy table, then months."""
+        months = (
+            self._conversation_months(conversation_id)
+            if conversation_id is not None
+            else self._list_partitions()
+        )
+        return [None, *months]
+
+    def drop_partitions(self, older_than: str) -> int:
+        """Delete every partition whose whole month is before *older_than*.
+
+        Returns the number of entries dropped.  Rollups are unaffected.
+        """
+        self.flush()
+        cutoff = self._month(older_than)
+        dropped = 0
+        for month in self._list_partitions():
+            if month >= cutoff:
+                break
+            with self._partition_lock:
+                path = self._partition_path(month)
+                conn = sqlite3.connect(str(path))
+                try:
+                    dropped += conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                finally:
+                    conn.close()
+                for suffix in ("", "-wal", "-shm"):
+                    Path(f"{path}{suffix}").unlink(missing_ok=True)
+                self._known_partitions.discard(month)
+            with self._conn() as conn:
+                conn.execute("DELETE FROM conversation_partitions WHERE month = ?", (month,))
+            _log.info("Dropped conversation log partition %s", month)
+        return dropped
 
     # ------------------------------------------------------------------
     # Sequence numbering
@@ -102,17 +503,202 @@ class ConversationLogger:
         """
         with self._seq_lock:
             if conversation_id not in self._seq_counters:
-                # Seed from DB.
-                with self._conn() as conn:
-                    row = conn.execute(
-                        "SELECT COALESCE(MAX(seq), 0) AS m "
-                        "FROM entries WHERE conversation_id = ?",
-                        (conversation_id,),
-                    ).fetchone()
-                    self._seq_counters[conversation_id] = row["m"]
+                self._seq_counters[conversation_id] = self._stored_max_seq(conversation_id)
             self._seq_counters[conversation_id] += 1
             return self._seq_counters[conversation_id]
 
+    def resync_seq(self, conversation_id: str) -> None:
+        """Catch the counter up with entries other writers logged since.
+
+        The counter is seeded from the database once and then only counts
+        this process's entries.  Call this when this worker claims the
+        conversation from another one, so numbering resumes after that
+        worker's entries instead of reusing their seqs.
+        """
+        stored = self._stored_max_seq(conversation_id)
+        with self._seq_lock:
+            if conversation_id in self._seq_counters:
+                self._seq_counters[conversation_id] = max(
+                    self._seq_counters[conversation_id], stored,
+                )
+
+    def last_seq(self, conversation_id: str) -> int:
+        """Highest seq logged for *conversation_id* by any writer (0 if none).
+
+        Reads the database rather than trusting this logger's counter, so
+        entries written by other worker processes are seen too; entries
+        still queued here count as well.
+        """
+        stored = self._stored_max_seq(conversation_id)
+        with self._seq_lock:
+            return max(stored, self._seq_counters.get(conversation_id, 0))
+
+    def _stored_max_seq(self, conversation_id: str) -> int:
+        seq = 0
+        for month in self._sources(conversation_id):
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
+                row = conn.execute(
+                    f"SELECT COALESCE(MAX(seq), 0) AS m "
+                    f"FROM {schema}.entries WHERE conversation_id = ?",
+                    (conversation_id,),
+                ).fetchone()
+                seq = max(seq, row["m"])
+        return seq
+
+    # ------------------------------------------------------------------
+    # Group-commit writer
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, item: Any) -> None:
+        """Hand *item* to the writer thread, starting it on first use.
+
+        Blocks while the queue is full so a stalled disk slows callers down
+        rather than letting memory grow without bound.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop,
+                    daemon=True,
+                    name=f"conversation-log-writer:{self._db_path.name}",
+                )
+                self._writer.start()
+        self._pending.put(item)
+
+    def _writer_loop(self) -> None:
+        """Drain the queue, committing up to ``batch_size`` rows at a time."""
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self._flush_interval
+            while (
+                len(batch) < self._batch_size
+                and batch[-1] is not _FLUSH
+                and batch[-1] is not _STOP
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            rows = [
+                item for item in batch
+                if item is not _FLUSH and item is not _STOP and not isinstance(item, _Checkpoint)
+            ]
+            checkpoints = [item for item in batch if isinstance(item, _Checkpoint)]
+            try:
+                if rows:
+                    self._write_rows(rows)
+                if checkpoints:
+                    self._write_checkpoints(checkpoints)
+            except Exception:
+                # Fail open: losing a batch of audit rows beats a dead writer,
+                # which would hang flush() and, once the queue fills, every
+                # log_* call on the chat thread.
+                _log.exception("Dropped %d conversation log entries", len(rows))
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+            if batch[-1] is _STOP:
+                return
+
+    def _write_rows(self, items: List[tuple]) -> None:
+        """Insert *items* in one transaction, falling back to one-by-one on error.
+
+        Each item is ``(entry_row, blob)`` where *blob* is an optional
+        ``snapshot_blobs`` row to insert alongside it.
+        """
+        by_month: Dict[str, List[tuple]] = {}
+        for item in items:
+            by_month.setdefault(self._month(item[0][17]), []).append(item)
+        failed: List[tuple] = []
+        for month, group in by_month.items():
+            try:
+                self._apply_rows(month, group)
+            except Exception:
+                if len(group) == 1:
+                    _log.exception("Failed to write conversation log entry")
+                else:
+                    failed.extend(group)
+        # Isolate the bad row so the rest of the batch still lands.
+        for item in failed:
+            try:
+                self._apply_rows(self._month(item[0][17]), [item])
+            except Exception:
+                row = item[0]
+                _log.exception(
+                    "Failed to write conversation log entry %s#%s", row[0], row[1],
+                )
+
+    def _write_checkpoints(self, items: List[_Checkpoint]) -> None:
+        """Store the newest of *items* per conversation, replacing older ones."""
+        latest = {item.conversation_id: item for item in items}
+        for item in latest.values():
+            try:
+                body = zlib.compress(json.dumps(
+                    item.history, separators=(",", ":"), default=str,
+                ).encode("utf-8"))
+                with self._conn() as conn:
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO history_checkpoints
+                            (conversation_id, through_seq, message_count, history, created_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (item.conversation_id, item.through_seq, len(item.history),
+                         body, item.created_at),
+                    )
+            except Exception:
+                _log.exception("Failed to write history checkpoint for %s", item.conversation_id)
+
+    def _apply_rows(self, month: str, items: List[tuple]) -> None:
+        """Write one month's items: blobs, entries, partition map and rollups."""
+        path = self._ensure_partition(month)
+        with self._conn() as conn:
+            # WAL + NORMAL only syncs at checkpoints; a crash can lose the
+            # last few batches but never corrupts the file.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("ATTACH DATABASE ? AS p", (str(path),))
+            conn.execute("PRAGMA p.synchronous=NORMAL")
+            # Take the write lock up front so the id watermark can't go stale.
+            conn.execute("BEGIN IMMEDIATE")
+            watermark = conn.execute("SELECT COALESCE(MAX(id), 0) FROM p.entries").fetchone()[0]
+            conn.executemany(_BLOB_INSERT_SQL, [b for _, b in items if b is not None])
+            conn.executemany(
+                _ENTRY_INSERT_SQL.format(schema="p"), [row for row, _ in items],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO conversation_partitions (conversation_id, month) "
+                "VALUES (?, ?)",
+                [(conversation_id, month) for conversation_id in {row[0] for row, _ in items}],
+            )
+            conn.execute(_ROLLUP_SQL.format(schema="p"), (watermark,))
+        with self._seq_lock:
+            for row, _ in items:
+                if row[18] is not None:
+                    self._last_snapshot_hash[row[0]] = row[18]
+
+    def flush(self) -> None:
+        """Block until every entry queued so far has been committed."""
+        if self._writer is None:
+            return
+        self._pending.put(_FLUSH)
+        self._pending.join()
+
+    def close(self) -> None:
+        """Flush pending entries and stop the writer thread."""
+        with self._writer_lock:
+            if self._writer is None:
+                return
+            self._pending.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
     # ------------------------------------------------------------------
     # Write API
     # ------------------------------------------------------------------
@@ -152,47 +738,42 @@ class ConversationLogger:
         entry_type: str,
         **cols: Any,
     ) -> int:
-        """Low-level helper that inserts one entry row and returns its seq."""
+        """Queue one entry row for the writer thread and return its seq."""
         seq = self._next_seq(conversation_id)
-        now = self._now()
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO entries
-                    (conversation_id, seq, entry_type,
-                     role, content, tool_name, tool_arguments, tool_result,
-                     tool_success, tool_duration_ms,
-                     input_tokens, output_tokens,
-                     cache_creation_tokens, cache_read_tokens,
-                     workflow_snapshot, files, task_id, timestamp)
-                VALUES (?, ?, ?,
-                        ?, ?, ?, ?, ?,
-                        ?, ?,
-                        ?, ?,
-                        ?, ?,
-                        ?, ?, ?, ?)
-                """,
-                (
-                    conversation_id,
-                    seq,
-                    entry_type,
-                    cols.get("role"),
-                    cols.get("content"),
-                    cols.get("tool_name"),
-                    cols.get("tool_arguments"),
-                    cols.get("tool_result"),
-                    cols.get("tool_success"),
-                    cols.get("tool_duration_ms"),
-                    cols.get("input_tokens"),
-                    cols.get("output_tokens"),
-                    cols.get("cache_creation_tokens"),
-                    cols.get("cache_read_tokens"),
-                    cols.get("workflow_snapshot"),
-                    cols.get("files"),
-                    cols.get("task_id"),
-                    now,
-                ),
-            )
+        snapshot = cols.get("workflow_snapshot")
+        snapshot_hash = cols.get("snapshot_hash")
+        blob: Optional[tuple] = None
+        if snapshot_hash is not None:
+            # The JSON lives in snapshot_blobs; the entry keeps only the hash.
+            # Entries queued before the first one commits all carry the
+            # blob; INSERT OR IGNORE keeps one copy.
+            with self._seq_lock:
+                changed = self._last_snapshot_hash.get(conversation_id) != snapshot_hash
+            if changed:
+                blob = (snapshot_hash, zlib.compress(snapshot.encode("utf-8")), self._now())
+            snapshot = None
+        row = (
+            conversation_id,
+            seq,
+            entry_type,
+            cols.get("role"),
+            cols.get("content"),
+            cols.get("tool_name"),
+            cols.get("tool_arguments"),
+            cols.get("tool_result"),
+            cols.get("tool_success"),
+            cols.get("tool_duration_ms"),
+            cols.get("input_tokens"),
+            cols.get("output_tokens"),
+            cols.get("cache_creation_tokens"),
+            cols.get("cache_read_tokens"),
+            snapshot,
+            cols.get("files"),
+            cols.get("task_id"),
+            self._now(),
+            snapshot_hash,
+        )
+        self._enqueue((row, blob))
         return seq
 
     # -- Convenience writers ------------------------------------------------
@@ -304,10 +885,13 @@ class ConversationLogger:
         *,
         task_id: Optional[str] = None,
     ) -> int:
+        # Canonical form so identical workflows hash identically.
+        body = json.dumps(workflow, default=str, sort_keys=True, separators=(",", ":"))
         return self._insert_entry(
             conversation_id,
             "workflow_snapshot",
-            workflow_snapshot=json.dumps(workflow, default=str),
+            workflow_snapshot=body,
+            snapshot_hash=hashlib.sha256(body.encode("utf-8")).hexdigest(),
             task_id=task_id,
         )
 
@@ -325,6 +909,244 @@ class ConversationLogger:
             task_id=task_id,
         )
 
+    # ------------------------------------------------------------------
+    # History checkpoints
+    # ------------------------------------------------------------------
+
+    def checkpoint_history(
+        self,
+        conversation_id: str,
+        history: List[Dict[str, Any]],
+        *,
+        force: bool = False,
+    ) -> Optional[int]:
+        """Store *history* as covering every entry logged so far, if due.
+
+        A checkpoint is due once ``checkpoint_every`` entries were logged
+        since the last one, or when *history* got shorter (it was
+        compacted).  It replaces the conversation's previous checkpoint, so
+        reload cost is one blob plus a bounded tail.  The writer thread
+        stores it after the entries it covers.  Returns the seq covered, or
+        None when skipped or nothing was logged through this logger yet (no
+        position to anchor to).
+        """
+        with self._seq_lock:
+            through_seq = self._seq_counters.get(conversation_id)
+            last = self._checkpoints.get(conversation_id)
+        if not through_seq:
+            return None
+        if not force and last is not None \
+                and through_seq - last[0] < self._checkpoint_every \
+                and len(history) >= last[1]:
+            return None
+        with self._seq_lock:
+            self._checkpoints[conversation_id] = (through_seq, len(history))
+        # Serialized on the writer thread; the copy keeps later appends out.
+        self._enqueue(_Checkpoint(conversation_id, through_seq, list(history), self._now()))
+        return through_seq
+
+    def get_history_checkpoint(
+        self, conversation_id: str,
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Return ``(through_seq, history)`` from the latest checkpoint, if any."""
+        self.flush()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT through_seq, history FROM history_checkpoints WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["through_seq"], json.loads(zlib.decompress(row["history"]))
+
+    # ------------------------------------------------------------------
+    # Retention (called by storage.maintenance in small batches)
+    # ------------------------------------------------------------------
+
+    def prune_entries(
+        self,
+        older_than: str,
+        *,
+        entry_types: Optional[List[str]] = None,
+        limit: int = 500,
+    ) -> int:
+        """Delete up to *limit* entries timestamped before *older_than*.
+
+        Optionally restricted to *entry_types*.  Returns the number deleted;
+        callers loop until it drops below *limit*.  Whole months are cheaper
+        to remove with ``drop_partitions``.
+        """
+        self.flush()
+        type_clause = ""
+        filters: List[Any] = [older_than]
+        if entry_types:
+            type_clause = f"AND entry_type IN ({','.join('?' for _ in entry_types)})"
+            filters.extend(entry_types)
+        cutoff_month = self._month(older_than)
+        deleted = 0
+        for month in self._sources():
+            if month is not None and month > cutoff_month:
+                break
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
+                cur = conn.execute(
+                    f"""
+                    DELETE FROM {schema}.entries WHERE id IN (
+                        SELECT id FROM {schema}.entries
+                        WHERE timestamp < ? {type_clause}
+                        ORDER BY id LIMIT ?
+                    )
+                    """,
+                    [*filters, limit - deleted],
+                )
+                deleted += cur.rowcount
+            if deleted >= limit:
+                break
+        return deleted
+
+    def prune_orphaned_entries(self, *, limit: int = 500) -> int:
+        """Delete entries whose conversation row no longer exists.
+
+        Checks the next *limit* entries (round-robin across calls and
+        sources, by id) so each call is a bounded range scan rather than an
+        anti-join over a whole partition; like
+        ``prune_orphaned_snapshot_blobs`` it returns fewer than *limit*
+        unless the whole window was orphaned.
+        """
+        self.flush()
+        cursor_month, after_id = self._entry_scan_cursor
+        scanned = deleted = 0
+        for month in self._sources():
+            key = month or ""
+            if key < cursor_month:
+                continue
+            start = after_id if key == cursor_month else 0
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
+                count, last_id = conn.execute(
+                    f"SELECT COUNT(*), MAX(id) FROM ("
+                    f"SELECT id FROM {schema}.entries WHERE id > ? ORDER BY id LIMIT ?)",
+                    (start, limit - scanned),
+                ).fetchone()
+                if not count:
+                    continue
+                cur = conn.execute(
+                    f"""
+                    DELETE FROM {schema}.entries
+                    WHERE id > ? AND id <= ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM main.conversations c
+                          WHERE c.id = entries.conversation_id
+                      )
+                    """,
+                    (start, last_id),
+                )
+                deleted += cur.rowcount
+                scanned += count
+            if scanned >= limit:
+                self._entry_scan_cursor = (key, last_id)
+                return deleted
+        self._entry_scan_cursor = ("", 0)
+        return deleted
+
+    def prune_empty_conversations(self, older_than: str, *, limit: int = 500) -> int:
+        """Delete up to *limit* idle conversations that have no entries left.
+
+        A conversation counts as empty once it has no legacy entries and no
+        partition months mapped, i.e. after its partitions were dropped.
+        """
+        self.flush()
+        with self._conn() as conn:
+            cur = conn.execute(
+                """
+                DELETE FROM conversations WHERE id IN (
+                    SELECT c.id FROM conversations c
+                    WHERE c.updated_at < ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM entries e WHERE e.conversation_id = c.id
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM conversation_partitions cp
+                          WHERE cp.conversation_id = c.id
+                      )
+                    LIMIT ?
+                )
+                """,
+                (older_than, limit),
+            )
+            if cur.rowcount:
+                conn.execute(
+                    "DELETE FROM history_checkpoints WHERE conversation_id NOT IN "
+                    "(SELECT id FROM conversations)"
+                )
+        return cur.rowcount
+
+    def prune_orphaned_snapshot_blobs(self, *, limit: int = 500) -> int:
+        """Delete snapshot blobs no entry references any more.
+
+        Checks the next *limit* blobs (round-robin across calls) against
+        every entry source and deletes the unreferenced ones, so a call
+        returns fewer than *limit* unless the whole window was orphaned.
+
+        The check and the delete run in one write transaction on the main
+        file, which every writer needs to commit entries, so no entry can
+        start referencing a blob between the two.  Snapshots of these
+        workflows queued meanwhile carry their blob again (the hashes are
+        forgotten first) and re-insert it once the transaction ends.
+        """
+        with self._conn() as conn:
+            hashes = [
+                r["hash"] for r in conn.execute(
+                    "SELECT hash FROM snapshot_blobs WHERE hash > ? ORDER BY hash LIMIT ?",
+                    (self._blob_scan_cursor, limit),
+                )
+            ]
+        self._blob_scan_cursor = hashes[-1] if len(hashes) == limit else ""
+        if not hashes:
+            return 0
+        candidates = set(hashes)
+        with self._seq_lock:
+            for conversation_id, last in list(self._last_snapshot_hash.items()):
+                if last in candidates:
+                    del self._last_snapshot_hash[conversation_id]
+        # Rows queued before that (without their blob) land before the check.
+        self.flush()
+
+        placeholders = ",".join("?" for _ in hashes)
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            referenced: set[str] = set()
+            for month in self._list_partitions():
+                with self._source_conn(month) as src:
+                    if src is None:
+                        continue
+                    part, _ = src
+                    referenced.update(
+                        r[0] for r in part.execute(
+                            f"SELECT DISTINCT snapshot_hash FROM p.entries "
+                            f"WHERE snapshot_hash IN ({placeholders})",
+                            hashes,
+                        )
+                    )
+            orphans = [h for h in hashes if h not in referenced]
+            if not orphans:
+                return 0
+            cur = conn.execute(
+                f"""
+                DELETE FROM snapshot_blobs
+                WHERE hash IN ({','.join('?' for _ in orphans)})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM entries e WHERE e.snapshot_hash = snapshot_blobs.hash
+                  )
+                """,
+                orphans,
+            )
+        return cur.rowcount
+
     # ------------------------------------------------------------------
     # Read API (for eval tooling)
     # ------------------------------------------------------------------
@@ -334,26 +1156,131 @@ class ConversationLogger:
         conversation_id: str,
         *,
         entry_types: Optional[List[str]] = None,
+        after_seq: int = 0,
     ) -> List[Dict[str, Any]]:
         """Return entries for a conversation, ordered by seq.
 
-        Optionally filter to specific *entry_types*.
+        Optionally filter to specific *entry_types* and to entries after
+        *after_seq*.  Only the partitions this conversation has entries in
+        are attached.
         """
-        with self._conn() as conn:
-            if entry_types:
-                placeholders = ",".join("?" for _ in entry_types)
+        self.flush()
+        type_clause = ""
+        params: List[Any] = [conversation_id, after_seq]
+        if entry_types:
+            type_clause = f"AND e.entry_type IN ({','.join('?' for _ in entry_types)})"
+            params.extend(entry_types)
+        entries = []
+        for month in self._sources(conversation_id):
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
                 rows = conn.execute(
-                    f"SELECT * FROM entries "
-                    f"WHERE conversation_id = ? AND entry_type IN ({placeholders}) "
-                    f"ORDER BY seq",
-                    [conversation_id, *entry_types],
+                    f"SELECT e.*, b.body AS snapshot_body FROM {schema}.entries e "
+                    f"LEFT JOIN main.snapshot_blobs b ON b.hash = e.snapshot_hash "
+                    f"WHERE e.conversation_id = ? AND e.seq > ? {type_clause} ORDER BY e.seq",
+                    params,
                 ).fetchall()
-            else:
+            for r in rows:
+                entry = dict(r)
+                body = entry.pop("snapshot_body")
+                if body is not None:
+                    entry["workflow_snapshot"] = zlib.decompress(body).decode("utf-8")
+                entries.append(entry)
+        entries.sort(key=lambda e: e["seq"])
+        return entries
+
+    def get_workflow_snapshots(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Return the conversation's workflow snapshots, decoded, ordered by seq.
+
+        Each item has ``seq``, ``timestamp``, ``task_id`` and ``workflow``.
+        """
+        return [
+            {
+                "seq": e["seq"],
+                "timestamp": e["timestamp"],
+                "task_id": e["task_id"],
+                "workflow": json.loads(e["workflow_snapshot"]),
+            }
+            for e in self.get_conversation_timeline(
+                conversation_id, entry_types=["workflow_snapshot"],
+            )
+            if e["workflow_snapshot"] is not None
+        ]
+
+    def search_entries(
+        self,
+        query: str,
+        *,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over messages and tool arguments, newest first.
+
+        Every word in *query* must match (punctuation is ignored, so
+        "eGFR < 30" finds entries containing both "egfr" and "30").
+        *since* / *until* are inclusive ``YYYY-MM-DD`` days and also decide
+        which partitions get attached.  Each hit carries a ``snippet`` with
+        matches wrapped in ``<mark>``.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"' for term in terms)
+
+        clauses: List[str] = []
+        filters: List[Any] = []
+        if user_id is not None:
+            clauses.append("c.user_id = ?")
+            filters.append(user_id)
+        if workflow_id is not None:
+            clauses.append("c.workflow_id = ?")
+            filters.append(workflow_id)
+        if since is not None:
+            clauses.append("e.timestamp >= ?")
+            filters.append(since[:10])
+        if until is not None:
+            clauses.append("e.timestamp < ?")
+            filters.append((date.fromisoformat(until[:10]) + timedelta(days=1)).isoformat())
+        where = "".join(f" AND {clause}" for clause in clauses)
+
+        self.flush()
+        wanted = offset + limit
+        hits: List[Dict[str, Any]] = []
+        # Newest partition first; the pre-partitioning table is oldest.
+        for month in reversed(self._sources()):
+            if month is not None and (
+                (since is not None and month < since[:7])
+                or (until is not None and month > until[:7])
+            ):
+                continue
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
                 rows = conn.execute(
-                    "SELECT * FROM entries WHERE conversation_id = ? ORDER BY seq",
-                    (conversation_id,),
+                    f"""
+                    SELECT e.conversation_id, e.seq, e.entry_type, e.tool_name,
+                           e.timestamp, c.user_id, c.workflow_id,
+                           snippet(entries_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet
+                    FROM {schema}.entries_fts
+                    JOIN {schema}.entries e ON e.id = entries_fts.rowid
+                    LEFT JOIN main.conversations c ON c.id = e.conversation_id
+                    WHERE entries_fts MATCH ?{where}
+                    ORDER BY entries_fts.rowid DESC
+                    LIMIT ?
+                    """,
+                    [match, *filters, wanted - len(hits)],
                 ).fetchall()
-        return [dict(r) for r in rows]
+            hits.extend(dict(r) for r in rows)
+            if len(hits) >= wanted:
+                break
+        return hits[offset:wanted]
 
     def list_conversations(
         self,
@@ -364,6 +1291,7 @@ class ConversationLogger:
         offset: int = 0,
     ) -> List[Dict[str, Any]]:
         """List conversations with optional filters, newest first."""
+        self.flush()
         clauses: List[str] = []
         params: List[Any] = []
         if user_id is not None:
@@ -387,26 +1315,122 @@ class ConversationLogger:
         *,
         conversation_id: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Aggregate tool call stats, optionally scoped to one conversation."""
-        where = ""
-        params: List[Any] = []
+        """Aggregate tool call stats, optionally scoped to one conversation.
+
+        The global view reads ``usage_rollups``, so it also covers entries
+        that retention has since pruned.
+        """
+        self.flush()
         if conversation_id:
-            where = "AND conversation_id = ?"
-            params.append(conversation_id)
+            return self._conversation_tool_stats(conversation_id)
         with self._conn() as conn:
             rows = conn.execute(
-                f"""
+                """
                 SELECT tool_name,
-                       COUNT(*)                        AS call_count,
-                       SUM(tool_success)               AS success_count,
-                       COUNT(*) - SUM(tool_success)    AS failure_count,
-                       AVG(tool_duration_ms)            AS avg_duration_ms,
-                       SUM(tool_duration_ms)            AS total_duration_ms
-                FROM entries
-                WHERE entry_type = 'tool_call' {where}
+                       SUM(tool_calls)                      AS call_count,
+                       SUM(tool_calls) - SUM(tool_failures) AS success_count,
+                       SUM(tool_failures)                   AS failure_count,
+                       SUM(tool_duration_ms) / SUM(tool_calls) AS avg_duration_ms,
+                       SUM(tool_duration_ms)                AS total_duration_ms
+                FROM usage_rollups
+                WHERE tool_name != '' AND tool_calls > 0
                 GROUP BY tool_name
                 ORDER BY call_count DESC
-                """,
+                """
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _conversation_tool_stats(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Per-tool stats for one conversation, merged across its partitions."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for month in self._sources(conversation_id):
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
+                rows = conn.execute(
+                    f"""
+                    SELECT tool_name,
+                           COUNT(*)                AS call_count,
+                           SUM(tool_success)       AS success_count,
+                           COUNT(tool_duration_ms) AS timed_count,
+                           SUM(tool_duration_ms)   AS total_duration_ms
+                    FROM {schema}.entries
+                    WHERE entry_type = 'tool_call' AND conversation_id = ?
+                    GROUP BY tool_name
+                    """,
+                    (conversation_id,),
+                ).fetchall()
+            for r in rows:
+                agg = merged.setdefault(r["tool_name"], {
+                    "call_count": 0, "success_count": None,
+                    "timed_count": 0, "total_duration_ms": None,
+                })
+                agg["call_count"] += r["call_count"]
+                agg["timed_count"] += r["timed_count"]
+                for key in ("success_count", "total_duration_ms"):
+                    if r[key] is not None:
+                        agg[key] = (agg[key] or 0) + r[key]
+        stats = []
+        for tool_name, agg in merged.items():
+            successes = agg["success_count"]
+            total = agg["total_duration_ms"]
+            stats.append({
+                "tool_name": tool_name,
+                "call_count": agg["call_count"],
+                "success_count": successes,
+                "failure_count": None if successes is None else agg["call_count"] - successes,
+                "avg_duration_ms": total / agg["timed_count"] if agg["timed_count"] else None,
+                "total_duration_ms": total,
+            })
+        stats.sort(key=lambda row: row["call_count"], reverse=True)
+        return stats
+
+    def get_usage_rollups(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return pre-aggregated (day, user_id, tool_name) usage rows.
+
+        *since* / *until* are inclusive ``YYYY-MM-DD`` days.  Rows with
+        ``tool_name == ''`` carry model-turn token totals and error counts.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("day <= ?")
+            params.append(until)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        self.flush()
+        with self._conn() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM usage_rollups {where} ORDER BY day, user_id, tool_name",
                 params,
             ).fetchall()
         return [dict(r) for r in rows]
+
+    def rebuild_rollups(self) -> None:
+        """Recompute ``usage_rollups`` from the entries currently on disk.
+
+        Runs automatically once when upgrading a pre-rollup database.  Note
+        that a manual rebuild forgets totals for entries retention has
+        already pruned.
+        """
+        self.flush()
+        with self._conn() as conn:
+            conn.execute("DELETE FROM usage_rollups")
+        for month in self._sources():
+            with self._source_conn(month) as src:
+                if src is None:
+                    continue
+                conn, schema = src
+                conn.execute(_ROLLUP_SQL.format(schema=schema), (0,))
@@ -0,0 +1,98 @@
+"""On-disk spill area for conversations evicted from memory.
+
+``ConversationStore`` keeps live conversations under a byte budget.  The
+ones it evicts are written here as one JSON file each, so bringing one
+back is a single file read instead of a checkpoint load plus log replay.
+A spill file is a cache, never the source of truth: it records the
+conversation log's last seq at spill time and is only used while the log
+has not moved past it (another worker, or this one after a restart, may
+have served the conversation since).
+
+Files are written atomically (temp file + rename), removed when loaded,
+and swept after ``max_age_seconds`` by ``prune``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("backend.storage")
+
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class ConversationSpill:
+    def __init__(self, spill_dir: Path, *, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS) -> None:
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._max_age_seconds = max_age_seconds
+
+    def _path(self, conversation_id: str) -> Path:
+        # Conversation ids may come from clients; never use them as paths
+        digest = hashlib.sha256(conversation_id.encode("utf-8")).hexdigest()[:32]
+        return self.spill_dir / f"{digest}.json"
+
+    def write(self, conversation_id: str, state: Dict[str, Any], *, through_seq: Optional[int]) -> None:
+        """Spill *state*, replacing any earlier spill of the conversation."""
+        path = self._path(conversation_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        body = {"conversation_id": conversation_id, "through_seq": through_seq, "state": state}
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(body, fh, separators=(",", ":"), default=str)
+        os.replace(tmp, path)
+
+    def take(self, conversation_id: str, *, through_seq: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Remove and return the spilled state, if present and still current.
+
+        A spill whose recorded seq differs from *through_seq* is stale and
+        is discarded.
+        """
+        path = self._path(conversation_id)
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                body = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Unreadable conversation spill %s — discarding", path, exc_info=True)
+            self._unlink(path)
+            return None
+        self._unlink(path)
+        if body.get("conversation_id") != conversation_id:
+            return None
+        if body.get("through_seq") != through_seq:
+            logger.info(
+                "Conversation spill for %s is stale (seq %s, log at %s)",
+                conversation_id, body.get("through_seq"), through_seq,
+            )
+            return None
+        return body.get("state")
+
+    def discard(self, conversation_id: str) -> None:
+        self._unlink(self._path(conversation_id))
+
+    def prune(self) -> int:
+        """Delete spill files older than the max age; returns the count."""
+        cutoff = time.time() - self._max_age_seconds
+        removed = 0
+        for path in self.spill_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,473 @@
+"""Cross-worker coordination: shared key/value state plus local pub/sub.
+
+The task registry, stepped-execution controls, conversation ownership and
+the login rate limiter used to live in process-local dicts, which pinned
+the API to one uvicorn worker.  They now go through a ``Coordinator``:
+
+- ``LocalCoordinator`` keeps everything in this process.  It is the
+  default and behaves exactly like the old dicts.
+- ``SqliteCoordinator`` shares state between the workers on one host via
+  a WAL-mode SQLite file.  Published messages are rows in a ``messages``
+  table that a single poller thread per worker tails and fans out to the
+  local subscribers.
+
+Each worker has an id and listens on its own control channel; features
+register handlers with ``on_control`` and reach the worker that owns a
+task with ``send_control`` (fire and forget) or ``request`` (waits for a
+reply).  ``broadcast`` sends a control message to every worker, the
+sender included (e.g. to drop cached state everywhere).
+
+``build_coordinator`` picks the shared backend when ``LEMON_COORDINATION``
+is ``sqlite`` or ``WEB_CONCURRENCY`` (uvicorn's ``--workers`` default)
+asks for more than one worker.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+from uuid import uuid4
+
+logger = logging.getLogger("backend.storage")
+
+Message = Dict[str, Any]
+Subscriber = Callable[[Message], None]
+ControlHandler = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# Published messages are only kept long enough for every poller to see them
+_MESSAGE_RETENTION_SECONDS = 60.0
+_POLL_INTERVAL_SECONDS = 0.02
+_PRUNE_INTERVAL_SECONDS = 10.0
+_REQUEST_TIMEOUT_SECONDS = 2.0
+
+
+class Subscription:
+    """Returned by subscribe(); close() stops delivery."""
+
+    def __init__(self, coordinator: "_BaseCoordinator", channel: str, callback: Subscriber) -> None:
+        self._coordinator = coordinator
+        self.channel = channel
+        self.callback = callback
+
+    def close(self) -> None:
+        self._coordinator._unsubscribe(self)
+
+
+class Coordinator(Protocol):
+    """Shared state and messaging used by the task-level singletons."""
+
+    worker_id: str
+    is_shared: bool
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], *, ttl: float) -> None: ...
+
+    def delete(self, namespace: str, key: str) -> None: ...
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+        *,
+        ttl: float,
+    ) -> Optional[Dict[str, Any]]: ...
+
+    def publish(self, channel: str, message: Message) -> None: ...
+
+    def subscribe(self, channel: str, callback: Subscriber) -> Subscription: ...
+
+    def close(self) -> None: ...
+
+
+class _BaseCoordinator:
+    """Subscriber bookkeeping shared by both backends."""
+
+    is_shared = False
+
+    def __init__(self, worker_id: Optional[str] = None) -> None:
+        self.worker_id = worker_id or f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._sub_lock = threading.Lock()
+
+    def subscribe(self, channel: str, callback: Subscriber) -> Subscription:
+        subscription = Subscription(self, channel, callback)
+        with self._sub_lock:
+            self._subscribers.setdefault(channel, []).append(subscription)
+        self._on_subscribe()
+        return subscription
+
+    def _on_subscribe(self) -> None:
+        pass
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._sub_lock:
+            subs = self._subscribers.get(subscription.channel, [])
+            if subscription in subs:
+                subs.remove(subscription)
+            if not subs:
+                self._subscribers.pop(subscription.channel, None)
+
+    def _dispatch(self, channel: str, message: Message) -> None:
+        with self._sub_lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for subscription in subs:
+            try:
+                subscription.callback(message)
+            except Exception:
+                logger.exception("Subscriber on %s failed", channel)
+
+
+class LocalCoordinator(_BaseCoordinator):
+    """In-process backend: dicts with expiry and synchronous fan-out."""
+
+    def __init__(self, worker_id: Optional[str] = None) -> None:
+        super().__init__(worker_id)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+
+    def _live_locked(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._values.get((namespace, key))
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._values[(namespace, key)]
+            return None
+        return value
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._live_locked(namespace, key)
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], *, ttl: float) -> None:
+        with self._lock:
+            if len(self._values) % 256 == 0:
+                self._purge_expired_locked()
+            self._values[(namespace, key)] = (value, time.time() + ttl)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._values.pop((namespace, key), None)
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+        *,
+        ttl: float,
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically replace the value with ``fn(current)``.
+
+        Returning None deletes the entry; returning *current* itself leaves
+        it (and its expiry) untouched.
+        """
+        with self._lock:
+            current = self._live_locked(namespace, key)
+            new = fn(current)
+            if new is None:
+                self._values.pop((namespace, key), None)
+            elif new is not current:
+                self._values[(namespace, key)] = (new, time.time() + ttl)
+            return new
+
+    def _purge_expired_locked(self) -> None:
+        now = time.time()
+        expired = [k for k, (_, expires_at) in self._values.items() if expires_at <= now]
+        for k in expired:
+            del self._values[k]
+
+    def publish(self, channel: str, message: Message) -> None:
+        self._dispatch(channel, message)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteCoordinator(_BaseCoordinator):
+    """Host-local backend shared by every worker opening the same file."""
+
+    is_shared = True
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        worker_id: Optional[str] = None,
+        poll_interval: float = _POLL_INTERVAL_SECONDS,
+    ) -> None:
+        super().__init__(worker_id)
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._poll_interval = poll_interval
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                """
+            )
+
+    @contextmanager
+    def _conn(self) -> Iterable[sqlite3.Connection]:
+        """Context manager for database connections."""
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # -- Key/value -----------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], *, ttl: float) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._conn() as conn:
+            conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+        *,
+        ttl: float,
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically replace the value with ``fn(current)`` (see LocalCoordinator)."""
+        with self._conn() as conn:
+            # IMMEDIATE takes the write lock up front so read-modify-write
+            # from two workers cannot interleave
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT value FROM kv WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (namespace, key, now),
+                ).fetchone()
+                current = json.loads(row[0]) if row else None
+                new = fn(current)
+                if new is None:
+                    conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+                elif new is not current:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (namespace, key, json.dumps(new), now + ttl),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return new
+
+    # -- Pub/sub -------------------------------------------------------------
+
+    def publish(self, channel: str, message: Message) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO messages (channel, payload, created_at) VALUES (?, ?, ?)",
+                (channel, json.dumps(message), time.time()),
+            )
+
+    def _on_subscribe(self) -> None:
+        with self._sub_lock:
+            if self._poller is not None:
+                return
+            with self._conn() as conn:
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+            self._poller = threading.Thread(
+                target=self._poll, args=(last_id,), daemon=True, name="coordination-poller",
+            )
+            self._poller.start()
+
+    def _poll(self, last_id: int) -> None:
+        next_prune = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+        while not self._stop.wait(self._poll_interval):
+            try:
+                with self._conn() as conn:
+                    rows = conn.execute(
+                        "SELECT id, channel, payload FROM messages WHERE id > ? ORDER BY id",
+                        (last_id,),
+                    ).fetchall()
+                    if time.monotonic() >= next_prune:
+                        next_prune = time.monotonic() + _PRUNE_INTERVAL_SECONDS
+                        now = time.time()
+                        conn.execute(
+                            "DELETE FROM messages WHERE created_at < ?",
+                            (now - _MESSAGE_RETENTION_SECONDS,),
+                        )
+                        conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+            except sqlite3.Error:
+                logger.warning("Coordination poll failed", exc_info=True)
+                continue
+            for message_id, channel, payload in rows:
+                last_id = message_id
+                with self._sub_lock:
+                    wanted = channel in self._subscribers
+                if wanted:
+                    self._dispatch(channel, json.loads(payload))
+
+    def close(self) -> None:
+        self._stop.set()
+        poller, self._poller = self._poller, None
+        if poller is not None and poller is not threading.current_thread():
+            poller.join(timeout=1.0)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide coordinator and worker control channel
+# ---------------------------------------------------------------------------
+
+_coordinator: Coordinator = LocalCoordinator()
+_control_handlers: Dict[str, ControlHandler] = {}
+_control_subscriptions: List[Subscription] = []
+_control_lock = threading.Lock()
+_BROADCAST_CHANNEL = "control:*"
+
+
+def _control_channel(worker_id: str) -> str:
+    return f"control:{worker_id}"
+
+
+def _subscribe_control_locked() -> None:
+    global _control_subscriptions
+    _control_subscriptions = [
+        _coordinator.subscribe(channel, _on_control_message)
+        for channel in (_control_channel(_coordinator.worker_id), _BROADCAST_CHANNEL)
+    ]
+
+
+def get_coordinator() -> Coordinator:
+    return _coordinator
+
+
+def set_coordinator(coordinator: Coordinator) -> Coordinator:
+    """Install *coordinator* for this process; returns the previous one."""
+    global _coordinator, _control_subscriptions
+    with _control_lock:
+        previous, _coordinator = _coordinator, coordinator
+        for subscription in _control_subscriptions:
+            subscription.close()
+        _control_subscriptions = []
+        if _control_handlers:
+            _subscribe_control_locked()
+    return previous
+
+
+def build_coordinator(data_dir: Path) -> Coordinator:
+    """Coordinator for this deployment (see module docstring)."""
+    mode = os.getenv("LEMON_COORDINATION", "").strip().lower()
+    try:
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        workers = 1
+    if mode == "sqlite" or (mode != "local" and workers > 1):
+        return SqliteCoordinator(data_dir / "coordination.sqlite")
+    return LocalCoordinator()
+
+
+def on_control(kind: str, handler: ControlHandler) -> None:
+    """Handle control messages of *kind* sent to this worker.
+
+    A handler's return value is sent back when the sender used request().
+    """
+    with _control_lock:
+        _control_handlers[kind] = handler
+        if not _control_subscriptions:
+            _subscribe_control_locked()
+
+
+def send_control(worker_id: str, kind: str, payload: Dict[str, Any]) -> None:
+    """Fire-and-forget control message to another worker."""
+    _coordinator.publish(_control_channel(worker_id), {"kind": kind, "payload": payload})
+
+
+def broadcast(kind: str, payload: Dict[str, Any]) -> None:
+    """Fire-and-forget control message to every worker, this one included."""
+    _coordinator.publish(_BROADCAST_CHANNEL, {"kind": kind, "payload": payload})
+
+
+def request(
+    worker_id: str,
+    kind: str,
+    payload: Dict[str, Any],
+    *,
+    timeout: float = _REQUEST_TIMEOUT_SECONDS,
+) -> Optional[Dict[str, Any]]:
+    """Send a control message and wait for the handler's reply.
+
+    Returns None on timeout or when the handler returned nothing.  Blocks —
+    call it off the event loop.
+    """
+    coordinator = _coordinator
+    reply_to = f"reply:{uuid4().hex}"
+    replies: List[Optional[Dict[str, Any]]] = []
+    received = threading.Event()
+
+    def on_reply(message: Message) -> None:
+        replies.append(message.get("payload"))
+        received.set()
+
+    subscription = coordinator.subscribe(reply_to, on_reply)
+    try:
+        coordinator.publish(
+            _control_channel(worker_id),
+            {"kind": kind, "payload": payload, "reply_to": reply_to},
+        )
+        if not received.wait(timeout):
+            return None
+        return replies[0]
+    finally:
+        subscription.close()
+
+
+def _on_control_message(message: Message) -> None:
+    handler = _control_handlers.get(message.get("kind", ""))
+    if handler is None:
+        logger.warning("No handler for control message %r", message.get("kind"))
+        return
+    result = handler(message.get("payload") or {})
+    reply_to = message.get("reply_to")
+    if reply_to:
+        _coordinator.publish(reply_to, {"payload": result})
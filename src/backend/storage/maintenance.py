@@ -0,0 +1,352 @@
+"""Background maintenance for the SQLite stores.
+
+Runs in-process on a daemon thread started from the FastAPI lifespan.  Each
+cycle applies the retention policy (expired auth sessions, old conversation
+log entries, old or orphaned workflow snapshots) — months past retention are
+dropped as whole partition files — and then keeps every database file
+healthy: ``ANALYZE`` / ``PRAGMA optimize`` for the query
+planner, ``wal_checkpoint(TRUNCATE)`` so WAL files don't grow unbounded, and
+``incremental_vacuum`` to return freed pages to the OS.
+
+Every task gets a wall-clock budget.  Deletes run in small batches, each its
+own short transaction, and the task stops at the first batch boundary past
+its deadline — so maintenance never holds a write lock long enough to stall
+a chat turn.  Work left over simply continues on the next cycle.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .auth import AuthStore
+from .conversation_log import ConversationLogger
+from .workflows import WorkflowStore
+
+logger = logging.getLogger("backend.storage")
+
+DEFAULT_INTERVAL_SECONDS = 6 * 60 * 60
+DEFAULT_INITIAL_DELAY_SECONDS = 60
+DEFAULT_TASK_BUDGET_MS = 2_000
+DEFAULT_BATCH_SIZE = 500
+# Retention is opt-in: deleting audit history is the deployment's call.
+DEFAULT_LOG_RETENTION_DAYS = 0
+DEFAULT_SNAPSHOT_RETENTION_DAYS = 0
+# Pages returned to the OS per incremental_vacuum step (4 MB at 4 KB pages).
+_VACUUM_STEP_PAGES = 1024
+
+
+@dataclass(frozen=True)
+class MaintenanceConfig:
+    """Retention policy and scheduling knobs.
+
+    A retention of 0 days disables that prune (keep forever).
+    """
+
+    enabled: bool
+    interval_seconds: int
+    initial_delay_seconds: int
+    task_budget_ms: int
+    batch_size: int
+    log_retention_days: int
+    snapshot_retention_days: int
+
+
+def _get_non_negative_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def get_maintenance_config() -> MaintenanceConfig:
+    enabled = os.getenv("LEMON_MAINTENANCE_ENABLED", "1").strip().lower()
+    return MaintenanceConfig(
+        enabled=enabled not in {"0", "false", "no"},
+        interval_seconds=_get_non_negative_int_env(
+            "LEMON_MAINTENANCE_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS),
+        initial_delay_seconds=_get_non_negative_int_env(
+            "LEMON_MAINTENANCE_INITIAL_DELAY_SECONDS", DEFAULT_INITIAL_DELAY_SECONDS),
+        task_budget_ms=_get_non_negative_int_env(
+            "LEMON_MAINTENANCE_TASK_BUDGET_MS", DEFAULT_TASK_BUDGET_MS),
+        batch_size=max(1, _get_non_negative_int_env(
+            "LEMON_MAINTENANCE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+        log_retention_days=_get_non_negative_int_env(
+            "LEMON_LOG_RETENTION_DAYS", DEFAULT_LOG_RETENTION_DAYS),
+        snapshot_retention_days=_get_non_negative_int_env(
+            "LEMON_SNAPSHOT_RETENTION_DAYS", DEFAULT_SNAPSHOT_RETENTION_DAYS),
+    )
+
+
+@dataclass
+class TaskReport:
+    """Metrics for one maintenance task in one cycle."""
+
+    name: str
+    duration_ms: float = 0.0
+    rows_deleted: int = 0
+    bytes_reclaimed: int = 0
+    # False when the task stopped at its time budget with work remaining
+    completed: bool = True
+    error: Optional[str] = None
+
+
+@dataclass
+class MaintenanceStats:
+    """Cumulative metrics across all cycles since startup."""
+
+    runs: int = 0
+    last_run_at: Optional[str] = None
+    last_run_duration_ms: float = 0.0
+    total_rows_deleted: int = 0
+    total_bytes_reclaimed: int = 0
+    last_reports: List[TaskReport] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _db_footprint(db_paths: Iterable[Path]) -> int:
+    """Bytes on disk for databases including their WAL and shared-memory files."""
+    total = 0
+    for db_path in db_paths:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                total += Path(f"{db_path}{suffix}").stat().st_size
+            except OSError:
+                pass
+    return total
+
+
+def _cutoff(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def _drain(prune: Callable[[int], int], batch_size: int, deadline: float) -> tuple[int, bool]:
+    """Call *prune(batch_size)* until a short batch or the deadline.
+
+    Returns (rows_deleted, completed).
+    """
+    deleted = 0
+    while True:
+        n = prune(batch_size)
+        deleted += n
+        if n < batch_size:
+            return deleted, True
+        if time.monotonic() >= deadline:
+            return deleted, False
+
+
+def optimize_database(db_path: Path, *, deadline: float, analyze: bool = False) -> bool:
+    """Refresh planner stats, truncate the WAL and vacuum free pages.
+
+    Returns False if the deadline cut incremental vacuum short.
+    """
+    if not Path(db_path).exists():
+        # e.g. a log partition dropped earlier in this cycle; connecting
+        # would recreate it as an empty file.
+        return True
+    conn = sqlite3.connect(str(db_path), timeout=1.0)
+    try:
+        if analyze:
+            conn.execute("ANALYZE")
+        else:
+            conn.execute("PRAGMA optimize")
+        conn.commit()
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if str(journal_mode).lower() == "wal":
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        # 2 == INCREMENTAL; on other modes incremental_vacuum is a no-op.
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return True
+        while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            if time.monotonic() >= deadline:
+                return False
+            conn.execute(f"PRAGMA incremental_vacuum({_VACUUM_STEP_PAGES})").fetchall()
+            conn.commit()
+        return True
+    finally:
+        conn.close()
+
+
+class MaintenanceScheduler:
+    """Periodically runs retention and housekeeping tasks on a daemon thread."""
+
+    def __init__(
+        self,
+        *,
+        auth_store: Optional[AuthStore] = None,
+        conversation_logger: Optional[ConversationLogger] = None,
+        workflow_store: Optional[WorkflowStore] = None,
+        config: Optional[MaintenanceConfig] = None,
+    ) -> None:
+        self.config = config or get_maintenance_config()
+        self._auth_store = auth_store
+        self._conversation_logger = conversation_logger
+        self._workflow_store = workflow_store
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self.stats = MaintenanceStats()
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        """Start the background thread (no-op when disabled or already running)."""
+        if not self.config.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, daemon=True, name="storage-maintenance",
+        )
+        self._thread.start()
+        logger.info(
+            "Storage maintenance scheduled every %ds (log retention %dd, snapshot retention %dd)",
+            self.config.interval_seconds,
+            self.config.log_retention_days,
+            self.config.snapshot_retention_days,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the thread to exit and wait for the current task to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        if self._stop.wait(self.config.initial_delay_seconds):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Storage maintenance cycle failed")
+            if self._stop.wait(max(1, self.config.interval_seconds)):
+                return
+
+    # --- One cycle ---
+
+    def run_once(self) -> List[TaskReport]:
+        """Run every task once, synchronously. Returns per-task reports."""
+        with self._run_lock:
+            started = time.monotonic()
+            # Full ANALYZE on the first cycle; PRAGMA optimize is cheaper
+            # and re-analyzes only tables whose stats have drifted.
+            analyze = self.stats.runs == 0
+            reports: List[TaskReport] = []
+            for name, db_paths, fn in self._tasks(analyze=analyze):
+                if self._stop.is_set():
+                    break
+                reports.append(self._run_task(name, db_paths, fn))
+
+            self.stats.runs += 1
+            self.stats.last_run_at = datetime.now(timezone.utc).isoformat()
+            self.stats.last_run_duration_ms = (time.monotonic() - started) * 1000
+            self.stats.total_rows_deleted += sum(r.rows_deleted for r in reports)
+            self.stats.total_bytes_reclaimed += sum(r.bytes_reclaimed for r in reports)
+            self.stats.last_reports = reports
+            logger.info(
+                "Storage maintenance run %d: %d rows deleted, %d bytes reclaimed in %.0fms",
+                self.stats.runs,
+                sum(r.rows_deleted for r in reports),
+                sum(r.bytes_reclaimed for r in reports),
+                self.stats.last_run_duration_ms,
+            )
+            return reports
+
+    def _run_task(
+        self,
+        name: str,
+        db_paths: List[Path],
+        fn: Callable[[float], tuple[int, bool]],
+    ) -> TaskReport:
+        report = TaskReport(name=name)
+        size_before = _db_footprint(db_paths)
+        started = time.monotonic()
+        try:
+            report.rows_deleted, report.completed = fn(
+                started + self.config.task_budget_ms / 1000.0
+            )
+        except Exception as exc:
+            logger.warning("Maintenance task %s failed: %s", name, exc, exc_info=True)
+            report.error = str(exc)
+            report.completed = False
+        report.duration_ms = (time.monotonic() - started) * 1000
+        report.bytes_reclaimed = max(0, size_before - _db_footprint(db_paths))
+        if not report.completed and report.error is None:
+            logger.info("Maintenance task %s hit its %dms budget — continuing next cycle",
+                        name, self.config.task_budget_ms)
+        return report
+
+    def _tasks(self, *, analyze: bool) -> List[tuple[str, List[Path], Callable[[float], tuple[int, bool]]]]:
+        """Build the (name, db_paths, fn(deadline) -> (rows, completed)) task list."""
+        cfg = self.config
+        batch = cfg.batch_size
+        tasks: List[tuple[str, List[Path], Callable[[float], tuple[int, bool]]]] = []
+        db_paths: List[Path] = []
+
+        if self._auth_store is not None:
+            auth = self._auth_store
+            db_paths.append(auth.db_path)
+            tasks.append((
+                "auth.expired_sessions", [auth.db_path],
+                lambda deadline: _drain(
+                    lambda n: auth.delete_expired_sessions(limit=n), batch, deadline),
+            ))
+
+        if self._conversation_logger is not None:
+            log = self._conversation_logger
+
+            def prune_log(deadline: float) -> tuple[int, bool]:
+                total, done = _drain(
+                    lambda n: log.prune_orphaned_entries(limit=n), batch, deadline)
+                if done and cfg.snapshot_retention_days:
+                    cutoff = _cutoff(cfg.snapshot_retention_days)
+                    n, done = _drain(
+                        lambda n: log.prune_entries(
+                            cutoff, entry_types=["workflow_snapshot"], limit=n),
+                        batch, deadline)
+                    total += n
+                if done and cfg.log_retention_days:
+                    cutoff = _cutoff(cfg.log_retention_days)
+                    # Whole months first: one unlink per partition.
+                    total += log.drop_partitions(cutoff)
+                    n, done = _drain(
+                        lambda n: log.prune_entries(cutoff, limit=n), batch, deadline)
+                    total += n
+                    if done:
+                        n, done = _drain(
+                            lambda n: log.prune_empty_conversations(cutoff, limit=n),
+                            batch, deadline)
+                        total += n
+                if done:
+                    n, done = _drain(
+                        lambda n: log.prune_orphaned_snapshot_blobs(limit=n), batch, deadline)
+                    total += n
+                return total, done
+
+            log_paths = [log.db_path, *log.partition_paths()]
+            db_paths.extend(log_paths)
+            tasks.append(("conversation_log.retention", log_paths, prune_log))
+
+        if self._workflow_store is not None:
+            db_paths.append(self._workflow_store.db_path)
+        for db_path in dict.fromkeys(db_paths):
+            tasks.append((
+                f"optimize:{Path(db_path).name}", [db_path],
+                lambda deadline, p=db_path: (
+                    0, optimize_database(p, deadline=deadline, analyze=analyze)),
+            ))
+        return tasks
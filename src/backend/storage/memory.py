@@ -0,0 +1,671 @@
+"""Dict-backed in-memory storage backends.
+
+Drop-in replacements for ``WorkflowStore``, ``ConversationLogger`` and
+``AuthStore`` that never touch disk. Used by the eval harness and pytest
+fixtures, where every sample or test would otherwise pay for creating a
+temp-file SQLite database and a file round-trip per tool call.
+
+Semantics mirror the SQLite implementations: rows are copied on the way
+in and out (callers can't mutate stored state), listings are ordered by
+``updated_at`` descending, text search is a case-insensitive substring
+match like SQLite's ``LIKE``, and uniqueness violations raise
+``sqlite3.IntegrityError`` so callers' error handling is unchanged.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .auth import AuthSession, AuthUser
+from .conversation_log import _SEARCHABLE_TYPES, ConversationLogger
+from .workflows import WorkflowRecord, _JSON_FIELDS, _SCALAR_FIELDS
+
+# Every column of the ``entries`` table, in schema order, so timeline rows
+# have exactly the keys ``SELECT *`` would return.
+_ENTRY_COLUMNS = (
+    "id", "conversation_id", "seq", "entry_type",
+    "role", "content", "tool_name", "tool_arguments", "tool_result",
+    "tool_success", "tool_duration_ms",
+    "input_tokens", "output_tokens",
+    "cache_creation_tokens", "cache_read_tokens",
+    "workflow_snapshot", "files", "task_id", "timestamp", "snapshot_hash",
+)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class InMemoryWorkflowStore:
+    """``WorkflowStore`` semantics over a dict of rows keyed by workflow ID."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("backend.workflows")
+
+    def create_workflow(
+        self,
+        workflow_id: str,
+        user_id: str,
+        name: str,
+        description: str,
+        *,
+        domain: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        nodes: Optional[List[Dict[str, Any]]] = None,
+        edges: Optional[List[Dict[str, Any]]] = None,
+        inputs: Optional[List[Dict[str, Any]]] = None,
+        outputs: Optional[List[Dict[str, Any]]] = None,
+        tree: Optional[Dict[str, Any]] = None,
+        doubts: Optional[List[str]] = None,
+        validation_score: int = 0,
+        validation_count: int = 0,
+        is_validated: bool = False,
+        output_type: Optional[str] = None,
+        is_draft: bool = True,
+        is_published: bool = False,
+        building: bool = False,
+        build_history: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """Create a new workflow. Raises IntegrityError on a duplicate ID."""
+        now = _now()
+        encode = self._json_column
+        row = {
+            "id": workflow_id,
+            "user_id": user_id,
+            "name": name,
+            "description": description,
+            "domain": domain,
+            "tags": encode(tags or []),
+            "nodes": encode(nodes or []),
+            "edges": encode(edges or []),
+            "inputs": encode(inputs or []),
+            "outputs": encode(outputs or []),
+            "tree": encode(tree or {}),
+            "doubts": encode(doubts or []),
+            "validation_score": validation_score,
+            "validation_count": validation_count,
+            "is_validated": bool(is_validated),
+            "output_type": output_type or "string",
+            "is_draft": bool(is_draft),
+            "is_published": bool(is_published),
+            "review_status": "unreviewed",
+            "net_votes": 0,
+            "published_at": now if is_published else None,
+            "building": bool(building),
+            "build_history": encode(build_history or []),
+            "conversation_id": None,
+            "uploaded_files": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            if workflow_id in self._rows:
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: workflows.id")
+            self._rows[workflow_id] = row
+        self._logger.info("Created workflow id=%s user=%s name=%s is_published=%s", workflow_id, user_id, name, is_published)
+
+    def get_workflow(self, workflow_id: str, user_id: str) -> Optional[WorkflowRecord]:
+        """Get a workflow by ID, ensuring it belongs to the user."""
+        with self._lock:
+            row = self._owned(workflow_id, user_id)
+            return self._to_record(row) if row else None
+
+    def update_workflow(self, workflow_id: str, user_id: str, **kwargs: Any) -> bool:
+        """Update an existing workflow. Only provided (non-None) fields are written."""
+        updates: Dict[str, Any] = {}
+        # Same field lists as the SQLite store — anything else (e.g. the
+        # legacy review_status/net_votes kwargs) is accepted but ignored.
+        for field_name in _SCALAR_FIELDS:
+            if kwargs.get(field_name) is not None:
+                updates[field_name] = kwargs[field_name]
+        for field_name in _JSON_FIELDS:
+            if kwargs.get(field_name) is not None:
+                updates[field_name] = self._json_column(kwargs[field_name])
+        is_published = kwargs.get("is_published")
+        if is_published is not None:
+            updates["is_published"] = bool(is_published)
+
+        if not updates:
+            return True  # No updates requested
+
+        for flag in ("is_validated", "is_draft", "building"):
+            if flag in updates:
+                updates[flag] = bool(updates[flag])
+
+        now = _now()
+        with self._lock:
+            row = self._owned(workflow_id, user_id)
+            if row is not None:
+                if is_published and row["published_at"] is None:
+                    row["published_at"] = now
+                row.update(updates)
+                row["updated_at"] = now
+
+        if row is not None:
+            self._logger.info("Updated workflow id=%s user=%s", workflow_id, user_id)
+            return True
+
+        self._logger.warning("Failed to update workflow id=%s user=%s (not found or unauthorized)", workflow_id, user_id)
+        return False
+
+    def try_set_building(self, workflow_id: str, user_id: str) -> bool:
+        """Atomically set building=True only if currently building=False."""
+        with self._lock:
+            row = self._owned(workflow_id, user_id)
+            won = row is not None and not row["building"]
+            if won:
+                row["building"] = True
+                row["updated_at"] = _now()
+        if won:
+            self._logger.info("Atomically set building=True for workflow %s", workflow_id)
+        else:
+            self._logger.info("Workflow %s already building — atomic set failed", workflow_id)
+        return won
+
+    def clear_stale_building_flags(self) -> int:
+        """Reset every building=True flag. Returns the number cleared."""
+        now = _now()
+        with self._lock:
+            stale = [row for row in self._rows.values() if row["building"]]
+            for row in stale:
+                row["building"] = False
+                row["updated_at"] = now
+        if stale:
+            self._logger.warning(
+                "Cleared stale building flag on %d workflow(s) from previous server run", len(stale),
+            )
+        return len(stale)
+
+    def delete_workflow(self, workflow_id: str, user_id: str) -> bool:
+        """Delete a workflow owned by user_id. Returns True if deleted."""
+        with self._lock:
+            deleted = self._owned(workflow_id, user_id) is not None
+            if deleted:
+                del self._rows[workflow_id]
+
+        if deleted:
+            self._logger.info("Deleted workflow id=%s user=%s", workflow_id, user_id)
+            return True
+
+        self._logger.warning("Failed to delete workflow id=%s user=%s (not found or unauthorized)", workflow_id, user_id)
+        return False
+
+    def list_workflows(
+        self,
+        user_id: str,
+        *,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[WorkflowRecord], int]:
+        """List workflows for a user, paginated, ordered by most recently updated."""
+        return self.search_workflows(user_id, limit=limit, offset=offset)
+
+    def search_workflows(
+        self,
+        user_id: str,
+        *,
+        query: Optional[str] = None,
+        domain: Optional[str] = None,
+        validated: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[WorkflowRecord], int]:
+        """Search workflows with optional text, domain, and validation filters."""
+        needle = query.lower() if query else None
+        with self._lock:
+            matches = [
+                row for row in self._rows.values()
+                if row["user_id"] == user_id
+                and (needle is None
+                     or needle in row["name"].lower()
+                     or needle in row["description"].lower())
+                and (not domain or row["domain"] == domain)
+                and (validated is None or row["is_validated"] == bool(validated))
+            ]
+            matches.sort(key=lambda row: row["updated_at"], reverse=True)
+            page = matches[offset:offset + limit] if limit >= 0 else matches[offset:]
+            return [self._to_record(row) for row in page], len(matches)
+
+    def get_domains(self, user_id: str) -> List[str]:
+        """Return distinct non-null domain strings for a user's workflows."""
+        with self._lock:
+            return sorted({
+                row["domain"] for row in self._rows.values()
+                if row["user_id"] == user_id and row["domain"]
+            })
+
+    # -- internals ----------------------------------------------------------
+
+    def _owned(self, workflow_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the live row if it exists and belongs to user_id. Call under lock."""
+        row = self._rows.get(workflow_id)
+        if row is None or row["user_id"] != user_id:
+            return None
+        return row
+
+    @staticmethod
+    def _json_column(value: Any) -> Any:
+        """Detach a value from the caller exactly as a JSON column round-trip would."""
+        return json.loads(json.dumps(value))
+
+    @staticmethod
+    def _to_record(row: Dict[str, Any]) -> WorkflowRecord:
+        return WorkflowRecord(**copy.deepcopy(row))
+
+
+class InMemoryConversationLogger(ConversationLogger):
+    """``ConversationLogger`` whose tables are Python lists and dicts.
+
+    Inherits the convenience writers so entries are serialised exactly as
+    the SQLite logger stores them; only the row storage is replaced.
+    """
+
+    def __init__(self) -> None:  # noqa: D107 — no db_path, nothing on disk
+        self._conversations: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._seq_counters: Dict[str, int] = {}
+        self._history_checkpoints: Dict[str, Tuple[int, List[Dict[str, Any]]]] = {}
+        self._checkpoint_every = 50
+        self._lock = threading.Lock()
+
+    def ensure_conversation(
+        self,
+        conversation_id: str,
+        *,
+        user_id: str,
+        workflow_id: Optional[str] = None,
+        model: str,
+    ) -> None:
+        """Create the conversation row if missing; always bump updated_at."""
+        now = self._now()
+        with self._lock:
+            row = self._conversations.setdefault(conversation_id, {
+                "id": conversation_id,
+                "workflow_id": workflow_id,
+                "user_id": user_id,
+                "model": model,
+                "created_at": now,
+                "updated_at": now,
+            })
+            row["updated_at"] = now
+
+    def _insert_entry(
+        self,
+        conversation_id: str,
+        entry_type: str,
+        **cols: Any,
+    ) -> int:
+        with self._lock:
+            seq = self._seq_counters.get(conversation_id, 0) + 1
+            self._seq_counters[conversation_id] = seq
+            row = {column: cols.get(column) for column in _ENTRY_COLUMNS}
+            row.update(
+                id=len(self._entries) + 1,
+                conversation_id=conversation_id,
+                seq=seq,
+                entry_type=entry_type,
+                timestamp=self._now(),
+            )
+            self._entries.append(row)
+        return seq
+
+    def resync_seq(self, conversation_id: str) -> None:
+        """A single process owns the entries; the counter is never stale."""
+
+    def last_seq(self, conversation_id: str) -> int:
+        with self._lock:
+            return self._seq_counters.get(conversation_id, 0)
+
+    def flush(self) -> None:
+        """Writes are applied synchronously; nothing to flush."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+    def get_conversation_timeline(
+        self,
+        conversation_id: str,
+        *,
+        entry_types: Optional[List[str]] = None,
+        after_seq: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Return entries for a conversation, ordered by seq."""
+        with self._lock:
+            rows = [
+                dict(row) for row in self._entries
+                if row["conversation_id"] == conversation_id
+                and row["seq"] > after_seq
+                and (not entry_types or row["entry_type"] in entry_types)
+            ]
+        rows.sort(key=lambda row: row["seq"])
+        return rows
+
+    def checkpoint_history(
+        self,
+        conversation_id: str,
+        history: List[Dict[str, Any]],
+        *,
+        force: bool = False,
+    ) -> Optional[int]:
+        """Same due rule as the SQLite logger; the copy is kept in a dict."""
+        with self._lock:
+            through_seq = self._seq_counters.get(conversation_id)
+            last = self._history_checkpoints.get(conversation_id)
+            if not through_seq:
+                return None
+            if not force and last is not None \
+                    and through_seq - last[0] < self._checkpoint_every \
+                    and len(history) >= len(last[1]):
+                return None
+            self._history_checkpoints[conversation_id] = (through_seq, copy.deepcopy(history))
+        return through_seq
+
+    def get_history_checkpoint(
+        self, conversation_id: str,
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        with self._lock:
+            checkpoint = self._history_checkpoints.get(conversation_id)
+        if checkpoint is None:
+            return None
+        return checkpoint[0], copy.deepcopy(checkpoint[1])
+
+    def search_entries(
+        self,
+        query: str,
+        *,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Whole-word, all-terms match over the same columns FTS indexes."""
+        terms = {term.lower() for term in re.findall(r"\w+", query)}
+        if not terms:
+            return []
+        end = (date.fromisoformat(until[:10]) + timedelta(days=1)).isoformat() if until else None
+        hits = []
+        with self._lock:
+            for row in reversed(self._entries):
+                if row["entry_type"] not in _SEARCHABLE_TYPES:
+                    continue
+                fields = [row[c] for c in ("content", "tool_arguments") if row[c]]
+                words = {word.lower() for text in fields for word in re.findall(r"\w+", text)}
+                conversation = self._conversations.get(row["conversation_id"], {})
+                if not terms <= words \
+                        or (user_id is not None and conversation.get("user_id") != user_id) \
+                        or (workflow_id is not None and conversation.get("workflow_id") != workflow_id) \
+                        or (since is not None and row["timestamp"] < since[:10]) \
+                        or (end is not None and row["timestamp"] >= end):
+                    continue
+                text = next(t for t in fields if terms & {w.lower() for w in re.findall(r"\w+", t)})
+                hits.append({
+                    "conversation_id": row["conversation_id"],
+                    "seq": row["seq"],
+                    "entry_type": row["entry_type"],
+                    "tool_name": row["tool_name"],
+                    "timestamp": row["timestamp"],
+                    "user_id": conversation.get("user_id"),
+                    "workflow_id": conversation.get("workflow_id"),
+                    "snippet": re.sub(
+                        r"\w+",
+                        lambda m: f"<mark>{m.group()}</mark>" if m.group().lower() in terms else m.group(),
+                        text,
+                    ),
+                })
+        return hits[offset:offset + limit]
+
+    def list_conversations(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """List conversations with optional filters, newest first."""
+        with self._lock:
+            rows = [
+                dict(row) for row in self._conversations.values()
+                if (user_id is None or row["user_id"] == user_id)
+                and (workflow_id is None or row["workflow_id"] == workflow_id)
+            ]
+        rows.sort(key=lambda row: row["updated_at"], reverse=True)
+        return rows[offset:offset + limit] if limit >= 0 else rows[offset:]
+
+    def get_tool_call_stats(
+        self,
+        *,
+        conversation_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate tool call stats, optionally scoped to one conversation."""
+        groups: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        with self._lock:
+            for row in self._entries:
+                if row["entry_type"] != "tool_call":
+                    continue
+                if conversation_id and row["conversation_id"] != conversation_id:
+                    continue
+                groups.setdefault(row["tool_name"], []).append(row)
+
+        stats = []
+        for tool_name, rows in groups.items():
+            successes = sum(row["tool_success"] or 0 for row in rows)
+            durations = [row["tool_duration_ms"] for row in rows if row["tool_duration_ms"] is not None]
+            stats.append({
+                "tool_name": tool_name,
+                "call_count": len(rows),
+                "success_count": successes,
+                "failure_count": len(rows) - successes,
+                "avg_duration_ms": sum(durations) / len(durations) if durations else None,
+                "total_duration_ms": sum(durations) if durations else None,
+            })
+        stats.sort(key=lambda row: row["call_count"], reverse=True)
+        return stats
+
+    def get_usage_rollups(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate usage per (day, user_id, tool_name) like ``usage_rollups``."""
+        rollups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        with self._lock:
+            for row in self._entries:
+                entry_type = row["entry_type"]
+                if entry_type not in ("tool_call", "assistant_response", "error"):
+                    continue
+                conversation = self._conversations.get(row["conversation_id"])
+                key = (
+                    row["timestamp"][:10],
+                    conversation["user_id"] if conversation else "",
+                    row["tool_name"] or "",
+                )
+                if (user_id is not None and key[1] != user_id) \
+                        or (since is not None and key[0] < since) \
+                        or (until is not None and key[0] > until):
+                    continue
+                agg = rollups.setdefault(key, {
+                    "day": key[0], "user_id": key[1], "tool_name": key[2],
+                    "tool_calls": 0, "tool_failures": 0, "tool_duration_ms": 0.0,
+                    "assistant_turns": 0, "input_tokens": 0, "output_tokens": 0,
+                    "cache_creation_tokens": 0, "cache_read_tokens": 0, "errors": 0,
+                })
+                if entry_type == "tool_call":
+                    agg["tool_calls"] += 1
+                    agg["tool_failures"] += 0 if row["tool_success"] else 1
+                    agg["tool_duration_ms"] += row["tool_duration_ms"] or 0.0
+                elif entry_type == "assistant_response":
+                    agg["assistant_turns"] += 1
+                else:
+                    agg["errors"] += 1
+                for column in ("input_tokens", "output_tokens",
+                               "cache_creation_tokens", "cache_read_tokens"):
+                    agg[column] += row[column] or 0
+        return [rollups[key] for key in sorted(rollups)]
+
+
+class InMemoryAuthStore:
+    """``AuthStore`` semantics over dicts of users and sessions."""
+
+    def __init__(self) -> None:
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("backend.auth")
+
+    def create_user(self, user_id: str, email: str, name: str, password_hash: str) -> None:
+        with self._lock:
+            if user_id in self._users:
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: users.id")
+            if any(user["email"] == email for user in self._users.values()):
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: users.email")
+            self._users[user_id] = {
+                "id": user_id,
+                "email": email,
+                "name": name,
+                "password_hash": password_hash,
+                "created_at": _now(),
+                "last_login_at": None,
+            }
+        self._logger.info("Created user id=%s email=%s", user_id, email)
+
+    def get_user_by_email(self, email: str) -> Optional[AuthUser]:
+        with self._lock:
+            for user in self._users.values():
+                if user["email"] == email:
+                    return AuthUser(**user)
+        return None
+
+    def get_user_by_id(self, user_id: str) -> Optional[AuthUser]:
+        with self._lock:
+            user = self._users.get(user_id)
+            return AuthUser(**user) if user else None
+
+    def update_last_login(self, user_id: str) -> None:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user:
+                user["last_login_at"] = _now()
+
+    def update_password_hash(
+        self, user_id: str, password_hash: str, *, revoke_sessions: bool = True,
+    ) -> int:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user:
+                user["password_hash"] = password_hash
+            revoked = [
+                sid for sid, s in self._sessions.items()
+                if revoke_sessions and s["user_id"] == user_id
+            ]
+            for session_id in revoked:
+                del self._sessions[session_id]
+        return len(revoked)
+
+    def delete_user(self, user_id: str) -> bool:
+        with self._lock:
+            if self._users.pop(user_id, None) is None:
+                return False
+            for session_id, session in list(self._sessions.items()):
+                if session["user_id"] == user_id:
+                    del self._sessions[session_id]
+        return True
+
+    def create_session(
+        self,
+        session_id: str,
+        user_id: str,
+        token_hash: str,
+        *,
+        expires_at: str,
+    ) -> None:
+        now = _now()
+        with self._lock:
+            if user_id not in self._users:
+                raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+            if session_id in self._sessions:
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: sessions.id")
+            if any(s["token_hash"] == token_hash for s in self._sessions.values()):
+                raise sqlite3.IntegrityError("UNIQUE constraint failed: sessions.token_hash")
+            self._sessions[session_id] = {
+                "id": session_id,
+                "user_id": user_id,
+                "token_hash": token_hash,
+                "created_at": now,
+                "expires_at": expires_at,
+                "last_used_at": now,
+            }
+
+    def get_session_by_token_hash(
+        self,
+        token_hash: str,
+    ) -> Optional[Tuple[AuthSession, AuthUser]]:
+        with self._lock:
+            for session in self._sessions.values():
+                if session["token_hash"] != token_hash:
+                    continue
+                user = self._users.get(session["user_id"])
+                if user is None:
+                    return None
+                return AuthSession(**session), AuthUser(**user)
+        return None
+
+    def has_cached_session(self, token_hash: str) -> bool:
+        """Every lookup is served from memory."""
+        return True
+
+    def touch_session(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session:
+                session["last_used_at"] = _now()
+
+    def flush_session_touches(self) -> int:
+        """Touches are applied synchronously; nothing to flush."""
+        return 0
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+    def delete_session_by_token_hash(self, token_hash: str) -> None:
+        with self._lock:
+            for session_id, session in list(self._sessions.items()):
+                if session["token_hash"] == token_hash:
+                    del self._sessions[session_id]
+
+    def delete_expired_sessions(self, *, limit: Optional[int] = None) -> int:
+        now = _now()
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items() if s["expires_at"] <= now]
+            if limit is not None:
+                expired = expired[:limit]
+            for session_id in expired:
+                del self._sessions[session_id]
+        return len(expired)
+
+    def prune_sessions(self, user_id: str, *, max_sessions: int) -> int:
+        if max_sessions <= 0:
+            return 0
+        with self._lock:
+            owned = sorted(
+                (s for s in self._sessions.values() if s["user_id"] == user_id),
+                key=lambda s: s["last_used_at"],
+                reverse=True,
+            )
+            stale = owned[max_sessions:]
+            for session in stale:
+                del self._sessions[session["id"]]
+        return len(stale)
@@ -0,0 +1,195 @@
+"""Structural interfaces shared by the SQLite and in-memory storage backends.
+
+Callers type against these protocols rather than a concrete class so that
+the eval harness and test fixtures can swap the SQLite stores for the
+dict-backed implementations in ``storage.memory`` without touching disk.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+from .auth import AuthSession, AuthUser
+from .workflows import WorkflowRecord
+
+
+@runtime_checkable
+class WorkflowStorage(Protocol):
+    """Persistence interface implemented by ``WorkflowStore``."""
+
+    def create_workflow(
+        self,
+        workflow_id: str,
+        user_id: str,
+        name: str,
+        description: str,
+        **fields: Any,
+    ) -> None: ...
+
+    def get_workflow(self, workflow_id: str, user_id: str) -> Optional[WorkflowRecord]: ...
+
+    def update_workflow(self, workflow_id: str, user_id: str, **fields: Any) -> bool: ...
+
+    def try_set_building(self, workflow_id: str, user_id: str) -> bool: ...
+
+    def clear_stale_building_flags(self) -> int: ...
+
+    def delete_workflow(self, workflow_id: str, user_id: str) -> bool: ...
+
+    def list_workflows(
+        self, user_id: str, *, limit: int = 100, offset: int = 0,
+    ) -> Tuple[List[WorkflowRecord], int]: ...
+
+    def search_workflows(
+        self,
+        user_id: str,
+        *,
+        query: Optional[str] = None,
+        domain: Optional[str] = None,
+        validated: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[WorkflowRecord], int]: ...
+
+    def get_domains(self, user_id: str) -> List[str]: ...
+
+
+@runtime_checkable
+class ConversationLog(Protocol):
+    """Audit-log interface implemented by ``ConversationLogger``."""
+
+    def ensure_conversation(
+        self,
+        conversation_id: str,
+        *,
+        user_id: str,
+        workflow_id: Optional[str] = None,
+        model: str,
+    ) -> None: ...
+
+    def log_user_message(self, conversation_id: str, content: str, **kwargs: Any) -> int: ...
+
+    def log_assistant_response(self, conversation_id: str, content: str, **kwargs: Any) -> int: ...
+
+    def log_tool_call(
+        self,
+        conversation_id: str,
+        tool_name: str,
+        arguments: Any,
+        result: Any,
+        success: bool,
+        duration_ms: float,
+        **kwargs: Any,
+    ) -> int: ...
+
+    def log_thinking(self, conversation_id: str, content: str, **kwargs: Any) -> int: ...
+
+    def log_compaction(
+        self,
+        conversation_id: str,
+        original_count: int,
+        summary: str,
+        discarded_messages: Any,
+    ) -> int: ...
+
+    def log_workflow_snapshot(
+        self, conversation_id: str, workflow: Dict[str, Any], **kwargs: Any,
+    ) -> int: ...
+
+    def log_error(self, conversation_id: str, error: Any, **kwargs: Any) -> int: ...
+
+    def flush(self) -> None: ...
+
+    def get_conversation_timeline(
+        self,
+        conversation_id: str,
+        *,
+        entry_types: Optional[List[str]] = None,
+        after_seq: int = 0,
+    ) -> List[Dict[str, Any]]: ...
+
+    def checkpoint_history(
+        self,
+        conversation_id: str,
+        history: List[Dict[str, Any]],
+        *,
+        force: bool = False,
+    ) -> Optional[int]: ...
+
+    def get_history_checkpoint(
+        self, conversation_id: str,
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]: ...
+
+    def get_workflow_snapshots(self, conversation_id: str) -> List[Dict[str, Any]]: ...
+
+    def search_entries(
+        self,
+        query: str,
+        *,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]: ...
+
+    def list_conversations(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]: ...
+
+    def get_tool_call_stats(
+        self, *, conversation_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def get_usage_rollups(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+
+@runtime_checkable
+class AuthStorage(Protocol):
+    """User/session interface implemented by ``AuthStore``."""
+
+    def create_user(self, user_id: str, email: str, name: str, password_hash: str) -> None: ...
+
+    def get_user_by_email(self, email: str) -> Optional[AuthUser]: ...
+
+    def get_user_by_id(self, user_id: str) -> Optional[AuthUser]: ...
+
+    def update_last_login(self, user_id: str) -> None: ...
+
+    def update_password_hash(
+        self, user_id: str, password_hash: str, *, revoke_sessions: bool = True,
+    ) -> int: ...
+
+    def delete_user(self, user_id: str) -> bool: ...
+
+    def create_session(
+        self, session_id: str, user_id: str, token_hash: str, *, expires_at: str,
+    ) -> None: ...
+
+    def get_session_by_token_hash(
+        self, token_hash: str,
+    ) -> Optional[Tuple[AuthSession, AuthUser]]: ...
+
+    def has_cached_session(self, token_hash: str) -> bool: ...
+
+    def touch_session(self, session_id: str) -> None: ...
+
+    def flush_session_touches(self) -> int: ...
+
+    def delete_session_by_token_hash(self, token_hash: str) -> None: ...
+
+    def delete_expired_sessions(self, *, limit: Optional[int] = None) -> int: ...
+
+    def prune_sessions(self, user_id: str, *, max_sessions: int) -> int: ...
@@ -0,0 +1,267 @@
+"""SQLite-backed, append-only ledger of LLM token usage.
+
+Every ``call_llm`` appends one row to ``usage_events`` and bumps the
+matching ``usage_totals`` rows (lifetime, session, model, day and
+conversation) in the same transaction, so recording is O(1) regardless of
+history size and summary queries never scan the event log.  Raw events are
+trimmed to the newest ``max_events``; the totals keep everything.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+USAGE_KEYS = (
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# Trimming old events runs on every Nth insert rather than every insert.
+_TRIM_EVERY = 1_000
+
+_TOTALS_UPSERT_SQL = f"""
+    INSERT INTO usage_totals (scope, key, calls, {", ".join(USAGE_KEYS)}, updated_at)
+    VALUES (?, ?, 1, {", ".join("?" for _ in USAGE_KEYS)}, ?)
+    ON CONFLICT (scope, key) DO UPDATE SET
+        calls = calls + 1,
+        {", ".join(f"{k} = {k} + excluded.{k}" for k in USAGE_KEYS)},
+        updated_at = excluded.updated_at
+"""
+
+
+def _usage_values(entry: Dict[str, Any]) -> List[int]:
+    usage = entry.get("usage") if isinstance(entry.get("usage"), dict) else {}
+    return [usage[k] if isinstance(usage.get(k), int) else 0 for k in USAGE_KEYS]
+
+
+class TokenLedger:
+    def __init__(self, db_path: Path, *, max_events: int = 10_000):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_events = max_events
+        self._logger = logging.getLogger("backend.tokens")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS usage_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    session_id TEXT,
+                    request_id TEXT,
+                    conversation_id TEXT,
+                    model TEXT,
+                    caller TEXT,
+                    request_tag TEXT,
+                    {", ".join(f"{k} INTEGER NOT NULL DEFAULT 0" for k in USAGE_KEYS)},
+                    entry TEXT NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_usage_events_conversation
+                    ON usage_events(conversation_id);
+
+                CREATE TABLE IF NOT EXISTS usage_totals (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    {", ".join(f"{k} INTEGER NOT NULL DEFAULT 0" for k in USAGE_KEYS)},
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (scope, key)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    @contextmanager
+    def _conn(self) -> Iterable[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(self, entry: Dict[str, Any]) -> int:
+        """Append one usage entry and update the running totals.
+
+        *entry* must carry ``timestamp``; ``usage`` holds the token counts.
+        Returns the new event id.
+        """
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            event_id = self._apply(conn, entry)
+            if self._max_events and event_id % _TRIM_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM usage_events WHERE id <= ?",
+                    (event_id - self._max_events,),
+                )
+        return event_id
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, entry: Dict[str, Any]) -> int:
+        usage = _usage_values(entry)
+        timestamp = str(entry["timestamp"])
+        model = entry.get("model") or ""
+        conversation_id = entry.get("conversation_id") or None
+        cursor = conn.execute(
+            f"""
+            INSERT INTO usage_events (
+                timestamp, session_id, request_id, conversation_id, model,
+                caller, request_tag, {", ".join(USAGE_KEYS)}, entry
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, {", ".join("?" for _ in USAGE_KEYS)}, ?)
+            """,
+            (
+                timestamp, entry.get("session_id"), entry.get("request_id"),
+                conversation_id, model, entry.get("caller"), entry.get("request_tag"),
+                *usage, json.dumps(entry, ensure_ascii=True, default=str),
+            ),
+        )
+        scopes = [
+            ("total", ""),
+            ("model", model),
+            ("day", timestamp[:10]),
+        ]
+        if entry.get("session_id"):
+            scopes.append(("session", str(entry["session_id"])))
+        if conversation_id:
+            scopes.append(("conversation", str(conversation_id)))
+        conn.executemany(
+            _TOTALS_UPSERT_SQL,
+            [(scope, key, *usage, timestamp) for scope, key in scopes],
+        )
+        return int(cursor.lastrowid)
+
+    def import_legacy_json(self, log_path: Path, summary_path: Path) -> int:
+        """One-time import of the old ``tokens_usage.json`` / ``tokens.json`` pair.
+
+        Only runs on an empty ledger.  The log was capped at 10k entries, so
+        lifetime totals are raised to the old summary's where it saw more.
+        Imported files are renamed with a ``.migrated`` suffix.  Returns the
+        number of events imported.
+        """
+        if not log_path.exists() and not summary_path.exists():
+            return 0
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM usage_totals LIMIT 1").fetchone():
+                return 0
+            entries = _read_json(log_path)
+            imported = 0
+            for entry in entries if isinstance(entries, list) else []:
+                if isinstance(entry, dict) and entry.get("timestamp"):
+                    self._apply(conn, entry)
+                    imported += 1
+            summary = _read_json(summary_path)
+            legacy_total = summary.get("total") if isinstance(summary, dict) else None
+            if isinstance(legacy_total, dict):
+                conn.execute(
+                    f"""
+                    INSERT INTO usage_totals (scope, key, {", ".join(USAGE_KEYS)}, updated_at)
+                    VALUES ('total', '', {", ".join("?" for _ in USAGE_KEYS)}, ?)
+                    ON CONFLICT (scope, key) DO UPDATE SET
+                        {", ".join(f"{k} = MAX({k}, excluded.{k})" for k in USAGE_KEYS)}
+                    """,
+                    (*_usage_values({"usage": legacy_total}), summary.get("updated_at") or ""),
+                )
+        for path in (log_path, summary_path):
+            if path.exists():
+                path.replace(path.with_name(path.name + ".migrated"))
+        self._logger.info("Imported %d token usage entries from %s", imported, log_path)
+        return imported
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _totals(
+        self,
+        scope: str,
+        *,
+        key: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        clauses = ["scope = ?"]
+        params: List[Any] = [scope]
+        if key is not None:
+            clauses.append("key = ?")
+            params.append(key)
+        if since is not None:
+            clauses.append("key >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("key <= ?")
+            params.append(until)
+        with self._conn() as conn:
+            rows = conn.execute(
+                f"SELECT key, calls, {', '.join(USAGE_KEYS)}, updated_at "
+                f"FROM usage_totals WHERE {' AND '.join(clauses)} ORDER BY key",
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _single(self, scope: str, key: str) -> Dict[str, Any]:
+        rows = self._totals(scope, key=key)
+        if rows:
+            return rows[0]
+        return {"key": key, "calls": 0, **{k: 0 for k in USAGE_KEYS}, "updated_at": None}
+
+    def totals(self) -> Dict[str, Any]:
+        """Lifetime totals across every recorded call."""
+        return self._single("total", "")
+
+    def session_usage(self, session_id: str) -> Dict[str, Any]:
+        return self._single("session", session_id)
+
+    def conversation_usage(self, conversation_id: str) -> Dict[str, Any]:
+        return self._single("conversation", conversation_id)
+
+    def usage_by_model(self) -> List[Dict[str, Any]]:
+        """Per-model totals, ordered by model name."""
+        return self._totals("model")
+
+    def usage_by_day(
+        self, *, since: Optional[str] = None, until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Per-day totals; *since*/*until* are inclusive ``YYYY-MM-DD`` days."""
+        return self._totals("day", since=since, until=until)
+
+    def recent_events(
+        self, *, limit: int = 100, conversation_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Newest raw entries first, as originally recorded."""
+        sql = "SELECT entry FROM usage_events"
+        params: List[Any] = []
+        if conversation_id is not None:
+            sql += " WHERE conversation_id = ?"
+            params.append(conversation_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [json.loads(row["entry"]) for row in rows]
+
+
+def _read_json(path: Path) -> Any:
+    if not path.exists():
+        return None
+    try:
+        raw = path.read_text(encoding="utf-8").strip()
+        return json.loads(raw) if raw else None
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -12,14 +12,15 @@ stale-purge all work identically to ChatTask.
 from __future__ import annotations
 
 import logging
-import threading
 import time
 from dataclasses import dataclass, field
 from threading import Event
 from typing import Any, Dict, List, Optional
 
+from .executor import task_executor
 from .sse import EventSink
 from .tool_summaries import ToolSummaryTracker
+from .workflow_state_stream import WorkflowStateStream
 from ..tools.constants import WORKFLOW_EDIT_TOOLS
 
 logger = logging.getLogger(__name__)
@@ -56,6 +57,7 @@ class BuilderTask:
     # --- Tool tracking ---
     executed_tools: List[Dict[str, Any]] = field(default_factory=list)
     tool_summary: ToolSummaryTracker = field(default_factory=ToolSummaryTracker)
+    workflow_state: WorkflowStateStream = field(default_factory=WorkflowStateStream)
 
     # --- Orchestrator reference (set after construction) ---
     orchestrator: Any = None
@@ -72,40 +74,29 @@ class BuilderTask:
     # --- Timeout watchdog ---
 
     def start_watchdog(self) -> None:
-        """Spawn a daemon thread that kills this build after _BUILDER_TIMEOUT_SECONDS.
+        """Schedule the kill switch for _BUILDER_TIMEOUT_SECONDS from now.
 
-        Must be called after construction — the background builder thread calls
-        this before starting the orchestrator. Same pattern as ChatTask.
+        Must be called after construction — the builder job calls this
+        before starting the orchestrator. Runs on the executor's shared timer
+        thread, same as ChatTask.
         """
-        t = threading.Thread(
-            target=self._timeout_watchdog,
-            daemon=True,
-            name=f"builder-watchdog-{self.task_id}",
-        )
-        t.start()
+        task_executor.call_later(_BUILDER_TIMEOUT_SECONDS, self._on_timeout)
 
-    def _timeout_watchdog(self) -> None:
-        """Kill the build if it exceeds the wall-clock timeout.
+    def _on_timeout(self) -> None:
+        """Kill the build if it is still running at the wall-clock timeout.
 
-        Polls every 5 seconds. Sets _cancelled so the orchestrator's
-        should_cancel callback picks it up on the next LLM call or tool call.
+        Sets _cancelled so the orchestrator's should_cancel callback picks
+        it up on the next LLM call or tool call.
         """
-        start = time.monotonic()
-        while not self.done.is_set():
-            self.done.wait(5)
-            if self.done.is_set() or self.is_cancelled():
-                break
-            elapsed = time.monotonic() - start
-            if elapsed > _BUILDER_TIMEOUT_SECONDS:
-                logger.error(
-                    "Builder %s timed out (%.0fs > %.0fs) — cancelling",
-                    self.task_id, elapsed, _BUILDER_TIMEOUT_SECONDS,
-                )
-                self._cancelled = True
-                self._emit("chat_error", {
-                    "error": "Build timed out — the subworkflow was too complex.",
-                })
-                break
+        if self.done.is_set() or self.is_cancelled():
+            return
+        logger.error(
+            "Builder %s timed out (> %.0fs) — cancelling", self.task_id, _BUILDER_TIMEOUT_SECONDS,
+        )
+        self._cancelled = True
+        self._emit("chat_error", {
+            "error": "Build timed out — the subworkflow was too complex.",
+        })
 
     # --- Event emission ---
 
@@ -205,12 +196,13 @@ class BuilderTask:
                 action = result.get("action", tool)
                 self._emit("workflow_update", {"action": action, "data": result})
                 if self.orchestrator is not None:
-                    self._emit("workflow_state_updated", {
+                    state_event, state_data = self.workflow_state.next_event({
                         "workflow_id": self.workflow_id,
                         "workflow": self.orchestrator.current_workflow,
                         "analysis": self.orchestrator.workflow_analysis,
                         "task_id": self.task_id,
                     })
+                    self._emit(state_event, state_data)
         elif event == "tool_batch_complete":
             self.flush_tool_summary()
 
@@ -220,20 +212,33 @@ class BuilderTask:
 
     # --- Resume support ---
 
-    def swap_sink(self, new_sink: EventSink) -> None:
+    def swap_sink(self, new_sink: EventSink, last_event_id: Optional[int] = None) -> None:
         """Swap the event sink for resume after page refresh.
 
-        Replays accumulated thinking + stream content to the new sink,
-        then routes all future events through it. Closes the old sink
-        to end the stale SSE stream (or drain the unread queue).
+        If *last_event_id* is still covered by the event log, only the missed
+        events are re-sent. Otherwise accumulated thinking + stream content is
+        replayed as a snapshot. All future events then go through the new
+        sink; the old one is closed to end the stale SSE stream (or drain the
+        unread queue).
         """
-        # Signal reconnection
-        new_sink.push("chat_progress", {
+        resumed = {
             "event": "resumed",
             "status": "Processing...",
             "task_id": self.task_id,
             "workflow_id": self.workflow_id,
-        })
+        }
+        if last_event_id is not None and new_sink.replay(last_event_id):
+            new_sink.push_replay("chat_progress", resumed)
+        else:
+            self._replay_snapshot(new_sink, resumed)
+        # Swap: close old sink, install new one
+        old_sink = self.sink
+        self.sink = new_sink
+        old_sink.close()
+
+    def _replay_snapshot(self, new_sink: EventSink, resumed: Dict[str, Any]) -> None:
+        # Signal reconnection
+        new_sink.push_replay("chat_progress", resumed)
         # NOTE: build_user_message is NOT replayed here. WorkflowPage shows
         # the brief via metadata.description during builds, and
         # syncConversationMessages loads it from the conversation logger
@@ -241,26 +246,35 @@ class BuilderTask:
         #
         # Replay accumulated thinking
         if self.thinking_chunks:
-            new_sink.push("chat_thinking", {
+            new_sink.push_replay("chat_thinking", {
                 "chunk": "".join(self.thinking_chunks),
                 "task_id": self.task_id,
                 "workflow_id": self.workflow_id,
             })
         # Replay accumulated stream content
         if self.stream_buffer:
-            new_sink.push("chat_stream", {
+            new_sink.push_replay("chat_stream", {
                 "chunk": self.stream_buffer,
                 "task_id": self.task_id,
                 "workflow_id": self.workflow_id,
             })
         # Replay last workflow state so the canvas syncs
-        if self.orchestrator is not None:
-            new_sink.push("workflow_state_updated", {
+        snapshot = self.workflow_state_snapshot()
+        if snapshot:
+            new_sink.push_replay("workflow_state_updated", snapshot)
+
+    def workflow_state_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest workflow state with its version, for resume and resync.
+
+        Falls back to the orchestrator's current state (version 0) when no
+        state event has been sent yet.
+        """
+        snapshot = self.workflow_state.snapshot()
+        if snapshot is None and self.orchestrator is not None:
+            snapshot = {
                 "workflow_id": self.workflow_id,
                 "workflow": self.orchestrator.current_workflow,
                 "analysis": self.orchestrator.workflow_analysis,
-            })
-        # Swap: close old sink, install new one
-        old_sink = self.sink
-        self.sink = new_sink
-        old_sink.close()
+                "version": 0,
+            }
+        return snapshot
@@ -8,22 +8,39 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
 from typing import Any, Callable, Dict, List, Optional
 
+from .executor import TimerHandle, task_executor
 from .sse import EventSink
 from .registry import task_registry
+from .workflow_state_stream import WorkflowStateStream
 
 logger = logging.getLogger(__name__)
 
 # Workflow-affecting events that the frontend requires workflow_id on.
-_WORKFLOW_EVENTS = {"workflow_update", "workflow_state_updated", "workflow_created"}
+_WORKFLOW_EVENTS = {
+    "workflow_update", "workflow_state_updated", "workflow_state_patch", "workflow_created",
+}
+
+# Text deltas arriving faster than this are coalesced into one chat_stream
+# event; a pending batch is flushed once it reaches the byte budget or the
+# window elapses, whichever comes first.
+_COALESCE_MAX_BYTES = 16 * 1024
+_COALESCE_WINDOW_SECONDS = 0.03
 
 
 class ChatEventChannel:
     """Manages SSE transport for a single chat task.
 
     Owns the EventSink and replay buffers (thinking_chunks, stream_buffer,
-    _last_workflow_state). All event emission goes through this channel.
+    the versioned workflow state). All event emission goes through this channel.
+
+    Text deltas are coalesced: the first delta of a run goes out immediately
+    (first-token latency is unchanged), later ones are batched until the byte
+    budget or time window is reached. Any other event flushes the batch first
+    so ordering is preserved, and the executor's shared timer thread flushes
+    a trailing batch when the model pauses.
 
     Thread safety: a lock guards sink swap and emit to prevent the race
     where swap_sink replays to a new sink while publish() writes to the old one.
@@ -34,6 +51,9 @@ class ChatEventChannel:
         sink: EventSink,
         task_id: str,
         workflow_id_fn: Callable[[], Optional[str]],
+        *,
+        coalesce_max_bytes: int = _COALESCE_MAX_BYTES,
+        coalesce_window_seconds: float = _COALESCE_WINDOW_SECONDS,
     ) -> None:
         """
         Args:
@@ -42,6 +62,9 @@ class ChatEventChannel:
             workflow_id_fn: Zero-arg callable returning the current workflow_id.
                            Avoids storing a mutable string that can go stale.
                            ChatTask passes ``lambda: self.current_workflow_id``.
+            coalesce_max_bytes: Flush a pending text batch at this size.
+            coalesce_window_seconds: Flush a pending text batch at this age.
+                           ``0`` disables coalescing.
         """
         self._sink = sink
         self._task_id = task_id
@@ -49,10 +72,18 @@ class ChatEventChannel:
         self._lock = threading.Lock()
 
         # Replay buffers — accumulated content replayed on resume
-        self.stream_buffer: str = ""
+        self._stream_chunks: List[str] = []
         self.thinking_chunks: List[str] = []
         self.did_stream: bool = False
-        self._last_workflow_state: Optional[Dict[str, Any]] = None
+        self._workflow_state = WorkflowStateStream()
+
+        # Coalescing state — guarded by _lock
+        self._coalesce_max_bytes = coalesce_max_bytes
+        self._coalesce_window = coalesce_window_seconds
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._last_stream_emit: Optional[float] = None
+        self._flush_timer: Optional[TimerHandle] = None
 
     # --- Core emission ---
 
@@ -62,6 +93,11 @@ class ChatEventChannel:
         external code that needs it (chat_routes cancel, orchestrator event_sink)."""
         return self._sink
 
+    @property
+    def stream_buffer(self) -> str:
+        """All text streamed so far, including any not-yet-flushed batch."""
+        return "".join(self._stream_chunks)
+
     def publish(self, event: str, payload: dict) -> None:
         """Push an event to the SSE stream.
 
@@ -70,21 +106,57 @@ class ChatEventChannel:
         """
         wf_id = self._workflow_id_fn()
         with self._lock:
-            if wf_id and "workflow_id" not in payload:
-                payload["workflow_id"] = wf_id
-            # Warn when workflow-affecting events lack workflow_id — frontend will drop them.
-            if event in _WORKFLOW_EVENTS and not payload.get("workflow_id"):
-                logger.warning(
-                    "Publishing %s without workflow_id — frontend will drop this event",
-                    event,
-                )
-            self._sink.push(event, payload)
+            self._flush_pending_locked(wf_id)
+            self._push_locked(event, payload, wf_id)
+            # The next text delta starts a new run and goes out immediately
+            self._last_stream_emit = None
+
+    def _push_locked(self, event: str, payload: dict, wf_id: Optional[str]) -> None:
+        if wf_id and "workflow_id" not in payload:
+            payload["workflow_id"] = wf_id
+        # Warn when workflow-affecting events lack workflow_id — frontend will drop them.
+        if event in _WORKFLOW_EVENTS and not payload.get("workflow_id"):
+            logger.warning(
+                "Publishing %s without workflow_id — frontend will drop this event",
+                event,
+            )
+        self._sink.push(event, payload)
+
+    def _flush_pending_locked(self, wf_id: Optional[str]) -> None:
+        """Emit the pending text batch, if any. Caller holds ``_lock``."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+        chunk = "".join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self._last_stream_emit = time.monotonic()
+        self._push_locked("chat_stream", {"chunk": chunk, "task_id": self._task_id}, wf_id)
+
+    def flush_stream(self) -> None:
+        """Emit any coalesced text that has not been sent yet."""
+        wf_id = self._workflow_id_fn()
+        with self._lock:
+            self._flush_pending_locked(wf_id)
 
     def publish_workflow_state(self, payload: Dict[str, Any]) -> None:
-        """Emit workflow_state_updated and cache for resume replay."""
+        """Emit the workflow state as a versioned snapshot or JSON-patch delta.
+
+        The state is kept as the base for the next delta and for resume replay.
+        """
+        wf_id = self._workflow_id_fn()
         with self._lock:
-            self._last_workflow_state = payload
-        self.publish("workflow_state_updated", payload)
+            # Versioning and push share the lock so deltas go out in order
+            event, data = self._workflow_state.next_event(payload)
+            self._flush_pending_locked(wf_id)
+            self._push_locked(event, data, wf_id)
+            self._last_stream_emit = None
+
+    def workflow_state_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest workflow state with its version, for client resync."""
+        return self._workflow_state.snapshot()
 
     def publish_progress(
         self, event: str, status: str, *, tool: Optional[str] = None,
@@ -109,13 +181,28 @@ class ChatEventChannel:
     # --- Streaming callbacks (passed to orchestrator) ---
 
     def stream_chunk(self, chunk: str) -> None:
-        """Accumulate and emit a text chunk.
+        """Accumulate and emit (or batch) a text chunk.
 
         Passed as orchestrator's ``stream`` callback.
         """
-        self.did_stream = True
-        self.stream_buffer += chunk
-        self.publish("chat_stream", {"chunk": chunk, "task_id": self._task_id})
+        wf_id = self._workflow_id_fn()
+        with self._lock:
+            self.did_stream = True
+            self._stream_chunks.append(chunk)
+            self._pending.append(chunk)
+            self._pending_bytes += len(chunk.encode("utf-8"))
+            now = time.monotonic()
+            last = self._last_stream_emit
+            if (
+                last is None
+                or now - last >= self._coalesce_window
+                or self._pending_bytes >= self._coalesce_max_bytes
+            ):
+                self._flush_pending_locked(wf_id)
+            elif self._flush_timer is None:
+                self._flush_timer = task_executor.call_later(
+                    self._coalesce_window - (now - last), self.flush_stream,
+                )
 
     def stream_thinking(self, chunk: str) -> None:
         """Accumulate and emit a thinking chunk.
@@ -129,46 +216,71 @@ class ChatEventChannel:
 
     # --- Resume ---
 
-    def swap_sink(self, new_sink: EventSink) -> None:
-        """Swap the underlying sink for resume. Replays accumulated content.
+    def swap_sink(self, new_sink: EventSink, last_event_id: Optional[int] = None) -> None:
+        """Swap the underlying sink for resume.
+
+        When the client sends the id of the last event it saw and the gap is
+        still in the event log, only the missed events are re-sent. Otherwise
+        the accumulated content is replayed as a compact snapshot.
 
         Thread-safe: holds the lock during the entire swap+replay so no
         concurrent publish() writes to the old sink after the swap.
         """
         wf_id = self._workflow_id_fn() or ""
         with self._lock:
-            # Progress event so frontend knows it's reconnected
-            new_sink.push("chat_progress", {
+            resumed = {
                 "event": "resumed",
                 "status": "Processing...",
                 "task_id": self._task_id,
                 "workflow_id": wf_id,
-            })
-            # Replay accumulated thinking
-            if self.thinking_chunks:
-                new_sink.push("chat_thinking", {
-                    "chunk": "".join(self.thinking_chunks),
-                    "task_id": self._task_id,
-                    "workflow_id": wf_id,
-                })
-            # Replay accumulated stream content
-            if self.stream_buffer:
-                new_sink.push("chat_stream", {
-                    "chunk": self.stream_buffer,
-                    "task_id": self._task_id,
-                    "workflow_id": wf_id,
-                })
-            # Replay last workflow state so the canvas syncs
-            if self._last_workflow_state:
-                new_sink.push("workflow_state_updated", {
-                    **self._last_workflow_state,
-                    "workflow_id": wf_id,
-                })
+            }
+            if last_event_id is not None and new_sink.replay(last_event_id):
+                # Missed suffix re-sent; a pending batch still goes out live
+                new_sink.push_replay("chat_progress", resumed)
+            else:
+                self._replay_snapshot_locked(new_sink, resumed, wf_id)
             # Swap: close old sink, install new one
             old_sink = self._sink
             self._sink = new_sink
             old_sink.close()
 
+    def _replay_snapshot_locked(
+        self, new_sink: EventSink, resumed: Dict[str, Any], wf_id: str,
+    ) -> None:
+        # The pending batch is part of the stream replay below
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._pending = []
+        self._pending_bytes = 0
+        # Progress event so frontend knows it's reconnected
+        new_sink.push_replay("chat_progress", resumed)
+        # Replay accumulated thinking
+        if self.thinking_chunks:
+            new_sink.push_replay("chat_thinking", {
+                "chunk": "".join(self.thinking_chunks),
+                "task_id": self._task_id,
+                "workflow_id": wf_id,
+            })
+        # Replay accumulated stream content
+        if self._stream_chunks:
+            new_sink.push_replay("chat_stream", {
+                "chunk": "".join(self._stream_chunks),
+                "task_id": self._task_id,
+                "workflow_id": wf_id,
+            })
+        # Replay last workflow state so the canvas syncs
+        snapshot = self._workflow_state.snapshot()
+        if snapshot:
+            new_sink.push_replay("workflow_state_updated", {
+                **snapshot,
+                "workflow_id": wf_id,
+            })
+
     def close(self) -> None:
-        """Close the underlying sink. Called in ChatTask.run() finally block."""
+        """Flush pending text and close the underlying sink.
+
+        Called in ChatTask.run() finally block.
+        """
+        self.flush_stream()
         self._sink.close()
@@ -176,7 +176,7 @@ def sync_orchestrator_from_convo(
     convo.orchestrator.open_tabs = open_tabs or []
     # Inject conversation logger so the orchestrator can log compaction events
     convo.orchestrator.conversation._conversation_logger = conversation_logger
-    convo.orchestrator.conversation._conversation_id = convo.id
+    convo.orchestrator.conversation.conversation_id = convo.id
 
 
 def sync_convo_from_orchestrator(convo: Conversation) -> None:
@@ -1,4 +1,4 @@
-"""SSE-based chat task — manages a single chat turn in a background thread.
+"""SSE-based chat task — manages a single chat turn on the task executor.
 
 Delegates SSE transport to ChatEventChannel. Events are pushed to a queue
 that FastAPI yields as SSE.
@@ -11,7 +11,6 @@ No conn_id locking needed (channel handles sink swap with a lock).
 from __future__ import annotations
 
 import logging
-import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -32,6 +31,7 @@ from .chat_turn_runner import ChatRuntimePorts, run_turn
 from ..api.common import utc_now
 from .conversations import Conversation, ConversationStore
 from ..api.response_utils import extract_tool_calls
+from .executor import task_executor
 from .sse import EventSink
 from .registry import task_registry
 from .tool_event_projector import ToolEventProjector
@@ -160,13 +160,17 @@ class ChatTask:
             return
         self.channel.stream_thinking(chunk)
 
-    def swap_sink(self, new_sink: EventSink) -> None:
+    def swap_sink(self, new_sink: EventSink, last_event_id: Optional[int] = None) -> None:
         """Swap the event sink for resume after page refresh (delegates to channel)."""
-        self.channel.swap_sink(new_sink)
+        self.channel.swap_sink(new_sink, last_event_id)
         # Keep self.sink in sync for external code that accesses task.sink directly
         # (e.g. chat_routes.py cancel endpoint pushes to task.sink)
         self.sink = self.channel.sink
 
+    def workflow_state_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest versioned workflow state (delegates to channel)."""
+        return self.channel.workflow_state_snapshot()
+
     # --- Helpers ---
 
     def is_cancelled(self) -> bool:
@@ -178,30 +182,21 @@ class ChatTask:
             return True
         return False
 
-    def _timeout_watchdog(self) -> None:
-        """Kill the task if it exceeds the wall-clock timeout.
+    def _on_timeout(self) -> None:
+        """Kill the task once it exceeds the wall-clock timeout.
 
-        Replaces the old heartbeat thread. No need to emit heartbeat events —
-        SSE keepalive comments handle proxy timeout prevention.
+        Scheduled on the executor's shared timer thread by run(). No need to
+        emit heartbeat events — SSE keepalive comments handle proxy timeouts.
         """
-        start = time.monotonic()
-        while not self.done.is_set():
-            self.done.wait(5)
-            if self.done.is_set() or self.is_cancelled():
-                break
-            elapsed = time.monotonic() - start
-            if elapsed > _TASK_TIMEOUT_SECONDS:
-                logger.error(
-                    "Task %s timed out (%.0fs > %.0fs) — cancelling",
-                    self.task_id, elapsed, _TASK_TIMEOUT_SECONDS,
-                )
-                # Emit error BEFORE setting cancelled — emit_error is
-                # cancellation-guarded and would silently drop the message.
-                self.emit_error(
-                    "Task timed out — please try again with a simpler request."
-                )
-                self._cancelled = True
-                break
+        if self.done.is_set() or self.is_cancelled():
+            return
+        logger.error(
+            "Task %s timed out (> %.0fs) — cancelling", self.task_id, _TASK_TIMEOUT_SECONDS,
+        )
+        # Emit error BEFORE setting cancelled — emit_error is
+        # cancellation-guarded and would silently drop the message.
+        self.emit_error("Task timed out — please try again with a simpler request.")
+        self._cancelled = True
 
     def flush_tool_summary(self) -> None:
         """Flush accumulated tool summary — delegated to projector."""
@@ -328,7 +323,7 @@ class ChatTask:
         cleanup only.
         """
         self.emit_progress("start", "Thinking...")
-        threading.Thread(target=self._timeout_watchdog, daemon=True).start()
+        timeout = task_executor.call_later(_TASK_TIMEOUT_SECONDS, self._on_timeout)
 
         try:
             # --- Bootstrap ---
@@ -390,6 +385,7 @@ class ChatTask:
             self.emit_error(f"Something went wrong: {type(exc).__name__}. Please try again.")
 
         finally:
+            timeout.cancel()
             self.done.set()
             task_registry.unregister(self)
             # Close our SSE stream. Builder tasks have their own independent
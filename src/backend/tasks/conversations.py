@@ -4,20 +4,29 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 from pathlib import Path
 
 from ..api.common import utc_now
+from ..storage.conversation_spill import ConversationSpill
+from ..storage.coordination import get_coordinator
 from ..agents.orchestrator import Orchestrator
 from ..agents.orchestrator_factory import build_orchestrator
+from ..utils.content_blocks import resolve_uploads
 
 logger = logging.getLogger(__name__)
 
-# Maximum conversations kept in memory before evicting oldest
-_MAX_CONVERSATIONS = 100
+# Memory budget for live conversations (LEMON_CONVERSATION_CACHE_MB)
+_DEFAULT_CACHE_MB = 512
+# Orchestrator, conversation manager and bookkeeping per live conversation
+_CONVERSATION_OVERHEAD_BYTES = 64 * 1024
+# How long a worker's claim on a conversation outlives its last turn
+_CLAIM_TTL_SECONDS = 24 * 60 * 60.0
 
 
 @dataclass
@@ -83,77 +92,132 @@ class Conversation:
 
 
 class ConversationStore:
-    def __init__(self, repo_root: Path, conversation_logger: Any = None) -> None:
+    """In-memory conversations, one per worker.
+
+    Live conversations are kept in LRU order under a byte budget, using a
+    per-conversation size estimate that is updated when its history grows
+    (only the new messages are measured) or is replaced.
+    The least recently used ones are evicted once the estimate exceeds the
+    budget; with a ``spill_dir`` they are written there and restored from
+    it on next use, otherwise they are rebuilt from the persistent log.
+
+    With several workers the persistent log is the source of truth: a
+    worker claims a conversation when it serves a turn for it, and any
+    other worker holding an older in-memory copy drops it and reloads from
+    the log on next use.
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        conversation_logger: Any = None,
+        *,
+        budget_bytes: Optional[int] = None,
+        spill_dir: Optional[Path] = None,
+    ) -> None:
         self._repo_root = repo_root
         self._conversation_logger = conversation_logger
-        self._conversations: Dict[str, Conversation] = {}
-        # Lock protects _conversations from concurrent WS thread access
+        self._budget_bytes = budget_bytes if budget_bytes is not None else _cache_budget_bytes()
+        self._spill = ConversationSpill(spill_dir) if spill_dir is not None else None
+        if self._spill is not None:
+            self._spill.prune()
+        # Least recently used first
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        # History list and length each size was measured at, with the
+        # history's share of it, so a grown history adds only its tail.
+        self._size_marks: Dict[str, Tuple[List[Dict[str, Any]], int, int]] = {}
+        self._total_bytes = 0
+        # Lock protects the LRU state from concurrent WS thread access
         self._lock = threading.Lock()
 
+    @property
+    def total_bytes(self) -> int:
+        """Estimated size of all live conversations."""
+        return self._total_bytes
+
     def get_or_create(self, conversation_id: Optional[str]) -> Conversation:
         with self._lock:
+            if conversation_id:
+                self._drop_if_claimed_elsewhere_locked(conversation_id)
             if conversation_id and conversation_id in self._conversations:
                 convo = self._conversations[conversation_id]
                 convo.updated_at = utc_now()
-                return convo
-            # Evict oldest conversations when at capacity
-            self._evict_if_full()
-            new_id = conversation_id or f"conv_{uuid4().hex}"
-            convo = Conversation(id=new_id, orchestrator=build_orchestrator(self._repo_root))
-            # Reload history from persistent logger when the conversation_id was
-            # provided but not found in memory (e.g. after backend restart).
-            if conversation_id and self._conversation_logger:
-                self._reload_history(convo)
-            self._conversations[new_id] = convo
-            return convo
+            else:
+                new_id = conversation_id or f"conv_{uuid4().hex}"
+                convo = Conversation(id=new_id, orchestrator=build_orchestrator(self._repo_root))
+                # A known conversation_id that is not in memory was evicted or
+                # predates a backend restart: restore it from the spill file,
+                # else reload history from the persistent logger.
+                if conversation_id and not self._restore_spilled(convo) \
+                        and self._conversation_logger:
+                    self._reload_history(convo)
+                self._conversations[new_id] = convo
+            self._claim(convo.id)
+            evicted = self._touch_locked(convo.id)
+        self._spill_evicted(evicted)
+        return convo
+
+    def _claim(self, conversation_id: str) -> None:
+        """Claim the conversation for this worker.
+
+        When the claim moves here (or had lapsed), the log's seq counter is
+        re-seeded from the stored entries so numbering continues after what
+        the previous worker logged instead of reusing its seqs.
+        """
+        coordinator = get_coordinator()
+        previous: List[Optional[Dict[str, Any]]] = []
+
+        def take(current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            previous.append(current)
+            return {"worker_id": coordinator.worker_id}
+
+        coordinator.update("conversations", conversation_id, take, ttl=_CLAIM_TTL_SECONDS)
+        moved = not previous[-1] or previous[-1]["worker_id"] != coordinator.worker_id
+        if moved and self._conversation_logger:
+            self._conversation_logger.resync_seq(conversation_id)
+
+    def _drop_if_claimed_elsewhere_locked(self, conversation_id: str) -> None:
+        """Forget our copy if another worker has served the conversation since."""
+        if conversation_id not in self._conversations:
+            return
+        coordinator = get_coordinator()
+        claim = coordinator.get("conversations", conversation_id)
+        if claim and claim["worker_id"] != coordinator.worker_id:
+            logger.info("Conversation %s moved to worker %s — dropping local copy",
+                        conversation_id, claim["worker_id"])
+            self._remove_locked(conversation_id)
 
     def _reload_history(self, convo: Conversation) -> None:
         """Reload conversation history from ConversationLogger into the orchestrator.
 
         Called when a known conversation_id is not in memory — typically after
-        a backend restart. Reads user/assistant messages and tool calls from
-        the persistent SQLite log. Tool calls are attached as tool_calls_meta
-        on assistant messages so get_conversation can display them.
+        a backend restart or eviction. Starts from the latest history
+        checkpoint (the already-compacted message list) and replays only the
+        user/assistant messages and tool calls logged after it, so the cost
+        is bounded however long the conversation is. Tool calls are attached
+        as tool_calls_meta on assistant messages so get_conversation can
+        display them.
         """
         try:
+            history: list[dict] = []
+            after_seq = 0
+            checkpoint = self._conversation_logger.get_history_checkpoint(convo.id)
+            if checkpoint is not None:
+                after_seq, history = checkpoint
+                history = resolve_uploads(history)
             entries = self._conversation_logger.get_conversation_timeline(
                 convo.id,
                 entry_types=["user_message", "assistant_response", "tool_call"],
+                after_seq=after_seq,
             )
-            if not entries:
-                return
-            history: list[dict] = []
-            pending_tool_calls: list[dict] = []
-            for entry in entries:
-                etype = entry["entry_type"]
-                if etype == "tool_call":
-                    # Collect tool calls between user message and assistant response
-                    tool_args = entry.get("tool_arguments")
-                    pending_tool_calls.append({
-                        "tool": entry.get("tool_name", ""),
-                        "arguments": json.loads(tool_args) if tool_args else {},
-                        "success": bool(entry.get("tool_success", 1)),
-                    })
-                elif etype == "user_message":
-                    pending_tool_calls = []
-                    content = entry.get("content", "")
-                    if content:
-                        history.append({"role": "user", "content": content})
-                elif etype == "assistant_response":
-                    content = entry.get("content", "")
-                    # Keep assistant messages with content OR pending tool calls
-                    # (ask_question can produce empty-content with tools)
-                    if content or pending_tool_calls:
-                        msg: dict = {"role": "assistant", "content": content}
-                        if pending_tool_calls:
-                            msg["tool_calls_meta"] = pending_tool_calls
-                            pending_tool_calls = []
-                        history.append(msg)
+            history.extend(_replay_entries(entries))
             if history:
                 convo.orchestrator.conversation.history = history
                 logger.info(
-                    "Reloaded %d messages for conversation %s from persistent log",
-                    len(history), convo.id,
+                    "Reloaded %d messages for conversation %s from persistent log "
+                    "(checkpoint seq=%d, %d entries replayed)",
+                    len(history), convo.id, after_seq, len(entries),
                 )
         except Exception:
             logger.warning(
@@ -163,21 +227,192 @@ class ConversationStore:
 
     def get(self, conversation_id: str) -> Optional[Conversation]:
         with self._lock:
-            return self._conversations.get(conversation_id)
+            self._drop_if_claimed_elsewhere_locked(conversation_id)
+            convo = self._conversations.get(conversation_id)
+            if convo is None:
+                return None
+            evicted = self._touch_locked(conversation_id)
+        self._spill_evicted(evicted)
+        return convo
+
+    # --- LRU and spill ---
 
-    def _evict_if_full(self) -> None:
-        """Remove oldest conversations when store exceeds max capacity.
+    def _touch_locked(self, conversation_id: str) -> List[Conversation]:
+        """Mark most recently used, re-estimate its size, evict over budget.
 
-        Must be called while self._lock is held.
+        Returns the evicted conversations, to be spilled once the lock is
+        released.  The conversation just touched is never evicted, even if
+        it alone exceeds the budget.
         """
-        if len(self._conversations) < _MAX_CONVERSATIONS:
+        self._conversations.move_to_end(conversation_id)
+        self._update_size_locked(conversation_id)
+
+        evicted: List[Conversation] = []
+        while self._total_bytes > self._budget_bytes and len(self._conversations) > 1:
+            oldest_id = next(iter(self._conversations))
+            logger.info(
+                "Evicting conversation %s (~%d KB) to stay within %d MB",
+                oldest_id, self._sizes[oldest_id] // 1024, self._budget_bytes // (1024 * 1024),
+            )
+            evicted.append(self._remove_locked(oldest_id))
+        return evicted
+
+    def _update_size_locked(self, conversation_id: str) -> None:
+        """Refresh the size estimate if the history changed since last measured.
+
+        Every turn appends to the history, so that is also when workflow,
+        uploads and guidance (small next to the history) are re-measured.
+        """
+        convo = self._conversations[conversation_id]
+        history = convo.orchestrator.conversation.history
+        mark = self._size_marks.get(conversation_id)
+        if mark is not None and mark[0] is history and mark[1] == len(history):
             return
-        # Sort by updated_at, evict oldest 10%
-        evict_count = max(1, _MAX_CONVERSATIONS // 10)
-        sorted_ids = sorted(
-            self._conversations,
-            key=lambda cid: self._conversations[cid].updated_at,
-        )
-        for cid in sorted_ids[:evict_count]:
-            logger.info("Evicting stale conversation %s", cid)
-            del self._conversations[cid]
+        if mark is not None and mark[0] is history and mark[1] < len(history):
+            history_bytes = mark[2] + _estimate_bytes(history[mark[1]:])
+        else:
+            history_bytes = _estimate_bytes(history)
+        size = _estimate_conversation_bytes(convo, history_bytes)
+        self._size_marks[conversation_id] = (history, len(history), history_bytes)
+        self._total_bytes += size - self._sizes.get(conversation_id, 0)
+        self._sizes[conversation_id] = size
+
+    def _remove_locked(self, conversation_id: str) -> Conversation:
+        self._total_bytes -= self._sizes.pop(conversation_id, 0)
+        self._size_marks.pop(conversation_id, None)
+        return self._conversations.pop(conversation_id)
+
+    def _log_seq(self, conversation_id: str) -> Optional[int]:
+        if self._conversation_logger is None:
+            return None
+        return self._conversation_logger.last_seq(conversation_id)
+
+    def _spill_evicted(self, evicted: List[Conversation]) -> None:
+        if self._spill is None:
+            return
+        for convo in evicted:
+            try:
+                self._spill.write(
+                    convo.id, _spill_state(convo), through_seq=self._log_seq(convo.id),
+                )
+            except Exception:
+                logger.warning("Failed to spill conversation %s", convo.id, exc_info=True)
+                self._spill.discard(convo.id)
+
+    def _restore_spilled(self, convo: Conversation) -> bool:
+        if self._spill is None:
+            return False
+        try:
+            state = self._spill.take(convo.id, through_seq=self._log_seq(convo.id))
+            if state is None:
+                return False
+            _apply_spill_state(convo, state)
+        except Exception:
+            logger.warning("Failed to restore spilled conversation %s", convo.id, exc_info=True)
+            return False
+        logger.info("Restored conversation %s from spill", convo.id)
+        return True
+
+
+def _cache_budget_bytes() -> int:
+    raw = os.getenv("LEMON_CONVERSATION_CACHE_MB", "").strip()
+    try:
+        mb = int(raw) if raw else _DEFAULT_CACHE_MB
+    except ValueError:
+        mb = _DEFAULT_CACHE_MB
+    return max(mb, 1) * 1024 * 1024
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Rough in-memory size of a JSON-like value.
+
+    Counts string and bytes payloads (base64 images dominate) plus a small
+    per-container cost; walks iteratively so deep nesting is safe.
+    """
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (str, bytes, bytearray)):
+            total += 48 + len(item)
+        elif isinstance(item, dict):
+            total += 64 + 16 * len(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            total += 56 + 8 * len(item)
+            stack.extend(item)
+        else:
+            total += 24
+    return total
+
+
+def _estimate_conversation_bytes(convo: Conversation, history_bytes: int) -> int:
+    orchestrator = convo.orchestrator
+    return _CONVERSATION_OVERHEAD_BYTES + history_bytes + _estimate_bytes([
+        convo.workflow,
+        orchestrator.workflow,
+        orchestrator.uploaded_files,
+        orchestrator.guidance,
+    ])
+
+
+def _spill_state(convo: Conversation) -> Dict[str, Any]:
+    """Conversation state that outlives a turn; per-turn wiring is re-synced."""
+    orchestrator = convo.orchestrator
+    return {
+        "created_at": convo.created_at,
+        "updated_at": convo.updated_at,
+        "workflow": convo.workflow,
+        "history": orchestrator.conversation.history,
+        "orchestrator_workflow": orchestrator.workflow,
+        "current_workflow_id": orchestrator.current_workflow_id,
+        "current_workflow_name": orchestrator.current_workflow_name,
+        "uploaded_files": orchestrator.uploaded_files,
+        "guidance": orchestrator.guidance,
+    }
+
+
+def _apply_spill_state(convo: Conversation, state: Dict[str, Any]) -> None:
+    orchestrator = convo.orchestrator
+    convo.created_at = state["created_at"]
+    convo.updated_at = utc_now()
+    convo.workflow = state["workflow"]
+    orchestrator.conversation.history = state["history"]
+    orchestrator.workflow = state["orchestrator_workflow"]
+    orchestrator.current_workflow_id = state["current_workflow_id"]
+    orchestrator.current_workflow_name = state["current_workflow_name"]
+    orchestrator.uploaded_files = state["uploaded_files"]
+    orchestrator.guidance = state["guidance"]
+
+
+def _replay_entries(entries: list[dict]) -> list[dict]:
+    """Rebuild history messages from logged user/assistant/tool_call entries."""
+    history: list[dict] = []
+    pending_tool_calls: list[dict] = []
+    for entry in entries:
+        etype = entry["entry_type"]
+        if etype == "tool_call":
+            # Collect tool calls between user message and assistant response
+            tool_args = entry.get("tool_arguments")
+            pending_tool_calls.append({
+                "tool": entry.get("tool_name", ""),
+                "arguments": json.loads(tool_args) if tool_args else {},
+                "success": bool(entry.get("tool_success", 1)),
+            })
+        elif etype == "user_message":
+            pending_tool_calls = []
+            content = entry.get("content", "")
+            if content:
+                history.append({"role": "user", "content": content})
+        elif etype == "assistant_response":
+            content = entry.get("content", "")
+            # Keep assistant messages with content OR pending tool calls
+            # (ask_question can produce empty-content with tools)
+            if content or pending_tool_calls:
+                msg: dict = {"role": "assistant", "content": content}
+                if pending_tool_calls:
+                    msg["tool_calls_meta"] = pending_tool_calls
+                    pending_tool_calls = []
+                history.append(msg)
+    return history
@@ -0,0 +1,171 @@
+"""Trace playback for stepped execution.
+
+SteppedExecutionTask runs the interpreter to completion up front and
+records a trace: a list of frames, each holding the events that used to
+be emitted between two step delays.  TracePlayer replays those frames onto
+the task's sink from timers on the event loop, so pacing, pause, single
+step, seek and speed changes no longer pin a thread for the length of the
+visualisation.
+
+All control methods are thread-safe: they hop onto the player's loop with
+``call_soon_threadsafe`` and the state below is only touched there.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .execution_task import SteppedExecutionTask
+
+Frame = List[Tuple[str, Dict[str, Any]]]
+
+
+def seekable_frames(frames: List[Frame]) -> List[int]:
+    """Indices of frames that start outside any subworkflow.
+
+    Seeking into the middle of a subworkflow would skip its
+    ``subflow_start``, so seeks snap back to the nearest main-flow frame.
+    """
+    seekable = []
+    depth = 0
+    for index, frame in enumerate(frames):
+        if depth == 0:
+            seekable.append(index)
+        for event, _ in frame:
+            if event == "subflow_start":
+                depth += 1
+            elif event == "subflow_complete":
+                depth -= 1
+    return seekable
+
+
+class TracePlayer:
+    """Plays a recorded execution trace onto a sink, one frame per tick."""
+
+    def __init__(self, task: "SteppedExecutionTask", loop: asyncio.AbstractEventLoop) -> None:
+        self._task = task
+        self._loop = loop
+        self._frames = task.trace
+        self._seekable = seekable_frames(self._frames)
+        self._position = 0
+        self._paused = False
+        self._finished = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def position(self) -> int:
+        """Number of frames played so far."""
+        return self._position
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._frames)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    # -- Thread-safe controls ---------------------------------------------
+
+    def start(self) -> None:
+        self._call(self._schedule, 0.0)
+
+    def pause(self) -> None:
+        self._call(self._pause)
+
+    def resume(self) -> None:
+        self._call(self._resume)
+
+    def step(self) -> None:
+        """Play the next frame while paused."""
+        self._call(self._step)
+
+    def seek(self, frame: int) -> None:
+        """Continue playback from *frame* (forwards or backwards)."""
+        self._call(self._seek, frame)
+
+    def set_speed(self, speed_ms: int) -> None:
+        self._call(self._set_speed, speed_ms)
+
+    def stop(self) -> None:
+        self._call(self._stop)
+
+    def _call(self, fn: Callable[..., None], *args: Any) -> None:
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    # -- Loop-thread internals --------------------------------------------
+
+    def _delay(self) -> float:
+        return max(self._task.speed_ms, 0) / 1000.0
+
+    def _cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self, delay: float) -> None:
+        self._cancel()
+        if not (self._paused or self._finished):
+            self._handle = self._loop.call_later(delay, self._tick)
+
+    def _tick(self) -> None:
+        self._handle = None
+        if self._finished or self._paused:
+            return
+        if self._task.sink.is_closed:
+            # Client went away; nothing left to play to
+            self._finish()
+            return
+        self._play_frame()
+        self._schedule(self._delay())
+
+    def _play_frame(self) -> None:
+        for event, data in self._frames[self._position]:
+            self._task.send(event, data)
+        self._position += 1
+        if self._position >= len(self._frames):
+            self._finish()
+
+    def _pause(self) -> None:
+        if self._paused or self._finished:
+            return
+        self._paused = True
+        self._cancel()
+        self._task.emit_paused()
+
+    def _resume(self) -> None:
+        if not self._paused or self._finished:
+            return
+        self._paused = False
+        self._task.emit_resumed()
+        self._schedule(self._delay())
+
+    def _step(self) -> None:
+        if self._paused and not self._finished:
+            self._play_frame()
+
+    def _seek(self, frame: int) -> None:
+        if self._finished or not self._seekable:
+            return
+        self._position = max(i for i in self._seekable if i <= max(frame, 0))
+        self._task.emit_seek(self._position)
+        self._schedule(self._delay())
+
+    def _set_speed(self, speed_ms: int) -> None:
+        self._task.speed_ms = speed_ms
+        if self._handle is not None:
+            self._schedule(self._delay())
+
+    def _stop(self) -> None:
+        if self._finished:
+            return
+        self._task.emit_complete(success=False, error="Execution stopped by user", path=[])
+        self._finish()
+
+    def _finish(self) -> None:
+        self._finished = True
+        self._cancel()
+        self._task.finish()
@@ -0,0 +1,144 @@
+"""Compact encoding for the stepped-execution SSE stream.
+
+The verbose stream re-sends a subworkflow's full nodes/edges on every
+``subflow_start`` and a full copy of the variable context on every
+``execution_step``.  The compact stream instead:
+
+- sends each subworkflow definition once per execution as
+  ``subflow_definition`` {subworkflow_id, version, nodes, edges}, and has
+  ``subflow_start`` reference it via ``definition_version``;
+- replaces ``context`` on ``execution_step`` with ``context_delta`` (keys
+  added or changed since the previous step) and ``context_removed``.
+
+After an ``execution_seek`` the delta chain restarts: the next step carries
+its whole context as the delta.
+
+``ExecutionStreamDecoder`` turns a compact stream back into the verbose
+events; the frontend mirrors it in ``api/stream-handlers/executionStream.ts``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_UNSET = object()
+
+
+def definition_version(nodes: Any, edges: Any) -> str:
+    """Short content hash identifying one revision of a subworkflow."""
+    blob = json.dumps({"nodes": nodes, "edges": edges}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def _changed(old: Any, new: Any) -> bool:
+    # Type check too: 1 == True in Python but not once serialized
+    return type(old) is not type(new) or old != new
+
+
+class ExecutionStreamEncoder:
+    """Per-execution state for emitting the compact stream."""
+
+    def __init__(self) -> None:
+        self._sent_definitions: Set[Tuple[Any, str]] = set()
+        self._context: Optional[Dict[str, Any]] = None
+
+    def encode(self, event: str, data: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Compact events for one verbose ``(event, data)`` pair."""
+        if event == "subflow_start":
+            return self.subflow_start(data)
+        if event == "execution_step":
+            return [(event, self.execution_step(data))]
+        return [(event, data)]
+
+    def reset_context(self) -> None:
+        """Forget the last context so the next step sends it in full."""
+        self._context = None
+
+    def subflow_start(self, payload: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Events for a verbose ``subflow_start`` payload.
+
+        The definition is emitted first the first time this revision of the
+        subworkflow is entered; afterwards only the reference is sent.
+        """
+        data = dict(payload)
+        nodes = data.pop("nodes", [])
+        edges = data.pop("edges", [])
+        version = definition_version(nodes, edges)
+        data["definition_version"] = version
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        key = (data.get("subworkflow_id"), version)
+        if key not in self._sent_definitions:
+            self._sent_definitions.add(key)
+            events.append(("subflow_definition", {
+                "execution_id": data.get("execution_id"),
+                "subworkflow_id": data.get("subworkflow_id"),
+                "version": version,
+                "nodes": nodes,
+                "edges": edges,
+            }))
+        events.append(("subflow_start", data))
+        return events
+
+    def execution_step(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace a step's full ``context`` with a delta against the last one."""
+        if "context" not in payload:
+            return payload
+        data = dict(payload)
+        context = data.pop("context") or {}
+        previous = self._context or {}
+        data["context_delta"] = {
+            k: v for k, v in context.items() if _changed(previous.get(k, _UNSET), v)
+        }
+        removed = [k for k in previous if k not in context]
+        if removed:
+            data["context_removed"] = removed
+        self._context = dict(context)
+        return data
+
+
+class ExecutionStreamDecoder:
+    """Reference client: rebuild verbose events from a compact stream."""
+
+    def __init__(self) -> None:
+        self._definitions: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+        self._context: Dict[str, Any] = {}
+
+    def decode(self, event: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the verbose payload for *event*, or None if it is consumed."""
+        if event == "subflow_definition":
+            self._definitions[(data.get("subworkflow_id"), data.get("version"))] = {
+                "nodes": data.get("nodes", []),
+                "edges": data.get("edges", []),
+            }
+            return None
+        if event == "execution_seek":
+            self._context = {}
+            return data
+        if event == "subflow_start" and "definition_version" in data:
+            expanded = dict(data)
+            version = expanded.pop("definition_version")
+            definition = self._definitions.get((data.get("subworkflow_id"), version))
+            if definition is None:
+                raise KeyError(f"Unknown subworkflow definition {data.get('subworkflow_id')}@{version}")
+            expanded.update(nodes=definition["nodes"], edges=definition["edges"])
+            return expanded
+        if event == "execution_step" and "context_delta" in data:
+            expanded = dict(data)
+            self._context.update(expanded.pop("context_delta"))
+            for key in expanded.pop("context_removed", []):
+                self._context.pop(key, None)
+            expanded["context"] = dict(self._context)
+            return expanded
+        return data
+
+    def decode_all(
+        self, events: List[Tuple[str, Dict[str, Any]]],
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        decoded = []
+        for event, data in events:
+            expanded = self.decode(event, data)
+            if expanded is not None:
+                decoded.append((event, expanded))
+        return decoded
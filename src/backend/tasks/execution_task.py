@@ -4,26 +4,38 @@ Provides visual workflow execution by emitting events for each node
 visited so the frontend can highlight nodes in real-time.  Events are
 pushed to an EventSink which FastAPI yields as an SSE stream.
 
+The workflow is run to completion first and recorded as a trace of
+frames; a TracePlayer (execution_playback.py) then paces the frames out
+from event-loop timers and serves pause/resume/step/seek/speed changes.
+
 Events emitted to client:
 - execution_step: {node_id, node_type, node_label, step_index, execution_id}
 - execution_paused: {execution_id, current_node_id}
 - execution_resumed: {execution_id}
+- execution_seek: {execution_id, frame, frames, current_node_id, executed_node_ids}
 - execution_complete: {success, output, path, error, execution_id}
 - execution_error: {error, execution_id}
 - execution_log: {execution_id, log_type, ...details}
 - subflow_start / subflow_step / subflow_complete: subworkflow lifecycle
+
+With ``compact=True`` (the default) subworkflow definitions are sent once as
+``subflow_definition`` and step contexts as deltas — see execution_stream.py.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from dataclasses import dataclass, field
 from threading import Event, Lock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from .execution_playback import Frame, TracePlayer
+from .execution_stream import ExecutionStreamEncoder
 from .sse import EventSink
 from ..execution.interpreter import TreeInterpreter
+from ..storage.coordination import get_coordinator, on_control, send_control
 from ..storage.workflows import WorkflowStore
 from ..execution.preparation import prepare_workflow_execution
 
@@ -32,7 +44,10 @@ logger = logging.getLogger("backend.api")
 
 # ---------- Execution state (pause/resume/stop support) ----------
 # Module-level dict keyed by execution_id.  Pause/resume/stop HTTP
-# endpoints mutate entries here; the execution thread polls on each step.
+# endpoints record the request here and forward it to the TracePlayer once
+# playback has started; the player picks up earlier requests on attach.
+# The owning worker is also recorded with the coordinator, so a control
+# request that lands on another worker is forwarded to the owner.
 
 _EXECUTION_STATE: Dict[str, Dict[str, Any]] = {}
 _EXECUTION_LOCK = Lock()
@@ -57,45 +72,105 @@ def register_execution(execution_id: str) -> None:
         _EXECUTION_STATE[execution_id] = {
             "paused": False,
             "stopped": False,
-            "pause_event": Event(),
+            "player": None,
             "created_at": now,
         }
-        # Event starts set (un-paused)
-        _EXECUTION_STATE[execution_id]["pause_event"].set()
+    coordinator = get_coordinator()
+    coordinator.put(
+        "executions", execution_id, {"worker_id": coordinator.worker_id},
+        ttl=_EXECUTION_TTL_SECONDS,
+    )
+
+
+def _forward_control(execution_id: str, action: str, *args: Any) -> bool:
+    """Send a control to the worker that owns *execution_id*, if another one does."""
+    coordinator = get_coordinator()
+    record = coordinator.get("executions", execution_id)
+    if not record or record["worker_id"] == coordinator.worker_id:
+        return False
+    send_control(record["worker_id"], "execution_control", {
+        "execution_id": execution_id, "action": action, "args": list(args),
+    })
+    return True
+
+
+def _update_execution(execution_id: str, **flags: bool) -> Optional[Dict[str, Any]]:
+    """Apply *flags* to a registered execution; returns its state or None."""
+    with _EXECUTION_LOCK:
+        state = _EXECUTION_STATE.get(execution_id)
+        if state:
+            state.update(flags)
+        return state
 
 
-def pause_execution(execution_id: str) -> bool:
-    """Pause a running execution.  Returns True if found."""
+def _get_player(execution_id: str) -> Optional[TracePlayer]:
     with _EXECUTION_LOCK:
         state = _EXECUTION_STATE.get(execution_id)
-        if not state:
-            return False
-        state["paused"] = True
-        state["pause_event"].clear()
-        return True
+        return state.get("player") if state else None
+
+
+def pause_execution(execution_id: str) -> bool:
+    """Pause a running execution.  Returns True if found."""
+    state = _update_execution(execution_id, paused=True)
+    if not state:
+        return _forward_control(execution_id, "pause")
+    if state["player"]:
+        state["player"].pause()
+    return True
 
 
 def resume_execution(execution_id: str) -> bool:
     """Resume a paused execution.  Returns True if found."""
-    with _EXECUTION_LOCK:
-        state = _EXECUTION_STATE.get(execution_id)
-        if not state:
-            return False
-        state["paused"] = False
-        state["pause_event"].set()
-        return True
+    state = _update_execution(execution_id, paused=False)
+    if not state:
+        return _forward_control(execution_id, "resume")
+    if state["player"]:
+        state["player"].resume()
+    return True
 
 
 def stop_execution(execution_id: str) -> bool:
     """Stop a running execution.  Returns True if found."""
-    with _EXECUTION_LOCK:
-        state = _EXECUTION_STATE.get(execution_id)
-        if not state:
-            return False
-        state["stopped"] = True
-        # Unblock pause_event so the thread can wake up and check stopped
-        state["pause_event"].set()
-        return True
+    state = _update_execution(execution_id, stopped=True)
+    if not state:
+        return _forward_control(execution_id, "stop")
+    if state["player"]:
+        state["player"].stop()
+    return True
+
+
+def step_execution(execution_id: str) -> bool:
+    """Play one step of a paused execution.  Returns True if found."""
+    player = _get_player(execution_id)
+    if not player:
+        return _forward_control(execution_id, "step")
+    player.step()
+    return True
+
+
+def seek_execution(execution_id: str, frame: int) -> bool:
+    """Move playback to *frame* of the trace.  Returns True if found."""
+    player = _get_player(execution_id)
+    if not player:
+        return _forward_control(execution_id, "seek", frame)
+    player.seek(frame)
+    return True
+
+
+def set_execution_speed(execution_id: str, speed_ms: int) -> bool:
+    """Change the delay between steps.  Returns True if found."""
+    player = _get_player(execution_id)
+    if not player:
+        return _forward_control(execution_id, "speed", speed_ms)
+    player.set_speed(speed_ms)
+    return True
+
+
+def _on_execution_control(payload: Dict[str, Any]) -> None:
+    """Apply a control forwarded from another worker."""
+    action = _CONTROL_ACTIONS.get(payload.get("action", ""))
+    if action is not None:
+        action(payload["execution_id"], *payload.get("args", []))
 
 
 def _is_execution_stopped(execution_id: str) -> bool:
@@ -110,15 +185,31 @@ def _is_execution_paused(execution_id: str) -> bool:
         return bool(state and state.get("paused"))
 
 
-def _get_pause_event(execution_id: str) -> Optional[Event]:
+def _attach_player(execution_id: str, player: TracePlayer) -> Dict[str, bool]:
+    """Register *player* for controls; returns the flags set so far."""
     with _EXECUTION_LOCK:
         state = _EXECUTION_STATE.get(execution_id)
-        return state.get("pause_event") if state else None
+        if not state:
+            return {"paused": False, "stopped": False}
+        state["player"] = player
+        return {"paused": state["paused"], "stopped": state["stopped"]}
 
 
 def _clear_execution(execution_id: str) -> None:
     with _EXECUTION_LOCK:
         _EXECUTION_STATE.pop(execution_id, None)
+    get_coordinator().delete("executions", execution_id)
+
+
+_CONTROL_ACTIONS = {
+    "pause": pause_execution,
+    "resume": resume_execution,
+    "stop": stop_execution,
+    "step": step_execution,
+    "seek": seek_execution,
+    "speed": set_execution_speed,
+}
+on_control("execution_control", _on_execution_control)
 
 
 # -- Log-emission config for on_step -------------------------------------------
@@ -154,8 +245,9 @@ class SteppedExecutionTask:
     """Manages stepped workflow execution with pause/resume support.
 
     Wraps TreeInterpreter to emit events for each step, allowing
-    the frontend to highlight nodes in real-time.  Events are pushed
-    to an EventSink (SSE stream) instead of a socket registry.
+    the frontend to highlight nodes in real-time.  ``record()`` runs the
+    workflow and keeps the events as ``trace``; ``play()`` paces them out
+    to the EventSink and ``run()`` sends them all at once.
     """
 
     sink: EventSink
@@ -165,12 +257,32 @@ class SteppedExecutionTask:
     workflow: Dict[str, Any]
     inputs: Dict[str, Any]
     speed_ms: int = 500
+    compact: bool = True
     done: Event = field(default_factory=Event)
     current_node_id: Optional[str] = None
+    trace: List[Frame] = field(default_factory=list)
+    _recording: bool = False
+    _encoder: ExecutionStreamEncoder = field(default_factory=ExecutionStreamEncoder)
 
     def _emit(self, event: str, payload: dict) -> None:
-        """Push an SSE event to the stream."""
-        self.sink.push(event, payload)
+        """Add an event to the trace while recording, else send it."""
+        if self._recording:
+            self.trace[-1].append((event, payload))
+        else:
+            self.send(event, payload)
+
+    def _end_frame(self) -> None:
+        """Close the current frame — playback pauses here between steps."""
+        if self._recording and self.trace[-1]:
+            self.trace.append([])
+
+    def send(self, event: str, payload: dict) -> None:
+        """Push an SSE event to the stream, compacted if enabled."""
+        if event in ("execution_step", "subflow_step"):
+            self.current_node_id = payload.get("node_id")
+        events = self._encoder.encode(event, payload) if self.compact else [(event, payload)]
+        for name, data in events:
+            self.sink.push(name, data)
 
     def is_stopped(self) -> bool:
         return _is_execution_stopped(self.execution_id)
@@ -189,10 +301,7 @@ class SteppedExecutionTask:
                 "step_index": step_info.get("step_index"),
             })
         else:
-            self._emit("execution_step", {
-                **step_info,
-                "execution_id": self.execution_id,
-            })
+            self._emit("execution_step", {**step_info, "execution_id": self.execution_id})
 
     def emit_paused(self) -> None:
         self._emit("execution_paused", {
@@ -203,6 +312,24 @@ class SteppedExecutionTask:
     def emit_resumed(self) -> None:
         self._emit("execution_resumed", {"execution_id": self.execution_id})
 
+    def emit_seek(self, frame: int) -> None:
+        """Announce a jump to *frame*, with the main-flow path up to it."""
+        executed = list(dict.fromkeys(
+            data.get("node_id")
+            for events in self.trace[:frame]
+            for event, data in events
+            if event == "execution_step"
+        ))
+        self._encoder.reset_context()
+        self.current_node_id = executed[-1] if executed else None
+        self._emit("execution_seek", {
+            "execution_id": self.execution_id,
+            "frame": frame,
+            "frames": len(self.trace),
+            "current_node_id": self.current_node_id,
+            "executed_node_ids": executed,
+        })
+
     def emit_complete(
         self,
         success: bool,
@@ -240,8 +367,8 @@ class SteppedExecutionTask:
     def on_step(self, step_info: Dict[str, Any]) -> None:
         """Callback for TreeInterpreter — called before each node.
 
-        Handles emitting step events, checking stop, waiting on pause,
-        and applying speed delay.
+        Emits the step's events and, while recording, closes the frame so
+        playback pauses after it.
         """
         if self.is_stopped():
             raise StoppedExecutionError("Execution stopped by user")
@@ -250,14 +377,15 @@ class SteppedExecutionTask:
 
         # -- Subworkflow events: emit a direct event AND an execution_log -----
         if event_type == "subflow_start":
-            self._emit("subflow_start", {
+            payload = {
                 "execution_id": self.execution_id,
                 "parent_node_id": step_info.get("parent_node_id"),
                 "subworkflow_id": step_info.get("subworkflow_id"),
                 "subworkflow_name": step_info.get("subworkflow_name"),
                 "nodes": step_info.get("nodes", []),
                 "edges": step_info.get("edges", []),
-            })
+            }
+            self._emit("subflow_start", payload)
             # Log uses parent_node_id as node_id, subworkflow_name as node_label
             self._emit_log("subflow_start",
                            {**step_info,
@@ -311,31 +439,49 @@ class SteppedExecutionTask:
         else:
             self.emit_step(step_info)
 
-        # -- Pause / resume gate ----------------------------------------------
-        pause_event = _get_pause_event(self.execution_id)
-        if pause_event:
-            was_paused = _is_execution_paused(self.execution_id)
-            if was_paused:
-                self.emit_paused()
-            while not pause_event.wait(timeout=0.1):
-                if self.is_stopped():
-                    raise StoppedExecutionError("Execution stopped by user")
-            if was_paused:
-                self.emit_resumed()
-
-        # -- Step delay for visualization (skip in instant mode) --------------
-        if self.speed_ms > 0:
-            delay_seconds = self.speed_ms / 1000.0
-            elapsed = 0.0
-            while elapsed < delay_seconds:
-                if self.is_stopped():
-                    raise StoppedExecutionError("Execution stopped by user")
-                sleep_time = min(0.1, delay_seconds - elapsed)
-                time.sleep(sleep_time)
-                elapsed += sleep_time
+        # -- Frame boundary: playback waits speed_ms here -------------------
+        self._end_frame()
+
+    def record(self) -> List[Frame]:
+        """Run the workflow to completion and keep its events as ``trace``."""
+        self.trace = [[]]
+        self._recording = True
+        try:
+            self._execute()
+        finally:
+            self._recording = False
+            if not self.trace[-1]:
+                self.trace.pop()
+        return self.trace
+
+    def play(self, loop: asyncio.AbstractEventLoop) -> TracePlayer:
+        """Start paced playback of the recorded trace on *loop*."""
+        player = TracePlayer(self, loop)
+        flags = _attach_player(self.execution_id, player)
+        player.start()
+        if flags["stopped"]:
+            player.stop()
+        elif flags["paused"]:
+            player.pause()
+        return player
 
     def run(self) -> None:
-        """Execute the workflow step-by-step.  Closes the sink when done."""
+        """Record the workflow and send the whole trace without pacing."""
+        try:
+            for frame in self.record():
+                for event, data in frame:
+                    self.send(event, data)
+        finally:
+            self.finish()
+
+    def finish(self) -> None:
+        """Mark the execution done and close the sink so the HTTP response ends."""
+        self.done.set()
+        _clear_execution(self.execution_id)
+        self.sink.close()
+
+    def _execute(self) -> None:
+        """Prepare and interpret the workflow, emitting completion or error."""
         try:
             nodes = self.workflow.get("nodes", [])
             edges = self.workflow.get("edges", [])
@@ -379,8 +525,3 @@ class SteppedExecutionTask:
         except Exception as exc:
             logger.exception("Stepped execution failed")
             self.emit_error(str(exc))
-        finally:
-            self.done.set()
-            _clear_execution(self.execution_id)
-            # Close the SSE stream so the HTTP response ends
-            self.sink.close()
@@ -0,0 +1,279 @@
+"""Bounded, prioritised executor for background tasks.
+
+Chat turns, subworkflow builds and stepped-execution recordings used to
+start a ``threading.Thread`` each (plus a watchdog thread per chat and
+build).  They are now submitted here instead:
+
+- One shared pool of at most ``max_workers`` threads, started lazily.  By
+  default that is the sum of the per-kind caps, so saturated builder and
+  bulk work can never take the workers chat is entitled to.
+- Each kind has its own running cap, queue depth and priority; a free
+  worker takes the oldest queued job of the highest-priority kind that is
+  below its cap (chat over builder over bulk).
+- Admission control: ``submit`` raises TaskRejected when the kind's queue
+  is full or the user already has ``per_user`` jobs of that kind in
+  flight.  Routes turn that into 429 with Retry-After.
+- ``call_later`` runs timeout callbacks from a single timer thread, so
+  tasks no longer need a watchdog thread of their own.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskKind(str, Enum):
+    CHAT = "chat"
+    BUILDER = "builder"
+    BULK = "bulk"
+
+
+@dataclass(frozen=True)
+class KindLimits:
+    priority: int      # lower runs first
+    max_running: int
+    max_queued: int
+    per_user: int      # queued + running per user
+
+
+_DEFAULT_LIMITS: Dict[TaskKind, KindLimits] = {
+    TaskKind.CHAT: KindLimits(priority=0, max_running=16, max_queued=32, per_user=3),
+    TaskKind.BUILDER: KindLimits(priority=1, max_running=5, max_queued=20, per_user=8),
+    TaskKind.BULK: KindLimits(priority=2, max_running=4, max_queued=32, per_user=4),
+}
+
+# Retry-After is estimated from queue depth and recent run times, clamped
+_RETRY_AFTER_MIN_SECONDS = 1
+_RETRY_AFTER_MAX_SECONDS = 60
+
+
+class TaskRejected(Exception):
+    """Raised by submit() when a job is refused admission."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Job:
+    kind: TaskKind
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    user_id: Optional[str]
+    name: str
+    future: Future = field(default_factory=Future)
+
+
+class TimerHandle:
+    """Returned by call_later(); cancel() drops the callback if not yet run."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TaskExecutor:
+    """Shared worker pool with per-kind caps, priorities and per-user limits.
+
+    Thread-safe — all state is guarded by one condition variable.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        limits: Optional[Dict[TaskKind, KindLimits]] = None,
+    ) -> None:
+        self._limits = dict(limits or _DEFAULT_LIMITS)
+        if max_workers is None:
+            max_workers = sum(kind.max_running for kind in self._limits.values())
+        self._max_workers = max_workers
+        self._cond = threading.Condition()
+        self._queues: Dict[TaskKind, List[_Job]] = {kind: [] for kind in self._limits}
+        self._running: Dict[TaskKind, int] = {kind: 0 for kind in self._limits}
+        self._per_user: Dict[Tuple[TaskKind, str], int] = {}
+        self._avg_seconds: Dict[TaskKind, float] = {kind: 1.0 for kind in self._limits}
+        self._workers = 0
+        self._idle = 0
+        self._shutdown = False
+        # Timer thread state
+        self._timers: List[Tuple[float, int, TimerHandle, Callable[[], None]]] = []
+        self._timer_seq = itertools.count()
+        self._timer_cond = threading.Condition()
+        self._timer_thread: Optional[threading.Thread] = None
+
+    # -- Submission ----------------------------------------------------------
+
+    def submit(
+        self,
+        kind: TaskKind,
+        fn: Callable[..., Any],
+        *args: Any,
+        user_id: Optional[str] = None,
+        name: str = "",
+    ) -> Future:
+        """Queue ``fn(*args)``; returns a Future.  Raises TaskRejected when full."""
+        limits = self._limits[kind]
+        job = _Job(kind=kind, fn=fn, args=args, user_id=user_id, name=name or kind.value)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("TaskExecutor is shut down")
+            queue = self._queues[kind]
+            if len(queue) >= limits.max_queued:
+                raise TaskRejected(
+                    f"Too many {kind.value} tasks queued", self._retry_after_locked(kind),
+                )
+            if user_id is not None:
+                in_flight = self._per_user.get((kind, user_id), 0)
+                if in_flight >= limits.per_user:
+                    raise TaskRejected(
+                        f"Too many concurrent {kind.value} tasks for this user",
+                        self._retry_after_locked(kind),
+                    )
+                self._per_user[(kind, user_id)] = in_flight + 1
+            queue.append(job)
+            if self._idle == 0 and self._workers < self._max_workers:
+                self._spawn_worker_locked()
+            self._cond.notify_all()
+        return job.future
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queued/running counts per kind, for diagnostics."""
+        with self._cond:
+            return {
+                kind.value: {"queued": len(self._queues[kind]), "running": self._running[kind]}
+                for kind in self._limits
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; workers exit once the queues are drained."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            if wait:
+                while self._workers:
+                    self._cond.wait(0.1)
+        with self._timer_cond:
+            self._timer_cond.notify_all()
+
+    def _retry_after_locked(self, kind: TaskKind) -> int:
+        limits = self._limits[kind]
+        waves = (len(self._queues[kind]) + 1) / max(limits.max_running, 1)
+        estimate = math.ceil(waves * self._avg_seconds[kind])
+        return max(_RETRY_AFTER_MIN_SECONDS, min(_RETRY_AFTER_MAX_SECONDS, estimate))
+
+    # -- Workers -------------------------------------------------------------
+
+    def _spawn_worker_locked(self) -> None:
+        self._workers += 1
+        threading.Thread(
+            target=self._worker, daemon=True, name=f"task-worker-{self._workers}",
+        ).start()
+
+    def _next_job_locked(self) -> Optional[_Job]:
+        for kind in sorted(self._limits, key=lambda k: self._limits[k].priority):
+            queue = self._queues[kind]
+            if queue and self._running[kind] < self._limits[kind].max_running:
+                self._running[kind] += 1
+                return queue.pop(0)
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job_locked()
+                while job is None:
+                    if self._shutdown and not any(self._queues.values()):
+                        self._workers -= 1
+                        self._cond.notify_all()
+                        return
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                    job = self._next_job_locked()
+            self._run(job)
+
+    def _run(self, job: _Job) -> None:
+        started = time.monotonic()
+        if job.future.set_running_or_notify_cancel():
+            try:
+                job.future.set_result(job.fn(*job.args))
+            except BaseException as exc:
+                logger.exception("Task %s failed", job.name)
+                job.future.set_exception(exc)
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._running[job.kind] -= 1
+            if job.user_id is not None:
+                key = (job.kind, job.user_id)
+                remaining = self._per_user.get(key, 1) - 1
+                if remaining > 0:
+                    self._per_user[key] = remaining
+                else:
+                    self._per_user.pop(key, None)
+            # Exponentially weighted run time feeds the Retry-After estimate
+            self._avg_seconds[job.kind] = 0.8 * self._avg_seconds[job.kind] + 0.2 * elapsed
+            self._cond.notify_all()
+
+    # -- Timers --------------------------------------------------------------
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run *callback* on the shared timer thread after *delay* seconds.
+
+        Callbacks must be quick — they share one thread.
+        """
+        handle = TimerHandle()
+        with self._timer_cond:
+            heapq.heappush(
+                self._timers,
+                (time.monotonic() + delay, next(self._timer_seq), handle, callback),
+            )
+            if self._timer_thread is None:
+                self._timer_thread = threading.Thread(
+                    target=self._timer_loop, daemon=True, name="task-timers",
+                )
+                self._timer_thread.start()
+            self._timer_cond.notify()
+        return handle
+
+    def _timer_loop(self) -> None:
+        while True:
+            with self._timer_cond:
+                while True:
+                    if self._shutdown:
+                        self._timer_thread = None
+                        return
+                    if self._timers:
+                        wait = self._timers[0][0] - time.monotonic()
+                        if wait <= 0:
+                            _, _, handle, callback = heapq.heappop(self._timers)
+                            break
+                        self._timer_cond.wait(wait)
+                    else:
+                        self._timer_cond.wait()
+            if handle.cancelled:
+                continue
+            try:
+                callback()
+            except Exception:
+                logger.exception("Timer callback failed")
+
+
+# Module-level singleton — shared by chat routes, builder tools and execution routes
+task_executor = TaskExecutor()
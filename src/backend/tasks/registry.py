@@ -6,6 +6,11 @@ stale entry purging.
 
 Shared by ChatTask (chat turns) and BuilderTask (subworkflow builds).
 Each task owns its own EventSink (SSE).
+
+Live task objects stay in the worker that runs them.  Ownership records
+(task_id -> worker) go to the shared coordinator so another worker can
+cancel a task, attach to its event stream or ask for its workflow state
+by sending a control message to the owner.
 """
 
 from __future__ import annotations
@@ -15,6 +20,9 @@ import time
 from threading import Lock
 from typing import Any, Dict, Optional, Protocol
 
+from ..storage.coordination import get_coordinator, on_control, request, send_control
+from .relay import AttachedSink, RelaySink
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +57,7 @@ class TaskRegistry:
             self._by_task_id[task.task_id] = task
             if task.current_workflow_id:
                 self._by_workflow[(task.user_id, task.current_workflow_id)] = task
+        self._announce(task)
 
     def cancel(self, task_id: str) -> Optional[Any]:
         """Mark a task as cancelled. Returns the task if found."""
@@ -83,6 +92,107 @@ class TaskRegistry:
             self._by_task_id.pop(task.task_id, None)
             if task.current_workflow_id:
                 self._by_workflow.pop((task.user_id, task.current_workflow_id), None)
+        self._withdraw(task)
+
+    # -- Cross-worker access --------------------------------------------------
+
+    def _announce(self, task: Any) -> None:
+        """Publish ownership so other workers can route requests here."""
+        coordinator = get_coordinator()
+        coordinator.put("tasks", task.task_id, {
+            "worker_id": coordinator.worker_id,
+            "user_id": task.user_id,
+            "workflow_id": task.current_workflow_id,
+        }, ttl=self._TTL_SECONDS)
+        if task.current_workflow_id:
+            coordinator.put(
+                "tasks_by_workflow", f"{task.user_id}:{task.current_workflow_id}",
+                {"task_id": task.task_id, "worker_id": coordinator.worker_id},
+                ttl=self._TTL_SECONDS,
+            )
+
+    def _withdraw(self, task: Any) -> None:
+        coordinator = get_coordinator()
+        coordinator.delete("tasks", task.task_id)
+        if task.current_workflow_id:
+            # A newer task for the same workflow may already own the key
+            coordinator.update(
+                "tasks_by_workflow", f"{task.user_id}:{task.current_workflow_id}",
+                lambda current: None if current and current["task_id"] == task.task_id else current,
+                ttl=self._TTL_SECONDS,
+            )
+
+    def locate_remote(self, user_id: str, workflow_id: str) -> Optional[Dict[str, str]]:
+        """{task_id, worker_id} of a task for this workflow run by another worker."""
+        coordinator = get_coordinator()
+        record = coordinator.get("tasks_by_workflow", f"{user_id}:{workflow_id}")
+        if record and record["worker_id"] != coordinator.worker_id:
+            return record
+        return None
+
+    def request_cancel(self, task_id: str) -> bool:
+        """Cancel a task wherever it runs. Returns True if it was found."""
+        task = self.cancel(task_id)
+        if task:
+            self.notify_cancelled(task)
+            return True
+        coordinator = get_coordinator()
+        record = coordinator.get("tasks", task_id)
+        if record and record["worker_id"] != coordinator.worker_id:
+            send_control(record["worker_id"], "task_cancel", {"task_id": task_id})
+            return True
+        return False
+
+    def notify_cancelled(self, task: Any) -> None:
+        """Push chat_cancelled to the task's stream, once."""
+        if self.mark_notified(task.task_id):
+            payload: Dict[str, Any] = {"task_id": task.task_id}
+            if task.current_workflow_id:
+                payload["workflow_id"] = task.current_workflow_id
+            task.sink.push("chat_cancelled", payload)
+
+    def attach_remote(self, record: Dict[str, str], last_event_id: Optional[int]) -> AttachedSink:
+        """Stream a task owned by another worker through a local sink."""
+        coordinator = get_coordinator()
+        task_id, worker_id = record["task_id"], record["worker_id"]
+        # Subscribe before asking the owner to start relaying
+        sink = AttachedSink(
+            coordinator, task_id,
+            on_detach=lambda: send_control(worker_id, "task_detach", {"task_id": task_id}),
+        )
+        send_control(worker_id, "task_attach", {
+            "task_id": task_id, "last_event_id": last_event_id,
+        })
+        return sink
+
+    def remote_snapshot(self, record: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Ask the owning worker for the task's workflow-state snapshot (blocking)."""
+        reply = request(record["worker_id"], "task_snapshot", {"task_id": record["task_id"]})
+        return reply.get("snapshot") if reply else None
+
+    # Control handlers — run on the owning worker
+
+    def _on_cancel(self, payload: Dict[str, Any]) -> None:
+        task = self.cancel(payload["task_id"])
+        if task:
+            self.notify_cancelled(task)
+
+    def _on_attach(self, payload: Dict[str, Any]) -> None:
+        task = self.get(payload["task_id"])
+        relay = RelaySink(get_coordinator(), payload["task_id"], log=task.sink.log if task else None)
+        if task is None or task.done.is_set():
+            relay.close()  # ends the attached stream
+            return
+        task.swap_sink(relay, payload.get("last_event_id"))
+
+    def _on_detach(self, payload: Dict[str, Any]) -> None:
+        task = self.get(payload["task_id"])
+        if task and isinstance(task.sink, RelaySink):
+            task.sink.close()
+
+    def _on_snapshot(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        task = self.get(payload["task_id"])
+        return {"snapshot": task.workflow_state_snapshot() if task else None}
 
     def _purge_stale(self) -> None:
         """Remove tasks older than _TTL_SECONDS. Called under lock."""
@@ -99,3 +209,7 @@ class TaskRegistry:
 
 # Module-level singleton — shared across chat routes and builder callbacks
 task_registry = TaskRegistry()
+on_control("task_cancel", task_registry._on_cancel)
+on_control("task_attach", task_registry._on_attach)
+on_control("task_detach", task_registry._on_detach)
+on_control("task_snapshot", task_registry._on_snapshot)
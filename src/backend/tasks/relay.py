@@ -0,0 +1,90 @@
+"""Event fan-out between workers for tasks owned by another process.
+
+When a client reconnects to a worker that does not own its task, that
+worker subscribes to the task's event channel and serves an
+``AttachedSink``; the owner swaps a ``RelaySink`` into the task, which
+publishes every queued event (with its original id) to the channel
+instead of holding it for a local response.
+
+Closing either end is forwarded: the owner closing the relay ends the
+attached stream, and the client going away closes the relay, which the
+task sees exactly like a local disconnect.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from .sse import EventLog, EventSink, LoggedEvent
+from ..storage.coordination import Coordinator, Subscription
+
+logger = logging.getLogger(__name__)
+
+
+def task_channel(task_id: str) -> str:
+    return f"task-events:{task_id}"
+
+
+class RelaySink(EventSink):
+    """Owner side: publishes queued events to the task's channel."""
+
+    def __init__(self, coordinator: Coordinator, task_id: str, log: Optional[EventLog] = None) -> None:
+        super().__init__(log=log)
+        self._coordinator = coordinator
+        self.channel = task_channel(task_id)
+
+    def _put(self, *items: Optional[LoggedEvent]) -> None:
+        for item in items:
+            message: Dict[str, Any] = (
+                {"closed": True} if item is None
+                else {"id": item[0], "event": item[1], "data": item[2]}
+            )
+            try:
+                self._coordinator.publish(self.channel, message)
+            except Exception:
+                logger.warning("Relay publish on %s failed", self.channel, exc_info=True)
+
+
+class AttachedSink(EventSink):
+    """Attaching side: fed from the task's channel, served as a normal SSE stream.
+
+    ``on_detach`` runs once when the client disconnects before the owner
+    closed the stream.
+    """
+
+    def __init__(
+        self,
+        coordinator: Coordinator,
+        task_id: str,
+        on_detach: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__()
+        self._on_detach = on_detach
+        self._owner_closed = False
+        self._subscription: Optional[Subscription] = coordinator.subscribe(
+            task_channel(task_id), self._on_message,
+        )
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get("closed"):
+            self._owner_closed = True
+            self._unsubscribe()
+            self.close()
+            return
+        if not self.is_closed:
+            self._put((message["id"], message["event"], message["data"]))
+
+    def _unsubscribe(self) -> None:
+        subscription, self._subscription = self._subscription, None
+        if subscription is not None:
+            subscription.close()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in super().__aiter__():
+                yield chunk
+        finally:
+            self._unsubscribe()
+            if not self._owner_closed and self._on_detach is not None:
+                self._on_detach()
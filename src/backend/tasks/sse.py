@@ -1,19 +1,26 @@
 """Server-Sent Events (SSE) infrastructure.
 
-Provides EventSink — a thread-safe queue that bridges background task threads
+Provides EventSink — a thread-safe buffer that bridges background task threads
 with FastAPI's StreamingResponse. The background thread pushes events via
-sink.push(), and FastAPI yields SSE-formatted lines via iteration.
+sink.push(), and FastAPI yields SSE-formatted lines via async iteration on
+the event loop.
 
 Each task (ChatTask, BuilderTask) owns its own EventSink. No sharing between
 tasks — this keeps lifecycle management simple (creator closes when done).
+
+Every pushed event gets a monotonic ``id:`` and is remembered in a bounded
+EventLog. A sink created for a reconnect shares the previous sink's log, so
+a client that sends ``Last-Event-ID`` can be sent just the events it missed.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import queue
-from typing import Any, Dict, Iterator, Optional, Tuple
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -21,58 +28,210 @@ logger = logging.getLogger(__name__)
 # Shorter than typical proxy timeouts (60-120s) to be safe.
 _KEEPALIVE_INTERVAL_SECONDS = 15
 
+# Events remembered per stream for Last-Event-ID replay.
+_EVENT_LOG_SIZE = 2048
+
+LoggedEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class EventLog:
+    """Bounded ring of recently pushed events, keyed by a monotonic id.
+
+    Shared by every sink a task streams through, so ids keep increasing
+    across reconnects.
+    """
+
+    def __init__(self, maxlen: int = _EVENT_LOG_SIZE) -> None:
+        self._events: Deque[LoggedEvent] = deque(maxlen=maxlen)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest event (0 before anything was pushed)."""
+        return self._last_id
+
+    def append(self, event: str, data: Dict[str, Any]) -> int:
+        """Record an event and return its id."""
+        with self._lock:
+            self._last_id += 1
+            self._events.append((self._last_id, event, data))
+            return self._last_id
+
+    def since(self, last_id: int) -> Optional[List[LoggedEvent]]:
+        """Events after *last_id*, or None if some have already been evicted.
+
+        An id from the future (e.g. from a different task) also returns None.
+        """
+        with self._lock:
+            if last_id > self._last_id:
+                return None
+            oldest = self._events[0][0] if self._events else self._last_id + 1
+            if last_id + 1 < oldest:
+                return None
+            return [entry for entry in self._events if entry[0] > last_id]
+
 
 class EventSink:
-    """Thread-safe event queue for SSE streaming.
+    """Event buffer bridging producer threads and an SSE response.
 
-    Background threads push (event_name, data_dict) tuples.
-    FastAPI's StreamingResponse iterates over SSE-formatted lines.
+    Background threads push (event_name, data_dict) tuples. The response
+    consumes the sink as an async iterator: producers wake it with
+    ``loop.call_soon_threadsafe``, so an open (even idle) stream holds no
+    threadpool thread. Plain iteration is kept for tests and sync callers.
     Closing the sink (or client disconnect) signals the end of the stream.
+
+    Pass the previous sink's ``log`` when creating a sink for a reconnect so
+    event ids continue and ``replay()`` can serve the missed suffix.
     """
 
-    def __init__(self) -> None:
-        self._queue: queue.Queue[Optional[Tuple[str, Dict[str, Any]]]] = queue.Queue()
+    def __init__(self, log: Optional[EventLog] = None) -> None:
+        self._items: Deque[Optional[LoggedEvent]] = deque()
+        self._ready = threading.Condition()
         self._closed = False
+        self.log = log if log is not None else EventLog()
+        # Set while an async consumer is attached
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wakeup_scheduled = False
+
+    def _put(self, *items: Optional[LoggedEvent]) -> None:
+        with self._ready:
+            self._items.extend(items)
+            self._ready.notify_all()
+            loop = self._loop
+            wakeup = self._wakeup
+            if loop is None or self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # Loop already closed — the consumer is gone
+
+    def _take(self) -> List[Optional[LoggedEvent]]:
+        with self._ready:
+            self._wakeup_scheduled = False
+            items = list(self._items)
+            self._items.clear()
+        return items
 
     def push(self, event: str, data: Dict[str, Any]) -> None:
-        """Push an event to the stream. No-ops silently if sink is closed."""
+        """Push an event to the stream. No-ops silently if sink is closed.
+
+        Events are recorded in the log even after the client has gone, so a
+        reconnecting client can still catch up on them.
+        """
+        event_id = self.log.append(event, data)
         if not self._closed:
-            self._queue.put((event, data))
+            self._put((event_id, event, data))
+
+    def push_replay(self, event: str, data: Dict[str, Any]) -> None:
+        """Queue a resume snapshot event without recording it in the log.
+
+        It carries the current head id, so a client that reconnects after
+        receiving it resumes from the live events that follow.
+        """
+        if not self._closed:
+            self._put((self.log.last_id, event, data))
+
+    def replay(self, last_event_id: int) -> bool:
+        """Queue every logged event after *last_event_id*, with original ids.
+
+        Returns False (queueing nothing) when the gap has fallen out of the
+        log; the caller should send a state snapshot instead.
+        """
+        missed = self.log.since(last_event_id)
+        if missed is None:
+            return False
+        if not self._closed and missed:
+            self._put(*missed)
+        return True
 
     def close(self) -> None:
         """Close the stream. Sends a sentinel so the iterator stops yielding."""
         if not self._closed:
             self._closed = True
-            self._queue.put(None)  # sentinel
+            self._put(None)  # sentinel
 
     @property
     def is_closed(self) -> bool:
         """True after close() has been called or client disconnected."""
         return self._closed
 
-    def __iter__(self) -> Iterator[str]:
-        """Yield SSE-formatted strings until close() is called.
+    @staticmethod
+    def _format(item: LoggedEvent) -> str:
+        event_id, event, data = item
+        return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
 
-        Starlette runs sync iterators in a threadpool, so blocking on
-        queue.get() is safe — it won't stall the event loop.
-        """
+    def __iter__(self) -> Iterator[str]:
+        """Yield SSE-formatted strings until close() is called (blocking)."""
         try:
             while True:
-                try:
-                    item = self._queue.get(timeout=_KEEPALIVE_INTERVAL_SECONDS)
-                except queue.Empty:
+                with self._ready:
+                    if not self._items:
+                        self._ready.wait(timeout=_KEEPALIVE_INTERVAL_SECONDS)
+                batch = self._take()
+                if not batch:
                     # Yield SSE comment as keepalive (keeps proxies happy)
                     yield ": keepalive\n\n"
                     continue
+                for item in batch:
+                    if item is None:
+                        # Sentinel — stream is done
+                        return
+                    yield self._format(item)
+
+        except GeneratorExit:
+            # Client disconnected — mark sink closed so the background task
+            # can detect this via sink.is_closed and stop doing work.
+            self._closed = True
 
-                if item is None:
-                    # Sentinel — stream is done
-                    break
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """Yield SSE-formatted strings until close() is called.
 
-                event, data = item
-                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        Starlette's StreamingResponse prefers this over ``__iter__``, so the
+        wait for the next event is an ``await`` rather than a blocked thread.
+        """
+        wakeup = asyncio.Event()
+        with self._ready:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = wakeup
+            self._wakeup_scheduled = False
+        try:
+            while True:
+                wakeup.clear()
+                batch = self._take()
+                if not batch:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), _KEEPALIVE_INTERVAL_SECONDS)
+                    except asyncio.TimeoutError:
+                        # Yield SSE comment as keepalive (keeps proxies happy)
+                        yield ": keepalive\n\n"
+                    continue
+                for item in batch:
+                    if item is None:
+                        # Sentinel — stream is done
+                        return
+                    yield self._format(item)
 
-        except GeneratorExit:
+        except (GeneratorExit, asyncio.CancelledError):
             # Client disconnected — mark sink closed so the background task
             # can detect this via sink.is_closed and stop doing work.
             self._closed = True
+            raise
+        finally:
+            with self._ready:
+                self._loop = None
+                self._wakeup = None
+
+
+def parse_last_event_id(value: Any) -> Optional[int]:
+    """Parse a ``Last-Event-ID`` header/body value; None when absent or invalid."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        parsed = int(str(value).strip())
+    except ValueError:
+        return None
+    return parsed if parsed >= 0 else None
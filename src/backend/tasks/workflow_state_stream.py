@@ -0,0 +1,64 @@
+"""Versioned workflow_state events — a full snapshot first, JSON-patch deltas after.
+
+Every canvas edit used to emit the whole workflow (nodes, edges, analysis)
+as ``workflow_state_updated``.  A task now keeps the last state it sent and
+emits ``workflow_state_patch`` with an RFC 6902 patch against that version.
+The client applies a patch only when ``base_version`` matches what it holds;
+otherwise it asks for a snapshot via ``POST /api/chat/resync``.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.json_patch import make_patch
+
+# Keys of the workflow_state payload that are diffed; the rest pass through.
+_STATE_KEYS = ("workflow", "analysis")
+
+
+class WorkflowStateStream:
+    """Turns successive workflow_state payloads into snapshot/patch events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version = 0
+        self._base: Optional[Dict[str, Any]] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def next_event(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return ``(event_name, data)`` for *payload* and make it the new base.
+
+        A full ``workflow_state_updated`` is sent for the first state, after
+        a workflow switch, and whenever the patch would not be smaller.
+        """
+        state = copy.deepcopy(payload)
+        with self._lock:
+            base = self._base
+            self._version += 1
+            version = self._version
+            self._base = state
+        if base is not None and base.get("workflow_id") == state.get("workflow_id"):
+            patch = make_patch(
+                {k: base.get(k) for k in _STATE_KEYS},
+                {k: state.get(k) for k in _STATE_KEYS},
+            )
+            full_size = len(json.dumps({k: state.get(k) for k in _STATE_KEYS}, default=str))
+            if len(json.dumps(patch, default=str)) < full_size:
+                data = {k: v for k, v in payload.items() if k not in _STATE_KEYS}
+                data.update(base_version=version - 1, version=version, patch=patch)
+                return "workflow_state_patch", data
+        return "workflow_state_updated", {**payload, "version": version}
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """The latest state as a full ``workflow_state_updated`` payload."""
+        with self._lock:
+            if self._base is None:
+                return None
+            return {**self._base, "version": self._version}
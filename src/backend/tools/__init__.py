@@ -1,7 +1,7 @@
 """Tool registry and workflow tools."""
 
-from .core import Tool, ToolParameter, ToolRegistry
-from .discovery import build_tool_registry, discover_tool_classes
+from .core import SideEffect, Tool, ToolParameter, ToolRegistry
+from .discovery import build_tool_registry, discover_tool_classes, shared_tool_registry
 from .workflow_analysis import AskQuestionTool, CreateSubworkflowTool, UpdateSubworkflowTool, ExtractGuidanceTool, ViewImageTool, UpdatePlanTool
 from .workflow_edit import (
     GetCurrentWorkflowTool,
@@ -25,11 +25,13 @@ from .execute_workflow import ExecuteWorkflowTool
 from .workflow_library import ListWorkflowsInLibrary, SaveWorkflowToLibrary
 
 __all__ = [
+    "SideEffect",
     "Tool",
     "ToolParameter",
     "ToolRegistry",
     "build_tool_registry",
     "discover_tool_classes",
+    "shared_tool_registry",
     "AskQuestionTool",
     "CreateSubworkflowTool",
     "UpdateSubworkflowTool",
@@ -85,18 +85,9 @@ VALID_WORKFLOW_OUTPUT_TYPES = frozenset({"string", "number", "bool", "json"})
 
 
 # --- Background Builder Concurrency ---
-# Caps the number of concurrent background builder threads (create + update)
-# to prevent runaway thread spawning if the LLM calls create_subworkflow in a loop.
-import threading as _threading  # noqa: E402
-
-_MAX_CONCURRENT_BUILDERS = 5
-builder_semaphore = _threading.Semaphore(_MAX_CONCURRENT_BUILDERS)
-
-# Timeout for acquiring a semaphore slot. If all slots are held by slow/zombie
-# builders, new builders fail loudly after this many seconds instead of
-# blocking forever. Set to 30s — enough to wait for a slot to free up from
-# a finishing build, short enough to surface stuck builders quickly.
-SEMAPHORE_TIMEOUT_SECONDS = 30
+# Concurrent builders (create + update) are capped by the BUILDER kind limits
+# of the shared task executor (src/backend/tasks/executor.py), which rejects
+# new builds with BUILDERS_BUSY once its queue is full.
 
 # Maximum build_history messages to persist in DB per workflow.
 # Prevents unbounded blob growth from long builder conversations.
@@ -104,6 +95,5 @@ MAX_BUILD_HISTORY_MESSAGES = 100
 
 # Maximum nesting depth for subworkflow builders. A builder at depth N
 # can spawn children at depth N+1. Depth 0 is the parent ChatTask's
-# orchestrator. Prevents infinite recursion and semaphore deadlock
-# (5 builders each waiting for a child that can't acquire the semaphore).
+# orchestrator. Prevents infinite recursion and runaway builder fan-out.
 MAX_BUILD_DEPTH = 2
@@ -8,6 +8,7 @@ and the ToolRegistry for dispatching tool calls.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -29,6 +30,20 @@ def tool_error(error: str, error_code: str = "TOOL_ERROR") -> Dict[str, Any]:
     }
 
 
+class SideEffect(str, Enum):
+    """What a tool call may change, which decides how calls can be scheduled.
+
+    READ: reads workflows, the library or uploaded files; changes nothing.
+    Several READ calls from one model message may run concurrently.
+    WORKFLOW_WRITE: modifies workflows; runs alone, in message order.
+    EXTERNAL: anything else with effects outside the call (UI events,
+    LLM sub-agents, executions, orchestrator state); runs alone, in order.
+    """
+    READ = "read"
+    WORKFLOW_WRITE = "workflow_write"
+    EXTERNAL = "external"
+
+
 @dataclass
 class ToolParameter:
     """Describes a single parameter for an LLM-callable tool.
@@ -95,6 +110,8 @@ class Tool:
     # Optional: raw JSON Schema dict that replaces auto-generated parameters.
     # Use this for tools with deeply nested schemas (e.g., add_node's condition).
     _schema_override: Optional[Dict[str, Any]] = None
+    # Tools that change nothing must opt in to concurrent scheduling
+    side_effect: SideEffect = SideEffect.EXTERNAL
 
     def execute(self, args: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
         raise NotImplementedError
@@ -146,6 +163,7 @@ class WorkflowTool(Tool):
 
     # Set to False in subclasses that don't need WorkflowValidator
     uses_validator: bool = True
+    side_effect: SideEffect = SideEffect.WORKFLOW_WRITE
 
     def __init__(self) -> None:
         if self.uses_validator:
@@ -176,12 +194,51 @@ class WorkflowTool(Tool):
 
 
 class ToolRegistry:
+    """Name -> Tool dispatch table.
+
+    Tools keep no per-conversation state (that arrives via
+    ``session_state`` on each call), so one frozen registry can be shared
+    by every orchestrator in the process.  ``schemas()`` is generated once
+    and cached until the next ``register``.
+    """
+
     def __init__(self) -> None:
         self._tools: Dict[str, Tool] = {}
+        self._schemas: Optional[Tuple[Dict[str, Any], ...]] = None
+        self._frozen = False
 
     def register(self, tool: Tool) -> None:
         """Register a tool under its canonical name."""
+        if self._frozen:
+            raise RuntimeError(
+                f"Cannot register {tool.name!r}: tool registry is frozen"
+            )
         self._tools[tool.name] = tool
+        self._schemas = None
+
+    def freeze(self) -> "ToolRegistry":
+        """Disallow further registration and pre-build the schemas."""
+        self.schemas()
+        self._frozen = True
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        """Anthropic schemas for all tools, in registration order.
+
+        The schema dicts are cached and shared; callers must not mutate them.
+        """
+        if self._schemas is None:
+            self._schemas = tuple(tool.to_anthropic_schema() for tool in self._tools.values())
+        return list(self._schemas)
+
+    def is_read_only(self, name: str) -> bool:
+        """True for registered tools declared ``SideEffect.READ``."""
+        tool = self._tools.get(name)
+        return getattr(tool, "side_effect", None) is SideEffect.READ
 
     def all_tools(self) -> List[Tool]:
         """Return all registered tools in registration order."""
@@ -5,11 +5,15 @@ from __future__ import annotations
 import importlib
 import inspect
 import pkgutil
+import threading
 from pathlib import Path
-from typing import List, Set, Type
+from typing import Dict, List, Set, Type
 
 from .core import Tool, ToolRegistry
 
+_shared_registries: Dict[Path, ToolRegistry] = {}
+_shared_lock = threading.Lock()
+
 
 def discover_tool_classes() -> List[Type[Tool]]:
     """Discover Tool subclasses declared under backend.tools.* modules."""
@@ -44,6 +48,21 @@ def build_tool_registry(repo_root: Path) -> ToolRegistry:
     return registry
 
 
+def shared_tool_registry(repo_root: Path) -> ToolRegistry:
+    """The process-wide frozen registry for *repo_root*, built on first use.
+
+    Discovery imports and instantiates every tool module, which is far
+    too slow to repeat per conversation or per request.
+    """
+    key = Path(repo_root).resolve()
+    with _shared_lock:
+        registry = _shared_registries.get(key)
+        if registry is None:
+            registry = build_tool_registry(key).freeze()
+            _shared_registries[key] = registry
+        return registry
+
+
 def _tools_package_name() -> str:
     module_name = __name__
     if module_name.endswith(".discovery"):
@@ -6,7 +6,7 @@ from typing import Any, Dict
 
 from ..execution.interpreter import TreeInterpreter
 from ..execution.preparation import prepare_workflow_execution
-from .core import WorkflowTool, ToolParameter
+from .core import SideEffect, WorkflowTool, ToolParameter
 
 
 class ExecuteWorkflowTool(WorkflowTool):
@@ -19,6 +19,7 @@ class ExecuteWorkflowTool(WorkflowTool):
     """
 
     name = "execute_workflow"
+    side_effect = SideEffect.EXTERNAL
     description = (
         "Run the active workflow with the given input values and return the result. "
         "Provide input values as a JSON object mapping variable names to their values. "
@@ -21,5 +21,6 @@ def generate_all_schemas(registry: ToolRegistry) -> List[Dict[str, Any]]:
 
     Returns:
         List of tool schema dicts in Anthropic function-calling format.
+        The dicts are cached on the registry and must not be mutated.
     """
-    return [tool.to_anthropic_schema() for tool in registry.all_tools()]
+    return registry.schemas()
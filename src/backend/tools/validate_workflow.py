@@ -10,7 +10,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from .core import WorkflowTool, ToolParameter
+from .core import SideEffect, WorkflowTool, ToolParameter
 
 
 class ValidateWorkflowTool(WorkflowTool):
@@ -20,6 +20,7 @@ class ValidateWorkflowTool(WorkflowTool):
     """
 
     name = "validate_workflow"
+    side_effect = SideEffect.READ
     description = (
         "Check if the active workflow is valid. "
         "Reports errors like disconnected nodes, missing branches, or unreachable paths. "
@@ -4,7 +4,7 @@ The main orchestrator calls this tool when it encounters a subprocess node that
 a new subworkflow. The tool:
 1. Creates a workflow in the DB immediately (returning workflow_id)
 2. Registers any declared input variables
-3. Spawns a background thread with a fresh Orchestrator to build the subworkflow
+3. Submits a builder job to the task executor with a fresh Orchestrator
 4. Returns immediately so the main orchestrator can continue in parallel
 
 The builder runs as an independent task with its own EventSink — it does not share
@@ -15,7 +15,6 @@ via POST /api/chat/resume when the user navigates to the subworkflow page.
 from __future__ import annotations
 
 import logging
-import threading
 from typing import Any, Dict, List
 from uuid import uuid4
 
@@ -23,11 +22,10 @@ from ..core import Tool, ToolParameter, extract_session_deps
 from ..constants import (
     generate_workflow_id,
     VALID_WORKFLOW_OUTPUT_TYPES,
-    builder_semaphore,
     MAX_BUILD_HISTORY_MESSAGES,
     MAX_BUILD_DEPTH,
-    SEMAPHORE_TIMEOUT_SECONDS,
 )
+from ...tasks.executor import TaskKind, TaskRejected, task_executor
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +40,7 @@ def _run_subworkflow_builder(
     build_depth: int = 1,
     conversation_logger: Any = None,
 ) -> None:
-    """Background thread: build a subworkflow using a fresh orchestrator.
+    """Builder job: build a subworkflow using a fresh orchestrator.
 
     Fully independent — no reference to the parent's EventSink. The builder
     owns its own sink via `task.sink`. The DB (building flag) is the only
@@ -65,24 +63,6 @@ def _run_subworkflow_builder(
     # Start timeout watchdog — kills the build after 300s wall-clock
     task.start_watchdog()
 
-    # Acquire semaphore with timeout — fail loudly instead of blocking forever
-    # if all 5 slots are held by zombie threads or slow builds.
-    if not builder_semaphore.acquire(timeout=SEMAPHORE_TIMEOUT_SECONDS):
-        logger.error(
-            "Builder %s failed to acquire semaphore within %ds — all slots busy",
-            workflow_id, SEMAPHORE_TIMEOUT_SECONDS,
-        )
-        task.emit_response("")
-        task.done.set()
-        from ...tasks.registry import task_registry as _reg
-        _reg.unregister(task)
-        task.sink.close()
-        try:
-            workflow_store.update_workflow(workflow_id, user_id, building=False)
-        except Exception:
-            pass
-        return
-
     try:
         from ...agents.orchestrator_factory import build_orchestrator
 
@@ -188,8 +168,6 @@ def _run_subworkflow_builder(
                 workflow_id, inner_exc,
             )
     finally:
-        # Release the semaphore slot so other builders can proceed
-        builder_semaphore.release()
         # Emit chat_response on builder's own sink to signal build completion
         task.emit_response(response_text)
         # Mark done and unregister so resume knows the build finished
@@ -405,9 +383,30 @@ class CreateSubworkflowTool(Tool):
             task_id=bg_task_id,
         )
 
-        # Register before thread spawn so resume can find it immediately
+        # Register before submitting so resume can find it immediately
         _task_registry.register(builder)
 
+        # Child builder runs at parent_depth + 1.
+        # No parent_sink reference passed — builder is fully independent.
+        child_depth = parent_depth + 1
+        parent_conv_logger = session_state.get("conversation_logger")
+        try:
+            task_executor.submit(
+                TaskKind.BUILDER, _run_subworkflow_builder,
+                workflow_id, builder_prompt, repo_root, workflow_store,
+                user_id, builder, child_depth, parent_conv_logger,
+                user_id=user_id, name=f"subworkflow-builder-{workflow_id}",
+            )
+        except TaskRejected as exc:
+            _task_registry.unregister(builder)
+            builder_sink.close()
+            workflow_store.delete_workflow(workflow_id, user_id)
+            return {
+                "success": False,
+                "error": f"Cannot start a builder right now: {exc}. Retry in {exc.retry_after}s.",
+                "error_code": "BUILDERS_BUSY",
+            }
+
         # Synchronous notification on parent's sink (still alive during tool call)
         parent_sink = session_state.get("event_sink")
         if parent_sink:
@@ -417,23 +416,8 @@ class CreateSubworkflowTool(Tool):
                 "building": True,
             })
 
-        # Child builder runs at parent_depth + 1.
-        # No parent_sink reference passed — builder is fully independent.
-        child_depth = parent_depth + 1
-        parent_conv_logger = session_state.get("conversation_logger")
-        thread = threading.Thread(
-            target=_run_subworkflow_builder,
-            args=(
-                workflow_id, builder_prompt, repo_root, workflow_store,
-                user_id, builder, child_depth, parent_conv_logger,
-            ),
-            daemon=True,
-            name=f"subworkflow-builder-{workflow_id}",
-        )
-        thread.start()
-
         logger.info(
-            "Created subworkflow %s ('%s') and spawned background builder",
+            "Created subworkflow %s ('%s') and submitted background builder",
             workflow_id, name_clean,
         )
 
@@ -8,7 +8,6 @@ building the workflow.
 
 from __future__ import annotations
 
-import base64
 import json
 import logging
 from pathlib import Path
@@ -16,7 +15,7 @@ from typing import Any, Dict, List
 
 from ..core import Tool, ToolParameter
 from ...llm import call_llm
-from ...utils.image import detect_image_media_type
+from ...utils.content_blocks import get_content_block_cache
 
 logger = logging.getLogger(__name__)
 
@@ -129,13 +128,12 @@ class ExtractGuidanceTool(Tool):
         if not image_path.exists():
             return {"success": False, "error": f"Image file not found: {image_path}"}
 
-        # Read and encode the image
-        raw = image_path.read_bytes()
-        b64 = base64.b64encode(raw).decode()
-
-        media_type = detect_image_media_type(raw, image_path.suffix)
+        # Encoded (and compressed if needed) once per image content
+        cached = get_content_block_cache().get(image_path, "image")
+        if cached is None:
+            return {"success": False, "error": f"Image file not found: {image_path}"}
 
-        logger.info("ExtractGuidanceTool calling LLM for %s (%d bytes)", image_path.name, len(raw))
+        logger.info("ExtractGuidanceTool calling LLM for %s (%d bytes)", image_path.name, cached.source_bytes)
 
         # Build messages with the image and guidance prompt
         messages = [
@@ -144,14 +142,7 @@ class ExtractGuidanceTool(Tool):
                 "role": "user",
                 "content": [
                     {"type": "text", "text": _GUIDANCE_PROMPT},
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": b64,
-                        },
-                    },
+                    cached.to_message_block(),
                 ],
             },
         ]
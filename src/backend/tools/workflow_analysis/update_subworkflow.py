@@ -4,8 +4,9 @@ The main orchestrator calls this when it needs to modify a previously-built
 subworkflow. The tool:
 1. Loads the workflow and its build_history from the DB
 2. Rejects if the workflow is still being built (building=True)
-3. Spawns a background thread with an orchestrator pre-loaded with the
-   previous conversation history so the builder has full context
+3. Submits a builder job to the task executor with an orchestrator
+   pre-loaded with the previous conversation history so the builder has
+   full context
 4. Returns immediately so the main orchestrator can continue
 
 The builder runs as an independent task with its own EventSink — it does not
@@ -16,12 +17,12 @@ POST /api/chat/resume when the user navigates to the subworkflow page.
 from __future__ import annotations
 
 import logging
-import threading
 from typing import Any, Dict
 from uuid import uuid4
 
 from ..core import Tool, ToolParameter, extract_session_deps
-from ..constants import builder_semaphore, MAX_BUILD_HISTORY_MESSAGES, SEMAPHORE_TIMEOUT_SECONDS
+from ..constants import MAX_BUILD_HISTORY_MESSAGES
+from ...tasks.executor import TaskKind, TaskRejected, task_executor
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,7 @@ def _run_subworkflow_updater(
     conversation_logger: Any = None,
     conversation_id: str | None = None,
 ) -> None:
-    """Background thread: update a subworkflow using a fresh orchestrator
+    """Builder job: update a subworkflow using a fresh orchestrator
     pre-loaded with the previous build conversation.
 
     Fully independent — no reference to the parent's EventSink. The builder
@@ -62,24 +63,6 @@ def _run_subworkflow_updater(
     # Start timeout watchdog — kills the build after 300s wall-clock
     task.start_watchdog()
 
-    # Acquire semaphore with timeout — fail loudly instead of blocking forever
-    # if all 5 slots are held by zombie threads or slow builds.
-    if not builder_semaphore.acquire(timeout=SEMAPHORE_TIMEOUT_SECONDS):
-        logger.error(
-            "Updater %s failed to acquire semaphore within %ds — all slots busy",
-            workflow_id, SEMAPHORE_TIMEOUT_SECONDS,
-        )
-        task.emit_response("")
-        task.done.set()
-        from ...tasks.registry import task_registry as _reg
-        _reg.unregister(task)
-        task.sink.close()
-        try:
-            workflow_store.update_workflow(workflow_id, user_id, building=False)
-        except Exception:
-            pass
-        return
-
     try:
         from ...agents.orchestrator_factory import build_orchestrator
 
@@ -182,8 +165,6 @@ def _run_subworkflow_updater(
                 workflow_id, inner_exc,
             )
     finally:
-        # Release the semaphore slot so other builders can proceed
-        builder_semaphore.release()
         # Emit chat_response on builder's own sink to signal completion
         task.emit_response(response_text)
         task.done.set()
@@ -298,38 +279,44 @@ class UpdateSubworkflowTool(Tool):
             task_id=bg_task_id,
         )
 
-        # Register before thread spawn so resume can find it immediately
+        # Register before submitting so resume can find it immediately
         _task_registry.register(builder)
 
-        # Synchronous notification on parent's sink (still alive during tool call)
-        parent_sink = session_state.get("event_sink")
-        if parent_sink:
-            parent_sink.push("subworkflow_building", {
-                "workflow_id": workflow_id,
-                "name": workflow.name,
-                "building": True,
-            })
-
         # Inherit parent's build depth so nested creates are depth-limited.
         # No parent_sink reference passed — builder is fully independent.
         parent_depth = session_state.get("build_depth", 0)
         child_depth = parent_depth + 1
         parent_conv_logger = session_state.get("conversation_logger")
 
-        thread = threading.Thread(
-            target=_run_subworkflow_updater,
-            args=(
+        try:
+            task_executor.submit(
+                TaskKind.BUILDER, _run_subworkflow_updater,
                 workflow_id, updater_prompt, repo_root, workflow_store,
                 user_id, workflow.build_history, builder,
                 child_depth, parent_conv_logger, workflow.conversation_id,
-            ),
-            daemon=True,
-            name=f"subworkflow-updater-{workflow_id}",
-        )
-        thread.start()
+                user_id=user_id, name=f"subworkflow-updater-{workflow_id}",
+            )
+        except TaskRejected as exc:
+            _task_registry.unregister(builder)
+            builder_sink.close()
+            workflow_store.update_workflow(workflow_id, user_id, building=False)
+            return {
+                "success": False,
+                "error": f"Cannot start the update right now: {exc}. Retry in {exc.retry_after}s.",
+                "error_code": "BUILDERS_BUSY",
+            }
+
+        # Synchronous notification on parent's sink (still alive during tool call)
+        parent_sink = session_state.get("event_sink")
+        if parent_sink:
+            parent_sink.push("subworkflow_building", {
+                "workflow_id": workflow_id,
+                "name": workflow.name,
+                "building": True,
+            })
 
         logger.info(
-            "Spawned background updater for subworkflow %s ('%s')",
+            "Submitted background updater for subworkflow %s ('%s')",
             workflow_id, workflow.name,
         )
 
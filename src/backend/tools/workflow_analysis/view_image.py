@@ -1,28 +1,36 @@
 """Tool for re-viewing an uploaded workflow image mid-conversation.
 
 Returns the image as an Anthropic-compatible base64 content block so the
-LLM can re-examine it without the user re-uploading.
+LLM can re-examine it without the user re-uploading.  Images larger than
+the per-view budget come back as a low-resolution overview; the LLM then
+asks for a ``region`` (and optionally a ``zoom`` level) to read details,
+rendered from a pyramid built once per upload (see ``utils.image_tiles``).
 """
 
 from __future__ import annotations
 
-import base64
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from ..core import Tool, ToolParameter, tool_error
-from ...utils.image import detect_image_media_type
+from PIL import Image, UnidentifiedImageError
+
+from ..core import SideEffect, Tool, ToolParameter, tool_error
+from ...utils.content_blocks import get_content_block_cache
+from ...utils.image_tiles import FULL_IMAGE, Box, get_image_tile_cache
 
 
 class ViewImageTool(Tool):
     """Load an uploaded image from disk and return it as an image content block."""
 
     name = "view_image"
+    side_effect = SideEffect.READ
     description = (
         "Re-examine an uploaded workflow image. Returns the image so you can "
         "look at it again during the conversation. When multiple images are "
-        "uploaded, pass the filename to select a specific one."
+        "uploaded, pass the filename to select a specific one. Large images "
+        "are returned as a low-resolution overview; pass region (and "
+        "optionally zoom) to look at part of the image in more detail."
     )
     parameters: List[ToolParameter] = [
         ToolParameter(
@@ -31,6 +39,33 @@ class ViewImageTool(Tool):
             description="Name of the image file to view. If omitted, returns the first image. Use this when multiple images are uploaded.",
             required=False,
         ),
+        ToolParameter(
+            name="region",
+            type="object",
+            description=(
+                "Part of the image to view, as fractions (0-1) of its width and height "
+                "measured from the top-left corner, e.g. {\"x\": 0.5, \"y\": 0, "
+                "\"width\": 0.5, \"height\": 0.5} for the top-right quarter. "
+                "If omitted, the whole image is shown."
+            ),
+            required=False,
+            properties={
+                "x": {"type": "number", "minimum": 0, "maximum": 1},
+                "y": {"type": "number", "minimum": 0, "maximum": 1},
+                "width": {"type": "number", "minimum": 0, "maximum": 1},
+                "height": {"type": "number", "minimum": 0, "maximum": 1},
+            },
+        ),
+        ToolParameter(
+            name="zoom",
+            type="integer",
+            description=(
+                "Detail level: 0 is the overview, each level doubles the resolution "
+                "up to the original. If omitted, the most detail that fits one view is used."
+            ),
+            required=False,
+            minimum=0,
+        ),
     ]
 
     def __init__(self) -> None:
@@ -71,32 +106,102 @@ class ViewImageTool(Tool):
         if not image_path.exists():
             return tool_error(f"Image file not found: {image_path}", "FILE_NOT_FOUND")
 
-        # Read and encode the image
-        raw = image_path.read_bytes()
-        b64 = base64.b64encode(raw).decode()
-
-        # Detect media type from magic bytes (file extension can be wrong)
-        media_type = detect_image_media_type(raw, image_path.suffix)
-
-        self._logger.info("ViewImageTool returning image %s (%d bytes)", image_path.name, len(raw))
+        box = _parse_region(args.get("region"))
+        if isinstance(box, str):
+            return tool_error(box, "INVALID_REGION")
+        zoom = args.get("zoom")
+        if zoom is not None and (not isinstance(zoom, int) or isinstance(zoom, bool) or zoom < 0):
+            return tool_error("zoom must be a non-negative integer.", "INVALID_ZOOM")
 
         # List all available image names so the LLM knows what else is uploaded
         available_names = [f.get("name", "?") for f in images]
         label = image_file.get("name", image_path.name)
-        caption = f"Image: {label}"
-        if len(images) > 1:
-            caption += f" (uploaded images: {', '.join(available_names)})"
+        others = f" (uploaded images: {', '.join(available_names)})" if len(images) > 1 else ""
+
+        if box is not None or zoom is not None or not _fits_one_view(image_path):
+            return self._view_tiled(image_path, label, others, box or FULL_IMAGE, zoom)
+
+        # Encoded (and compressed if needed) once per image content
+        cached = get_content_block_cache().get(image_path, "image")
+        if cached is None:
+            return tool_error(f"Image file not found: {image_path}", "FILE_NOT_FOUND")
+
+        self._logger.info("ViewImageTool returning image %s (%d bytes)", image_path.name, cached.source_bytes)
+        caption = f"Image: {label}{others}"
 
         return {
             "success": True,
             "content": [
-                {
-                    "type": "image",
-                    "source": {"type": "base64", "media_type": media_type, "data": b64},
-                },
+                cached.to_message_block(),
                 {
                     "type": "text",
                     "text": caption,
                 },
             ],
         }
+
+    def _view_tiled(
+        self, image_path: Path, label: str, others: str, box: Box, zoom: Optional[int],
+    ) -> Dict[str, Any]:
+        try:
+            tile = get_image_tile_cache().view(image_path, box, zoom)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+            return tool_error(f"Could not decode image {label}: {exc}", "INVALID_IMAGE")
+
+        self._logger.info(
+            "ViewImageTool returning %s region %s at zoom %d (%dx%d)",
+            image_path.name, box, tile.level, *tile.size,
+        )
+        left, top, right, bottom = tile.box
+        src_w, src_h = tile.source_size
+        caption = (
+            f"Image: {label} ({src_w}x{src_h} px){others}. "
+            f"Showing region x={left:g}, y={top:g}, width={right - left:g}, "
+            f"height={bottom - top:g} at zoom {tile.level} of {tile.max_level}, "
+            f"sent as {tile.size[0]}x{tile.size[1]} px."
+        )
+        native_w, _ = _region_px(tile.source_size, tile.box)
+        if tile.level < tile.max_level or tile.size[0] < native_w - 1:
+            caption += " Pass a smaller region or a higher zoom to read finer detail."
+        return {
+            "success": True,
+            "content": [
+                tile.content.to_message_block(),
+                {"type": "text", "text": caption},
+            ],
+        }
+
+
+def _parse_region(region: Any) -> Union[Box, str, None]:
+    """The region as a (left, top, right, bottom) box, or an error message."""
+    if region is None:
+        return None
+    if not isinstance(region, dict):
+        return "region must be an object with x, y, width and height."
+    try:
+        x, y = float(region.get("x", 0)), float(region.get("y", 0))
+        w, h = float(region.get("width", 1 - x)), float(region.get("height", 1 - y))
+    except (TypeError, ValueError):
+        return "region x, y, width and height must be numbers between 0 and 1."
+    if not (0 <= x < 1 and 0 <= y < 1 and w > 0 and h > 0):
+        return "region x and y must be in [0, 1) and width and height greater than 0."
+    return x, y, min(1.0, x + w), min(1.0, y + h)
+
+
+def _fits_one_view(image_path: Path) -> bool:
+    """Whether the whole image fits the per-view budget as is.
+
+    Reads only the header.  Files PIL cannot identify are sent as they
+    are, as before tiling existed.
+    """
+    try:
+        with Image.open(image_path) as img:
+            return get_image_tile_cache().fits_one_view(img.size)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return True
+
+
+def _region_px(size: Tuple[int, int], box: Box) -> Tuple[int, int]:
+    w, h = size
+    left, top, right, bottom = box
+    return round((right - left) * w), round((bottom - top) * h)
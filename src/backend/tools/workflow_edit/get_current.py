@@ -11,7 +11,7 @@ from __future__ import annotations
 import copy
 from typing import Any, Dict, List
 
-from ..core import WorkflowTool, ToolParameter
+from ..core import SideEffect, WorkflowTool, ToolParameter
 
 
 # Human-readable labels for comparators
@@ -145,6 +145,7 @@ class GetCurrentWorkflowTool(WorkflowTool):
     """
 
     uses_validator = False
+    side_effect = SideEffect.READ
 
     name = "get_current_workflow"
     description = (
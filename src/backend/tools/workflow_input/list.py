@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
-from ..core import WorkflowTool, ToolParameter
+from ..core import SideEffect, WorkflowTool, ToolParameter
 
 
 class ListWorkflowVariablesTool(WorkflowTool):
@@ -24,6 +24,7 @@ class ListWorkflowVariablesTool(WorkflowTool):
     """
 
     uses_validator = False
+    side_effect = SideEffect.READ
 
     name = "list_workflow_variables"
     description = (
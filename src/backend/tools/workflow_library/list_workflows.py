@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Set
 
-from ..core import Tool, ToolParameter, extract_session_deps
+from ..core import SideEffect, Tool, ToolParameter, extract_session_deps
 
 
 class ListWorkflowsInLibrary(Tool):
@@ -25,6 +25,7 @@ class ListWorkflowsInLibrary(Tool):
     """
 
     name = "list_workflows_in_library"
+    side_effect = SideEffect.READ
     description = (
         "List all workflows in the user's library, PLUS the current canvas workflow (even if unsaved). "
         "Returns workflow metadata including name, description, domain, tags, status, "
@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from ..core import Tool, ToolParameter, extract_session_deps
+from ..core import SideEffect, Tool, ToolParameter, extract_session_deps
 
 
 class SaveWorkflowToLibrary(Tool):
@@ -27,6 +27,7 @@ class SaveWorkflowToLibrary(Tool):
     """
 
     name = "save_workflow_to_library"
+    side_effect = SideEffect.WORKFLOW_WRITE
     description = (
         "Save the active workflow to the user's permanent library. "
         "Drafts are workflows you've created that haven't been explicitly saved yet. "
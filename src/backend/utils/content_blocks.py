@@ -0,0 +1,354 @@
+"""Cache of ready-to-send LLM content blocks for uploaded files.
+
+Turning an upload into an Anthropic content block means reading the
+file, compressing images that exceed the API limit and base64-encoding
+the result.  The same upload is sent again by later turns, ``view_image``
+and ``extract_guidance``, and the same file is often uploaded into
+several conversations, so blocks are cached by a hash of the file's
+content (plus its type and the encoder version):
+
+- in memory, LRU under a byte budget, shared by every conversation;
+- on disk under ``cache_dir`` (one JSON file per block, written
+  atomically), also byte-bounded, so a restart does not redo the work.
+
+A path is hashed only the first time it is seen at a given size and
+mtime; uploads are written once, so later lookups skip reading the file.
+
+Blocks handed out end up in conversation history (``view_image``
+results).  ``reference_uploads`` swaps them for small ``upload``
+references before history is persisted and ``resolve_uploads`` turns
+those back into blocks on reload, so checkpoints do not carry base64
+copies of files that are on disk anyway.
+
+    block = get_content_block_cache().get(path, "image")
+    if block is not None:
+        content.append(block.to_message_block())
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .image import fit_image_bytes
+
+logger = logging.getLogger(__name__)
+
+# Bump when block construction changes so stale disk entries are ignored
+_ENCODER_VERSION = 1
+_MAX_PDF_BYTES = 32_000_000
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_BUDGET_BYTES = 2 * 1024 * 1024 * 1024
+# Path/size/mtime -> content key entries kept before the index is reset
+_MAX_STAT_INDEX = 10_000
+
+_BlockFn = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class ContentBlock:
+    """A ready-to-send content block plus its size metadata."""
+    key: str
+    block: Dict[str, Any]
+    media_type: str
+    source_bytes: int    # size of the uploaded file
+    encoded_bytes: int   # size of the base64 payload sent to the API
+
+    def to_message_block(self) -> Dict[str, Any]:
+        """A copy of the block safe to put into a message."""
+        return {**self.block, "source": dict(self.block["source"])}
+
+
+class ContentBlockCache:
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        *,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+        disk_budget_bytes: int = DEFAULT_DISK_BUDGET_BYTES,
+    ) -> None:
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self._cache_dir is not None:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory_budget = memory_budget_bytes
+        self._disk_budget = disk_budget_bytes
+        # Least recently used first
+        self._entries: "OrderedDict[str, ContentBlock]" = OrderedDict()
+        self._memory_bytes = 0
+        self._by_stat: Dict[Tuple[str, int, int, str], str] = {}
+        # base64 payload -> (path, file_type) of an upload it was built from,
+        # for blocks still in memory
+        self._origins: Dict[str, Tuple[str, str]] = {}
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def get(self, path: Path, file_type: str) -> Optional[ContentBlock]:
+        """The block for the file at *path*, or None if missing or unsupported.
+
+        *file_type* is ``"image"`` or ``"pdf"``.  PDFs over the API size
+        limit yield None.
+        """
+        if file_type not in ("image", "pdf"):
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            logger.warning("File not found: %s", path)
+            return None
+        stat_key = (str(path), st.st_size, st.st_mtime_ns, file_type)
+        with self._lock:
+            key = self._by_stat.get(stat_key)
+            entry = self._touch_locked(key) if key else None
+            if entry is not None:
+                self._origins[entry.block["source"]["data"]] = (str(path), file_type)
+        if entry is not None:
+            return entry
+
+        raw = path.read_bytes()
+        key = _content_key(raw, file_type)
+        with self._lock:
+            entry = self._touch_locked(key)
+        if entry is None:
+            entry = self._read_disk(key)
+        if entry is None:
+            entry = _build_block(key, raw, path.suffix, file_type)
+            if entry is None:
+                logger.warning("File %s too large (%d bytes), skipping", path.name, len(raw))
+                return None
+            self._write_disk(entry)
+        with self._lock:
+            if len(self._by_stat) >= _MAX_STAT_INDEX:
+                self._by_stat.clear()
+            self._by_stat[stat_key] = key
+            self._insert_locked(entry)
+            self._origins[entry.block["source"]["data"]] = (str(path), file_type)
+        return entry
+
+    def reference_for(self, block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """An ``upload`` reference standing in for *block*, if this cache built it.
+
+        Only blocks still in memory are known; anything else yields None
+        and is kept as it is.
+        """
+        source = block.get("source")
+        if not isinstance(source, dict) or source.get("type") != "base64":
+            return None
+        data = source.get("data")
+        if not isinstance(data, str):
+            return None
+        with self._lock:
+            origin = self._origins.get(data)
+        if origin is None:
+            return None
+        path, file_type = origin
+        return {"type": block.get("type"), "source": {
+            "type": "upload", "path": path, "file_type": file_type,
+            "media_type": source.get("media_type"),
+        }}
+
+    def resolve(self, block: Dict[str, Any]) -> Dict[str, Any]:
+        """The content block an ``upload`` reference stands for.
+
+        A text note replaces it when the upload is gone or unreadable.
+        """
+        source = block["source"]
+        path = Path(source.get("path", ""))
+        try:
+            entry = self.get(path, source.get("file_type", ""))
+        except OSError:
+            logger.warning("Failed to read upload %s", path, exc_info=True)
+            entry = None
+        if entry is None:
+            return {"type": "text", "text": f"[Uploaded file {path.name} is no longer available]"}
+        return entry.to_message_block()
+
+    # --- Memory LRU ---
+
+    def _touch_locked(self, key: str) -> Optional[ContentBlock]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _insert_locked(self, entry: ContentBlock) -> None:
+        if entry.key in self._entries:
+            self._entries.move_to_end(entry.key)
+            return
+        self._entries[entry.key] = entry
+        self._memory_bytes += entry.encoded_bytes
+        # The newest entry stays even if it alone exceeds the budget
+        while self._memory_bytes > self._memory_budget and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted.encoded_bytes
+            self._origins.pop(evicted.block["source"]["data"], None)
+
+    # --- Disk ---
+
+    def _disk_path(self, key: str) -> Path:
+        assert self._cache_dir is not None
+        return self._cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[ContentBlock]:
+        if self._cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                entry = ContentBlock(**json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            logger.warning("Unreadable cached content block %s — rebuilding", path, exc_info=True)
+            return None
+        try:
+            os.utime(path)  # recently used survives disk pruning
+        except OSError:
+            pass
+        return entry
+
+    def _write_disk(self, entry: ContentBlock) -> None:
+        if self._cache_dir is None:
+            return
+        path = self._disk_path(entry.key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as fh:
+                json.dump(asdict(entry), fh, separators=(",", ":"))
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError:
+            logger.warning("Failed to persist content block %s", entry.key, exc_info=True)
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self._cache_dir.glob("*.json"))
+            else:
+                self._disk_bytes += size
+            over = self._disk_bytes > self._disk_budget
+        if over:
+            self._prune_disk(keep=path)
+
+    def _prune_disk(self, keep: Path) -> None:
+        """Delete least recently used block files until under the disk budget."""
+        files = []
+        for p in self._cache_dir.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, p in files:
+            if total <= self._disk_budget:
+                break
+            if p == keep:
+                continue
+            p.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+def _content_key(raw: bytes, file_type: str) -> str:
+    digest = hashlib.sha256(raw).hexdigest()
+    return f"{file_type}-v{_ENCODER_VERSION}-{digest}"
+
+
+def _build_block(key: str, raw: bytes, suffix: str, file_type: str) -> Optional[ContentBlock]:
+    if file_type == "image":
+        data, media_type = fit_image_bytes(raw, suffix)
+        block_type = "image"
+    else:
+        if len(raw) > _MAX_PDF_BYTES:
+            return None
+        data, media_type = raw, "application/pdf"
+        block_type = "document"
+    encoded = base64.b64encode(data).decode("ascii")
+    return ContentBlock(
+        key=key,
+        block={"type": block_type, "source": {"type": "base64", "media_type": media_type, "data": encoded}},
+        media_type=media_type,
+        source_bytes=len(raw),
+        encoded_bytes=len(encoded),
+    )
+
+
+def reference_uploads(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """*history* with cached upload blocks swapped for ``upload`` references.
+
+    Messages without such blocks are shared, not copied; *history* itself
+    is left untouched.
+    """
+    cache = get_content_block_cache()
+    return [_map_message(message, cache.reference_for) for message in history]
+
+
+def resolve_uploads(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Undo ``reference_uploads``: re-materialize ``upload`` references."""
+    cache = get_content_block_cache()
+
+    def resolve(block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        source = block.get("source")
+        if isinstance(source, dict) and source.get("type") == "upload":
+            return cache.resolve(block)
+        return None
+
+    return [_map_message(message, resolve) for message in history]
+
+
+def _map_message(message: Dict[str, Any], fn: _BlockFn) -> Dict[str, Any]:
+    content = message.get("content") if isinstance(message, dict) else None
+    mapped = _map_blocks(content, fn)
+    return message if mapped is content else {**message, "content": mapped}
+
+
+def _map_blocks(content: Any, fn: _BlockFn) -> Any:
+    """*content* with each block replaced by ``fn(block)`` where not None.
+
+    Recurses into ``tool_result`` content; returns *content* itself when
+    nothing changed.
+    """
+    if not isinstance(content, list):
+        return content
+    out: List[Any] = []
+    changed = False
+    for block in content:
+        new = block
+        if isinstance(block, dict):
+            if block.get("type") == "tool_result":
+                inner = _map_blocks(block.get("content"), fn)
+                if inner is not block.get("content"):
+                    new = {**block, "content": inner}
+            else:
+                new = fn(block) or block
+        changed = changed or new is not block
+        out.append(new)
+    return out if changed else content
+
+
+_cache = ContentBlockCache()
+
+
+def get_content_block_cache() -> ContentBlockCache:
+    return _cache
+
+
+def set_content_block_cache(cache: ContentBlockCache) -> ContentBlockCache:
+    """Install the process-wide cache; returns the previous one."""
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
@@ -6,6 +6,7 @@ import base64
 import io
 import logging
 from pathlib import Path
+from typing import Tuple
 
 from PIL import Image
 
@@ -30,6 +31,17 @@ def image_to_data_url(image_path: Path) -> str:
     return _compress_image(raw, image_path.suffix)
 
 
+def fit_image_bytes(raw: bytes, suffix: str = "") -> Tuple[bytes, str]:
+    """Return ``(bytes, media_type)`` for *raw*, compressed if over the API limit.
+
+    Images already small enough are returned unchanged; larger ones are
+    resized and re-encoded as JPEG.
+    """
+    if len(raw) <= _MAX_RAW_BYTES:
+        return raw, detect_image_media_type(raw, suffix)
+    return _compress_to_jpeg(raw), "image/jpeg"
+
+
 def file_to_data_url(file_path: Path) -> str:
     """Read an image or PDF file and return a data URL.
 
@@ -75,11 +87,33 @@ def _encode_image_bytes(raw: bytes, suffix: str) -> str:
 
 def _compress_image(raw: bytes, suffix: str) -> str:
     """Resize and compress an image to stay under _MAX_RAW_BYTES."""
+    encoded = base64.b64encode(_compress_to_jpeg(raw)).decode("ascii")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """*img* as RGB, with any transparent areas composited onto white.
+
+    A plain ``convert("RGB")`` drops the alpha channel, so transparent
+    pixels (usually black underneath) come out black.
+    """
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA", "PA"):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _compress_to_jpeg(raw: bytes) -> bytes:
+    """Resize and re-encode *raw* as JPEG bytes under _MAX_RAW_BYTES."""
     img = Image.open(io.BytesIO(raw))
 
-    # Convert RGBA/palette to RGB for JPEG output
+    # JPEG has no alpha: flatten transparency onto white
     if img.mode in ("RGBA", "P", "LA"):
-        img = img.convert("RGB")
+        img = flatten_to_rgb(img)
 
     # Resize if either dimension exceeds the max
     w, h = img.size
@@ -98,11 +132,9 @@ def _compress_image(raw: bytes, suffix: str) -> str:
         data = buf.getvalue()
         if len(data) <= _MAX_RAW_BYTES:
             logger.info("Compressed image to %d bytes (quality=%d)", len(data), quality)
-            encoded = base64.b64encode(data).decode("ascii")
-            return f"data:image/jpeg;base64,{encoded}"
+            return data
         quality -= 5
 
     # Last resort: return whatever we got at lowest quality
     logger.warning("Image still %d bytes after max compression", len(data))
-    encoded = base64.b64encode(data).decode("ascii")
-    return f"data:image/jpeg;base64,{encoded}"
+    return data
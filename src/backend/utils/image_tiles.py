@@ -0,0 +1,284 @@
+"""Resolution pyramids for viewing parts of large uploaded images.
+
+Sending a 6000×4000 scanned guideline at full size on every look costs
+thousands of input tokens.  Instead ``view_image`` renders an overview
+and, on request, regions of the image at increasing zoom levels, each
+downscaled to fit a per-view pixel budget (input tokens scale with
+pixels, roughly width × height / 750).
+
+Each upload is decoded once into an ``ImagePyramid``: level 0 is the
+largest power-of-two reduction that fits the budget, and every level
+above doubles the resolution up to the original.  Pyramids and rendered
+regions are cached in memory by a hash of the upload's content, under
+byte budgets.  The full-resolution level dominates a pyramid (about 72 MB
+for a 6000×4000 scan), so the pyramid budget can be raised with
+``LEMON_IMAGE_PYRAMID_CACHE_MB``.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .content_blocks import ContentBlock
+from .image import flatten_to_rgb
+
+logger = logging.getLogger(__name__)
+
+# ~1600 input tokens per view; the API downsizes anything past 1568 px anyway
+DEFAULT_MAX_PIXELS = 1_200_000
+DEFAULT_MAX_DIMENSION = 1568
+# Memory budget for decoded pyramids (LEMON_IMAGE_PYRAMID_CACHE_MB)
+_DEFAULT_PYRAMID_CACHE_MB = 512
+DEFAULT_TILE_BUDGET_BYTES = 64 * 1024 * 1024
+_JPEG_QUALITY = 88
+_MAX_STAT_INDEX = 10_000
+
+# (left, top, right, bottom) as fractions of the image, 0-1
+Box = Tuple[float, float, float, float]
+FULL_IMAGE: Box = (0.0, 0.0, 1.0, 1.0)
+
+
+def fits_budget(size: Tuple[int, int], max_pixels: int = DEFAULT_MAX_PIXELS,
+                max_dimension: int = DEFAULT_MAX_DIMENSION) -> bool:
+    w, h = size
+    return w * h <= max_pixels and max(w, h) <= max_dimension
+
+
+@dataclass(frozen=True)
+class Tile:
+    """A rendered region, ready to send."""
+    content: ContentBlock
+    level: int
+    max_level: int
+    box: Box
+    size: Tuple[int, int]          # pixels sent
+    source_size: Tuple[int, int]   # pixels of the original image
+
+
+class ImagePyramid:
+    """An image decoded once, kept at halving resolutions (level 0 smallest)."""
+
+    def __init__(self, image: Image.Image, *, max_pixels: int = DEFAULT_MAX_PIXELS,
+                 max_dimension: int = DEFAULT_MAX_DIMENSION) -> None:
+        if image.mode not in ("RGB", "L"):
+            image = flatten_to_rgb(image)
+        self.source_size: Tuple[int, int] = image.size
+        self._max_pixels = max_pixels
+        self._max_dimension = max_dimension
+        levels = [image]
+        while not fits_budget(levels[-1].size, max_pixels, max_dimension) \
+                and min(levels[-1].size) > 1:
+            levels.append(levels[-1].reduce(2))
+        levels.reverse()
+        self.levels: List[Image.Image] = levels
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, **kwargs) -> "ImagePyramid":
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+        return cls(image, **kwargs)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.levels) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(w * h * len(img.getbands()) for img in self.levels for w, h in [img.size])
+
+    def auto_level(self, box: Box) -> int:
+        """The most detailed level at which *box* fits the budget unscaled.
+
+        Falls back to level 0 (downscaled when rendered) for boxes too
+        large even there.
+        """
+        best = 0
+        for level in range(self.max_level + 1):
+            if not fits_budget(self._crop_size(level, box), self._max_pixels, self._max_dimension):
+                break
+            best = level
+        return best
+
+    def render(self, level: int, box: Box) -> Tuple[bytes, Tuple[int, int]]:
+        """JPEG bytes and pixel size of *box* at *level*, fitted to the budget."""
+        image = self.levels[level]
+        crop = image.crop(self._crop_px(level, box))
+        w, h = crop.size
+        if not fits_budget((w, h), self._max_pixels, self._max_dimension):
+            scale = min(
+                (self._max_pixels / (w * h)) ** 0.5,
+                self._max_dimension / max(w, h),
+            )
+            crop = crop.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.LANCZOS)
+        buf = io.BytesIO()
+        crop.save(buf, format="JPEG", quality=_JPEG_QUALITY)
+        return buf.getvalue(), crop.size
+
+    def _crop_px(self, level: int, box: Box) -> Tuple[int, int, int, int]:
+        w, h = self.levels[level].size
+        left, top, right, bottom = box
+        x0, y0 = int(left * w), int(top * h)
+        x1, y1 = max(x0 + 1, round(right * w)), max(y0 + 1, round(bottom * h))
+        return x0, y0, min(x1, w), min(y1, h)
+
+    def _crop_size(self, level: int, box: Box) -> Tuple[int, int]:
+        x0, y0, x1, y1 = self._crop_px(level, box)
+        return x1 - x0, y1 - y0
+
+
+class ImageTileCache:
+    """Pyramids and rendered regions, keyed by upload content hash."""
+
+    def __init__(
+        self,
+        *,
+        pyramid_budget_bytes: Optional[int] = None,
+        tile_budget_bytes: int = DEFAULT_TILE_BUDGET_BYTES,
+        max_pixels: int = DEFAULT_MAX_PIXELS,
+        max_dimension: int = DEFAULT_MAX_DIMENSION,
+    ) -> None:
+        self._pyramid_budget = (
+            pyramid_budget_bytes if pyramid_budget_bytes is not None else _pyramid_budget_bytes()
+        )
+        self._tile_budget = tile_budget_bytes
+        self._max_pixels = max_pixels
+        self._max_dimension = max_dimension
+        # Least recently used first
+        self._pyramids: "OrderedDict[str, ImagePyramid]" = OrderedDict()
+        self._pyramid_bytes = 0
+        self._tiles: "OrderedDict[Tuple[str, int, Box], Tile]" = OrderedDict()
+        self._tile_bytes = 0
+        self._by_stat: Dict[Tuple[str, int, int], str] = {}
+        # One decode per upload, even when several views of it run at once
+        self._decode_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def fits_one_view(self, size: Tuple[int, int]) -> bool:
+        return fits_budget(size, self._max_pixels, self._max_dimension)
+
+    def view(self, path: Path, box: Box = FULL_IMAGE, level: Optional[int] = None) -> Tile:
+        """Render *box* of the image at *path*; *level* defaults to ``auto_level``.
+
+        Levels above the pyramid's top are clamped.  Raises OSError if the
+        file is missing and PIL errors if it cannot be decoded.
+        """
+        digest, pyramid = self._pyramid(path)
+        if level is None:
+            level = pyramid.auto_level(box)
+        level = max(0, min(level, pyramid.max_level))
+        key = (digest, level, tuple(round(v, 4) for v in box))
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+
+        data, size = pyramid.render(level, box)
+        encoded = base64.b64encode(data).decode("ascii")
+        tile = Tile(
+            content=ContentBlock(
+                key=f"tile-{digest}-{level}-{'-'.join(str(v) for v in key[2])}",
+                block={"type": "image", "source": {
+                    "type": "base64", "media_type": "image/jpeg", "data": encoded,
+                }},
+                media_type="image/jpeg",
+                source_bytes=len(data),
+                encoded_bytes=len(encoded),
+            ),
+            level=level,
+            max_level=pyramid.max_level,
+            box=box,
+            size=size,
+            source_size=pyramid.source_size,
+        )
+        with self._lock:
+            self._tiles[key] = tile
+            self._tile_bytes += tile.content.encoded_bytes
+            while self._tile_bytes > self._tile_budget and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self._tile_bytes -= evicted.content.encoded_bytes
+        return tile
+
+    def _pyramid(self, path: Path) -> Tuple[str, ImagePyramid]:
+        st = path.stat()
+        stat_key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._by_stat.get(stat_key)
+            pyramid = self._touch_locked(digest) if digest else None
+        if pyramid is not None:
+            return digest, pyramid
+
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            if len(self._by_stat) >= _MAX_STAT_INDEX:
+                self._by_stat.clear()
+            self._by_stat[stat_key] = digest
+            decode_lock = self._decode_locks.setdefault(digest, threading.Lock())
+        try:
+            with decode_lock:
+                with self._lock:
+                    pyramid = self._touch_locked(digest)
+                if pyramid is None:
+                    pyramid = ImagePyramid.from_bytes(
+                        raw, max_pixels=self._max_pixels, max_dimension=self._max_dimension,
+                    )
+                    logger.info(
+                        "Built %d-level pyramid for %s (%dx%d)",
+                        pyramid.max_level + 1, path.name, *pyramid.source_size,
+                    )
+                    with self._lock:
+                        self._insert_locked(digest, pyramid)
+        finally:
+            # Also on a failed decode, or the lock would outlive the upload
+            with self._lock:
+                self._decode_locks.pop(digest, None)
+        return digest, pyramid
+
+    def _touch_locked(self, digest: str) -> Optional[ImagePyramid]:
+        pyramid = self._pyramids.get(digest)
+        if pyramid is not None:
+            self._pyramids.move_to_end(digest)
+        return pyramid
+
+    def _insert_locked(self, digest: str, pyramid: ImagePyramid) -> None:
+        self._pyramids[digest] = pyramid
+        self._pyramid_bytes += pyramid.nbytes
+        # The newest pyramid stays even if it alone exceeds the budget
+        while self._pyramid_bytes > self._pyramid_budget and len(self._pyramids) > 1:
+            _, evicted = self._pyramids.popitem(last=False)
+            self._pyramid_bytes -= evicted.nbytes
+
+
+def _pyramid_budget_bytes() -> int:
+    raw = os.getenv("LEMON_IMAGE_PYRAMID_CACHE_MB", "").strip()
+    try:
+        mb = int(raw) if raw else _DEFAULT_PYRAMID_CACHE_MB
+    except ValueError:
+        mb = _DEFAULT_PYRAMID_CACHE_MB
+    return max(mb, 1) * 1024 * 1024
+
+
+_cache = ImageTileCache()
+
+
+def get_image_tile_cache() -> ImageTileCache:
+    return _cache
+
+
+def set_image_tile_cache(cache: ImageTileCache) -> ImageTileCache:
+    """Install the process-wide cache; returns the previous one."""
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
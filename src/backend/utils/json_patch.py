@@ -0,0 +1,140 @@
+"""Minimal RFC 6902 JSON Patch: diff two JSON documents and apply the result.
+
+Only ``add``, ``remove`` and ``replace`` are produced.  Lists are diffed by
+trimming the common prefix/suffix, so the usual canvas edits (append a node,
+delete one, change a field) yield a handful of operations instead of a
+cascade of index shifts.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch does not apply to the given document."""
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any) -> Patch:
+    """Return the operations that turn *old* into *new*."""
+    ops: Patch = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: Patch) -> None:
+    if type(old) is not type(new):
+        ops.append({"op": "replace", "path": path, "value": new})
+    elif isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(old[key], value, child, ops)
+    elif isinstance(old, list):
+        _diff_list(old, new, path, ops)
+    elif old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def _diff_list(old: List[Any], new: List[Any], path: str, ops: Patch) -> None:
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    old_mid, new_mid = old_end - start, new_end - start
+    # Patch the overlapping part of the changed region in place, then drop
+    # surplus old elements (back to front) or insert the extra new ones
+    common = min(old_mid, new_mid)
+    for i in range(start, start + common):
+        _diff(old[i], new[i], f"{path}/{i}", ops)
+    for i in range(old_end - 1, start + common - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{i}"})
+    at_end = old_end == len(old)
+    for i in range(start + common, new_end):
+        target = "-" if at_end else str(i)
+        ops.append({"op": "add", "path": f"{path}/{target}", "value": new[i]})
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    """Return a copy of *doc* with *patch* applied; *doc* is not modified."""
+    result = copy.deepcopy(doc)
+    for op in patch:
+        result = _apply_op(result, op)
+    return result
+
+
+def _apply_op(doc: Any, op: Dict[str, Any]) -> Any:
+    kind = op.get("op")
+    path = op.get("path", "")
+    if path == "":
+        if kind in ("add", "replace"):
+            return copy.deepcopy(op.get("value"))
+        raise JsonPatchError(f"Cannot {kind} the document root")
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid pointer: {path!r}")
+    *parents, last = [_unescape(t) for t in path[1:].split("/")]
+    target = doc
+    for token in parents:
+        target = _child(target, token, path)
+    if isinstance(target, dict):
+        if kind == "add" or (kind == "replace" and last in target):
+            target[last] = copy.deepcopy(op.get("value"))
+        elif kind == "remove" and last in target:
+            del target[last]
+        else:
+            raise JsonPatchError(f"Cannot {kind} missing member {path!r}")
+    elif isinstance(target, list):
+        if kind == "add" and last == "-":
+            target.append(copy.deepcopy(op.get("value")))
+            return doc
+        index = _index(last, path)
+        bound = len(target) if kind == "add" else len(target) - 1
+        if index > bound:
+            raise JsonPatchError(f"Index out of range: {path!r}")
+        if kind == "add":
+            target.insert(index, copy.deepcopy(op.get("value")))
+        elif kind == "replace":
+            target[index] = copy.deepcopy(op.get("value"))
+        elif kind == "remove":
+            del target[index]
+        else:
+            raise JsonPatchError(f"Unsupported op: {kind!r}")
+    else:
+        raise JsonPatchError(f"Cannot traverse into scalar at {path!r}")
+    return doc
+
+
+def _child(target: Any, token: str, path: str) -> Any:
+    if isinstance(target, dict) and token in target:
+        return target[token]
+    if isinstance(target, list):
+        index = _index(token, path)
+        if index < len(target):
+            return target[index]
+    raise JsonPatchError(f"Path not found: {path!r}")
+
+
+def _index(token: str, path: str) -> int:
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JsonPatchError(f"Invalid array index in {path!r}")
+    return int(token)
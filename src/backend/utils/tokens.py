@@ -1,21 +1,38 @@
-"""Token usage tracking helpers."""
+"""Token usage tracking helpers.
+
+Usage is appended to a SQLite ledger (``storage.token_ledger``) that keeps
+running totals per model, day, session and conversation.  The old
+``tokens_usage.json`` / ``tokens.json`` files are imported on first use.
+"""
 
 from __future__ import annotations
 
-import json
 import os
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from threading import Lock
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
+from ..storage.token_ledger import USAGE_KEYS, TokenLedger
 from .paths import lemon_data_dir
 
 _LOCK = Lock()
 _SESSION_ID = os.environ.get("LEMON_TOKEN_SESSION_ID") or uuid.uuid4().hex
 _SESSION_STARTED_AT = datetime.now(timezone.utc).isoformat()
 
+# Raw events kept in the ledger; older ones are trimmed (totals are kept).
+_MAX_LOG_ENTRIES = 10_000
+
+_ledger: Optional[TokenLedger] = None
+
+
+def _tokens_db_path() -> Path:
+    env_path = os.environ.get("LEMON_TOKENS_DB")
+    if env_path:
+        return Path(env_path)
+    return lemon_data_dir() / "token_usage.sqlite"
+
 
 def _tokens_summary_path() -> Path:
     env_path = os.environ.get("LEMON_TOKENS_FILE")
@@ -30,89 +47,34 @@ def _tokens_log_path() -> Path:
     return lemon_data_dir() / "tokens_usage.json"
 
 
-def _empty_usage() -> Dict[str, int]:
-    return {
-        "input_tokens": 0,
-        "output_tokens": 0,
-        "total_tokens": 0,
-        "cache_creation_input_tokens": 0,
-        "cache_read_input_tokens": 0,
-    }
-
-
-def _load_json_list(path: Path) -> List[Dict[str, Any]]:
-    if not path.exists():
-        return []
-    try:
-        raw = path.read_text(encoding="utf-8").strip()
-        if not raw:
-            return []
-        loaded = json.loads(raw)
-        return loaded if isinstance(loaded, list) else []
-    except (OSError, json.JSONDecodeError):
-        return []
-
-
-def _write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = path.with_suffix(".json.tmp")
-    tmp_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
-    tmp_path.replace(path)
-
-
-def _update_summary(entry: Dict[str, Any]) -> None:
-    summary_path = _tokens_summary_path()
-    summary: Dict[str, Any] = {}
-    if summary_path.exists():
-        try:
-            raw = summary_path.read_text(encoding="utf-8").strip()
-            if raw:
-                loaded = json.loads(raw)
-                if isinstance(loaded, dict):
-                    summary = loaded
-        except (OSError, json.JSONDecodeError):
-            summary = {}
-
-    total_usage = summary.get("total") if isinstance(summary.get("total"), dict) else _empty_usage()
-    recent_usage = summary.get("recent_session") if isinstance(summary.get("recent_session"), dict) else _empty_usage()
-
-    if summary.get("recent_session_id") != _SESSION_ID:
-        recent_usage = _empty_usage()
-
-    usage = entry.get("usage")
-    if isinstance(usage, dict):
-        for key, value in usage.items():
-            if not isinstance(value, int):
-                continue
-            total_usage[key] = int(total_usage.get(key, 0)) + value
-            recent_usage[key] = int(recent_usage.get(key, 0)) + value
-
-    summary = {
-        "total": total_usage,
-        "recent_session": recent_usage,
-        "recent_session_id": _SESSION_ID,
-        "recent_session_started_at": _SESSION_STARTED_AT,
-        "updated_at": entry.get("timestamp") or datetime.now(timezone.utc).isoformat(),
-    }
-    _write_json(summary_path, summary)
-
-
-# Cap the token usage log to prevent unbounded growth.
-# Oldest entries are dropped when the limit is exceeded.
-_MAX_LOG_ENTRIES = 10_000
+def get_token_ledger() -> TokenLedger:
+    """Return the process-wide ledger, opening (and migrating) it on first use."""
+    global _ledger
+    db_path = _tokens_db_path()
+    with _LOCK:
+        if _ledger is None or _ledger.db_path != db_path:
+            ledger = TokenLedger(db_path, max_events=_MAX_LOG_ENTRIES)
+            ledger.import_legacy_json(_tokens_log_path(), _tokens_summary_path())
+            _ledger = ledger
+        return _ledger
 
 
 def record_token_usage(entry: Dict[str, Any]) -> None:
     entry = dict(entry)
     entry.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
     entry.setdefault("session_id", _SESSION_ID)
-    log_path = _tokens_log_path()
+    get_token_ledger().record(entry)
 
-    with _LOCK:
-        log_entries = _load_json_list(log_path)
-        log_entries.append(entry)
-        # Drop oldest entries to prevent the log file from growing forever
-        if len(log_entries) > _MAX_LOG_ENTRIES:
-            log_entries = log_entries[-_MAX_LOG_ENTRIES:]
-        _write_json(log_path, log_entries)
-        _update_summary(entry)
+
+def get_token_summary() -> Dict[str, Any]:
+    """Lifetime and current-session totals, in the shape ``tokens.json`` had."""
+    ledger = get_token_ledger()
+    total = ledger.totals()
+    session = ledger.session_usage(_SESSION_ID)
+    return {
+        "total": {k: total[k] for k in USAGE_KEYS},
+        "recent_session": {k: session[k] for k in USAGE_KEYS},
+        "recent_session_id": _SESSION_ID,
+        "recent_session_started_at": _SESSION_STARTED_AT,
+        "updated_at": total["updated_at"],
+    }
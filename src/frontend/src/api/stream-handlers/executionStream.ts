@@ -0,0 +1,68 @@
+/**
+ * Decoder for the compact stepped-execution stream.
+ *
+ * Mirrors ExecutionStreamDecoder in src/backend/tasks/execution_stream.py:
+ * `subflow_definition` events are cached by (subworkflow_id, version),
+ * `subflow_start` is expanded back to carry nodes/edges, and
+ * `execution_step` context deltas are folded into the full context
+ * (restarted by `execution_seek`).
+ * Verbose events pass through unchanged.
+ */
+
+type Payload = Record<string, unknown>
+type Handlers = Record<string, (data: unknown) => void>
+
+type Definition = { nodes: unknown[]; edges: unknown[] }
+
+export class ExecutionStreamDecoder {
+  private definitions = new Map<string, Definition>()
+  private context: Payload = {}
+
+  /** Return the verbose payload for `event`, or null if it is consumed. */
+  decode(event: string, data: Payload): Payload | null {
+    if (event === 'subflow_definition') {
+      this.definitions.set(`${data.subworkflow_id}@${data.version}`, {
+        nodes: (data.nodes as unknown[]) ?? [],
+        edges: (data.edges as unknown[]) ?? [],
+      })
+      return null
+    }
+    if (event === 'execution_seek') {
+      this.context = {}
+      return data
+    }
+    if (event === 'subflow_start' && 'definition_version' in data) {
+      const { definition_version: version, ...rest } = data
+      const definition = this.definitions.get(`${data.subworkflow_id}@${version}`)
+      if (!definition) {
+        throw new Error(`Unknown subworkflow definition ${data.subworkflow_id}@${version}`)
+      }
+      return { ...rest, nodes: definition.nodes, edges: definition.edges }
+    }
+    if (event === 'execution_step' && 'context_delta' in data) {
+      const { context_delta: delta, context_removed: removed, ...rest } = data
+      Object.assign(this.context, delta as Payload)
+      for (const key of (removed as string[] | undefined) ?? []) {
+        delete this.context[key]
+      }
+      return { ...rest, context: { ...this.context } }
+    }
+    return data
+  }
+}
+
+/** Wrap an execution handler map so it receives verbose payloads. */
+export function withExecutionStreamDecoding(handlers: Handlers): Handlers {
+  const decoder = new ExecutionStreamDecoder()
+  const decoding = (event: string) => (rawData: unknown) => {
+    const decoded = decoder.decode(event, rawData as Payload)
+    if (decoded !== null) handlers[event]?.(decoded)
+  }
+  return {
+    ...handlers,
+    subflow_definition: decoding('subflow_definition'),
+    subflow_start: decoding('subflow_start'),
+    execution_step: decoding('execution_step'),
+    execution_seek: decoding('execution_seek'),
+  }
+}
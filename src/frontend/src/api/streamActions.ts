@@ -3,11 +3,13 @@
  *
  * Chat: POST /api/chat/send → SSE stream
  * Execution: POST /api/workflows/{id}/execute → SSE stream
- * Pause/Resume/Stop: POST /api/executions/{id}/pause|resume|stop → JSON
+ * Pause/Resume/Stop/Step/Seek/Speed: POST /api/executions/{id}/<action> → JSON
  *
  * Exports: sendChatMessage, cancelChatTask, resumeTask,
  *          startWorkflowExecution, pauseWorkflowExecution,
- *          resumeWorkflowExecution, stopWorkflowExecution
+ *          resumeWorkflowExecution, stopWorkflowExecution,
+ *          stepWorkflowExecution, seekWorkflowExecution,
+ *          setWorkflowExecutionSpeed
  */
 import { getSessionId, api } from './client'
 import { createSSEStream, type SSEStream } from './sse'
@@ -16,6 +18,8 @@ import { useWorkflowStore } from '../stores/workflowStore'
 import { useUIStore } from '../stores/uiStore'
 import { transformFlowchartFromBackend, transformNodeFromBackend } from '../utils/canvas'
 import { beautifyNodes } from '../utils/beautifyNodes'
+import { applyJsonPatch, type JsonPatchOp } from '../utils/jsonPatch'
+import { withExecutionStreamDecoding } from './stream-handlers/executionStream'
 import type {
   WorkflowAnalysis,
   FlowNode,
@@ -32,6 +36,10 @@ const _activeStreams = new Map<string, SSEStream>()
 // Separate map for execution SSE streams (one execution at a time, keyed by executionId)
 const _activeExecutionStreams = new Map<string, SSEStream>()
 
+// Last versioned workflow state per workflow — the base that
+// workflow_state_patch deltas apply to.
+const _workflowStateBases = new Map<string, { version: number; state: WorkflowStateUpdatedPayload }>()
+
 type StreamEventHandlerMap = Record<string, (data: unknown) => void>
 
 type ChatProgressPayload = {
@@ -90,6 +98,14 @@ type WorkflowStateUpdatedPayload = {
   workflow_id?: string
   workflow?: { nodes?: FlowNode[]; edges?: FlowEdge[] }
   analysis?: WorkflowStateAnalysisPayload
+  version?: number
+}
+
+type WorkflowStatePatchPayload = {
+  workflow_id?: string
+  base_version?: number
+  version?: number
+  patch?: JsonPatchOp[]
 }
 
 type AnalysisUpdatedPayload = {
@@ -140,6 +156,13 @@ type ExecutionStepPayload = ExecutionLifecyclePayload & {
   node_id: string
 }
 
+type ExecutionSeekPayload = ExecutionLifecyclePayload & {
+  frame: number
+  frames: number
+  current_node_id: string | null
+  executed_node_ids: string[]
+}
+
 type ExecutionCompletePayload = ExecutionLifecyclePayload & {
   success?: boolean
   output?: unknown
@@ -205,6 +228,49 @@ type OpenTabPayload = {
  * Includes handlers for builder events (subworkflow_created, etc.) that
  * now flow through the parent ChatTask's EventSink.
  */
+/**
+ * Push a full workflow state (snapshot or patched) into the canvas stores.
+ */
+function _applyWorkflowState(data: WorkflowStateUpdatedPayload): void {
+  const workflowStore = useWorkflowStore.getState()
+  const currentId = workflowStore.currentWorkflow?.id
+  if (currentId && data.workflow_id !== currentId) return
+  if (data.workflow) {
+    const flowchart = transformFlowchartFromBackend(data.workflow)
+    workflowStore.setFlowchartSilent(flowchart)
+  }
+  if (data.analysis) {
+    const currentAnalysis = workflowStore.currentAnalysis ?? { variables: [], outputs: [] }
+    const updatedAnalysis: WorkflowAnalysis = {
+      ...currentAnalysis,
+      variables: (data.analysis.variables ?? currentAnalysis.variables) as WorkflowAnalysis['variables'],
+      outputs: (data.analysis.outputs ?? currentAnalysis.outputs) as WorkflowAnalysis['outputs'],
+      ...(data.analysis.output_type ? { output_type: data.analysis.output_type } : {}),
+    }
+    workflowStore.setAnalysis(updatedAnalysis)
+  }
+}
+
+/**
+ * Fetch a full workflow state snapshot after a missed or unappliable delta.
+ * Deltas that arrive before the snapshot will resync again — harmless.
+ */
+function _resyncWorkflowState(workflowId: string): void {
+  _workflowStateBases.delete(workflowId)
+  api.post<WorkflowStateUpdatedPayload & { status?: string }>(
+    '/api/chat/resync', { workflow_id: workflowId },
+  ).then((snapshot) => {
+    if (snapshot.status !== 'ok' || typeof snapshot.version !== 'number') return
+    _workflowStateBases.set(workflowId, {
+      version: snapshot.version,
+      state: { workflow: snapshot.workflow, analysis: snapshot.analysis },
+    })
+    _applyWorkflowState({ ...snapshot, workflow_id: workflowId })
+  }).catch((err) => {
+    console.error('[SSE] workflow state resync failed:', err)
+  })
+}
+
 function _buildChatSSEHandlers(workflowId: string) {
   return {
     // SSE keepalive comment — proves the connection is alive even when
@@ -403,28 +469,42 @@ function _buildChatSSEHandlers(workflowId: string) {
     'workflow_state_updated': (rawData: unknown) => {
       const data = rawData as WorkflowStateUpdatedPayload
       console.log('[SSE] workflow_state_updated')
-      const workflowStore = useWorkflowStore.getState()
       // Drop events without workflow_id — cannot be safely routed.
       if (!data.workflow_id) {
         console.warn('[SSE] workflow_state_updated dropped: missing workflow_id')
         return
       }
-      const currentId = workflowStore.currentWorkflow?.id
-      if (currentId && data.workflow_id !== currentId) return
-      if (data.workflow) {
-        const flowchart = transformFlowchartFromBackend(data.workflow)
-        workflowStore.setFlowchartSilent(flowchart)
+      if (typeof data.version === 'number') {
+        _workflowStateBases.set(data.workflow_id, {
+          version: data.version,
+          state: { workflow: data.workflow, analysis: data.analysis },
+        })
       }
-      if (data.analysis) {
-        const currentAnalysis = workflowStore.currentAnalysis ?? { variables: [], outputs: [] }
-        const updatedAnalysis: WorkflowAnalysis = {
-          ...currentAnalysis,
-          variables: (data.analysis.variables ?? currentAnalysis.variables) as WorkflowAnalysis['variables'],
-          outputs: (data.analysis.outputs ?? currentAnalysis.outputs) as WorkflowAnalysis['outputs'],
-          ...(data.analysis.output_type ? { output_type: data.analysis.output_type } : {}),
-        }
-        workflowStore.setAnalysis(updatedAnalysis)
+      _applyWorkflowState(data)
+    },
+
+    'workflow_state_patch': (rawData: unknown) => {
+      const data = rawData as WorkflowStatePatchPayload
+      if (!data.workflow_id) {
+        console.warn('[SSE] workflow_state_patch dropped: missing workflow_id')
+        return
+      }
+      const base = _workflowStateBases.get(data.workflow_id)
+      if (!base || base.version !== data.base_version || typeof data.version !== 'number') {
+        console.warn('[SSE] workflow_state_patch gap — resyncing', base?.version, data.base_version)
+        _resyncWorkflowState(data.workflow_id)
+        return
       }
+      let state: WorkflowStateUpdatedPayload
+      try {
+        state = applyJsonPatch(base.state, data.patch ?? [])
+      } catch (err) {
+        console.warn('[SSE] workflow_state_patch failed to apply — resyncing', err)
+        _resyncWorkflowState(data.workflow_id)
+        return
+      }
+      _workflowStateBases.set(data.workflow_id, { version: data.version, state })
+      _applyWorkflowState({ ...state, workflow_id: data.workflow_id })
     },
 
     'analysis_updated': (rawData: unknown) => {
@@ -839,6 +919,15 @@ function _buildExecutionSSEHandlers(executionId: string) {
       }
     },
 
+    // Playback jumped to another frame of the recorded trace
+    'execution_seek': (rawData: unknown) => {
+      const data = rawData as ExecutionSeekPayload
+      console.log('[SSE] execution_seek:', data)
+      const workflowStore = useWorkflowStore.getState()
+      if (workflowStore.execution.executionId !== data.execution_id) return
+      workflowStore.seekExecution(data.executed_node_ids, data.current_node_id)
+    },
+
     // Execution resumed
     'execution_resumed': (rawData: unknown) => {
       const data = rawData as ExecutionLifecyclePayload
@@ -1061,7 +1150,7 @@ export function startWorkflowExecution(
   workflowStore.startExecution(executionId)
 
   // Build SSE handlers and open the execution stream
-  const handlers = _buildExecutionSSEHandlers(executionId)
+  const handlers = withExecutionStreamDecoding(_buildExecutionSSEHandlers(executionId))
   const stream = createSSEStream(
     `/api/workflows/${currentWorkflow.id}/execute`,
     {
@@ -1117,6 +1206,47 @@ export function resumeWorkflowExecution(): void {
 }
 
 /** Stop the currently executing workflow */
+/** Play a single step of a paused workflow execution */
+export function stepWorkflowExecution(): void {
+  const execution = useWorkflowStore.getState().execution
+
+  if (!execution.isPaused || !execution.executionId) {
+    console.warn('[SSE] No paused execution to step')
+    return
+  }
+
+  api.post(`/api/executions/${execution.executionId}/step`).catch((err) => {
+    console.error('[SSE] Step failed:', err.message)
+  })
+}
+
+/** Jump playback to a frame of the recorded execution trace */
+export function seekWorkflowExecution(frame: number): void {
+  const execution = useWorkflowStore.getState().execution
+
+  if (!execution.isExecuting || !execution.executionId) {
+    console.warn('[SSE] No active execution to seek')
+    return
+  }
+
+  api.post(`/api/executions/${execution.executionId}/seek`, { frame }).catch((err) => {
+    console.error('[SSE] Seek failed:', err.message)
+  })
+}
+
+/** Change the step delay, including for an execution already playing */
+export function setWorkflowExecutionSpeed(speedMs: number): void {
+  const workflowStore = useWorkflowStore.getState()
+  workflowStore.setExecutionSpeed(speedMs)
+
+  const execution = workflowStore.execution
+  if (!execution.isExecuting || !execution.executionId) return
+
+  api.post(`/api/executions/${execution.executionId}/speed`, { speed_ms: speedMs }).catch((err) => {
+    console.error('[SSE] Speed change failed:', err.message)
+  })
+}
+
 export function stopWorkflowExecution(): void {
   const workflowStore = useWorkflowStore.getState()
   const execution = workflowStore.execution
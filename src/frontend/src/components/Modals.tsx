@@ -9,6 +9,8 @@ import {
   pauseWorkflowExecution,
   resumeWorkflowExecution,
   stopWorkflowExecution,
+  stepWorkflowExecution,
+  setWorkflowExecutionSpeed,
 } from '../api/streamActions'
 import WorkflowBrowser from './WorkflowBrowser'
 import type { Flowchart, Workflow, WorkflowAnalysis, WorkflowVariable } from '../types'
@@ -556,7 +558,6 @@ function ExecuteWorkflowForm() {
     flowchart,
     currentAnalysis,
     execution,
-    setExecutionSpeed,
     clearExecution,
     inputValues: persistedValues,
     setInputValues: setGlobalInputValues,
@@ -610,9 +611,9 @@ function ExecuteWorkflowForm() {
   const handleSpeedChange = useCallback(
     (e: React.ChangeEvent<HTMLInputElement>) => {
       const value = parseInt(e.target.value, 10)
-      setExecutionSpeed(value)
+      setWorkflowExecutionSpeed(value)
     },
-    [setExecutionSpeed]
+    []
   )
 
   // Start execution - closes modal immediately so user can watch canvas
@@ -865,12 +866,20 @@ function ExecuteWorkflowForm() {
         ) : (
           <>
             {execution.isPaused ? (
-              <button className="primary" onClick={resumeWorkflowExecution}>
-                <svg viewBox="0 0 24 24" fill="currentColor" width="16" height="16">
-                  <path d="M8 5v14l11-7z" />
-                </svg>
-                Resume
-              </button>
+              <>
+                <button className="primary" onClick={resumeWorkflowExecution}>
+                  <svg viewBox="0 0 24 24" fill="currentColor" width="16" height="16">
+                    <path d="M8 5v14l11-7z" />
+                  </svg>
+                  Resume
+                </button>
+                <button className="ghost" onClick={stepWorkflowExecution}>
+                  <svg viewBox="0 0 24 24" fill="currentColor" width="16" height="16">
+                    <path d="M6 5v14l9-7zM16 5h2v14h-2z" />
+                  </svg>
+                  Step
+                </button>
+              </>
             ) : (
               <button className="ghost" onClick={pauseWorkflowExecution}>
                 <svg viewBox="0 0 24 24" fill="currentColor" width="16" height="16">
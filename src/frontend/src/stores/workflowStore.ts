@@ -132,6 +132,7 @@ interface WorkflowState {
   pauseExecution: () => void
   resumeExecution: () => void
   stopExecution: () => void
+  seekExecution: (executedNodeIds: string[], executingNodeId: string | null) => void
   setExecutingNode: (nodeId: string | null) => void
   markNodeExecuted: (nodeId: string) => void
   setExecutionSpeed: (speed: number) => void
@@ -645,6 +646,18 @@ export const useWorkflowStore = create<WorkflowState>((set, get) => ({
     },
   })),
 
+  // Rewinds or fast-forwards the trail after a playback seek (seeks land in the main flow)
+  seekExecution: (executedNodeIds, executingNodeId) => set((state) => ({
+    execution: {
+      ...state.execution,
+      executingNodeId,
+      executedNodeIds: executedNodeIds.filter((id) => id !== executingNodeId),
+      executionPath: executedNodeIds,
+      logIndentationStack: [],
+    },
+    subflowStack: [],
+  })),
+
   // Sets the currently executing node (highlights it)
   setExecutingNode: (nodeId: string | null) => set((state) => ({
     execution: {
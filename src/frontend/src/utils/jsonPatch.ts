@@ -0,0 +1,92 @@
+/**
+ * Minimal RFC 6902 JSON Patch applier (add / remove / replace).
+ *
+ * Mirrors src/backend/utils/json_patch.py, which produces the
+ * workflow_state_patch deltas. Throws JsonPatchError when an operation
+ * does not fit the document — callers should resync from a snapshot.
+ */
+
+export type JsonPatchOp = {
+  op: 'add' | 'remove' | 'replace'
+  path: string
+  value?: unknown
+}
+
+export class JsonPatchError extends Error {
+  constructor(message: string) {
+    super(message)
+    this.name = 'JsonPatchError'
+  }
+}
+
+function unescapeToken(token: string): string {
+  return token.replace(/~1/g, '/').replace(/~0/g, '~')
+}
+
+function parseIndex(token: string, path: string): number {
+  if (!/^(0|[1-9][0-9]*)$/.test(token)) {
+    throw new JsonPatchError(`Invalid array index in ${path}`)
+  }
+  return Number(token)
+}
+
+function isRecord(value: unknown): value is Record<string, unknown> {
+  return typeof value === 'object' && value !== null && !Array.isArray(value)
+}
+
+/** Return a patched copy of `doc`; `doc` itself is not modified. */
+export function applyJsonPatch<T>(doc: T, ops: JsonPatchOp[]): T {
+  let result: unknown = structuredClone(doc)
+  for (const op of ops) {
+    result = applyOp(result, op)
+  }
+  return result as T
+}
+
+function applyOp(doc: unknown, op: JsonPatchOp): unknown {
+  const { path } = op
+  if (path === '') {
+    if (op.op === 'remove') throw new JsonPatchError('Cannot remove the document root')
+    return structuredClone(op.value)
+  }
+  if (!path.startsWith('/')) throw new JsonPatchError(`Invalid pointer: ${path}`)
+
+  const tokens = path.slice(1).split('/').map(unescapeToken)
+  const last = tokens.pop() as string
+  let target: unknown = doc
+  for (const token of tokens) {
+    if (Array.isArray(target)) {
+      const index = parseIndex(token, path)
+      if (index >= target.length) throw new JsonPatchError(`Path not found: ${path}`)
+      target = target[index]
+    } else if (isRecord(target) && token in target) {
+      target = target[token]
+    } else {
+      throw new JsonPatchError(`Path not found: ${path}`)
+    }
+  }
+
+  if (Array.isArray(target)) {
+    if (op.op === 'add' && last === '-') {
+      target.push(structuredClone(op.value))
+      return doc
+    }
+    const index = parseIndex(last, path)
+    const bound = op.op === 'add' ? target.length : target.length - 1
+    if (index > bound) throw new JsonPatchError(`Index out of range: ${path}`)
+    if (op.op === 'add') target.splice(index, 0, structuredClone(op.value))
+    else if (op.op === 'replace') target[index] = structuredClone(op.value)
+    else target.splice(index, 1)
+  } else if (isRecord(target)) {
+    if (op.op === 'add' || (op.op === 'replace' && last in target)) {
+      target[last] = structuredClone(op.value)
+    } else if (op.op === 'remove' && last in target) {
+      delete target[last]
+    } else {
+      throw new JsonPatchError(`Cannot ${op.op} missing member ${path}`)
+    }
+  } else {
+    throw new JsonPatchError(`Cannot traverse into scalar at ${path}`)
+  }
+  return doc
+}
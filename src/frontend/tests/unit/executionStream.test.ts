@@ -0,0 +1,62 @@
+import { describe, it, expect, vi } from 'vitest'
+import {
+  ExecutionStreamDecoder,
+  withExecutionStreamDecoding,
+} from '../../src/api/stream-handlers/executionStream'
+
+describe('ExecutionStreamDecoder', () => {
+  it('expands subflow_start from a cached definition', () => {
+    const decoder = new ExecutionStreamDecoder()
+    const nodes = [{ id: 'a' }]
+    expect(decoder.decode('subflow_definition', {
+      subworkflow_id: 'wf_sub', version: 'v1', nodes, edges: [],
+    })).toBeNull()
+
+    const start = { execution_id: 'e', subworkflow_id: 'wf_sub', definition_version: 'v1' }
+    expect(decoder.decode('subflow_start', start)).toEqual({
+      execution_id: 'e', subworkflow_id: 'wf_sub', nodes, edges: [],
+    })
+  })
+
+  it('throws for an unknown definition', () => {
+    const decoder = new ExecutionStreamDecoder()
+    expect(() => decoder.decode('subflow_start', {
+      subworkflow_id: 'wf_sub', definition_version: 'missing',
+    })).toThrow()
+  })
+
+  it('folds context deltas into the full context', () => {
+    const decoder = new ExecutionStreamDecoder()
+    decoder.decode('execution_step', { node_id: 'a', context_delta: { x: 1, y: 2 } })
+    const step = decoder.decode('execution_step', {
+      node_id: 'b', context_delta: { x: 3 }, context_removed: ['y'],
+    })
+    expect(step).toEqual({ node_id: 'b', context: { x: 3 } })
+  })
+
+  it('restarts the context chain on execution_seek', () => {
+    const decoder = new ExecutionStreamDecoder()
+    decoder.decode('execution_step', { node_id: 'a', context_delta: { x: 1, y: 2 } })
+    decoder.decode('execution_seek', { frame: 0, executed_node_ids: [] })
+    const step = decoder.decode('execution_step', { node_id: 'a', context_delta: { x: 1 } })
+    expect(step).toEqual({ node_id: 'a', context: { x: 1 } })
+  })
+
+  it('passes verbose events through', () => {
+    const decoder = new ExecutionStreamDecoder()
+    const step = { node_id: 'a', context: { x: 1 } }
+    expect(decoder.decode('execution_step', step)).toBe(step)
+  })
+})
+
+describe('withExecutionStreamDecoding', () => {
+  it('hands decoded payloads to the wrapped handlers', () => {
+    const subflowStart = vi.fn()
+    const handlers = withExecutionStreamDecoding({ subflow_start: subflowStart })
+
+    handlers.subflow_definition({ subworkflow_id: 's', version: 'v', nodes: [], edges: [] })
+    handlers.subflow_start({ subworkflow_id: 's', definition_version: 'v' })
+
+    expect(subflowStart).toHaveBeenCalledWith({ subworkflow_id: 's', nodes: [], edges: [] })
+  })
+})
@@ -0,0 +1,31 @@
+import { describe, it, expect } from 'vitest'
+import { applyJsonPatch, JsonPatchError } from '../../src/utils/jsonPatch'
+
+describe('applyJsonPatch', () => {
+  it('applies add, remove and replace without mutating the input', () => {
+    const doc = { workflow: { nodes: [{ id: 'a', label: 'A' }, { id: 'b' }], edges: [] as unknown[] } }
+    const result = applyJsonPatch(doc, [
+      { op: 'replace', path: '/workflow/nodes/0/label', value: 'Renamed' },
+      { op: 'remove', path: '/workflow/nodes/1' },
+      { op: 'add', path: '/workflow/nodes/-', value: { id: 'c' } },
+      { op: 'add', path: '/workflow/edges/0', value: { from: 'a', to: 'c' } },
+    ])
+    expect(result.workflow.nodes).toEqual([{ id: 'a', label: 'Renamed' }, { id: 'c' }])
+    expect(result.workflow.edges).toEqual([{ from: 'a', to: 'c' }])
+    expect(doc.workflow.nodes).toHaveLength(2)
+  })
+
+  it('unescapes ~0 and ~1 in pointer tokens', () => {
+    const result = applyJsonPatch({ 'a/b': { '~c': 1 } }, [
+      { op: 'replace', path: '/a~1b/~0c', value: 2 },
+    ])
+    expect(result).toEqual({ 'a/b': { '~c': 2 } })
+  })
+
+  it('throws on paths that do not exist', () => {
+    expect(() => applyJsonPatch({ nodes: [] }, [{ op: 'remove', path: '/nodes/0' }]))
+      .toThrow(JsonPatchError)
+    expect(() => applyJsonPatch({ a: 1 }, [{ op: 'replace', path: '/b', value: 2 }]))
+      .toThrow(JsonPatchError)
+  })
+})
@@ -13,14 +13,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import pytest
-import tempfile
 from pathlib import Path
 from typing import Any, Dict, Generator, Tuple
 from uuid import uuid4
 
 from src.backend.agents.orchestrator import Orchestrator
 from src.backend.agents.orchestrator_factory import build_orchestrator
-from src.backend.storage.workflows import WorkflowStore
+from src.backend.storage.memory import InMemoryWorkflowStore
+from src.backend.storage.protocols import WorkflowStorage
 from src.backend.tools.constants import generate_workflow_id
 
 
@@ -58,12 +58,13 @@ def _repo_root() -> Path:
 
 
 @pytest.fixture
-def workflow_store() -> Generator[WorkflowStore, None, None]:
-    """Create a temporary workflow store for testing."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test_workflows.sqlite"
-        store = WorkflowStore(db_path)
-        yield store
+def workflow_store() -> Generator[WorkflowStorage, None, None]:
+    """Create a fresh in-memory workflow store for testing.
+
+    SQLite-specific behaviour (schema, migrations, on-disk persistence) is
+    covered by tests that construct a WorkflowStore explicitly.
+    """
+    yield InMemoryWorkflowStore()
 
 
 @pytest.fixture
@@ -73,7 +74,7 @@ def test_user_id() -> str:
 
 
 @pytest.fixture
-def session_state(workflow_store: WorkflowStore, test_user_id: str) -> Dict[str, Any]:
+def session_state(workflow_store: WorkflowStorage, test_user_id: str) -> Dict[str, Any]:
     """Create a session state dict with workflow_store and user_id."""
     return {
         "workflow_store": workflow_store,
@@ -83,7 +84,7 @@ def session_state(workflow_store: WorkflowStore, test_user_id: str) -> Dict[str,
 
 @pytest.fixture
 def create_test_workflow(
-    workflow_store: WorkflowStore,
+    workflow_store: WorkflowStorage,
     test_user_id: str,
     session_state: Dict[str, Any],
 ):
@@ -110,7 +111,7 @@ def create_test_workflow(
 
 
 def make_session_with_workflow(
-    workflow_store: WorkflowStore,
+    workflow_store: WorkflowStorage,
     user_id: str,
     nodes: list = None,
     edges: list = None,
@@ -147,11 +148,11 @@ def make_session_with_workflow(
 
 
 @pytest.fixture
-def orchestrator_with_workflow(tmp_path) -> Orchestrator:
-    """Create an orchestrator backed by a real SQLite WorkflowStore.
+def orchestrator_with_workflow() -> Orchestrator:
+    """Create an orchestrator backed by an in-memory workflow store.
 
     Sets up:
-    - WorkflowStore with a test workflow record in the DB
+    - InMemoryWorkflowStore with a test workflow record
     - orchestrator.current_workflow_id pointing to that workflow
     - orchestrator.user_id set to a test user
 
@@ -160,9 +161,7 @@ def orchestrator_with_workflow(tmp_path) -> Orchestrator:
     """
     orch = build_orchestrator(repo_root=_repo_root())
 
-    # Create real SQLite workflow store in tmp_path
-    db_path = tmp_path / "test_workflows.sqlite"
-    workflow_store = WorkflowStore(db_path)
+    workflow_store = InMemoryWorkflowStore()
 
     test_user_id = f"test_user_{uuid4().hex[:8]}"
     workflow_id = f"wf_test_{uuid4().hex[:8]}"
@@ -4,8 +4,6 @@ BuilderTask runs headless with its own EventSink, satisfies the
 Registrable protocol for TaskRegistry, and supports resume via swap_sink.
 """
 
-import queue as q
-
 from src.backend.tasks.builder_task import BuilderTask
 from src.backend.tasks.sse import EventSink
 from src.backend.tasks.registry import TaskRegistry
@@ -20,14 +18,10 @@ class _OrchestratorStub:
 def _drain_events(sink: EventSink) -> list[tuple[str, dict]]:
     """Read all queued events from the sink without blocking."""
     events = []
-    while True:
-        try:
-            item = sink._queue.get_nowait()
-        except q.Empty:
-            break
+    for item in sink._take():
         if item is None:
             break
-        events.append(item)
+        events.append(item[1:])
     return events
 
 
@@ -206,6 +200,21 @@ class TestBuilderTaskResume:
         stream_event = next(e for n, e in events if n == "chat_stream")
         assert stream_event["chunk"] == "partial response"
 
+    def test_swap_sink_with_last_event_id_sends_only_missed(self):
+        old_sink = EventSink()
+        task = BuilderTask(sink=old_sink, workflow_id="wf_1", user_id="u1", task_id="t1")
+        task.stream_chunk("seen")
+        task.stream_chunk(" missed")
+
+        new_sink = EventSink(log=old_sink.log)
+        task.swap_sink(new_sink, last_event_id=1)
+
+        events = _drain_events(new_sink)
+        assert [(n, e.get("chunk")) for n, e in events] == [
+            ("chat_stream", " missed"),
+            ("chat_progress", None),
+        ]
+
     def test_swap_sink_does_not_replay_user_message(self):
         """swap_sink must NOT replay build_user_message — WorkflowPage recovery
         and syncConversationMessages handle it. Replaying would duplicate."""
@@ -6,17 +6,20 @@ Verifies:
 - Close semantics (sentinel, is_closed)
 - Thread safety (concurrent pushes from multiple threads)
 - GeneratorExit handling (client disconnect)
+- Event ids and Last-Event-ID replay
+- Async consumption (no thread per open stream), incl. 1,000+ idle streams
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import threading
 import time
 
 import pytest
 
-from src.backend.tasks.sse import EventSink
+from src.backend.tasks.sse import EventLog, EventSink, parse_last_event_id
 
 
 class TestEventSinkBasic:
@@ -31,8 +34,8 @@ class TestEventSinkBasic:
 
         lines = list(sink)
         assert len(lines) == 2
-        assert lines[0] == 'event: chat_stream\ndata: {"chunk": "hello"}\n\n'
-        assert lines[1] == 'event: chat_stream\ndata: {"chunk": " world"}\n\n'
+        assert lines[0] == 'id: 1\nevent: chat_stream\ndata: {"chunk": "hello"}\n\n'
+        assert lines[1] == 'id: 2\nevent: chat_stream\ndata: {"chunk": " world"}\n\n'
 
     def test_close_stops_iteration(self):
         """close() sends sentinel that terminates the iterator."""
@@ -88,8 +91,9 @@ class TestEventSinkSSEFormat:
 
         lines = list(sink)
         assert len(lines) == 1
-        # SSE format: event: <name>\ndata: <json>\n\n
-        event_line, data_line, trailing = lines[0].split("\n", 2)
+        # SSE format: id: <n>\nevent: <name>\ndata: <json>\n\n
+        id_line, event_line, data_line, trailing = lines[0].split("\n", 3)
+        assert id_line == "id: 1"
         assert event_line == "event: workflow_update"
         assert data_line.startswith("data: ")
         parsed = json.loads(data_line[6:])
@@ -171,3 +175,146 @@ class TestEventSinkGeneratorExit:
         it.close()  # Simulate client disconnect (GeneratorExit)
 
         assert sink.is_closed
+
+
+class TestEventSinkReplay:
+    """Monotonic ids and Last-Event-ID replay across reconnects."""
+
+    def test_ids_continue_across_shared_log(self):
+        old = EventSink()
+        old.push("a", {})
+        old.push("b", {})
+        old.close()
+
+        new = EventSink(log=old.log)
+        new.push("c", {})
+        new.close()
+
+        assert list(new)[0].startswith("id: 3\n")
+
+    def test_replay_sends_missed_suffix_with_original_ids(self):
+        old = EventSink()
+        for i in range(5):
+            old.push("step", {"i": i})
+        old.close()
+
+        new = EventSink(log=old.log)
+        assert new.replay(3) is True
+        new.close()
+
+        lines = list(new)
+        assert [line.split("\n", 1)[0] for line in lines] == ["id: 4", "id: 5"]
+
+    def test_replay_fails_when_gap_evicted(self):
+        sink = EventSink(log=EventLog(maxlen=3))
+        for i in range(6):
+            sink.push("step", {"i": i})
+
+        assert sink.replay(1) is False
+        assert sink.replay(3) is True
+        assert sink.log.since(99) is None
+
+    def test_events_after_disconnect_are_logged(self):
+        sink = EventSink()
+        sink.push("a", {})
+        sink.close()
+        sink.push("b", {})
+
+        assert [event for _, event, _ in sink.log.since(0)] == ["a", "b"]
+
+    def test_push_replay_uses_head_id_and_is_not_logged(self):
+        sink = EventSink()
+        sink.push("a", {})
+        sink.push_replay("snapshot", {})
+        sink.close()
+
+        lines = list(sink)
+        assert lines[1].startswith("id: 1\nevent: snapshot")
+        assert sink.log.last_id == 1
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [(None, None), ("7", 7), (" 12 ", 12), ("abc", None), ("-1", None), (3, 3), (True, None)],
+    )
+    def test_parse_last_event_id(self, value, expected):
+        assert parse_last_event_id(value) == expected
+
+
+async def _consume(sink: EventSink) -> list[str]:
+    return [line async for line in sink]
+
+
+class TestEventSinkAsync:
+    """Async iteration: producers in threads, consumers on the event loop."""
+
+    def test_async_iteration(self):
+        sink = EventSink()
+        sink.push("a", {"x": 1})
+        sink.close()
+
+        lines = asyncio.run(_consume(sink))
+        assert lines == ['id: 1\nevent: a\ndata: {"x": 1}\n\n']
+
+    def test_producer_thread_wakes_consumer(self):
+        sink = EventSink()
+
+        async def scenario():
+            consumer = asyncio.ensure_future(_consume(sink))
+            await asyncio.sleep(0.01)
+
+            def produce():
+                for i in range(3):
+                    sink.push("step", {"i": i})
+                    time.sleep(0.005)
+                sink.close()
+
+            threading.Thread(target=produce).start()
+            return await asyncio.wait_for(consumer, timeout=5)
+
+        assert len(asyncio.run(scenario())) == 3
+
+    def test_streaming_response_uses_async_path(self):
+        from starlette.responses import StreamingResponse
+
+        sink = EventSink()
+        assert StreamingResponse(sink).body_iterator is sink
+
+    def test_cancelled_consumer_marks_closed(self):
+        sink = EventSink()
+
+        async def scenario():
+            consumer = asyncio.ensure_future(_consume(sink))
+            await asyncio.sleep(0.01)
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+
+        asyncio.run(scenario())
+        assert sink.is_closed
+
+    def test_thousand_idle_streams_hold_no_threads(self):
+        """1,500 open idle streams add no threads; one producer serves them all."""
+        n_streams = 1500
+        sinks = [EventSink() for _ in range(n_streams)]
+
+        async def scenario():
+            threads_before = threading.active_count()
+            consumers = [asyncio.ensure_future(_consume(s)) for s in sinks]
+            await asyncio.sleep(0.05)
+            assert all(s._loop is not None for s in sinks)
+            idle_threads = threading.active_count() - threads_before
+
+            def produce():
+                for s in sinks:
+                    s.push("chat_stream", {"chunk": "hi"})
+                    s.close()
+
+            producer = threading.Thread(target=produce)
+            producer.start()
+            results = await asyncio.wait_for(asyncio.gather(*consumers), timeout=30)
+            producer.join()
+            return idle_threads, results
+
+        idle_threads, results = asyncio.run(scenario())
+        assert idle_threads == 0
+        assert all(len(lines) == 1 for lines in results)
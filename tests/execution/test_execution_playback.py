@@ -0,0 +1,261 @@
+"""Tests for recorded-trace playback of stepped execution.
+
+Verifies:
+- record() runs the workflow instantly and splits events into frames
+- TracePlayer paces frames from loop timers without extra threads
+- pause / step / seek (incl. backwards) / speed / stop controls
+- The execute route streams a played-back trace
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.deps import require_auth
+from src.backend.api.routes.stepped_execution_routes import register_stepped_execution_routes
+from src.backend.storage.auth import AuthUser
+from src.backend.tasks.execution_playback import seekable_frames
+from src.backend.tasks.execution_stream import ExecutionStreamDecoder
+from src.backend.tasks.execution_task import (
+    SteppedExecutionTask,
+    pause_execution,
+    register_execution,
+    resume_execution,
+    seek_execution,
+    set_execution_speed,
+    step_execution,
+    stop_execution,
+)
+
+
+WORKFLOW = {
+    "nodes": [
+        {"id": "start", "type": "start", "label": "Start", "x": 0, "y": 0},
+        {
+            "id": "decision1",
+            "type": "decision",
+            "label": "Age >= 18",
+            "x": 0, "y": 100,
+            "condition": {"input_id": "input_age_int", "comparator": "gte", "value": 18},
+        },
+        {"id": "out_adult", "type": "end", "label": "Adult", "x": -100, "y": 200},
+        {"id": "out_minor", "type": "end", "label": "Minor", "x": 100, "y": 200},
+    ],
+    "edges": [
+        {"from": "start", "to": "decision1"},
+        {"from": "decision1", "to": "out_adult", "label": "true"},
+        {"from": "decision1", "to": "out_minor", "label": "false"},
+    ],
+    "variables": [
+        {"id": "input_age_int", "name": "Age", "type": "int", "range": {"min": 0, "max": 120}},
+    ],
+    "outputs": [{"name": "Adult"}, {"name": "Minor"}],
+}
+
+
+def _task(execution_id: str, *, speed_ms: int = 0, compact: bool = False) -> SteppedExecutionTask:
+    sink = Mock()
+    sink.is_closed = False
+    register_execution(execution_id)
+    return SteppedExecutionTask(
+        sink=sink, workflow_store=Mock(), user_id="u1", execution_id=execution_id,
+        workflow=WORKFLOW, inputs={"input_age_int": 25}, speed_ms=speed_ms, compact=compact,
+    )
+
+
+def _pushed(task: SteppedExecutionTask) -> list[tuple[str, dict]]:
+    return [(c.args[0], c.args[1]) for c in task.sink.push.call_args_list]
+
+
+def _names(task: SteppedExecutionTask) -> list[str]:
+    return [name for name, _ in _pushed(task)]
+
+
+async def _settle(seconds: float = 0.05) -> None:
+    await asyncio.sleep(seconds)
+
+
+async def _wait_done(task: SteppedExecutionTask, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not task.done.is_set():
+        assert asyncio.get_running_loop().time() < deadline, "playback did not finish"
+        await asyncio.sleep(0.005)
+
+
+class TestRecord:
+    def test_record_splits_steps_into_frames(self):
+        task = _task("rec1")
+        frames = task.record()
+
+        assert not task.sink.push.called
+        steps = [[d["node_id"] for n, d in f if n == "execution_step"] for f in frames]
+        # Two interpreter callbacks per node (visit, then evaluation)
+        assert steps == [
+            ["start"], ["start"], ["decision1"], ["decision1"], ["out_adult"], ["out_adult"], [],
+        ]
+        assert frames[-1][-1][0] == "execution_complete"
+
+    def test_run_sends_whole_trace(self):
+        task = _task("rec2", speed_ms=2000)
+        task.run()
+
+        assert _pushed(task) == [e for frame in task.trace for e in frame]
+        assert task.done.is_set()
+        task.sink.close.assert_called_once()
+
+
+class TestPlayback:
+    def test_plays_to_completion_without_threads(self):
+        task = _task("play1", speed_ms=10)
+        task.record()
+
+        async def main():
+            threads = threading.active_count()
+            task.play(asyncio.get_running_loop())
+            await _wait_done(task)
+            assert threading.active_count() == threads
+
+        asyncio.run(main())
+        assert _pushed(task) == [e for frame in task.trace for e in frame]
+        task.sink.close.assert_called_once()
+
+    def test_pause_before_start_then_step(self):
+        task = _task("play2", speed_ms=10)
+        task.record()
+        pause_execution("play2")
+
+        async def main():
+            task.play(asyncio.get_running_loop())
+            await _settle()
+            assert _names(task) == ["execution_paused"]
+
+            assert step_execution("play2")
+            await _settle()
+            assert [d.get("node_id") for n, d in _pushed(task) if n == "execution_step"] == ["start"]
+
+            assert resume_execution("play2")
+            await _wait_done(task)
+
+        asyncio.run(main())
+        names = _names(task)
+        assert names.count("execution_resumed") == 1
+        assert names[-1] == "execution_complete"
+
+    def test_seek_backwards_replays_from_frame(self):
+        task = _task("play3", speed_ms=2000, compact=True)
+        task.record()
+
+        async def main():
+            task.play(asyncio.get_running_loop())
+            pause_execution("play3")
+            await _settle()
+            for _ in range(4):
+                step_execution("play3")
+            await _settle()
+
+            assert seek_execution("play3", 3)
+            await _settle()
+            assert set_execution_speed("play3", 0)
+            resume_execution("play3")
+            await _wait_done(task)
+
+        asyncio.run(main())
+        decoded = ExecutionStreamDecoder().decode_all(_pushed(task))
+        seek = next(d for n, d in decoded if n == "execution_seek")
+        assert (seek["frame"], seek["frames"]) == (3, len(task.trace))
+        assert seek["executed_node_ids"] == ["start", "decision1"]
+        assert seek["current_node_id"] == "decision1"
+        steps = [d["node_id"] for n, d in decoded if n == "execution_step"]
+        assert steps == [
+            "start", "start", "decision1", "decision1",
+            "decision1", "out_adult", "out_adult",
+        ]
+        # The delta chain restarts, so decoded contexts match the recording
+        recorded = [d for f in task.trace for n, d in f if n == "execution_step"]
+        replayed = [d for n, d in decoded if n == "execution_step"]
+        assert replayed[4:] == recorded[3:]
+
+    def test_stop_completes_and_closes(self):
+        task = _task("play4", speed_ms=2000)
+        task.record()
+
+        async def main():
+            task.play(asyncio.get_running_loop())
+            await _settle()
+            assert stop_execution("play4")
+            await _wait_done(task)
+
+        asyncio.run(main())
+        complete = [d for n, d in _pushed(task) if n == "execution_complete"]
+        assert complete == [{
+            "execution_id": "play4", "success": False, "output": None,
+            "path": [], "error": "Execution stopped by user",
+        }]
+        assert not step_execution("play4")
+
+    def test_closed_sink_ends_playback(self):
+        task = _task("play5", speed_ms=10)
+        task.record()
+        task.sink.is_closed = True
+
+        async def main():
+            task.play(asyncio.get_running_loop())
+            await _wait_done(task)
+
+        asyncio.run(main())
+        assert not task.sink.push.called
+
+
+class TestSeekableFrames:
+    def test_frames_inside_subflows_are_skipped(self):
+        frames = [
+            [("execution_step", {})],
+            [("subflow_start", {}), ("subflow_step", {})],
+            [("subflow_step", {})],
+            [("subflow_complete", {}), ("execution_step", {})],
+            [("execution_complete", {})],
+        ]
+        assert seekable_frames(frames) == [0, 1, 4]
+
+
+class TestRoutes:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        register_stepped_execution_routes(app, workflow_store=Mock())
+        app.dependency_overrides[require_auth] = lambda: AuthUser(
+            id="u1", email="u@example.com", name="U", password_hash="",
+            created_at="", last_login_at=None,
+        )
+        return TestClient(app)
+
+    def test_execute_streams_trace(self, client):
+        body = {
+            "execution_id": "route1", "workflow": WORKFLOW,
+            "inputs": {"input_age_int": 10}, "speed_ms": 0,
+        }
+        with client.stream("POST", "/api/workflows/wf1/execute", json=body) as response:
+            text = "".join(response.iter_text())
+
+        events = [
+            (block.split("\n")[1][len("event: "):], json.loads(block.split("\n")[2][len("data: "):]))
+            for block in text.strip().split("\n\n")
+        ]
+        assert events[0][0] == "execution_started"
+        assert events[-1][0] == "execution_complete"
+        assert events[-1][1]["path"][-1] == "out_minor"
+
+    def test_controls_for_unknown_execution(self, client):
+        assert client.post("/api/executions/nope/step").status_code == 404
+        assert client.post("/api/executions/nope/seek", json={"frame": 0}).status_code == 404
+        assert client.post("/api/executions/nope/speed", json={"speed_ms": 100}).status_code == 404
+
+    def test_seek_requires_integer_frame(self, client):
+        assert client.post("/api/executions/x/seek", json={"frame": "1"}).status_code == 400
@@ -0,0 +1,177 @@
+"""Tests for the compact stepped-execution event stream.
+
+The compact stream, decoded by ExecutionStreamDecoder, must reproduce the
+verbose stream SteppedExecutionTask emits with ``compact=False``.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.backend.execution.interpreter import TreeInterpreter
+from src.backend.tasks.execution_stream import (
+    ExecutionStreamDecoder,
+    ExecutionStreamEncoder,
+    definition_version,
+)
+from src.backend.tasks.execution_task import (
+    SteppedExecutionTask,
+    _clear_execution,
+    register_execution,
+)
+from tests.execution.test_interpreter_subflows import (
+    CREDIT_SCORE_WORKFLOW,
+    MockWorkflow,
+    MockWorkflowStore,
+)
+
+
+def _credit_score_with_canvas() -> MockWorkflow:
+    workflow = copy.deepcopy(CREDIT_SCORE_WORKFLOW)
+    workflow.nodes = [
+        {"id": f"n{i}", "type": "decision", "label": f"Check {i}", "x": i * 40, "y": 0}
+        for i in range(40)
+    ]
+    workflow.edges = [{"from": f"n{i}", "to": f"n{i + 1}"} for i in range(39)]
+    return workflow
+
+
+def _subprocess(node_id: str, output_variable: str, children: list) -> dict:
+    return {
+        "id": node_id,
+        "type": "subprocess",
+        "label": f"Score ({node_id})",
+        "subworkflow_id": "wf_credit_score",
+        "input_mapping": {"ApplicantIncome": "Income", "ApplicantAge": "Age"},
+        "output_variable": output_variable,
+        "children": children,
+    }
+
+
+# Calls the same subworkflow three times in a row, then decides.
+_PARENT_TREE = {
+    "start": {
+        "id": "start",
+        "type": "start",
+        "label": "Start",
+        "children": [
+            _subprocess("score_1", "Score1", [
+                _subprocess("score_2", "Score2", [
+                    _subprocess("score_3", "Score3", [
+                        {
+                            "id": "check",
+                            "type": "decision",
+                            "label": "Score3 >= 700",
+                            "condition": {
+                                "input_id": "var_sub_score3_number",
+                                "comparator": "gte",
+                                "value": 700,
+                            },
+                            "children": [
+                                {"id": "yes", "type": "output", "label": "Approved",
+                                 "edge_label": "Yes", "children": []},
+                                {"id": "no", "type": "output", "label": "Denied",
+                                 "edge_label": "No", "children": []},
+                            ],
+                        },
+                    ]),
+                ]),
+            ]),
+        ],
+    },
+}
+
+_INPUTS = [
+    {"id": "input_applicant_income_int", "name": "ApplicantIncome", "type": "number",
+     "range": {"min": 0, "max": 1000000}},
+    {"id": "input_applicant_age_int", "name": "ApplicantAge", "type": "number",
+     "range": {"min": 18, "max": 120}},
+]
+
+
+def _run(*, compact: bool) -> list[tuple[str, dict]]:
+    sink = Mock()
+    sink.is_closed = False
+    task = SteppedExecutionTask(
+        sink=sink, workflow_store=Mock(), user_id="u1", execution_id=f"exec-{compact}",
+        workflow={}, inputs={}, speed_ms=0, compact=compact,
+    )
+    store = MockWorkflowStore({"wf_credit_score": _credit_score_with_canvas()})
+    interpreter = TreeInterpreter(
+        tree=_PARENT_TREE, variables=_INPUTS, outputs=[{"name": "Approved"}, {"name": "Denied"}],
+        workflow_store=store, user_id="u1",
+    )
+    register_execution(task.execution_id)
+    try:
+        result = interpreter.execute(
+            {"input_applicant_income_int": 60000, "input_applicant_age_int": 35},
+            on_step=task.on_step,
+        )
+    finally:
+        _clear_execution(task.execution_id)
+    assert result.success, result.error
+    events = [(c.args[0], c.args[1]) for c in sink.push.call_args_list]
+    # Execution ids differ between the two runs; normalise for comparison
+    return [(name, {**data, "execution_id": "exec"}) for name, data in events]
+
+
+class TestCompactStream:
+    def test_decoded_compact_matches_verbose(self) -> None:
+        verbose = _run(compact=False)
+        compact = _run(compact=True)
+
+        assert ExecutionStreamDecoder().decode_all(compact) == verbose
+
+    def test_definition_sent_once_and_stream_is_smaller(self) -> None:
+        verbose = _run(compact=False)
+        compact = _run(compact=True)
+
+        assert [n for n, _ in compact].count("subflow_definition") == 1
+        starts = [d for n, d in compact if n == "subflow_start"]
+        assert len(starts) == 3
+        assert all("nodes" not in d and d["definition_version"] for d in starts)
+        # The canvas travels once instead of once per call
+        assert json.dumps(verbose).count('"Check 0"') == 3
+        assert json.dumps(compact).count('"Check 0"') == 1
+        assert len(json.dumps(compact)) < len(json.dumps(verbose))
+
+    def test_steps_carry_only_changed_variables(self) -> None:
+        steps = [d for n, d in _run(compact=True) if n == "execution_step" and "context_delta" in d]
+        assert steps
+        assert all("context" not in d for d in steps)
+        # The first step carries the inputs; later steps only what changed
+        assert "input_applicant_income_int" in steps[0]["context_delta"]
+        assert all("input_applicant_income_int" not in d["context_delta"] for d in steps[1:])
+
+
+class TestEncoder:
+    def test_new_definition_revision_is_resent(self) -> None:
+        encoder = ExecutionStreamEncoder()
+        base = {"execution_id": "e", "subworkflow_id": "wf_a", "nodes": [{"id": "a"}], "edges": []}
+        first = encoder.subflow_start(base)
+        again = encoder.subflow_start(base)
+        changed = encoder.subflow_start({**base, "nodes": [{"id": "b"}]})
+
+        assert [n for n, _ in first] == ["subflow_definition", "subflow_start"]
+        assert [n for n, _ in again] == ["subflow_start"]
+        assert [n for n, _ in changed] == ["subflow_definition", "subflow_start"]
+        assert changed[1][1]["definition_version"] == definition_version([{"id": "b"}], [])
+
+    def test_context_removals_and_type_changes(self) -> None:
+        encoder = ExecutionStreamEncoder()
+        decoder = ExecutionStreamDecoder()
+        contexts = [{"a": 1, "b": 2}, {"a": True, "b": 2}, {"a": True}]
+        for context in contexts:
+            step = encoder.execution_step({"node_id": "n", "context": context})
+            assert decoder.decode("execution_step", step)["context"] == context
+        assert step == {"node_id": "n", "context_delta": {}, "context_removed": ["b"]}
+
+    def test_decoder_rejects_unknown_definition(self) -> None:
+        with pytest.raises(KeyError):
+            ExecutionStreamDecoder().decode(
+                "subflow_start", {"subworkflow_id": "x", "definition_version": "abc"},
+            )
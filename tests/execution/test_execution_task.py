@@ -31,10 +31,10 @@ def _collect_events(sink: EventSink) -> list[tuple[str, dict]]:
     """Drain the sink and return (event_name, data) tuples."""
     events = []
     for line in sink:
-        # Parse SSE format: "event: <name>\ndata: <json>\n\n"
+        # Parse SSE format: "id: <n>\nevent: <name>\ndata: <json>\n\n"
         parts = line.strip().split("\n")
-        event_name = parts[0].split(": ", 1)[1]
-        data = json.loads(parts[1].split(": ", 1)[1])
+        event_name = parts[1].split(": ", 1)[1]
+        data = json.loads(parts[2].split(": ", 1)[1])
         events.append((event_name, data))
     return events
 
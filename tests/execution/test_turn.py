@@ -396,6 +396,15 @@ class TestAuditLogging:
             "conv_test", "kaboom", task_id="task_1",
         )
 
+    def test_commit_offers_history_checkpoint(self):
+        logger = self._make_mock_logger()
+        turn = make_turn(conversation_logger=logger)
+        turn.start()
+        turn.complete("ok")
+        cm = FakeConversationManager()
+        turn.commit(cm)
+        logger.checkpoint_history.assert_called_once_with("conv_test", cm.history)
+
     def test_no_logger_no_crash(self):
         """All Turn methods work fine without a logger."""
         turn = make_turn(conversation_logger=None)
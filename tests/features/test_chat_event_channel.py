@@ -2,8 +2,8 @@
 
 Covers:
 1. publish() injects workflow_id and pushes to sink
-2. stream_chunk / stream_thinking accumulate and emit
-3. swap_sink replays accumulated content to the new sink
+2. stream_chunk / stream_thinking accumulate and emit; text deltas coalesce
+3. swap_sink replays accumulated content (or the missed suffix) to the new sink
 4. Lock prevents interleaving of swap and publish
 5. publish_workflow_state caches for replay
 6. close() delegates to sink
@@ -12,6 +12,7 @@ Covers:
 
 import logging
 import threading
+import time
 from unittest.mock import MagicMock, call
 
 from src.backend.tasks.chat_event_channel import ChatEventChannel
@@ -103,6 +104,97 @@ class TestStreaming:
 
         assert channel.stream_buffer == "Hello world"
         assert channel.did_stream is True
+        # First delta is sent immediately, the second is batched
+        assert sink.push.call_count == 1
+        channel.flush_stream()
+        assert [c.args[1]["chunk"] for c in sink.push.call_args_list] == ["Hello ", "world"]
+
+    def test_deltas_within_window_coalesce(self):
+        channel, _ = _make_channel()
+        sink = _mock_sink()
+        channel._sink = sink
+
+        for i in range(50):
+            channel.stream_chunk(f"{i},")
+        channel.flush_stream()
+
+        chunks = [c.args[1]["chunk"] for c in sink.push.call_args_list]
+        assert chunks == ["0,", "".join(f"{i}," for i in range(1, 50))]
+
+    def test_byte_budget_flushes_early(self):
+        sink = _mock_sink()
+        channel = ChatEventChannel(
+            sink, "t1", lambda: "wf-1",
+            coalesce_max_bytes=10, coalesce_window_seconds=60,
+        )
+        channel.stream_chunk("a")
+        channel.stream_chunk("bbbbb")
+        channel.stream_chunk("cccccc")
+
+        chunks = [c.args[1]["chunk"] for c in sink.push.call_args_list]
+        assert chunks == ["a", "bbbbbcccccc"]
+
+    def test_trailing_batch_flushed_by_timer(self):
+        sink = _mock_sink()
+        channel = ChatEventChannel(
+            sink, "t1", lambda: "wf-1", coalesce_window_seconds=0.01,
+        )
+        channel.stream_chunk("first")
+        channel.stream_chunk("tail")
+
+        deadline = time.monotonic() + 2
+        while sink.push.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert sink.push.call_args_list[-1].args[1]["chunk"] == "tail"
+
+    def test_trailing_flush_uses_shared_timer_thread(self):
+        sink = _mock_sink()
+        channel = ChatEventChannel(
+            sink, "t1", lambda: "wf-1", coalesce_window_seconds=0.01,
+        )
+        flushed_on = []
+        sink.push.side_effect = lambda *a, **k: flushed_on.append(threading.current_thread().name)
+        channel.stream_chunk("first")
+        channel._last_stream_emit = time.monotonic()
+        channel.stream_chunk("warm-up")  # starts the shared timer thread if needed
+        deadline = time.monotonic() + 2
+        while len(flushed_on) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        threads_before = threading.active_count()
+
+        for i in range(5):
+            channel._last_stream_emit = time.monotonic()  # inside the window
+            channel.stream_chunk(f"tail-{i}")
+            deadline = time.monotonic() + 2
+            while len(flushed_on) < 3 + i and time.monotonic() < deadline:
+                time.sleep(0.005)
+
+        assert flushed_on[1:] == ["task-timers"] * 6
+        assert threading.active_count() == threads_before
+
+    def test_other_events_flush_pending_text_first(self):
+        channel, _ = _make_channel()
+        sink = _mock_sink()
+        channel._sink = sink
+
+        channel.stream_chunk("a")
+        channel.stream_chunk("b")
+        channel.publish_progress("tool_start", "Running", tool="x")
+        channel.stream_chunk("c")
+
+        events = [(c.args[0], c.args[1].get("chunk")) for c in sink.push.call_args_list]
+        assert events == [
+            ("chat_stream", "a"),
+            ("chat_stream", "b"),
+            ("chat_progress", None),
+            ("chat_stream", "c"),
+        ]
+
+    def test_zero_window_disables_coalescing(self):
+        sink = _mock_sink()
+        channel = ChatEventChannel(sink, "t1", lambda: "wf-1", coalesce_window_seconds=0)
+        channel.stream_chunk("a")
+        channel.stream_chunk("b")
         assert sink.push.call_count == 2
 
     def test_stream_thinking_accumulates_and_emits(self):
@@ -139,15 +231,15 @@ class TestSwapSink:
         channel.swap_sink(new_sink)
 
         # New sink should receive: resumed, thinking replay, stream replay
-        events = [c.args[0] for c in new_sink.push.call_args_list]
+        events = [c.args[0] for c in new_sink.push_replay.call_args_list]
         assert events == ["chat_progress", "chat_thinking", "chat_stream"]
 
         # Verify thinking replay contains concatenated chunks
-        thinking_call = new_sink.push.call_args_list[1]
+        thinking_call = new_sink.push_replay.call_args_list[1]
         assert thinking_call.args[1]["chunk"] == "thought-A"
 
         # Verify stream replay
-        stream_call = new_sink.push.call_args_list[2]
+        stream_call = new_sink.push_replay.call_args_list[2]
         assert stream_call.args[1]["chunk"] == "text-B"
 
     def test_replays_workflow_state(self):
@@ -158,7 +250,7 @@ class TestSwapSink:
         channel.swap_sink(new_sink)
 
         # Should replay: resumed + workflow_state_updated
-        events = [c.args[0] for c in new_sink.push.call_args_list]
+        events = [c.args[0] for c in new_sink.push_replay.call_args_list]
         assert "workflow_state_updated" in events
 
     def test_closes_old_sink(self):
@@ -178,13 +270,56 @@ class TestSwapSink:
         last_call = new_sink.push.call_args_list[-1]
         assert last_call.args[0] == "after_swap"
 
+    def test_pending_text_replayed_once(self):
+        channel, _ = _make_channel()
+        channel.stream_chunk("sent ")
+        channel.stream_chunk("pending")
+
+        new_sink = _mock_sink()
+        channel.swap_sink(new_sink)
+        channel.flush_stream()
+
+        calls = new_sink.push_replay.call_args_list + new_sink.push.call_args_list
+        chunks = [c.args[1]["chunk"] for c in calls if c.args[0] == "chat_stream"]
+        assert chunks == ["sent pending"]
+
+    def test_last_event_id_replays_only_missed_suffix(self):
+        channel, old_sink = _make_channel(workflow_id="wf-1", task_id="t1")
+        channel.stream_thinking("thought")          # id 1
+        channel.publish_progress("tool_start", "x")  # id 2
+        channel.stream_chunk("text")                # id 3
+
+        new_sink = EventSink(log=old_sink.log)
+        channel.swap_sink(new_sink, last_event_id=2)
+        channel.publish("after", {})
+        channel.close()
+
+        lines = list(new_sink)
+        heads = [line.split("\n")[:2] for line in lines]
+        assert heads == [
+            ["id: 3", "event: chat_stream"],
+            ["id: 3", "event: chat_progress"],
+            ["id: 4", "event: after"],
+        ]
+
+    def test_evicted_last_event_id_falls_back_to_snapshot(self):
+        channel, _ = _make_channel()
+        channel.stream_chunk("text")
+
+        new_sink = _mock_sink()
+        new_sink.replay.return_value = False
+        channel.swap_sink(new_sink, last_event_id=0)
+
+        events = [c.args[0] for c in new_sink.push_replay.call_args_list]
+        assert events == ["chat_progress", "chat_stream"]
+
     def test_swap_with_no_accumulated_content(self):
         """Swap with nothing accumulated — only the 'resumed' event."""
         channel, _ = _make_channel()
         new_sink = _mock_sink()
         channel.swap_sink(new_sink)
 
-        events = [c.args[0] for c in new_sink.push.call_args_list]
+        events = [c.args[0] for c in new_sink.push_replay.call_args_list]
         assert events == ["chat_progress"]
 
 
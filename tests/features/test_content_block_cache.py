@@ -0,0 +1,142 @@
+"""Tests for the content-block cache of uploaded files.
+
+Covers:
+1. Blocks are built once per content and shared between paths
+2. Unchanged files are not re-read after the first lookup
+3. Oversized images are compressed; oversized PDFs are skipped
+4. Memory is bounded by bytes; the disk copy survives a new cache
+5. The orchestrator and view_image send cached blocks
+6. Persisted history references uploads instead of inlining them
+"""
+
+import base64
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src.backend.agents.orchestrator import _encode_file
+from src.backend.tools.workflow_analysis.view_image import ViewImageTool
+from src.backend.utils import content_blocks
+from src.backend.utils.content_blocks import (
+    ContentBlockCache,
+    reference_uploads,
+    resolve_uploads,
+    set_content_block_cache,
+)
+
+
+def _png(path: Path, size=(4, 4), color=(255, 0, 0)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="PNG")
+    path.write_bytes(buf.getvalue())
+    return buf.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ContentBlockCache(tmp_path / "blocks")
+    previous = set_content_block_cache(c)
+    yield c
+    set_content_block_cache(previous)
+
+
+def test_same_content_built_once_across_paths(cache, tmp_path):
+    raw = _png(tmp_path / "a.png")
+    (tmp_path / "b.png").write_bytes(raw)
+
+    with patch.object(content_blocks, "_build_block", wraps=content_blocks._build_block) as build:
+        first = cache.get(tmp_path / "a.png", "image")
+        second = cache.get(tmp_path / "b.png", "image")
+
+    assert build.call_count == 1
+    assert first is second
+    assert first.media_type == "image/png"
+    assert first.source_bytes == len(raw)
+    assert base64.b64decode(first.block["source"]["data"]) == raw
+
+
+def test_unchanged_file_is_not_reread(cache, tmp_path):
+    path = tmp_path / "a.png"
+    _png(path)
+    cache.get(path, "image")
+    with patch.object(Path, "read_bytes", side_effect=AssertionError("re-read")):
+        assert cache.get(path, "image") is not None
+
+
+def test_large_image_compressed_and_large_pdf_skipped(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.backend.utils.image._MAX_RAW_BYTES", 100)
+    monkeypatch.setattr("src.backend.utils.image._MAX_DIMENSION", 100)
+    _png(tmp_path / "big.png", size=(400, 200), color=(10, 200, 30))
+    block = cache.get(tmp_path / "big.png", "image")
+    assert block.media_type == "image/jpeg"
+    sent = Image.open(io.BytesIO(base64.b64decode(block.block["source"]["data"])))
+    assert (sent.format, sent.size) == ("JPEG", (100, 50))
+
+    monkeypatch.setattr(content_blocks, "_MAX_PDF_BYTES", 10)
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF-1.4 too long for the limit")
+    assert cache.get(tmp_path / "doc.pdf", "pdf") is None
+
+
+def test_memory_budget_and_disk_persistence(tmp_path):
+    cache = ContentBlockCache(tmp_path / "blocks", memory_budget_bytes=1)
+    for i in range(3):
+        _png(tmp_path / f"{i}.png", color=(i, 0, 0))
+        cache.get(tmp_path / f"{i}.png", "image")
+    assert len(cache._entries) == 1  # only the newest stays in memory
+    assert len(list((tmp_path / "blocks").glob("*.json"))) == 3
+
+    restarted = ContentBlockCache(tmp_path / "blocks")
+    with patch.object(content_blocks, "_build_block") as build:
+        block = restarted.get(tmp_path / "0.png", "image")
+    build.assert_not_called()
+    assert block.source_bytes == (tmp_path / "0.png").stat().st_size
+
+
+def test_orchestrator_and_view_image_use_cache(cache, tmp_path):
+    raw = _png(tmp_path / "diagram.png")
+    message_block = _encode_file({"path": str(tmp_path / "diagram.png"), "file_type": "image"})
+    assert base64.b64decode(message_block["source"]["data"]) == raw
+    # Callers get copies; the cached block is never mutated
+    message_block["cache_control"] = {"type": "ephemeral"}
+    message_block["source"]["data"] = ""
+
+    result = ViewImageTool().execute({}, session_state={"uploaded_files": [
+        {"name": "diagram.png", "path": str(tmp_path / "diagram.png"), "file_type": "image"},
+    ]})
+    image_block = result["content"][0]
+    assert "cache_control" not in image_block
+    assert base64.b64decode(image_block["source"]["data"]) == raw
+    assert len(cache._entries) == 1
+
+
+def test_history_references_uploads_and_resolves_them(cache, tmp_path):
+    raw = _png(tmp_path / "diagram.png")
+    result = ViewImageTool().execute({}, session_state={"uploaded_files": [
+        {"name": "diagram.png", "path": str(tmp_path / "diagram.png"), "file_type": "image"},
+    ]})
+    history = [
+        {"role": "user", "content": "look"},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "t1", "content": result["content"]},
+        ]},
+    ]
+
+    stored = reference_uploads(history)
+    assert stored[0] is history[0]  # untouched messages are shared
+    source = stored[1]["content"][0]["content"][0]["source"]
+    assert source == {
+        "type": "upload", "path": str(tmp_path / "diagram.png"),
+        "file_type": "image", "media_type": "image/png",
+    }
+    assert history[1]["content"][0]["content"][0]["source"]["type"] == "base64"
+
+    restored = resolve_uploads(stored)
+    assert restored == history
+    assert base64.b64decode(restored[1]["content"][0]["content"][0]["source"]["data"]) == raw
+
+    (tmp_path / "diagram.png").unlink()
+    gone = resolve_uploads(stored)[1]["content"][0]["content"][0]
+    assert gone == {"type": "text", "text": "[Uploaded file diagram.png is no longer available]"}
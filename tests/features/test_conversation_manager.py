@@ -227,3 +227,17 @@ class TestOrchestratorToolHistoryIntegration:
         tool_use_msg = non_system[1]
         assert "tool_calls" in tool_use_msg
         assert tool_use_msg["tool_calls"][0]["name"] == "get_current_workflow"
+
+
+def test_llm_calls_tagged_with_bound_conversation_id(repo_root):
+    """Every LLM call of a turn carries the conversation id bound to the manager."""
+    orch = build_orchestrator(repo_root)
+    orch.conversation.conversation_id = "conv-42"
+    responses = [
+        LLMResponse(text="", tool_calls=[{"id": "tc_1", "name": "get_current_workflow", "input": {}}]),
+        LLMResponse(text="Done."),
+    ]
+    with patch("src.backend.agents.orchestrator.call_llm", side_effect=responses) as llm:
+        orch.respond("Show me the workflow", allow_tools=True)
+
+    assert [c.kwargs["conversation_id"] for c in llm.call_args_list] == ["conv-42", "conv-42"]
@@ -10,6 +10,7 @@ from unittest.mock import patch
 
 import pytest
 
+from src.backend.tasks import conversations
 from src.backend.tasks.conversations import ConversationStore
 from src.backend.storage.conversation_log import ConversationLogger
 
@@ -157,3 +158,136 @@ class TestConversationReload:
             convo = store.get_or_create("conv_error")
         # Should gracefully fall back to empty history
         assert convo.orchestrator.conversation.history == []
+
+    def test_reload_from_checkpoint_plus_tail(self, repo_root, conversation_logger):
+        """Reload starts from the checkpoint and replays only later entries."""
+        conv_id = "conv_test_checkpoint"
+        _seed_conversation(conversation_logger, conv_id)
+        # Checkpointed history is already compacted — it is not what a full
+        # replay of the log would produce.
+        compacted = [
+            {"role": "user", "content": "[Conversation summary — 2 earlier messages]"},
+            {"role": "assistant", "content": "Understood."},
+        ]
+        assert conversation_logger.checkpoint_history(conv_id, compacted) == 2
+        conversation_logger.log_user_message(conv_id, "Now add an end node.")
+        conversation_logger.log_assistant_response(conv_id, "Added the end node.")
+
+        store = ConversationStore(repo_root, conversation_logger=conversation_logger)
+        with patch.object(
+            conversation_logger, "get_conversation_timeline",
+            wraps=conversation_logger.get_conversation_timeline,
+        ) as timeline:
+            convo = store.get_or_create(conv_id)
+
+        assert timeline.call_args.kwargs["after_seq"] == 2
+        history = convo.orchestrator.conversation.history
+        assert [m["content"] for m in history] == [
+            "[Conversation summary — 2 earlier messages]",
+            "Understood.",
+            "Now add an end node.",
+            "Added the end node.",
+        ]
+
+
+class TestConversationCache:
+    """Byte-budgeted LRU with disk spill."""
+
+    @staticmethod
+    def _grow(store: ConversationStore, conv_id: str, n_bytes: int) -> None:
+        convo = store.get_or_create(conv_id)
+        convo.orchestrator.conversation.history.append(
+            {"role": "user", "content": [{"type": "image", "data": "A" * n_bytes}]},
+        )
+        store.get(conv_id)  # re-estimates the size
+
+    def test_evicts_least_recently_used_over_budget(self, repo_root):
+        store = ConversationStore(repo_root, budget_bytes=2 * 1024 * 1024)
+        self._grow(store, "a", 800_000)
+        self._grow(store, "b", 800_000)
+        store.get("a")  # b is now least recently used
+        self._grow(store, "c", 800_000)
+
+        assert store.get("b") is None
+        assert store.get("a") is not None and store.get("c") is not None
+        assert store.total_bytes <= 2 * 1024 * 1024
+
+    def test_conversation_in_use_is_never_evicted(self, repo_root):
+        store = ConversationStore(repo_root, budget_bytes=1024 * 1024)
+        self._grow(store, "small", 10)
+        self._grow(store, "huge", 4 * 1024 * 1024)
+        assert store.get("small") is None
+        assert store.get("huge") is not None
+
+    def test_size_updated_incrementally_as_history_grows(self, repo_root):
+        store = ConversationStore(repo_root)
+        history = store.get_or_create("a").orchestrator.conversation.history
+        history.extend({"role": "user", "content": f"m{i}"} for i in range(100))
+        store.get("a")
+        before = store.total_bytes
+
+        measured: list = []
+        estimate = conversations._estimate_bytes
+
+        def recording(value):
+            measured.append(value)
+            return estimate(value)
+
+        with patch.object(conversations, "_estimate_bytes", side_effect=recording):
+            store.get("a")  # unchanged: nothing measured
+            assert measured == []
+            history.append({"role": "assistant", "content": "x" * 10_000})
+            store.get("a")
+        assert [{"role": "assistant", "content": "x" * 10_000}] in measured
+        assert all(len(v) < 100 for v in measured if isinstance(v, list))
+        assert store.total_bytes > before + 10_000
+
+        # A replaced (compacted) history is measured afresh
+        store.get("a").orchestrator.conversation.history = history[-2:]
+        store.get("a")
+        assert store.total_bytes < before
+
+    def test_evicted_conversation_restored_from_spill(self, repo_root, conversation_logger, tmp_dir):
+        conv_id = "conv_spilled"
+        _seed_conversation(conversation_logger, conv_id)
+        store = ConversationStore(
+            repo_root, conversation_logger=conversation_logger,
+            budget_bytes=1024 * 1024, spill_dir=tmp_dir / "spill",
+        )
+        convo = store.get_or_create(conv_id)
+        convo.workflow["nodes"] = [{"id": "start", "type": "start"}]
+        convo.orchestrator.current_workflow_id = "wf1"
+        convo.orchestrator.uploaded_files = [{"name": "diagram.png", "path": "/tmp/d.png"}]
+        convo.orchestrator.conversation.history.append({"role": "assistant", "content": "In memory only"})
+        self._grow(store, "other", 2 * 1024 * 1024)
+        assert store.get(conv_id) is None
+        assert len(list((tmp_dir / "spill").glob("*.json"))) == 1
+
+        with patch.object(conversation_logger, "get_conversation_timeline") as timeline:
+            restored = store.get_or_create(conv_id)
+        timeline.assert_not_called()
+        assert restored.orchestrator.conversation.history[-1]["content"] == "In memory only"
+        assert restored.workflow["nodes"] == [{"id": "start", "type": "start"}]
+        assert restored.orchestrator.current_workflow_id == "wf1"
+        assert restored.orchestrator.uploaded_files[0]["name"] == "diagram.png"
+        # Its spill file was consumed; the one left is "other", evicted in turn
+        assert store.get("other") is None
+        assert len(list((tmp_dir / "spill").glob("*.json"))) == 1
+
+    def test_stale_spill_falls_back_to_log(self, repo_root, conversation_logger, tmp_dir):
+        conv_id = "conv_stale_spill"
+        _seed_conversation(conversation_logger, conv_id)
+        store = ConversationStore(
+            repo_root, conversation_logger=conversation_logger,
+            budget_bytes=1024 * 1024, spill_dir=tmp_dir / "spill",
+        )
+        store.get_or_create(conv_id).orchestrator.conversation.history.append(
+            {"role": "assistant", "content": "In memory only"},
+        )
+        self._grow(store, "other", 2 * 1024 * 1024)
+        # Served elsewhere after the spill: the log moved on
+        conversation_logger.log_user_message(conv_id, "Later message")
+
+        history = store.get_or_create(conv_id).orchestrator.conversation.history
+        assert [m["content"] for m in history][-1] == "Later message"
+        assert "In memory only" not in [m["content"] for m in history]
@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.routes import search_routes
+from src.backend.api.routes.search_routes import register_search_routes
+from src.backend.storage.auth import AuthUser
+from src.backend.storage.memory import InMemoryConversationLogger, InMemoryWorkflowStore
+
+
+def _client(conversation_logger=None) -> TestClient:
+    app = FastAPI()
+    register_search_routes(
+        app,
+        workflow_store=InMemoryWorkflowStore(),
+        conversation_logger=conversation_logger,
+    )
+    user = AuthUser(
+        id="user_1",
+        email="test@example.com",
+        name="Test User",
+        password_hash="hash",
+        created_at="2026-01-01T00:00:00Z",
+        last_login_at=None,
+    )
+    app.dependency_overrides[search_routes.require_auth] = lambda: user
+    return TestClient(app)
+
+
+def test_conversation_search_is_scoped_to_caller_and_paginated():
+    log = InMemoryConversationLogger()
+    log.ensure_conversation("mine", user_id="user_1", workflow_id="wf1", model="m")
+    log.ensure_conversation("theirs", user_id="user_2", model="m")
+    for i in range(3):
+        log.log_user_message("mine", f"lactate check {i}")
+    log.log_user_message("theirs", "lactate elsewhere")
+    client = _client(log)
+
+    first = client.get("/api/conversations/search", params={"q": "lactate", "limit": 2}).json()
+    assert [r["seq"] for r in first["results"]] == [3, 2]
+    assert first["has_more"] is True
+    assert {r["conversation_id"] for r in first["results"]} == {"mine"}
+
+    second = client.get(
+        "/api/conversations/search", params={"q": "lactate", "limit": 2, "offset": 2},
+    ).json()
+    assert [r["seq"] for r in second["results"]] == [1]
+    assert second["has_more"] is False
+
+    other_wf = client.get(
+        "/api/conversations/search", params={"q": "lactate", "workflow_id": "wf2"},
+    ).json()
+    assert other_wf["results"] == []
+
+
+def test_conversation_search_errors():
+    client = _client(InMemoryConversationLogger())
+    assert client.get("/api/conversations/search").status_code == 400
+    response = client.get("/api/conversations/search", params={"q": "x", "since": "yesterday"})
+    assert response.status_code == 400
+    assert "since" in response.json()["error"]
+    assert _client(None).get("/api/conversations/search", params={"q": "x"}).status_code == 503
@@ -0,0 +1,131 @@
+"""Tests for off-loop password hashing and rehash-on-login."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.auth import (
+    PasswordHasher,
+    PasswordHashingBusy,
+    get_auth_config,
+    hash_password,
+    login_rate_limiter,
+    needs_rehash,
+    verify_password,
+)
+from src.backend.api.routes.auth_routes import register_auth_routes
+from src.backend.storage.memory import InMemoryAuthStore
+
+
+def _thread_hasher(**overrides) -> PasswordHasher:
+    options = dict(max_workers=2, max_pending=0, timeout_seconds=5)
+    options.update(overrides)
+    return PasswordHasher(
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n), **options,
+    )
+
+
+@pytest.fixture
+def fast_config(monkeypatch):
+    monkeypatch.setenv("LEMON_PASSWORD_HASH_ITERATIONS", "1000")
+    return get_auth_config()
+
+
+class TestPasswordHasher:
+    def test_process_pool_roundtrip(self, fast_config) -> None:
+        hasher = PasswordHasher(max_workers=1, max_pending=2, timeout_seconds=60)
+
+        async def roundtrip():
+            stored = await hasher.hash("correct horse 1", config=fast_config)
+            return stored, await hasher.verify("correct horse 1", stored)
+
+        try:
+            stored, ok = asyncio.run(roundtrip())
+        finally:
+            hasher.shutdown()
+        assert ok is True
+        assert verify_password("wrong 1", stored) is False
+
+    def test_saturated_pool_rejects_fast(self) -> None:
+        hasher = _thread_hasher(max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        async def scenario():
+            held = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(PasswordHashingBusy):
+                await hasher._run(release.wait)
+            release.set()
+            await asyncio.gather(*held)
+            # Slots are returned once jobs finish
+            return await hasher._run(lambda: "ok")
+
+        try:
+            assert asyncio.run(scenario()) == "ok"
+        finally:
+            hasher.shutdown()
+
+    def test_timeout_raises_busy(self) -> None:
+        hasher = _thread_hasher(timeout_seconds=0.01)
+        release = threading.Event()
+        try:
+            with pytest.raises(PasswordHashingBusy):
+                asyncio.run(hasher._run(release.wait))
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    def test_needs_rehash(self, fast_config) -> None:
+        stored = hash_password("pw123456789", config=fast_config)
+        assert needs_rehash(stored, fast_config) is False
+        assert needs_rehash(stored, replace(fast_config, password_iterations=2000)) is True
+        assert needs_rehash("md5$abc", fast_config) is True
+
+
+class TestLoginRoute:
+    @pytest.fixture
+    def client_and_store(self, fast_config):
+        login_rate_limiter._attempts.clear()
+        app = FastAPI()
+        store = InMemoryAuthStore()
+        hasher = _thread_hasher()
+        register_auth_routes(app, auth_store=store, password_hasher=hasher)
+        yield TestClient(app), store, hasher
+        hasher.shutdown()
+
+    def test_login_rehashes_when_iterations_change(self, client_and_store, fast_config) -> None:
+        client, store, _ = client_and_store
+        old_hash = hash_password("pw123456789", config=replace(fast_config, password_iterations=1500))
+        store.create_user("u1", "a@example.com", "A", old_hash)
+
+        response = client.post(
+            "/api/auth/login", json={"email": "a@example.com", "password": "pw123456789"},
+        )
+        assert response.status_code == 200
+        new_hash = store.get_user_by_id("u1").password_hash
+        assert new_hash != old_hash
+        assert not needs_rehash(new_hash, fast_config)
+        assert verify_password("pw123456789", new_hash)
+
+        bad = client.post("/api/auth/login", json={"email": "a@example.com", "password": "nope"})
+        assert bad.status_code == 401
+
+    def test_busy_pool_returns_503(self, client_and_store, monkeypatch) -> None:
+        client, store, hasher = client_and_store
+
+        async def busy(*args, **kwargs):
+            raise PasswordHashingBusy("full")
+
+        monkeypatch.setattr(hasher, "verify", busy)
+        response = client.post(
+            "/api/auth/login", json={"email": "a@example.com", "password": "pw123456789"},
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
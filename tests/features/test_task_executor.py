@@ -0,0 +1,225 @@
+"""Tests for the bounded task executor.
+
+Covers:
+1. Priorities across kinds and per-kind running caps
+2. Admission control: queue depth and per-user limits raise TaskRejected
+3. Bounded worker threads, exceptions surfaced on the Future
+4. Shared timer thread (call_later / cancel)
+5. /api/chat/send answers 429 + Retry-After when chat is saturated
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.deps import require_auth
+from src.backend.api.routes import chat_routes
+from src.backend.api.routes.chat_routes import register_chat_routes
+from src.backend.storage.auth import AuthUser
+from src.backend.tasks.executor import KindLimits, TaskExecutor, TaskKind, TaskRejected
+from src.backend.tasks.registry import task_registry
+from src.backend.tasks.sse import EventSink
+
+
+def _limits(**overrides: KindLimits) -> dict:
+    limits = {
+        TaskKind.CHAT: KindLimits(priority=0, max_running=4, max_queued=4, per_user=4),
+        TaskKind.BUILDER: KindLimits(priority=1, max_running=4, max_queued=4, per_user=4),
+        TaskKind.BULK: KindLimits(priority=2, max_running=4, max_queued=4, per_user=4),
+    }
+    limits.update({TaskKind(k): v for k, v in overrides.items()})
+    return limits
+
+
+@pytest.fixture
+def executors():
+    created = []
+
+    def make(**kwargs) -> TaskExecutor:
+        executor = TaskExecutor(**kwargs)
+        created.append(executor)
+        return executor
+
+    yield make
+    for executor in created:
+        executor.shutdown(wait=False)
+
+
+class TestScheduling:
+    def test_chat_runs_before_queued_bulk(self, executors) -> None:
+        executor = executors(max_workers=1, limits=_limits())
+        gate = threading.Event()
+        order = []
+        executor.submit(TaskKind.BULK, gate.wait)
+        time.sleep(0.05)  # let the single worker pick up the blocker
+
+        done = [
+            executor.submit(TaskKind.BULK, order.append, "bulk"),
+            executor.submit(TaskKind.BUILDER, order.append, "builder"),
+            executor.submit(TaskKind.CHAT, order.append, "chat"),
+        ]
+        gate.set()
+        for future in done:
+            future.result(timeout=2)
+        assert order == ["chat", "builder", "bulk"]
+
+    def test_kind_running_cap(self, executors) -> None:
+        executor = executors(
+            max_workers=4,
+            limits=_limits(builder=KindLimits(priority=1, max_running=1, max_queued=4, per_user=4)),
+        )
+        lock = threading.Lock()
+        running = peak = 0
+
+        def job() -> None:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        futures = [executor.submit(TaskKind.BUILDER, job) for _ in range(4)]
+        for future in futures:
+            future.result(timeout=2)
+        assert peak == 1
+
+    def test_worker_threads_are_bounded(self, executors) -> None:
+        executor = executors(
+            max_workers=3,
+            limits=_limits(bulk=KindLimits(priority=2, max_running=8, max_queued=100, per_user=100)),
+        )
+        names = set()
+
+        def job() -> None:
+            names.add(threading.current_thread().name)
+            time.sleep(0.005)
+
+        futures = [executor.submit(TaskKind.BULK, job) for _ in range(40)]
+        for future in futures:
+            future.result(timeout=5)
+        assert 1 <= len(names) <= 3
+
+    def test_chat_gets_workers_while_other_kinds_are_saturated(self, executors) -> None:
+        executor = executors(limits=_limits())
+        gate = threading.Event()
+        blockers = [
+            executor.submit(kind, gate.wait)
+            for kind in (TaskKind.BUILDER, TaskKind.BULK)
+            for _ in range(4)
+        ]
+        started = threading.Barrier(5)
+        chats = [executor.submit(TaskKind.CHAT, started.wait, 2) for _ in range(4)]
+        try:
+            started.wait(2)  # all four chat jobs run at once
+        finally:
+            gate.set()
+        for future in blockers + chats:
+            future.result(timeout=2)
+
+    def test_default_pool_covers_every_kind_cap(self) -> None:
+        executor = TaskExecutor()
+        assert executor._max_workers >= sum(
+            limits.max_running for limits in executor._limits.values()
+        )
+
+    def test_exception_reaches_future(self, executors) -> None:
+        executor = executors(limits=_limits())
+
+        def boom() -> None:
+            raise ValueError("nope")
+
+        with pytest.raises(ValueError):
+            executor.submit(TaskKind.BULK, boom).result(timeout=2)
+
+
+class TestAdmission:
+    def test_full_queue_rejects_with_retry_after(self, executors) -> None:
+        executor = executors(
+            max_workers=1,
+            limits=_limits(bulk=KindLimits(priority=2, max_running=1, max_queued=1, per_user=10)),
+        )
+        gate = threading.Event()
+        executor.submit(TaskKind.BULK, gate.wait)
+        time.sleep(0.05)
+        executor.submit(TaskKind.BULK, gate.wait)
+
+        with pytest.raises(TaskRejected) as excinfo:
+            executor.submit(TaskKind.BULK, gate.wait)
+        assert excinfo.value.retry_after >= 1
+        # Other kinds are unaffected
+        executor.submit(TaskKind.CHAT, lambda: None)
+        gate.set()
+
+    def test_per_user_limit(self, executors) -> None:
+        executor = executors(
+            limits=_limits(chat=KindLimits(priority=0, max_running=4, max_queued=4, per_user=1)),
+        )
+        gate = threading.Event()
+        first = executor.submit(TaskKind.CHAT, gate.wait, user_id="u1")
+
+        with pytest.raises(TaskRejected):
+            executor.submit(TaskKind.CHAT, gate.wait, user_id="u1")
+        other = executor.submit(TaskKind.CHAT, gate.wait, user_id="u2")
+
+        gate.set()
+        first.result(timeout=2)
+        other.result(timeout=2)
+        # The slot is released once the job finishes
+        executor.submit(TaskKind.CHAT, lambda: None, user_id="u1").result(timeout=2)
+
+
+class TestTimers:
+    def test_call_later_and_cancel(self, executors) -> None:
+        executor = executors()
+        fired = threading.Event()
+        cancelled = threading.Event()
+
+        handle = executor.call_later(0.01, cancelled.set)
+        handle.cancel()
+        executor.call_later(0.02, fired.set)
+
+        assert fired.wait(2)
+        assert not cancelled.is_set()
+
+
+class TestChatAdmission:
+    def test_send_returns_429_when_saturated(self, monkeypatch) -> None:
+        app = FastAPI()
+        register_chat_routes(
+            app, conversation_store=MagicMock(), repo_root=MagicMock(),
+            workflow_store=None, conversation_logger=None,
+        )
+        app.dependency_overrides[require_auth] = lambda: AuthUser(
+            id="u1", email="u@example.com", name="U", password_hash="",
+            created_at="", last_login_at=None,
+        )
+
+        def reject(*args, **kwargs):
+            raise TaskRejected("Too many chat tasks queued", 7)
+
+        monkeypatch.setattr(chat_routes.task_executor, "submit", reject)
+        sinks = []
+
+        class RecordingSink(EventSink):
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+                sinks.append(self)
+
+        monkeypatch.setattr(chat_routes, "EventSink", RecordingSink)
+        response = TestClient(app).post(
+            "/api/chat/send", json={"message": "hi", "task_id": "t-busy"},
+        )
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+        assert task_registry.get("t-busy") is None
+        (sink,) = sinks
+        assert sink.is_closed
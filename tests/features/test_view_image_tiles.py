@@ -0,0 +1,161 @@
+"""Tests for view_image overviews and zoomed regions.
+
+Covers:
+1. Large images come back as an overview within the per-view budget
+2. Regions and zoom levels render the expected part and size
+3. Each upload is decoded once; tiles are shared by content hash
+4. Small images are still sent as they are
+5. Invalid regions and zoom levels are rejected
+6. Transparent areas render white; the pyramid budget is configurable
+"""
+
+import base64
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src.backend.tools.workflow_analysis.view_image import ViewImageTool
+from src.backend.utils.image_tiles import ImagePyramid, ImageTileCache, set_image_tile_cache
+
+
+def _png(path: Path, size) -> bytes:
+    """Left half red, right half blue."""
+    img = Image.new("RGB", size, (255, 0, 0))
+    img.paste((0, 0, 255), (size[0] // 2, 0, size[0], size[1]))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    path.write_bytes(buf.getvalue())
+    return buf.getvalue()
+
+
+@pytest.fixture
+def tiles():
+    # 100x100 px per view so small test images still need several levels
+    cache = ImageTileCache(max_pixels=10_000, max_dimension=100)
+    previous = set_image_tile_cache(cache)
+    yield cache
+    set_image_tile_cache(previous)
+
+
+def _view(tmp_path, name, **args):
+    session = {"uploaded_files": [
+        {"name": name, "path": str(tmp_path / name), "file_type": "image"},
+    ]}
+    return ViewImageTool().execute(args, session_state=session)
+
+
+def _sent(result) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(result["content"][0]["source"]["data"])))
+
+
+def test_pyramid_levels_halve_down_to_budget():
+    pyramid = ImagePyramid(Image.new("RGB", (800, 400)), max_pixels=10_000, max_dimension=100)
+    assert [img.size for img in pyramid.levels] == [(100, 50), (200, 100), (400, 200), (800, 400)]
+    assert pyramid.max_level == 3
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA", "P"])
+def test_transparent_areas_render_white(mode):
+    image = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+    image.putpixel((0, 0), (255, 0, 0, 255))
+    if mode == "LA":
+        image = image.convert("LA")
+    elif mode == "P":
+        image = image.convert("P")
+        image.info["transparency"] = image.getpixel((3, 3))
+    level = ImagePyramid(image).levels[0]
+    assert level.mode == "RGB"
+    assert level.getpixel((3, 3)) == (255, 255, 255)
+    assert level.getpixel((0, 0)) != (255, 255, 255)
+
+
+def test_pyramid_budget_from_env(monkeypatch):
+    monkeypatch.setenv("LEMON_IMAGE_PYRAMID_CACHE_MB", "2048")
+    assert ImageTileCache()._pyramid_budget == 2048 * 1024 * 1024
+    monkeypatch.setenv("LEMON_IMAGE_PYRAMID_CACHE_MB", "lots")
+    assert ImageTileCache()._pyramid_budget == 512 * 1024 * 1024
+
+
+def test_large_image_returns_overview(tiles, tmp_path):
+    _png(tmp_path / "scan.png", (800, 400))
+
+    result = _view(tmp_path, "scan.png")
+
+    assert result["success"] is True
+    sent = _sent(result)
+    assert (sent.format, sent.size) == ("JPEG", (100, 50))
+    caption = result["content"][1]["text"]
+    assert "scan.png (800x400 px)" in caption
+    assert "zoom 0 of 3" in caption
+
+
+def test_region_and_zoom(tiles, tmp_path):
+    _png(tmp_path / "scan.png", (800, 400))
+    right_half = {"x": 0.5, "y": 0, "width": 0.5, "height": 1}
+
+    zoomed = _sent(_view(tmp_path, "scan.png", region=right_half, zoom=1))
+    assert zoomed.size == (100, 100)
+    r, g, b = zoomed.convert("RGB").getpixel((50, 50))
+    assert b > 200 and r < 50
+
+    # Without zoom: the most detailed level at which the region fits
+    auto = _view(tmp_path, "scan.png", region={"x": 0.25, "y": 0.25, "width": 0.1, "height": 0.1})
+    assert _sent(auto).size == (80, 40)
+    assert "zoom 3 of 3" in auto["content"][1]["text"]
+
+    # Zoom past the top level is clamped
+    clamped = _view(tmp_path, "scan.png", region=right_half, zoom=9)
+    assert "zoom 3 of 3" in clamped["content"][1]["text"]
+    assert max(_sent(clamped).size) <= 100
+
+
+def test_decoded_once_and_tiles_shared_by_content(tiles, tmp_path):
+    raw = _png(tmp_path / "a.png", (800, 400))
+    (tmp_path / "b.png").write_bytes(raw)
+    region = {"x": 0, "y": 0, "width": 0.5, "height": 0.5}
+
+    with patch.object(ImagePyramid, "from_bytes", wraps=ImagePyramid.from_bytes) as decode:
+        _view(tmp_path, "a.png", zoom=0)
+        _view(tmp_path, "a.png", region=region, zoom=2)
+        first = _view(tmp_path, "b.png", region=region, zoom=2)
+        with patch.object(ImagePyramid, "render", side_effect=AssertionError("re-rendered")):
+            second = _view(tmp_path, "a.png", region=region, zoom=2)
+
+    assert decode.call_count == 1
+    assert first["content"][0] == second["content"][0]
+    assert len(tiles._pyramids) == 1
+
+
+def test_small_image_sent_as_is(tiles, tmp_path):
+    raw = _png(tmp_path / "small.png", (60, 40))
+    result = _view(tmp_path, "small.png")
+    assert base64.b64decode(result["content"][0]["source"]["data"]) == raw
+    assert tiles._pyramids == {}
+
+
+@pytest.mark.parametrize("args, code", [
+    ({"region": {"x": 1.2, "y": 0, "width": 0.5, "height": 0.5}}, "INVALID_REGION"),
+    ({"region": {"x": 0, "y": 0, "width": 0, "height": 0.5}}, "INVALID_REGION"),
+    ({"region": "top-left"}, "INVALID_REGION"),
+    ({"zoom": -1}, "INVALID_ZOOM"),
+])
+def test_invalid_arguments(tiles, tmp_path, args, code):
+    _png(tmp_path / "scan.png", (800, 400))
+    result = _view(tmp_path, "scan.png", **args)
+    assert result["success"] is False
+    assert result["error_code"] == code
+
+
+def test_undecodable_image_is_an_error(tiles, tmp_path):
+    # PNG signature, truncated body: passes the header check, fails to decode
+    raw = _png(tmp_path / "scan.png", (800, 400))
+    (tmp_path / "scan.png").write_bytes(raw[:200])
+
+    result = _view(tmp_path, "scan.png", zoom=0)
+
+    assert result["success"] is False
+    assert result["error_code"] == "INVALID_IMAGE"
+    assert tiles._decode_locks == {}
@@ -0,0 +1,192 @@
+"""Tests for versioned workflow_state deltas.
+
+Covers:
+1. make_patch / apply_patch roundtrip (incl. pointer escaping, list edits)
+2. WorkflowStateStream: snapshot first, patches after, fallback to snapshot
+3. ChatEventChannel publishes patches and replays a versioned snapshot
+4. /api/chat/resync returns the snapshot for the active task
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.deps import require_auth
+from src.backend.api.routes.chat_routes import register_chat_routes
+from src.backend.storage.auth import AuthUser
+from src.backend.tasks.chat_event_channel import ChatEventChannel
+from src.backend.tasks.registry import task_registry
+from src.backend.tasks.sse import EventSink
+from src.backend.tasks.workflow_state_stream import WorkflowStateStream
+from src.backend.utils.json_patch import JsonPatchError, apply_patch, make_patch
+
+
+def _workflow(n_nodes: int) -> dict:
+    return {
+        "nodes": [{"id": f"n{i}", "label": f"Node {i}", "x": i * 10, "y": 0} for i in range(n_nodes)],
+        "edges": [{"from": f"n{i}", "to": f"n{i + 1}"} for i in range(n_nodes - 1)],
+    }
+
+
+def _payload(workflow: dict, *, workflow_id: str = "wf-1") -> dict:
+    return {
+        "workflow_id": workflow_id,
+        "workflow": workflow,
+        "analysis": {"variables": [], "outputs": []},
+        "task_id": "t1",
+    }
+
+
+class TestJsonPatch:
+    @pytest.mark.parametrize("old,new", [
+        ({"a": 1}, {"a": 2}),
+        ({"a": 1, "b": 2}, {"b": 2, "c": 3}),
+        ([1, 2, 3], [1, 3]),
+        ([1, 2, 3], [0, 1, 2, 3, 4]),
+        ({"a/b": {"~c": [1]}}, {"a/b": {"~c": [1, 2]}}),
+        ({"a": [1]}, {"a": {"0": 1}}),
+        (1, "x"),
+    ])
+    def test_roundtrip(self, old, new) -> None:
+        assert apply_patch(old, make_patch(old, new)) == new
+
+    def test_apply_does_not_mutate_input(self) -> None:
+        doc = {"nodes": [{"id": "a"}]}
+        apply_patch(doc, [{"op": "add", "path": "/nodes/-", "value": {"id": "b"}}])
+        assert doc == {"nodes": [{"id": "a"}]}
+
+    def test_single_node_edits_stay_small(self) -> None:
+        old = _workflow(300)
+        new = copy.deepcopy(old)
+        new["nodes"][10]["label"] = "Renamed"
+        new["nodes"].append({"id": "n300", "label": "New", "x": 0, "y": 0})
+        del new["edges"][150]
+
+        patch = make_patch(old, new)
+        assert patch == [
+            {"op": "replace", "path": "/nodes/10/label", "value": "Renamed"},
+            {"op": "add", "path": "/nodes/-", "value": new["nodes"][-1]},
+            {"op": "remove", "path": "/edges/150"},
+        ]
+
+    def test_bad_patch_raises(self) -> None:
+        with pytest.raises(JsonPatchError):
+            apply_patch({"a": []}, [{"op": "remove", "path": "/a/0"}])
+        with pytest.raises(JsonPatchError):
+            apply_patch({"a": 1}, [{"op": "replace", "path": "/b", "value": 2}])
+
+
+class TestWorkflowStateStream:
+    def test_snapshot_then_patches(self) -> None:
+        stream = WorkflowStateStream()
+        workflow = _workflow(300)
+
+        event, data = stream.next_event(_payload(workflow))
+        assert event == "workflow_state_updated"
+        assert data["version"] == 1
+
+        workflow["nodes"].append({"id": "extra"})
+        event, data = stream.next_event(_payload(workflow))
+        assert event == "workflow_state_patch"
+        assert (data["base_version"], data["version"]) == (1, 2)
+        assert data["workflow_id"] == "wf-1" and data["task_id"] == "t1"
+        assert "workflow" not in data
+        assert len(json.dumps(data)) < 500
+
+        base = {"workflow": _workflow(300), "analysis": {"variables": [], "outputs": []}}
+        assert apply_patch(base, data["patch"])["workflow"] == workflow
+
+    def test_base_is_a_copy(self) -> None:
+        stream = WorkflowStateStream()
+        workflow = _workflow(3)
+        stream.next_event(_payload(workflow))
+        workflow["nodes"][0]["label"] = "mutated in place"
+
+        event, data = stream.next_event(_payload(workflow))
+        assert event == "workflow_state_patch"
+        assert data["patch"] == [
+            {"op": "replace", "path": "/workflow/nodes/0/label", "value": "mutated in place"},
+        ]
+
+    def test_workflow_switch_sends_snapshot(self) -> None:
+        stream = WorkflowStateStream()
+        stream.next_event(_payload(_workflow(3)))
+        event, data = stream.next_event(_payload(_workflow(3), workflow_id="wf-2"))
+        assert event == "workflow_state_updated"
+        assert data["version"] == 2
+
+    def test_large_change_sends_snapshot(self) -> None:
+        stream = WorkflowStateStream()
+        stream.next_event(_payload(_workflow(50)))
+        event, _ = stream.next_event(_payload({"nodes": [], "edges": []}))
+        assert event == "workflow_state_updated"
+
+    def test_snapshot_carries_version(self) -> None:
+        stream = WorkflowStateStream()
+        assert stream.snapshot() is None
+        stream.next_event(_payload(_workflow(2)))
+        stream.next_event(_payload(_workflow(3)))
+        snapshot = stream.snapshot()
+        assert snapshot["version"] == 2
+        assert snapshot["workflow"] == _workflow(3)
+
+
+class TestChannelDeltas:
+    def test_channel_publishes_patch_and_replays_snapshot(self) -> None:
+        sink = MagicMock(spec=EventSink)
+        sink.is_closed = False
+        channel = ChatEventChannel(sink, "t1", lambda: "wf-1")
+        workflow = _workflow(20)
+        channel.publish_workflow_state(_payload(workflow))
+        workflow["nodes"][0]["x"] = 99
+        channel.publish_workflow_state(_payload(workflow))
+
+        events = [c.args[0] for c in sink.push.call_args_list]
+        assert events == ["workflow_state_updated", "workflow_state_patch"]
+
+        new_sink = MagicMock(spec=EventSink)
+        new_sink.is_closed = False
+        channel.swap_sink(new_sink)
+        replayed = [c.args for c in new_sink.push_replay.call_args_list
+                    if c.args[0] == "workflow_state_updated"]
+        assert replayed[0][1]["version"] == 2
+        assert replayed[0][1]["workflow"]["nodes"][0]["x"] == 99
+
+
+class TestResyncRoute:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        register_chat_routes(
+            app, conversation_store=MagicMock(), repo_root=MagicMock(),
+            workflow_store=None, conversation_logger=None,
+        )
+        app.dependency_overrides[require_auth] = lambda: AuthUser(
+            id="u1", email="u@example.com", name="U", password_hash="",
+            created_at="", last_login_at=None,
+        )
+        return TestClient(app)
+
+    def test_returns_active_task_snapshot(self, client, monkeypatch) -> None:
+        task = MagicMock()
+        task.workflow_state_snapshot.return_value = {**_payload(_workflow(2)), "version": 7}
+        monkeypatch.setattr(task_registry, "get_by_workflow", lambda user_id, wf_id: task)
+
+        body = client.post("/api/chat/resync", json={"workflow_id": "wf-1"}).json()
+        assert body["status"] == "ok"
+        assert body["version"] == 7
+        assert body["workflow"] == _workflow(2)
+
+    def test_no_active_task(self, client, monkeypatch) -> None:
+        monkeypatch.setattr(task_registry, "get_by_workflow", lambda user_id, wf_id: None)
+        body = client.post("/api/chat/resync", json={"workflow_id": "wf-1"}).json()
+        assert body == {"status": "no_active_task", "workflow_id": "wf-1"}
+
+    def test_requires_workflow_id(self, client) -> None:
+        assert client.post("/api/chat/resync", json={}).status_code == 400
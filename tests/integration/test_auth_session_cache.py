@@ -0,0 +1,128 @@
+"""Tests for AuthStore's session validation cache and batched touches."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.backend.api.auth import SESSION_COOKIE_NAME, get_session_from_cookies, hash_session_token
+from src.backend.api.deps import require_auth
+from src.backend.storage.auth import AuthStore, AuthUser
+
+
+def _future(hours: int = 1) -> str:
+    return (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    store = AuthStore(tmp_path / "auth.sqlite", touch_interval_seconds=3600)
+    store.create_user("u1", "a@example.com", "A", "hash")
+    store.create_session("s1", "u1", hash_session_token("tok1"), expires_at=_future())
+    yield store
+    store.close()
+
+
+def _last_used(store: AuthStore, session_id: str) -> str:
+    conn = sqlite3.connect(str(store.db_path))
+    try:
+        return conn.execute(
+            "SELECT last_used_at FROM sessions WHERE id = ?", (session_id,),
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestSessionCache:
+    def test_repeat_validation_skips_the_database(self, store: AuthStore, monkeypatch) -> None:
+        cookies = {SESSION_COOKIE_NAME: "tok1"}
+        assert get_session_from_cookies(store, cookies) is not None
+
+        def no_db():
+            raise AssertionError("database hit")
+
+        monkeypatch.setattr(store, "_conn", no_db)
+        for _ in range(5):
+            session, user = get_session_from_cookies(store, cookies)
+        assert (session.id, user.id) == ("s1", "u1")
+
+    def test_logout_invalidates(self, store: AuthStore) -> None:
+        token_hash = hash_session_token("tok1")
+        assert store.get_session_by_token_hash(token_hash) is not None
+        store.delete_session_by_token_hash(token_hash)
+        assert store.get_session_by_token_hash(token_hash) is None
+
+    def test_pruned_sessions_invalidated(self, store: AuthStore) -> None:
+        token_hash = hash_session_token("tok1")
+        assert store.get_session_by_token_hash(token_hash) is not None
+        store.create_session("s2", "u1", "tok2", expires_at=_future())
+        store.touch_session("s2")
+        assert store.prune_sessions("u1", max_sessions=1) == 1
+        assert store.get_session_by_token_hash(token_hash) is None
+
+    def test_ttl_zero_disables_cache(self, tmp_path: Path) -> None:
+        store = AuthStore(tmp_path / "nocache.sqlite", session_cache_ttl_seconds=0)
+        store.create_user("u1", "a@example.com", "A", "hash")
+        store.create_session("s1", "u1", "tok", expires_at=_future())
+        store.get_session_by_token_hash("tok")
+        assert store._session_cache == {}
+
+
+class TestBatchedTouches:
+    def test_touches_coalesce_into_one_flush(self, store: AuthStore) -> None:
+        before = _last_used(store, "s1")
+        for _ in range(10):
+            get_session_from_cookies(store, {SESSION_COOKIE_NAME: "tok1"})
+        assert _last_used(store, "s1") == before
+
+        assert store.flush_session_touches() == 1
+        assert _last_used(store, "s1") > before
+        assert store.flush_session_touches() == 0
+
+    def test_background_thread_flushes(self, tmp_path: Path) -> None:
+        store = AuthStore(tmp_path / "bg.sqlite", touch_interval_seconds=0.01)
+        store.create_user("u1", "a@example.com", "A", "hash")
+        store.create_session("s1", "u1", "tok", expires_at=_future())
+        before = _last_used(store, "s1")
+        store.touch_session("s1")
+        thread = store._touch_thread
+        assert thread is not None and thread.is_alive()
+
+        store.close()
+        assert not thread.is_alive()
+        assert _last_used(store, "s1") > before
+
+
+class TestRequireAuth:
+    def test_cache_miss_is_looked_up_off_the_event_loop(self, store: AuthStore) -> None:
+        lookup_threads: list[str] = []
+        conn = store._conn
+
+        def recording_conn():
+            lookup_threads.append(threading.current_thread().name)
+            return conn()
+
+        store._conn = recording_conn  # type: ignore[method-assign]
+        app = FastAPI()
+        app.state.auth_store = store
+
+        @app.get("/me")
+        async def me(user: AuthUser = Depends(require_auth)) -> dict:
+            return {"id": user.id, "loop_thread": threading.current_thread().name}
+
+        with TestClient(app) as client:
+            client.cookies.set(SESSION_COOKIE_NAME, "tok1")
+            first = client.get("/me")
+            second = client.get("/me")  # cache hit: no lookup at all
+            client.cookies.set(SESSION_COOKIE_NAME, "bogus")
+            assert client.get("/me").status_code == 401
+
+        assert first.json()["id"] == second.json()["id"] == "u1"
+        assert len(lookup_threads) == 2
+        assert all(name.startswith("store-io") for name in lookup_threads)
@@ -7,9 +7,13 @@ thread safety, tool-call aggregation, and compaction logging.
 from __future__ import annotations
 
 import json
+import sqlite3
 import tempfile
 import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -151,12 +155,35 @@ class TestSequenceMonotonicity:
         lg1.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
         lg1.log_user_message(CONV_ID, "first")
         lg1.log_user_message(CONV_ID, "second")
+        lg1.close()  # shutdown commits anything still queued
 
         # Simulate restart — new instance, same DB file.
         lg2 = ConversationLogger(db)
         seq = lg2.log_user_message(CONV_ID, "third")
         assert seq == 3
 
+    def test_two_writers_alternating(self, tmp_path: Path) -> None:
+        """A conversation moving A -> B -> A keeps one gap-free numbering.
+
+        Each worker resyncs when it takes the conversation over (as
+        ConversationStore does on claim), so the seqs log_* hands back are
+        the ones stored.
+        """
+        db = tmp_path / "workers.sqlite"
+        a, b = ConversationLogger(db), ConversationLogger(db)
+        a.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+
+        returned = []
+        for writer, content in ((a, "a1"), (b, "b1"), (a, "a2"), (b, "b2"), (a, "a3")):
+            writer.resync_seq(CONV_ID)
+            returned.append((writer.log_user_message(CONV_ID, content), content))
+            writer.flush()
+
+        timeline = [(e["seq"], e["content"]) for e in a.get_conversation_timeline(CONV_ID)]
+        assert timeline == returned == [(1, "a1"), (2, "b1"), (3, "a2"), (4, "b2"), (5, "a3")]
+        assert a.last_seq(CONV_ID) == 5
+        assert a.checkpoint_history(CONV_ID, [], force=True) == 5
+
 
 # ------------------------------------------------------------------
 # Thread safety
@@ -304,3 +331,466 @@ class TestListConversations:
         assert len(page2) == 2
         all_ids = {c["id"] for c in page} | {c["id"] for c in page2}
         assert len(all_ids) == 4  # no overlap
+
+
+# ------------------------------------------------------------------
+# Group-commit writer
+# ------------------------------------------------------------------
+
+class TestGroupCommit:
+    @staticmethod
+    def _raw_count(lg: ConversationLogger) -> int:
+        total = 0
+        for path in lg.partition_paths():
+            conn = sqlite3.connect(str(path))
+            try:
+                total += conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            finally:
+                conn.close()
+        return total
+
+    def test_entries_are_batched(self, tmp_path: Path) -> None:
+        lg = ConversationLogger(tmp_path / "batch.sqlite", batch_size=16, flush_interval_ms=1000)
+        batches: list[int] = []
+        write_rows = lg._write_rows
+
+        def recording(rows):
+            batches.append(len(rows))
+            write_rows(rows)
+
+        lg._write_rows = recording  # type: ignore[method-assign]
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        for i in range(40):
+            lg.log_tool_call(CONV_ID, "add_node", {"i": i}, {}, True, 1.0)
+        lg.flush()
+
+        assert sum(batches) == 40
+        assert len(batches) < 40
+        assert max(batches) <= 16
+
+    def test_flush_gives_read_your_writes(self, tmp_path: Path) -> None:
+        db = tmp_path / "flush.sqlite"
+        lg = ConversationLogger(db, flush_interval_ms=10_000)
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        lg.log_user_message(CONV_ID, "hello")
+        # flush() must not wait out the 10s batching window
+        lg.flush()
+        assert self._raw_count(lg) == 1
+
+    def test_close_drains_queue_and_stops_writer(self, tmp_path: Path) -> None:
+        db = tmp_path / "close.sqlite"
+        lg = ConversationLogger(db, flush_interval_ms=10_000)
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        for i in range(5):
+            lg.log_user_message(CONV_ID, f"m{i}")
+        writer = lg._writer
+        lg.close()
+        assert writer is not None and not writer.is_alive()
+        assert self._raw_count(lg) == 5
+
+    def test_full_queue_applies_backpressure(self, tmp_path: Path) -> None:
+        lg = ConversationLogger(tmp_path / "bp.sqlite", batch_size=1, max_pending=2)
+        release = threading.Event()
+        write_rows = lg._write_rows
+
+        def stalled(rows):
+            release.wait()
+            write_rows(rows)
+
+        lg._write_rows = stalled  # type: ignore[method-assign]
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+
+        done = threading.Event()
+
+        def producer() -> None:
+            for i in range(6):
+                lg.log_user_message(CONV_ID, f"m{i}")
+            done.set()
+
+        t = threading.Thread(target=producer)
+        t.start()
+        assert not done.wait(0.2), "producer should block on a full queue"
+        release.set()
+        t.join(5)
+        assert done.is_set()
+        assert len(lg.get_conversation_timeline(CONV_ID)) == 6
+
+    def test_writer_survives_non_sqlite_errors(self, tmp_path: Path) -> None:
+        """A failed batch is dropped and logged; flush() and later entries still work."""
+        lg = ConversationLogger(tmp_path / "crash.sqlite")
+        write_rows = lg._write_rows
+        calls = {"n": 0}
+
+        def fail_first(rows):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OSError("partition directory vanished")
+            write_rows(rows)
+
+        lg._write_rows = fail_first  # type: ignore[method-assign]
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        lg.log_user_message(CONV_ID, "lost")
+        flusher = threading.Thread(target=lg.flush, daemon=True)
+        flusher.start()
+        flusher.join(5)
+        assert not flusher.is_alive(), "flush() hung on a dead writer"
+
+        lg.log_user_message(CONV_ID, "kept")
+        lg.flush()
+        assert lg._writer is not None and lg._writer.is_alive()
+        assert [e["content"] for e in lg.get_conversation_timeline(CONV_ID)] == ["kept"]
+
+
+# ------------------------------------------------------------------
+# Content-addressed workflow snapshots
+# ------------------------------------------------------------------
+
+class TestSnapshotDedup:
+    @staticmethod
+    def _scalar(db: Path, sql: str) -> int:
+        conn = sqlite3.connect(str(db))
+        try:
+            return conn.execute(sql).fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_identical_snapshots_share_one_blob(self, tmp_path: Path) -> None:
+        db = tmp_path / "dedup.sqlite"
+        lg = ConversationLogger(db)
+        wf = {"nodes": [{"id": "n1", "label": "Start"}], "edges": [], "variables": []}
+        for conv in ("c1", "c2"):
+            lg.ensure_conversation(conv, user_id=USER_ID, model=MODEL)
+            for _ in range(10):
+                lg.log_workflow_snapshot(conv, wf)
+        # Key order doesn't matter — canonical JSON hashes the same.
+        lg.log_workflow_snapshot("c1", {"variables": [], "edges": [], "nodes": wf["nodes"]})
+        lg.flush()
+
+        assert self._scalar(db, "SELECT COUNT(*) FROM snapshot_blobs") == 1
+        (partition,) = lg.partition_paths()
+        assert self._scalar(
+            partition, "SELECT COUNT(*) FROM entries WHERE workflow_snapshot IS NOT NULL",
+        ) == 0
+        snapshots = lg.get_workflow_snapshots("c1")
+        assert len(snapshots) == 11
+        assert all(s["workflow"] == wf for s in snapshots)
+
+    def test_blob_resent_after_failed_write(self, tmp_path: Path) -> None:
+        """A snapshot whose row (and blob) was lost doesn't stop later ones carrying it."""
+        lg = ConversationLogger(tmp_path / "retry.sqlite")
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        wf = {"nodes": [{"id": "n1"}], "edges": []}
+        apply_rows = lg._apply_rows
+        calls = {"n": 0}
+
+        def fail_first(month, items):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise sqlite3.OperationalError("disk I/O error")
+            apply_rows(month, items)
+
+        lg._apply_rows = fail_first
+        lg.log_workflow_snapshot(CONV_ID, wf)
+        lg.flush()
+        lg.log_workflow_snapshot(CONV_ID, wf)
+        lg.log_workflow_snapshot(CONV_ID, wf)
+        lg.flush()
+
+        snapshots = lg.get_workflow_snapshots(CONV_ID)
+        assert [s["workflow"] for s in snapshots] == [wf, wf]
+
+    def test_snapshot_queued_while_pruning_keeps_its_blob(self, tmp_path: Path) -> None:
+        lg = ConversationLogger(tmp_path / "race.sqlite")
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        wf = {"nodes": [{"id": "n1"}], "edges": []}
+        lg.log_workflow_snapshot(CONV_ID, wf)
+        lg.flush()
+        # Its only entry is gone: the blob is an orphan, but the hash is
+        # still this conversation's last snapshot
+        (partition,) = lg.partition_paths()
+        conn = sqlite3.connect(str(partition))
+        conn.execute("DELETE FROM entries")
+        conn.commit()
+        conn.close()
+
+        source_conn = lg._source_conn
+        raced: list[bool] = []
+
+        @contextmanager
+        def racing(month):
+            with source_conn(month) as src:
+                yield src
+            if month is not None and not raced:
+                # The same workflow is snapshotted once the scan has run
+                raced.append(True)
+                lg.log_workflow_snapshot(CONV_ID, wf)
+                deadline = time.monotonic() + 0.5
+                while lg._pending.unfinished_tasks and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+        lg._source_conn = racing  # type: ignore[method-assign]
+        lg.prune_orphaned_snapshot_blobs()
+        lg.flush()
+
+        assert raced
+        assert [s["workflow"] for s in lg.get_workflow_snapshots(CONV_ID)] == [wf]
+
+    def test_timeline_materialises_snapshot_json(self, logger: ConversationLogger) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_workflow_snapshot(CONV_ID, {"nodes": [], "edges": []})
+        logger.log_workflow_snapshot(CONV_ID, {"nodes": [{"id": "n1"}], "edges": []})
+
+        timeline = logger.get_conversation_timeline(CONV_ID)
+        assert [json.loads(e["workflow_snapshot"])["nodes"] for e in timeline] == [
+            [], [{"id": "n1"}],
+        ]
+        assert timeline[0]["snapshot_hash"] != timeline[1]["snapshot_hash"]
+        assert "snapshot_body" not in timeline[0]
+
+    def test_legacy_inline_snapshots_still_readable(self, tmp_path: Path) -> None:
+        db = tmp_path / "legacy.sqlite"
+        conn = sqlite3.connect(str(db))
+        conn.executescript(
+            """
+            CREATE TABLE conversations (
+                id TEXT PRIMARY KEY, workflow_id TEXT, user_id TEXT NOT NULL,
+                model TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+            );
+            CREATE TABLE entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL, seq INTEGER NOT NULL,
+                entry_type TEXT NOT NULL, role TEXT, content TEXT, tool_name TEXT,
+                tool_arguments TEXT, tool_result TEXT, tool_success INTEGER,
+                tool_duration_ms REAL, input_tokens INTEGER, output_tokens INTEGER,
+                cache_creation_tokens INTEGER, cache_read_tokens INTEGER,
+                workflow_snapshot TEXT, files TEXT, task_id TEXT,
+                timestamp TEXT NOT NULL, UNIQUE(conversation_id, seq)
+            );
+            INSERT INTO conversations VALUES ('c1', NULL, 'u', 'm', 't', 't');
+            INSERT INTO entries (conversation_id, seq, entry_type, workflow_snapshot, timestamp)
+                VALUES ('c1', 1, 'workflow_snapshot', '{"nodes": ["old"]}', 't');
+            """
+        )
+        conn.close()
+
+        lg = ConversationLogger(db)
+        lg.log_workflow_snapshot("c1", {"nodes": ["new"]})
+        assert [s["workflow"]["nodes"] for s in lg.get_workflow_snapshots("c1")] == [
+            ["old"], ["new"],
+        ]
+
+
+# ------------------------------------------------------------------
+# Usage rollups
+# ------------------------------------------------------------------
+
+class TestUsageRollups:
+    def test_global_stats_survive_retention(self, logger: ConversationLogger) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_tool_call(CONV_ID, "add_node", {}, {}, True, 10.0)
+        logger.log_tool_call(CONV_ID, "add_node", {}, {}, False, 20.0)
+
+        assert logger.prune_entries("9999-01-01T00:00:00") == 2
+        assert logger.get_tool_call_stats(conversation_id=CONV_ID) == []
+        (stats,) = logger.get_tool_call_stats()
+        assert (stats["tool_name"], stats["call_count"], stats["failure_count"]) == (
+            "add_node", 2, 1,
+        )
+        assert stats["avg_duration_ms"] == pytest.approx(15.0)
+
+    def test_backfill_on_upgrade(self, tmp_path: Path) -> None:
+        db = tmp_path / "upgrade.sqlite"
+        lg = ConversationLogger(db)
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        lg.log_tool_call(CONV_ID, "add_node", {}, {}, True, 10.0)
+        lg.log_assistant_response(CONV_ID, "done", input_tokens=7)
+        lg.close()
+        conn = sqlite3.connect(str(db))
+        conn.execute("DROP TABLE usage_rollups")
+        conn.commit()
+        conn.close()
+
+        rows = ConversationLogger(db).get_usage_rollups(user_id=USER_ID)
+        assert {r["tool_name"]: r["tool_calls"] for r in rows} == {"": 0, "add_node": 1}
+        assert sum(r["input_tokens"] for r in rows) == 7
+
+    def test_rebuild_matches_incremental(self, logger: ConversationLogger) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        for i in range(30):
+            logger.log_tool_call(CONV_ID, f"tool_{i % 3}", {}, {}, i % 4 != 0, float(i))
+            logger.log_assistant_response(CONV_ID, "r", output_tokens=i)
+        incremental = logger.get_usage_rollups()
+        logger.rebuild_rollups()
+        assert logger.get_usage_rollups() == incremental
+
+
+# ------------------------------------------------------------------
+# Monthly partitions
+# ------------------------------------------------------------------
+
+class TestPartitions:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        state = {"now": "2026-01-31T23:59:00+00:00"}
+        monkeypatch.setattr(ConversationLogger, "_now", staticmethod(lambda: state["now"]))
+        return state
+
+    def test_timeline_spans_months(self, logger: ConversationLogger, clock) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_user_message(CONV_ID, "january")
+        clock["now"] = "2026-02-01T00:01:00+00:00"
+        logger.log_assistant_response(CONV_ID, "february")
+        logger.ensure_conversation("other", user_id=USER_ID, model=MODEL)
+        clock["now"] = "2026-03-15T00:00:00+00:00"
+        logger.log_user_message("other", "march")
+
+        assert logger.list_partitions() == ["2026-01", "2026-02", "2026-03"]
+        assert logger._conversation_months(CONV_ID) == ["2026-01", "2026-02"]
+        timeline = logger.get_conversation_timeline(CONV_ID)
+        assert [(e["seq"], e["content"]) for e in timeline] == [(1, "january"), (2, "february")]
+
+    def test_seq_continues_across_partitions_after_restart(
+        self, tmp_path: Path, clock,
+    ) -> None:
+        db = tmp_path / "restart.sqlite"
+        lg1 = ConversationLogger(db)
+        lg1.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        lg1.log_user_message(CONV_ID, "one")
+        lg1.log_user_message(CONV_ID, "two")
+        lg1.close()
+
+        clock["now"] = "2026-02-10T00:00:00+00:00"
+        lg2 = ConversationLogger(db)
+        assert lg2.log_user_message(CONV_ID, "three") == 3
+        assert [e["seq"] for e in lg2.get_conversation_timeline(CONV_ID)] == [1, 2, 3]
+
+    def test_drop_partitions_removes_whole_months(
+        self, logger: ConversationLogger, clock,
+    ) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        for _ in range(3):
+            logger.log_tool_call(CONV_ID, "add_node", {}, {}, True, 1.0)
+        clock["now"] = "2026-03-01T00:00:00+00:00"
+        logger.log_user_message(CONV_ID, "kept")
+        january = logger.partition_paths()[0]
+
+        assert logger.drop_partitions("2026-02-15T00:00:00+00:00") == 3
+        assert logger.list_partitions() == ["2026-03"]
+        assert not january.exists()
+        assert [e["content"] for e in logger.get_conversation_timeline(CONV_ID)] == ["kept"]
+        # Rollups keep history the partitions no longer hold
+        assert logger.get_tool_call_stats()[0]["call_count"] == 3
+
+
+# ------------------------------------------------------------------
+# Full-text search
+# ------------------------------------------------------------------
+
+class TestFullTextSearch:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        state = {"now": "2026-01-10T12:00:00+00:00"}
+        monkeypatch.setattr(ConversationLogger, "_now", staticmethod(lambda: state["now"]))
+        return state
+
+    def test_date_range_spans_partitions(self, logger: ConversationLogger, clock) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_user_message(CONV_ID, "sepsis bundle in january")
+        clock["now"] = "2026-02-20T12:00:00+00:00"
+        logger.log_assistant_response(CONV_ID, "sepsis bundle in february")
+        clock["now"] = "2026-03-05T12:00:00+00:00"
+        logger.log_tool_call(CONV_ID, "add_node", {"label": "Sepsis screen"}, {}, True, 1.0)
+
+        assert [h["seq"] for h in logger.search_entries("sepsis")] == [3, 2, 1]
+        assert [h["seq"] for h in logger.search_entries("sepsis", since="2026-02-20")] == [3, 2]
+        assert [h["seq"] for h in logger.search_entries("sepsis", until="2026-02-20")] == [2, 1]
+        assert [h["seq"] for h in logger.search_entries("sepsis", limit=2, offset=1)] == [2, 1]
+        (hit,) = logger.search_entries("screen")
+        assert (hit["entry_type"], hit["tool_name"], hit["user_id"]) == (
+            "tool_call", "add_node", USER_ID,
+        )
+        assert "<mark>screen</mark>" in hit["snippet"].lower()
+
+    def test_index_follows_retention(self, logger: ConversationLogger, clock) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_user_message(CONV_ID, "warfarin dose")
+        clock["now"] = "2026-01-20T12:00:00+00:00"
+        logger.log_user_message(CONV_ID, "warfarin interaction")
+
+        assert logger.prune_entries("2026-01-15T00:00:00+00:00") == 1
+        assert [h["seq"] for h in logger.search_entries("warfarin")] == [2]
+        conn = sqlite3.connect(str(logger.partition_paths()[0]))
+        try:
+            conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+        finally:
+            conn.close()
+
+    def test_backfill_on_upgrade(self, tmp_path: Path, clock) -> None:
+        db = tmp_path / "upgrade.sqlite"
+        lg = ConversationLogger(db)
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        lg.log_user_message(CONV_ID, "heparin drip")
+        lg.log_thinking(CONV_ID, "heparin thinking stays unindexed")
+        lg.close()
+        conn = sqlite3.connect(str(lg.partition_paths()[0]))
+        conn.executescript(
+            "DROP TRIGGER entries_fts_ai; DROP TRIGGER entries_fts_ad; DROP TABLE entries_fts;"
+        )
+        conn.close()
+
+        hits = ConversationLogger(db).search_entries("heparin")
+        assert [(h["seq"], h["entry_type"]) for h in hits] == [(1, "user_message")]
+
+
+# ------------------------------------------------------------------
+# History checkpoints
+# ------------------------------------------------------------------
+
+class TestHistoryCheckpoints:
+    def test_written_when_due(self, tmp_path: Path) -> None:
+        lg = ConversationLogger(tmp_path / "ckpt.sqlite", checkpoint_every=3)
+        lg.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        assert lg.checkpoint_history(CONV_ID, history) is None  # nothing logged yet
+
+        lg.log_user_message(CONV_ID, "hi")
+        lg.log_assistant_response(CONV_ID, "hello")
+        assert lg.checkpoint_history(CONV_ID, history) == 2
+        lg.log_user_message(CONV_ID, "again")
+        assert lg.checkpoint_history(CONV_ID, history) is None  # 1 entry since
+        # Shorter history means it was compacted: always checkpoint
+        assert lg.checkpoint_history(CONV_ID, history[:1]) == 3
+        for _ in range(3):
+            lg.log_user_message(CONV_ID, "more")
+        assert lg.checkpoint_history(CONV_ID, history) == 6
+
+        assert lg.get_history_checkpoint(CONV_ID) == (6, history)
+        assert lg.get_history_checkpoint("other") is None
+        tail = lg.get_conversation_timeline(CONV_ID, after_seq=4)
+        assert [e["seq"] for e in tail] == [5, 6]
+
+    def test_written_on_the_writer_thread(self, logger: ConversationLogger) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_user_message(CONV_ID, "hi")
+        history = [{"role": "user", "content": "hi"}]
+        threads = []
+        write = logger._write_checkpoints
+
+        def record(items):
+            threads.append(threading.current_thread().name)
+            write(items)
+
+        with patch.object(logger, "_write_checkpoints", side_effect=record):
+            assert logger.checkpoint_history(CONV_ID, history, force=True) == 1
+            history.append({"role": "assistant", "content": "appended after"})
+            assert logger.get_history_checkpoint(CONV_ID) == (1, history[:1])
+        assert threads and all(name.startswith("conversation-log-writer") for name in threads)
+
+    def test_pruned_with_conversation(self, logger: ConversationLogger) -> None:
+        logger.ensure_conversation(CONV_ID, user_id=USER_ID, model=MODEL)
+        logger.log_user_message(CONV_ID, "hi")
+        logger.checkpoint_history(CONV_ID, [{"role": "user", "content": "hi"}])
+
+        logger.drop_partitions("9999-01-01T00:00:00+00:00")
+        assert logger.prune_empty_conversations("9999-01-01T00:00:00+00:00") == 1
+        assert logger.get_history_checkpoint(CONV_ID) is None
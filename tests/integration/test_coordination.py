@@ -0,0 +1,323 @@
+"""Tests for cross-worker coordination.
+
+Covers:
+1. Coordinator contract — the local and SQLite backends agree
+2. Two SQLite coordinators on one file see each other's state and messages
+3. Task cancel / execution controls are forwarded to the owning worker
+4. RelaySink -> AttachedSink fan-out keeps event ids and close semantics
+5. Login rate limits, conversation claims and session invalidations are
+   shared between workers
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.backend.api.auth import LoginRateLimiter
+from src.backend.storage import coordination
+from src.backend.storage.auth import AuthStore
+from src.backend.storage.conversation_log import ConversationLogger
+from src.backend.storage.coordination import (
+    LocalCoordinator,
+    SqliteCoordinator,
+    broadcast,
+    request,
+    set_coordinator,
+)
+from src.backend.tasks import execution_task
+from src.backend.tasks.conversations import ConversationStore
+from src.backend.tasks.registry import task_registry
+from src.backend.tasks.relay import AttachedSink, RelaySink
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture(params=["local", "sqlite"])
+def coordinator(request, tmp_path: Path):
+    if request.param == "local":
+        c = LocalCoordinator()
+    else:
+        c = SqliteCoordinator(tmp_path / "coordination.sqlite", poll_interval=0.005)
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def workers(tmp_path: Path):
+    """Two workers sharing one coordination file."""
+    path = tmp_path / "coordination.sqlite"
+    a = SqliteCoordinator(path, worker_id="A", poll_interval=0.005)
+    b = SqliteCoordinator(path, worker_id="B", poll_interval=0.005)
+    yield a, b
+    a.close()
+    b.close()
+
+
+@pytest.fixture
+def install():
+    """Install a coordinator as this process's; restores the previous one."""
+    installed: List[Any] = []
+
+    def _install(c):
+        installed.append(set_coordinator(c))
+        return c
+
+    yield _install
+    for previous in reversed(installed):
+        set_coordinator(previous)
+
+
+def _collect(c, channel: str) -> List[Dict[str, Any]]:
+    messages: List[Dict[str, Any]] = []
+    c.subscribe(channel, messages.append)
+    return messages
+
+
+class TestCoordinatorContract:
+    def test_put_get_delete(self, coordinator) -> None:
+        assert coordinator.get("ns", "k") is None
+        coordinator.put("ns", "k", {"v": 1}, ttl=60)
+        assert coordinator.get("ns", "k") == {"v": 1}
+        assert coordinator.get("other", "k") is None
+        coordinator.delete("ns", "k")
+        assert coordinator.get("ns", "k") is None
+
+    def test_entries_expire(self, coordinator) -> None:
+        coordinator.put("ns", "k", {"v": 1}, ttl=0.05)
+        time.sleep(0.1)
+        assert coordinator.get("ns", "k") is None
+
+    def test_update(self, coordinator) -> None:
+        bump = lambda cur: {"n": (cur or {"n": 0})["n"] + 1}
+        coordinator.update("ns", "k", bump, ttl=60)
+        assert coordinator.update("ns", "k", bump, ttl=60) == {"n": 2}
+        # Returning current unchanged keeps it; None deletes
+        assert coordinator.update("ns", "k", lambda cur: cur, ttl=60) == {"n": 2}
+        assert coordinator.get("ns", "k") == {"n": 2}
+        coordinator.update("ns", "k", lambda cur: None, ttl=60)
+        assert coordinator.get("ns", "k") is None
+
+    def test_publish_subscribe(self, coordinator) -> None:
+        messages = _collect(coordinator, "chan")
+        other = _collect(coordinator, "other")
+        coordinator.publish("chan", {"n": 1})
+        assert _wait_for(lambda: messages == [{"n": 1}])
+        assert other == []
+
+    def test_request_reply(self, coordinator, install, monkeypatch) -> None:
+        monkeypatch.setitem(coordination._control_handlers, "test_echo", lambda p: {"echo": p["x"]})
+        install(coordinator)
+        assert request(coordinator.worker_id, "test_echo", {"x": 5}) == {"echo": 5}
+
+
+class TestSharedBackend:
+    def test_workers_share_state_and_messages(self, workers) -> None:
+        a, b = workers
+        a.put("tasks", "t1", {"worker_id": "A"}, ttl=60)
+        assert b.get("tasks", "t1") == {"worker_id": "A"}
+
+        received = _collect(a, "control:A")
+        b.publish("control:A", {"kind": "ping"})
+        assert _wait_for(lambda: received == [{"kind": "ping"}])
+
+    def test_concurrent_updates_do_not_lose_counts(self, workers) -> None:
+        a, b = workers
+        bump = lambda cur: {"n": (cur or {"n": 0})["n"] + 1}
+
+        def hammer(c):
+            for _ in range(25):
+                c.update("ns", "counter", bump, ttl=60)
+
+        threads = [threading.Thread(target=hammer, args=(c,)) for c in (a, b, a, b)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert a.get("ns", "counter") == {"n": 100}
+
+
+class TestForwarding:
+    def test_cancel_is_sent_to_owner(self, workers, install) -> None:
+        a, b = workers
+        install(b)
+        a.put("tasks", "t-remote", {"worker_id": "A", "user_id": "u1", "workflow_id": "wf"}, ttl=60)
+        received = _collect(a, "control:A")
+
+        assert task_registry.request_cancel("t-remote") is True
+        assert _wait_for(lambda: received)
+        assert received[0]["kind"] == "task_cancel"
+        assert received[0]["payload"] == {"task_id": "t-remote"}
+        assert task_registry.request_cancel("t-unknown") is False
+
+    def test_owner_applies_forwarded_cancel(self, workers, install) -> None:
+        a, b = workers
+        install(a)
+        task = MagicMock(task_id="t-own", user_id="u1", current_workflow_id="wf1")
+        task._cancelled = False
+        task._notified = False
+        task._created_at = time.monotonic()
+        task_registry.register(task)
+        try:
+            assert b.get("tasks_by_workflow", "u1:wf1") == {"task_id": "t-own", "worker_id": "A"}
+            b.publish("control:A", {"kind": "task_cancel", "payload": {"task_id": "t-own"}})
+            assert _wait_for(lambda: task._cancelled)
+            assert _wait_for(lambda: task.sink.push.called)
+            task.sink.push.assert_called_once_with(
+                "chat_cancelled", {"task_id": "t-own", "workflow_id": "wf1"},
+            )
+        finally:
+            task_registry.unregister(task)
+        assert b.get("tasks", "t-own") is None
+        assert b.get("tasks_by_workflow", "u1:wf1") is None
+
+    def test_execution_controls_are_sent_to_owner(self, workers, install) -> None:
+        a, b = workers
+        install(b)
+        a.put("executions", "exec-remote", {"worker_id": "A"}, ttl=60)
+        received = _collect(a, "control:A")
+
+        assert execution_task.seek_execution("exec-remote", 7) is True
+        assert execution_task.stop_execution("exec-unknown") is False
+        assert _wait_for(lambda: received)
+        assert received[0] == {"kind": "execution_control", "payload": {
+            "execution_id": "exec-remote", "action": "seek", "args": [7],
+        }}
+
+    def test_owner_applies_forwarded_execution_controls(self, workers, install) -> None:
+        a, b = workers
+        install(a)
+        execution_task.register_execution("exec-own")
+        player = MagicMock()
+        execution_task._attach_player("exec-own", player)
+        assert b.get("executions", "exec-own") == {"worker_id": "A"}
+
+        for action, args in (("pause", []), ("seek", [3])):
+            b.publish("control:A", {"kind": "execution_control", "payload": {
+                "execution_id": "exec-own", "action": action, "args": args,
+            }})
+        assert _wait_for(lambda: player.seek.called)
+        player.pause.assert_called_once_with()
+        player.seek.assert_called_once_with(3)
+        assert execution_task._is_execution_paused("exec-own")
+
+        execution_task._clear_execution("exec-own")
+        assert b.get("executions", "exec-own") is None
+
+
+class TestRelay:
+    def test_events_keep_ids_and_close_ends_stream(self, workers) -> None:
+        a, b = workers
+        attached = AttachedSink(b, "t1")
+        relay = RelaySink(a, "t1")
+        relay.push("chat_progress", {"n": 1})
+        relay.push("chat_progress", {"n": 2})
+        relay.close()
+
+        async def consume() -> List[str]:
+            return [chunk async for chunk in attached]
+
+        chunks = asyncio.run(asyncio.wait_for(consume(), 5))
+        assert chunks == [
+            'id: 1\nevent: chat_progress\ndata: {"n": 1}\n\n',
+            'id: 2\nevent: chat_progress\ndata: {"n": 2}\n\n',
+        ]
+
+    def test_client_disconnect_notifies_owner(self, coordinator) -> None:
+        detached: List[bool] = []
+        attached = AttachedSink(coordinator, "t2", on_detach=lambda: detached.append(True))
+
+        async def consume_one() -> None:
+            stream = attached.__aiter__()
+            coordinator.publish("task-events:t2", {"id": 1, "event": "e", "data": {}})
+            await asyncio.wait_for(stream.__anext__(), 5)
+            await stream.aclose()
+
+        asyncio.run(consume_one())
+        assert detached == [True]
+
+
+class TestSharedState:
+    def test_rate_limit_shared_between_workers(self, workers, install) -> None:
+        a, _ = workers
+        install(a)
+        worker_1 = LoginRateLimiter(limit=2, window_seconds=60, block_seconds=60)
+        worker_2 = LoginRateLimiter(limit=2, window_seconds=60, block_seconds=60)
+        worker_1.add_failure("ip:a@example.com")
+        worker_2.add_failure("ip:a@example.com")
+        allowed, retry_after = worker_1.is_allowed("ip:a@example.com")
+        assert allowed is False and retry_after > 0
+        assert worker_2.is_allowed("ip:b@example.com") == (True, 0)
+
+    def test_conversation_claimed_elsewhere_is_dropped(self, workers, install) -> None:
+        a, b = workers
+        install(a)
+        store = ConversationStore(Path("."))
+        store._conversations["conv-1"] = MagicMock()
+        assert store.get("conv-1") is not None
+
+        b.put("conversations", "conv-1", {"worker_id": "B"}, ttl=60)
+        assert store.get("conv-1") is None
+
+    def test_conversation_moving_between_workers_keeps_log_seqs(
+        self, workers, install, tmp_path,
+    ) -> None:
+        a, b = workers
+        db = tmp_path / "conversation_log.sqlite"
+        log_a, log_b = ConversationLogger(db), ConversationLogger(db)
+        log_a.ensure_conversation("conv-1", user_id="u1", model="m")
+        stores = {a: ConversationStore(Path("."), log_a), b: ConversationStore(Path("."), log_b)}
+        logs = {a: log_a, b: log_b}
+
+        returned = []
+        for worker, content in ((a, "a1"), (b, "b1"), (a, "a2"), (b, "b2"), (a, "a3")):
+            install(worker)
+            stores[worker].get_or_create("conv-1")
+            returned.append((logs[worker].log_user_message("conv-1", content), content))
+            logs[worker].flush()
+
+        timeline = [(e["seq"], e["content"]) for e in log_a.get_conversation_timeline("conv-1")]
+        assert timeline == returned
+        assert [seq for seq, _ in timeline] == [1, 2, 3, 4, 5]
+        log_a.close()
+        log_b.close()
+
+    def test_session_invalidation_reaches_every_worker(self, workers, install, tmp_path) -> None:
+        a, b = workers
+        install(a)
+        store = AuthStore(tmp_path / "auth.sqlite", touch_interval_seconds=3600)
+        store.create_user("u1", "a@example.com", "A", "hash")
+        for token_hash in ("h1", "h2"):
+            store.create_session(f"s-{token_hash}", "u1", token_hash, expires_at="9999-12-31")
+            assert store.get_session_by_token_hash(token_hash) is not None  # now cached
+
+        # Logging out here tells worker B to drop its copy
+        sent = _collect(b, "control:*")
+        store.delete_session_by_token_hash("h1")
+        assert _wait_for(lambda: sent)
+        assert sent[0]["payload"]["token_hash"] == "h1"
+
+        # B logging out h2: its row is gone and A's cached entry goes too
+        with store._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = 'h2'")
+        install(b)
+        broadcast("auth_sessions_invalidated", {
+            "db": store._db_key, "token_hash": "h2", "user_id": None, "session_ids": [],
+        })
+        install(a)
+        assert _wait_for(lambda: "h2" not in store._session_cache)
+        assert store.get_session_by_token_hash("h2") is None
+        store.close()
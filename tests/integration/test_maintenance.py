@@ -0,0 +1,255 @@
+"""Tests for the background storage maintenance scheduler."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from src.backend.storage.auth import AuthStore
+from src.backend.storage.conversation_log import ConversationLogger
+from src.backend.storage.maintenance import (
+    MaintenanceConfig,
+    MaintenanceScheduler,
+    get_maintenance_config,
+)
+from src.backend.storage.workflows import WorkflowStore
+
+
+def _config(**overrides: Any) -> MaintenanceConfig:
+    values: Dict[str, Any] = dict(
+        enabled=True,
+        interval_seconds=3600,
+        initial_delay_seconds=0,
+        task_budget_ms=10_000,
+        batch_size=10,
+        log_retention_days=30,
+        snapshot_retention_days=7,
+    )
+    values.update(overrides)
+    return MaintenanceConfig(**values)
+
+
+def _ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Dict[str, Optional[str]]:
+    """Set ``clock["now"]`` to log entries (into that month's partition) in the past."""
+    state: Dict[str, Optional[str]] = {"now": None}
+    real_now = ConversationLogger._now
+    monkeypatch.setattr(
+        ConversationLogger, "_now", staticmethod(lambda: state["now"] or real_now()),
+    )
+    return state
+
+
+@pytest.fixture
+def stores(tmp_path: Path):
+    auth = AuthStore(tmp_path / "auth.sqlite")
+    log = ConversationLogger(tmp_path / "conversation_log.sqlite")
+    workflows = WorkflowStore(tmp_path / "workflows.sqlite")
+    return auth, log, workflows
+
+
+def _count(db_path: Path, sql: str) -> int:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestRetention:
+    def test_expired_sessions_deleted_in_batches(self, stores) -> None:
+        auth, _, _ = stores
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        for i in range(25):
+            auth.create_session(f"old{i}", "u1", f"tok_old{i}", expires_at=_ago(1))
+        auth.create_session("live", "u1", "tok_live", expires_at=_ago(-1))
+
+        assert auth.delete_expired_sessions(limit=10) == 10
+        scheduler = MaintenanceScheduler(auth_store=auth, config=_config())
+        reports = {r.name: r for r in scheduler.run_once()}
+
+        assert reports["auth.expired_sessions"].rows_deleted == 15
+        assert reports["auth.expired_sessions"].completed is True
+        assert auth.get_session_by_token_hash("tok_live") is not None
+        assert _count(auth.db_path, "SELECT COUNT(*) FROM sessions") == 1
+
+    def test_log_retention_policy(self, stores, clock) -> None:
+        _, log, _ = stores
+        clock["now"] = _ago(90)
+        log.ensure_conversation("old", user_id="u1", model="m")
+        log.log_user_message("old", "ancient")
+        clock["now"] = _ago(10)
+        log.ensure_conversation("recent", user_id="u1", model="m")
+        log.log_workflow_snapshot("recent", {"nodes": []})
+        clock["now"] = None
+        log.log_user_message("recent", "hello")
+        log.log_workflow_snapshot("recent", {"nodes": [{"id": "n1"}]})
+        log.flush()
+        old_month = _ago(90)[:7]
+        assert old_month in log.list_partitions()
+
+        # Pre-partitioning entry (main file) whose conversation row is gone
+        conn = sqlite3.connect(str(log.db_path))
+        conn.execute(
+            "INSERT INTO entries (conversation_id, seq, entry_type, timestamp) "
+            "VALUES ('ghost', 1, 'user_message', ?)",
+            (_ago(0),),
+        )
+        conn.commit()
+        conn.close()
+
+        scheduler = MaintenanceScheduler(conversation_logger=log, config=_config())
+        report = {r.name: r for r in scheduler.run_once()}["conversation_log.retention"]
+
+        # ghost entry + 10-day-old snapshot + 90-day-old message (its month
+        # dropped whole) + empty conversation + the now-unreferenced blob
+        assert report.rows_deleted == 5
+        assert report.completed is True
+        assert old_month not in log.list_partitions()
+        assert [c["id"] for c in log.list_conversations()] == ["recent"]
+        timeline = log.get_conversation_timeline("recent")
+        assert [e["entry_type"] for e in timeline] == ["user_message", "workflow_snapshot"]
+
+    def test_zero_retention_keeps_forever(self, stores, clock) -> None:
+        _, log, _ = stores
+        clock["now"] = _ago(5000)
+        log.ensure_conversation("c1", user_id="u1", model="m")
+        log.log_workflow_snapshot("c1", {"nodes": []})
+
+        scheduler = MaintenanceScheduler(
+            conversation_logger=log,
+            config=_config(log_retention_days=0, snapshot_retention_days=0),
+        )
+        scheduler.run_once()
+        assert len(log.get_conversation_timeline("c1")) == 1
+
+    def test_orphaned_entries_scanned_in_bounded_windows(self, stores) -> None:
+        _, log, _ = stores
+        log.ensure_conversation("live", user_id="u1", model="m")
+        for i in range(3):
+            log.log_user_message("live", f"m{i}")
+        log.flush()
+        conn = sqlite3.connect(str(log.db_path))
+        conn.execute(
+            "INSERT INTO entries (conversation_id, seq, entry_type, timestamp) "
+            "VALUES ('ghost', 1, 'user_message', ?)",
+            (_ago(0),),
+        )
+        conn.commit()
+        conn.close()
+
+        # Each call checks at most `limit` entries, resuming where it stopped
+        assert log.prune_orphaned_entries(limit=2) == 1  # legacy ghost + m0
+        assert log.prune_orphaned_entries(limit=2) == 0  # m1, m2
+        assert log.prune_orphaned_entries(limit=2) == 0  # wrapped around
+        assert len(log.get_conversation_timeline("live")) == 3
+
+
+class TestBudgetsAndMetrics:
+    def test_budget_exhaustion_resumes_next_cycle(self, stores) -> None:
+        auth, _, _ = stores
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        for i in range(30):
+            auth.create_session(f"s{i}", "u1", f"tok{i}", expires_at=_ago(1))
+
+        scheduler = MaintenanceScheduler(auth_store=auth, config=_config(task_budget_ms=0))
+        first = scheduler.run_once()[0]
+        assert (first.rows_deleted, first.completed) == (10, False)
+
+        scheduler.run_once()
+        scheduler.run_once()
+        assert scheduler.stats.total_rows_deleted == 30
+        assert _count(auth.db_path, "SELECT COUNT(*) FROM sessions") == 0
+
+    def test_optimize_tasks_and_reclaimed_bytes(self, stores, clock) -> None:
+        auth, log, workflows = stores
+        log.ensure_conversation("c1", user_id="u1", model="m")
+        clock["now"] = _ago(400)
+        for _ in range(200):
+            log.log_tool_call("c1", "add_node", {"blob": "x" * 2000}, {}, True, 1.0)
+        # Distinct, incompressible snapshots: their blobs free pages in the
+        # main file once snapshot retention removes the entries.
+        clock["now"] = _ago(10)
+        for _ in range(100):
+            log.log_workflow_snapshot("c1", {"noise": os.urandom(1500).hex()})
+        clock["now"] = None
+        log.flush()
+        months = log.list_partitions()
+
+        scheduler = MaintenanceScheduler(
+            auth_store=auth,
+            conversation_logger=log,
+            workflow_store=workflows,
+            config=_config(batch_size=500),
+        )
+        reports = scheduler.run_once()
+
+        assert [r.name for r in reports] == [
+            "auth.expired_sessions",
+            "conversation_log.retention",
+            "optimize:auth.sqlite",
+            "optimize:conversation_log.sqlite",
+            *[f"optimize:entries-{m}.sqlite" for m in months],
+            "optimize:workflows.sqlite",
+        ]
+        assert all(r.error is None and r.completed for r in reports)
+        # 200 dropped with their partition, 100 snapshot entries, 100 blobs
+        assert scheduler.stats.total_rows_deleted == 400
+        assert _ago(400)[:7] not in log.list_partitions()
+        # Dropped partition file + incremental vacuum of the freed blob pages
+        assert scheduler.stats.total_bytes_reclaimed > 0
+        assert _count(log.db_path, "PRAGMA freelist_count") == 0
+        assert _count(log.db_path, "SELECT COUNT(*) FROM sqlite_stat1") > 0
+
+    def test_task_errors_are_reported_not_raised(self, tmp_path: Path) -> None:
+        auth = AuthStore(tmp_path / "auth.sqlite")
+        auth.db_path.unlink()
+        auth.db_path.mkdir()  # connecting to a directory fails
+
+        scheduler = MaintenanceScheduler(auth_store=auth, config=_config())
+        reports = scheduler.run_once()
+        assert reports[0].error is not None
+        assert reports[0].completed is False
+        assert scheduler.stats.runs == 1
+
+
+class TestScheduler:
+    def test_start_stop(self, stores) -> None:
+        auth, _, _ = stores
+        scheduler = MaintenanceScheduler(auth_store=auth, config=_config())
+        scheduler.start()
+        thread = scheduler._thread
+        assert thread is not None and thread.is_alive()
+        scheduler.stop()
+        assert not thread.is_alive()
+        assert scheduler.stats.runs <= 1
+
+    def test_disabled_does_not_start(self, stores) -> None:
+        auth, _, _ = stores
+        scheduler = MaintenanceScheduler(auth_store=auth, config=_config(enabled=False))
+        scheduler.start()
+        assert scheduler._thread is None
+
+    def test_config_from_env(self, monkeypatch) -> None:
+        monkeypatch.setenv("LEMON_LOG_RETENTION_DAYS", "0")
+        monkeypatch.setenv("LEMON_SNAPSHOT_RETENTION_DAYS", "-3")
+        monkeypatch.setenv("LEMON_MAINTENANCE_ENABLED", "false")
+        cfg = get_maintenance_config()
+        assert cfg.log_retention_days == 0
+        assert cfg.snapshot_retention_days == 0
+        assert cfg.enabled is False
+
+    def test_retention_is_opt_in(self, monkeypatch) -> None:
+        monkeypatch.delenv("LEMON_LOG_RETENTION_DAYS", raising=False)
+        monkeypatch.delenv("LEMON_SNAPSHOT_RETENTION_DAYS", raising=False)
+        cfg = get_maintenance_config()
+        assert (cfg.log_retention_days, cfg.snapshot_retention_days) == (0, 0)
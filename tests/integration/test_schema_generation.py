@@ -6,9 +6,15 @@ schema, and that the generated schemas have the required structure.
 
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Any, Dict
+from unittest.mock import patch
+
 import pytest
 
-from src.backend.tools.discovery import build_tool_registry
+from src.backend.agents.orchestrator_factory import build_orchestrator
+from src.backend.tools.core import Tool, ToolRegistry
+from src.backend.tools.discovery import build_tool_registry, shared_tool_registry
 from src.backend.tools.schema_gen import generate_all_schemas
 
 # Valid JSON Schema types for properties
@@ -155,3 +161,39 @@ def test_list_workflows_has_limit_constraints(schemas):
     limit = lw["input_schema"]["properties"]["limit"]
     assert limit.get("minimum") == 1
     assert limit.get("maximum") == 100
+
+
+class _EchoTool(Tool):
+    name = "echo"
+    description = "Echo."
+    parameters: list = []
+
+    def execute(self, args: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        return {"success": True}
+
+
+def test_schemas_are_cached_until_next_register():
+    reg = ToolRegistry()
+    reg.register(_EchoTool())
+    with patch.object(_EchoTool, "to_anthropic_schema", autospec=True,
+                      side_effect=Tool.to_anthropic_schema) as gen:
+        first = generate_all_schemas(reg)
+        assert generate_all_schemas(reg) == first
+        assert gen.call_count == 1
+
+        class _Other(_EchoTool):
+            name = "other"
+
+        reg.register(_Other())
+        assert [s["name"] for s in generate_all_schemas(reg)] == ["echo", "other"]
+
+
+def test_shared_registry_is_built_once_and_frozen():
+    shared = shared_tool_registry(Path("."))
+    assert shared.frozen
+    assert shared_tool_registry(Path(".").resolve()) is shared
+    assert build_orchestrator(Path(".")).tools is shared
+    assert build_orchestrator(Path(".")).tools is shared
+    with pytest.raises(RuntimeError, match="frozen"):
+        shared.register(_EchoTool())
+    assert "echo" not in {t.name for t in shared.all_tools()}
@@ -0,0 +1,274 @@
+"""Contract tests: the in-memory stores behave like their SQLite counterparts.
+
+Every test runs against both backends so the eval harness and pytest
+fixtures (which use the in-memory stores) can't silently diverge from
+production semantics.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from src.backend.storage.auth import AuthStore
+from src.backend.storage.conversation_log import ConversationLogger
+from src.backend.storage.memory import (
+    InMemoryAuthStore,
+    InMemoryConversationLogger,
+    InMemoryWorkflowStore,
+)
+from src.backend.storage.protocols import AuthStorage, ConversationLog, WorkflowStorage
+from src.backend.storage.workflows import WorkflowStore
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def workflows(request, tmp_path: Path) -> WorkflowStorage:
+    if request.param == "sqlite":
+        return WorkflowStore(tmp_path / "workflows.sqlite")
+    return InMemoryWorkflowStore()
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def conv_log(request, tmp_path: Path) -> ConversationLog:
+    if request.param == "sqlite":
+        return ConversationLogger(tmp_path / "conversation_log.sqlite")
+    return InMemoryConversationLogger()
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def auth(request, tmp_path: Path) -> AuthStorage:
+    if request.param == "sqlite":
+        return AuthStore(tmp_path / "auth.sqlite")
+    return InMemoryAuthStore()
+
+
+def test_backends_satisfy_protocols(tmp_path: Path) -> None:
+    assert isinstance(InMemoryWorkflowStore(), WorkflowStorage)
+    assert isinstance(WorkflowStore(tmp_path / "w.sqlite"), WorkflowStorage)
+    assert isinstance(InMemoryConversationLogger(), ConversationLog)
+    assert isinstance(ConversationLogger(tmp_path / "c.sqlite"), ConversationLog)
+    assert isinstance(InMemoryAuthStore(), AuthStorage)
+    assert isinstance(AuthStore(tmp_path / "a.sqlite"), AuthStorage)
+
+
+class TestWorkflowBackends:
+    def test_roundtrip_and_ownership(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow(
+            "wf_1", "u1", "Lipids", "Statin pathway",
+            nodes=[{"id": "n1"}], tags=["cardio"], output_type="bool",
+        )
+        record = workflows.get_workflow("wf_1", "u1")
+        assert record is not None
+        assert record.nodes == [{"id": "n1"}]
+        assert record.tags == ["cardio"]
+        assert record.output_type == "bool"
+        assert record.is_draft is True
+        assert workflows.get_workflow("wf_1", "someone_else") is None
+
+    def test_duplicate_id_raises_integrity_error(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "A", "")
+        with pytest.raises(sqlite3.IntegrityError):
+            workflows.create_workflow("wf_1", "u1", "B", "")
+
+    def test_returned_records_are_detached(self, workflows: WorkflowStorage) -> None:
+        nodes = [{"id": "n1"}]
+        workflows.create_workflow("wf_1", "u1", "A", "", nodes=nodes)
+        nodes.append({"id": "n2"})
+        workflows.get_workflow("wf_1", "u1").nodes.append({"id": "n3"})
+        assert workflows.get_workflow("wf_1", "u1").nodes == [{"id": "n1"}]
+
+    def test_update_partial_and_unknown(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "A", "desc")
+        assert workflows.update_workflow("wf_1", "u1", name="B", is_draft=False)
+        record = workflows.get_workflow("wf_1", "u1")
+        assert (record.name, record.description, record.is_draft) == ("B", "desc", False)
+        assert workflows.update_workflow("wf_1", "u1") is True  # no-op
+        assert workflows.update_workflow("missing", "u1", name="X") is False
+        assert workflows.update_workflow("wf_1", "u2", name="X") is False
+
+    def test_list_orders_by_updated_at(self, workflows: WorkflowStorage) -> None:
+        for wf_id in ("wf_a", "wf_b", "wf_c"):
+            workflows.create_workflow(wf_id, "u1", wf_id, "")
+            time.sleep(0.002)
+        workflows.update_workflow("wf_a", "u1", description="touched")
+
+        records, total = workflows.list_workflows("u1")
+        assert total == 3
+        assert [r.id for r in records] == ["wf_a", "wf_c", "wf_b"]
+
+        page, total = workflows.list_workflows("u1", limit=1, offset=1)
+        assert total == 3
+        assert [r.id for r in page] == ["wf_c"]
+
+    def test_search_filters(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "Diabetes Care", "HbA1c checks", domain="endo")
+        workflows.create_workflow("wf_2", "u1", "Lipids", "statin DIABETES risk", domain="cardio")
+        workflows.create_workflow("wf_3", "u1", "Asthma", "inhalers", domain="resp")
+        workflows.update_workflow("wf_3", "u1", is_validated=True)
+
+        ids = {r.id for r in workflows.search_workflows("u1", query="diabetes")[0]}
+        assert ids == {"wf_1", "wf_2"}
+        records, total = workflows.search_workflows("u1", query="diabetes", domain="cardio")
+        assert (total, [r.id for r in records]) == (1, ["wf_2"])
+        records, _ = workflows.search_workflows("u1", validated=True)
+        assert [r.id for r in records] == ["wf_3"]
+        assert workflows.get_domains("u1") == ["cardio", "endo", "resp"]
+
+    def test_building_flags(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "A", "")
+        assert workflows.try_set_building("wf_1", "u1") is True
+        assert workflows.try_set_building("wf_1", "u1") is False
+        assert workflows.clear_stale_building_flags() == 1
+        assert workflows.get_workflow("wf_1", "u1").building is False
+
+    def test_publish_sets_published_at_once(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "A", "")
+        workflows.update_workflow("wf_1", "u1", is_published=True)
+        first = workflows.get_workflow("wf_1", "u1").published_at
+        assert first is not None
+        workflows.update_workflow("wf_1", "u1", is_published=True)
+        assert workflows.get_workflow("wf_1", "u1").published_at == first
+
+    def test_delete(self, workflows: WorkflowStorage) -> None:
+        workflows.create_workflow("wf_1", "u1", "A", "")
+        assert workflows.delete_workflow("wf_1", "u2") is False
+        assert workflows.delete_workflow("wf_1", "u1") is True
+        assert workflows.get_workflow("wf_1", "u1") is None
+
+
+class TestConversationLogBackends:
+    def test_timeline_and_sequence(self, conv_log: ConversationLog) -> None:
+        conv_log.ensure_conversation("c1", user_id="u1", workflow_id="wf", model="m")
+        assert conv_log.log_user_message("c1", "hi", files=[{"name": "a.png"}]) == 1
+        assert conv_log.log_tool_call("c1", "add_node", {"x": 1}, {"ok": True}, True, 5.0) == 2
+        assert conv_log.log_assistant_response("c1", "done", input_tokens=10) == 3
+
+        timeline = conv_log.get_conversation_timeline("c1")
+        assert [e["seq"] for e in timeline] == [1, 2, 3]
+        assert timeline[0]["files"] == '[{"name": "a.png"}]'
+        assert timeline[1]["tool_arguments"] == '{"x": 1}'
+        assert timeline[2]["input_tokens"] == 10
+
+        only_tools = conv_log.get_conversation_timeline("c1", entry_types=["tool_call"])
+        assert [e["entry_type"] for e in only_tools] == ["tool_call"]
+
+    def test_list_conversations_newest_first(self, conv_log: ConversationLog) -> None:
+        conv_log.ensure_conversation("c1", user_id="u1", model="m")
+        time.sleep(0.002)
+        conv_log.ensure_conversation("c2", user_id="u1", model="m")
+        time.sleep(0.002)
+        conv_log.ensure_conversation("c1", user_id="u1", model="m")
+        conv_log.ensure_conversation("c3", user_id="u2", model="m")
+
+        ids = [c["id"] for c in conv_log.list_conversations(user_id="u1")]
+        assert ids == ["c1", "c2"]
+
+    def test_tool_call_stats(self, conv_log: ConversationLog) -> None:
+        conv_log.ensure_conversation("c1", user_id="u1", model="m")
+        conv_log.log_tool_call("c1", "add_node", {}, {}, True, 10.0)
+        conv_log.log_tool_call("c1", "add_node", {}, {}, False, 30.0)
+        conv_log.log_tool_call("c1", "delete_node", {}, {}, True, 5.0)
+
+        stats = {s["tool_name"]: s for s in conv_log.get_tool_call_stats()}
+        assert stats["add_node"]["call_count"] == 2
+        assert stats["add_node"]["success_count"] == 1
+        assert stats["add_node"]["failure_count"] == 1
+        assert stats["add_node"]["avg_duration_ms"] == pytest.approx(20.0)
+        assert stats["delete_node"]["total_duration_ms"] == pytest.approx(5.0)
+
+    def test_usage_rollups(self, conv_log: ConversationLog) -> None:
+        conv_log.ensure_conversation("c1", user_id="u1", model="m")
+        conv_log.ensure_conversation("c2", user_id="u2", model="m")
+        conv_log.log_tool_call("c1", "add_node", {}, {}, True, 10.0)
+        conv_log.log_tool_call("c1", "add_node", {}, {}, False, 30.0)
+        conv_log.log_assistant_response("c1", "ok", input_tokens=100, output_tokens=20)
+        conv_log.log_error("c1", "boom")
+        conv_log.log_tool_call("c2", "delete_node", {}, {}, True, 5.0)
+        conv_log.log_user_message("c2", "not counted")
+
+        rows = conv_log.get_usage_rollups(user_id="u1")
+        by_tool = {r["tool_name"]: r for r in rows}
+        assert set(by_tool) == {"", "add_node"}
+        assert (by_tool["add_node"]["tool_calls"], by_tool["add_node"]["tool_failures"]) == (2, 1)
+        assert by_tool["add_node"]["tool_duration_ms"] == pytest.approx(40.0)
+        assert by_tool[""]["assistant_turns"] == 1
+        assert (by_tool[""]["input_tokens"], by_tool[""]["output_tokens"]) == (100, 20)
+        assert by_tool[""]["errors"] == 1
+
+        day = rows[0]["day"]
+        assert len(conv_log.get_usage_rollups(since=day, until=day)) == 3
+        assert conv_log.get_usage_rollups(since="9999-01-01") == []
+
+    def test_search_entries(self, conv_log: ConversationLog) -> None:
+        conv_log.ensure_conversation("c1", user_id="u1", workflow_id="wf1", model="m")
+        conv_log.ensure_conversation("c2", user_id="u2", model="m")
+        conv_log.log_user_message("c1", "Check eGFR before metformin")
+        conv_log.log_tool_call("c1", "add_node", {"label": "eGFR threshold"}, {}, True, 1.0)
+        conv_log.log_thinking("c1", "eGFR is not indexed in thinking")
+        conv_log.log_assistant_response("c2", "eGFR below 30 means stop")
+
+        hits = conv_log.search_entries("egfr")
+        assert [(h["conversation_id"], h["seq"]) for h in hits] == [("c2", 1), ("c1", 2), ("c1", 1)]
+        assert "<mark>" in hits[0]["snippet"]
+        assert [h["seq"] for h in conv_log.search_entries("eGFR metformin")] == [1]
+        assert [h["conversation_id"] for h in conv_log.search_entries("egfr", user_id="u2")] == ["c2"]
+        assert len(conv_log.search_entries("egfr", workflow_id="wf1")) == 2
+        assert [h["seq"] for h in conv_log.search_entries("egfr", limit=1, offset=1)] == [2]
+        assert conv_log.search_entries("egfr", since="9999-01-01") == []
+        assert conv_log.search_entries("?!") == []
+
+
+class TestAuthBackends:
+    @staticmethod
+    def _future(hours: int = 1) -> str:
+        return (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
+
+    def test_user_uniqueness(self, auth: AuthStorage) -> None:
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        with pytest.raises(sqlite3.IntegrityError):
+            auth.create_user("u2", "a@example.com", "B", "hash")
+        assert auth.get_user_by_email("a@example.com").id == "u1"
+        assert auth.get_user_by_id("u1").email == "a@example.com"
+
+    def test_session_lifecycle(self, auth: AuthStorage) -> None:
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        auth.create_session("s1", "u1", "tok1", expires_at=self._future())
+        session, user = auth.get_session_by_token_hash("tok1")
+        assert (session.id, user.id) == ("s1", "u1")
+
+        auth.delete_session_by_token_hash("tok1")
+        assert auth.get_session_by_token_hash("tok1") is None
+
+    def test_expiry_and_pruning(self, auth: AuthStorage) -> None:
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        auth.create_session("old", "u1", "tok_old", expires_at=self._future(-1))
+        for i in range(3):
+            auth.create_session(f"s{i}", "u1", f"tok{i}", expires_at=self._future())
+            time.sleep(0.002)
+        assert auth.delete_expired_sessions() == 1
+
+        auth.touch_session("s0")
+        assert auth.prune_sessions("u1", max_sessions=2) == 1
+        assert auth.get_session_by_token_hash("tok0") is not None
+        assert auth.get_session_by_token_hash("tok1") is None
+
+    def test_password_change_and_user_deletion_revoke_sessions(self, auth: AuthStorage) -> None:
+        auth.create_user("u1", "a@example.com", "A", "hash")
+        auth.create_user("u2", "b@example.com", "B", "hash")
+        auth.create_session("s1", "u1", "tok1", expires_at=self._future())
+        auth.create_session("s2", "u1", "tok2", expires_at=self._future())
+        auth.create_session("s3", "u2", "tok3", expires_at=self._future())
+        assert auth.get_session_by_token_hash("tok1") is not None
+
+        assert auth.update_password_hash("u1", "new-hash") == 2
+        assert auth.get_session_by_token_hash("tok1") is None
+        assert auth.get_user_by_id("u1").password_hash == "new-hash"
+
+        assert auth.get_session_by_token_hash("tok3") is not None
+        assert auth.delete_user("u2") is True
+        assert auth.get_session_by_token_hash("tok3") is None
+        assert auth.delete_user("u2") is False
@@ -0,0 +1,102 @@
+"""Tests for the append-only token usage ledger."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.backend.storage import token_ledger
+from src.backend.storage.token_ledger import TokenLedger
+from src.backend.utils import tokens
+
+
+def _entry(ts: str, model: str = "m1", conversation_id: str | None = "c1", **usage: int) -> dict:
+    return {
+        "timestamp": ts,
+        "session_id": "s1",
+        "model": model,
+        "conversation_id": conversation_id,
+        "caller": "orchestrator",
+        "usage": {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15, **usage},
+    }
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> TokenLedger:
+    return TokenLedger(tmp_path / "token_usage.sqlite")
+
+
+class TestTotals:
+    def test_running_totals_by_scope(self, ledger: TokenLedger) -> None:
+        ledger.record(_entry("2026-03-01T10:00:00+00:00"))
+        ledger.record(_entry("2026-03-01T11:00:00+00:00", model="m2", cache_read_input_tokens=7))
+        ledger.record(_entry("2026-03-02T09:00:00+00:00", conversation_id="c2"))
+
+        total = ledger.totals()
+        assert (total["calls"], total["input_tokens"], total["cache_read_input_tokens"]) == (3, 30, 7)
+        assert {r["key"]: r["calls"] for r in ledger.usage_by_model()} == {"m1": 2, "m2": 1}
+        assert [r["key"] for r in ledger.usage_by_day(since="2026-03-02")] == ["2026-03-02"]
+        assert ledger.conversation_usage("c1")["total_tokens"] == 30
+        assert ledger.conversation_usage("missing")["calls"] == 0
+        assert ledger.session_usage("s1")["calls"] == 3
+        assert [e["model"] for e in ledger.recent_events(limit=2)] == ["m1", "m2"]
+
+    def test_events_trimmed_totals_kept(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(token_ledger, "_TRIM_EVERY", 5)
+        ledger = TokenLedger(tmp_path / "ledger.sqlite", max_events=3)
+        for i in range(10):
+            ledger.record(_entry(f"2026-03-01T10:00:{i:02d}+00:00"))
+
+        assert len(ledger.recent_events(limit=100)) == 3
+        assert ledger.totals()["calls"] == 10
+
+
+class TestRecordTokenUsage:
+    @pytest.fixture
+    def paths(self, tmp_path: Path, monkeypatch):
+        paths = {
+            "db": tmp_path / "token_usage.sqlite",
+            "log": tmp_path / "tokens_usage.json",
+            "summary": tmp_path / "tokens.json",
+        }
+        monkeypatch.setenv("LEMON_TOKENS_DB", str(paths["db"]))
+        monkeypatch.setenv("LEMON_TOKENS_LOG_FILE", str(paths["log"]))
+        monkeypatch.setenv("LEMON_TOKENS_FILE", str(paths["summary"]))
+        monkeypatch.setattr(tokens, "_ledger", None)
+        return paths
+
+    def test_legacy_json_migrated_once(self, paths) -> None:
+        paths["log"].write_text(json.dumps([
+            _entry("2026-01-01T00:00:00+00:00"),
+            _entry("2026-01-02T00:00:00+00:00"),
+        ]))
+        # The old log was capped, so the summary had seen more than it holds
+        paths["summary"].write_text(json.dumps({
+            "total": {"input_tokens": 500, "output_tokens": 5, "total_tokens": 505},
+        }))
+
+        tokens.record_token_usage(_entry("2026-02-01T00:00:00+00:00"))
+
+        ledger = tokens.get_token_ledger()
+        assert len(ledger.recent_events()) == 3
+        assert ledger.totals()["input_tokens"] == 510
+        assert ledger.totals()["output_tokens"] == 15
+        assert not paths["log"].exists()
+        assert Path(str(paths["summary"]) + ".migrated").exists()
+
+        summary = tokens.get_token_summary()
+        assert summary["total"]["input_tokens"] == 510
+        assert summary["recent_session"]["input_tokens"] == 0  # other session id
+
+    def test_session_summary(self, paths) -> None:
+        entry = _entry("2026-02-01T00:00:00+00:00")
+        del entry["session_id"]
+        tokens.record_token_usage(entry)
+        tokens.record_token_usage(entry)
+
+        summary = tokens.get_token_summary()
+        assert summary["recent_session"]["total_tokens"] == 30
+        assert summary["recent_session_id"] == tokens._SESSION_ID
+        assert not paths["summary"].exists()
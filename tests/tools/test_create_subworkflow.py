@@ -576,14 +576,8 @@ class TestBuilderTimeout:
         sink.close()
 
 
-class TestSemaphoreTimeout:
-    """Test that builder threads fail loudly when semaphore is unavailable."""
-
-    def test_semaphore_timeout_constant_exists(self):
-        """SEMAPHORE_TIMEOUT_SECONDS is defined in constants."""
-        from src.backend.tools.constants import SEMAPHORE_TIMEOUT_SECONDS
-        assert isinstance(SEMAPHORE_TIMEOUT_SECONDS, (int, float))
-        assert SEMAPHORE_TIMEOUT_SECONDS > 0
+class TestBuilderConstants:
+    """Builder timeout configuration."""
 
     def test_builder_timeout_constant_exists(self):
         """_BUILDER_TIMEOUT_SECONDS is defined in builder_task."""
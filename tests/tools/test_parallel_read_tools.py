@@ -0,0 +1,171 @@
+"""Tests for concurrent execution of read-only tool calls in one batch.
+
+Covers:
+1. Batches split into runs of read-only calls and single other calls
+2. Read-only calls in a run execute concurrently
+3. Writes run alone and in order; results keep tool_use order
+4. A failing read skips the rest of the batch as before and cancels the
+   reads that have not started
+5. Read-only tools followed by a workflow refresh still run alone and refresh
+"""
+
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from src.backend.agents.orchestrator import Orchestrator, _group_tool_calls
+from src.backend.llm.client import LLMResponse
+from src.backend.tools import SideEffect, Tool, ToolRegistry
+
+
+class _LoggingTool(Tool):
+    parameters: list = []
+    description = "Test tool."
+
+    def __init__(self, log: List[str], lock: threading.Lock, barrier: threading.Barrier = None,
+                 fail: bool = False) -> None:
+        self._log = log
+        self._lock = lock
+        self._barrier = barrier
+        self._fail = fail
+
+    def execute(self, args: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._log.append(f"start:{args['tag']}")
+        if self._barrier is not None:
+            # Only passes if every read in the run is executing at once
+            self._barrier.wait(timeout=5)
+        with self._lock:
+            self._log.append(f"end:{args['tag']}")
+        if self._fail:
+            return {"success": False, "error": f"{args['tag']} failed"}
+        return {"success": True, "tag": args["tag"]}
+
+
+def _tools(log, lock, barrier=None, fail_read=False) -> ToolRegistry:
+    class ReadTool(_LoggingTool):
+        name = "read"
+        side_effect = SideEffect.READ
+
+    class WriteTool(_LoggingTool):
+        name = "write"
+        side_effect = SideEffect.WORKFLOW_WRITE
+
+    registry = ToolRegistry()
+    registry.register(ReadTool(log, lock, barrier, fail=fail_read))
+    registry.register(WriteTool(log, lock))
+    return registry
+
+
+def _call(i: int, name: str) -> Dict[str, Any]:
+    return {"id": f"tu_{i}", "name": name, "input": {"tag": f"{name}{i}"}}
+
+
+def _respond(orch: Orchestrator, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run one turn with *calls* in a single message; return tool_result blocks."""
+    with patch("src.backend.agents.orchestrator.call_llm") as mock_llm:
+        mock_llm.side_effect = [LLMResponse(text="", tool_calls=calls), LLMResponse(text="Done.")]
+        orch.respond("go", allow_tools=True)
+        messages = mock_llm.call_args_list[1].args[0]
+    return [
+        m["content"][0] for m in messages
+        if m["role"] == "user" and isinstance(m["content"], list)
+        and m["content"][0].get("type") == "tool_result"
+    ]
+
+
+def test_grouping_keeps_writes_alone():
+    registry = _tools([], threading.Lock())
+    calls = [_call(0, "read"), _call(1, "read"), _call(2, "write"), _call(3, "read"),
+             _call(4, "unknown"), _call(5, "read"), _call(6, "read")]
+    groups = _group_tool_calls(calls, registry)
+    assert [[idx for idx, _, _ in g] for g in groups] == [[0, 1], [2], [3], [4], [5, 6]]
+
+
+def test_read_only_calls_run_concurrently_in_order():
+    log: List[str] = []
+    lock = threading.Lock()
+    orch = Orchestrator(_tools(log, lock, barrier=threading.Barrier(3)))
+
+    results = _respond(orch, [_call(0, "read"), _call(1, "read"), _call(2, "read")])
+
+    assert [r["tool_use_id"] for r in results] == ["tu_0", "tu_1", "tu_2"]
+    assert [json.loads(r["content"])["tag"] for r in results] == ["read0", "read1", "read2"]
+    # All three started before any finished
+    assert sorted(log[:3]) == ["start:read0", "start:read1", "start:read2"]
+
+
+def test_writes_are_barriers():
+    log: List[str] = []
+    lock = threading.Lock()
+    orch = Orchestrator(_tools(log, lock))
+
+    results = _respond(orch, [_call(0, "read"), _call(1, "read"), _call(2, "write"), _call(3, "read")])
+
+    assert [r["tool_use_id"] for r in results] == ["tu_0", "tu_1", "tu_2", "tu_3"]
+    write_start = log.index("start:write2")
+    assert {"end:read0", "end:read1"} <= set(log[:write_start])
+    assert log[write_start + 1] == "end:write2"
+    assert log.index("start:read3") > write_start
+
+
+def test_failed_read_skips_rest_of_batch():
+    log: List[str] = []
+    lock = threading.Lock()
+    orch = Orchestrator(_tools(log, lock, fail_read=True))
+
+    results = _respond(orch, [_call(0, "read"), _call(1, "read"), _call(2, "write")])
+
+    contents = [json.loads(r["content"]) for r in results]
+    assert [r["tool_use_id"] for r in results] == ["tu_0", "tu_1", "tu_2"]
+    assert contents[0]["error"] == "read0 failed"
+    assert contents[1]["skipped"] is True and contents[2]["skipped"] is True
+    assert "start:write2" not in log
+
+
+class _QueuedExecutor:
+    """Runs the first submitted call at once and holds the rest unstarted."""
+
+    def __init__(self) -> None:
+        self.futures: List[Future] = []
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        if not self.futures:
+            future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+
+def test_failed_read_cancels_unstarted_reads():
+    log: List[str] = []
+    orch = Orchestrator(_tools(log, threading.Lock(), fail_read=True))
+    executor = _QueuedExecutor()
+
+    with patch("src.backend.agents.orchestrator._read_tool_executor", return_value=executor):
+        results = _respond(orch, [_call(0, "read"), _call(1, "read"), _call(2, "read")])
+
+    assert [json.loads(r["content"]).get("skipped") for r in results] == [None, True, True]
+    assert [f.cancelled() for f in executor.futures] == [False, True, True]
+    assert log == ["start:read0", "end:read0"]
+
+
+def test_refreshing_read_tool_runs_alone_and_refreshes():
+    log: List[str] = []
+    lock = threading.Lock()
+
+    class ListVariables(_LoggingTool):
+        name = "list_workflow_variables"
+        side_effect = SideEffect.READ
+
+    registry = _tools(log, lock)
+    registry.register(ListVariables(log, lock))
+    calls = [_call(0, "read"), _call(1, "list_workflow_variables"), _call(2, "read")]
+    assert [[idx for idx, _, _ in g] for g in _group_tool_calls(calls, registry)] == [[0], [1], [2]]
+
+    orch = Orchestrator(registry)
+    with patch.object(orch, "refresh_workflow_from_db") as refresh:
+        _respond(orch, calls)
+    refresh.assert_called_once_with()
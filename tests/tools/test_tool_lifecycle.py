@@ -15,7 +15,7 @@ that broke all decision node creation.
 import pytest
 import tempfile
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from uuid import uuid4
 
 from src.backend.storage.workflows import WorkflowStore
@@ -39,6 +39,9 @@ from src.backend.tools.validate_workflow import ValidateWorkflowTool
 from src.backend.tools.execute_workflow import ExecuteWorkflowTool
 from src.backend.tools.workflow_library.save_workflow import SaveWorkflowToLibrary
 from src.backend.tools.workflow_library.list_workflows import ListWorkflowsInLibrary
+from src.backend.tools.workflow_analysis.create_subworkflow import _run_subworkflow_builder
+from src.backend.tools.workflow_analysis.update_subworkflow import _run_subworkflow_updater
+from src.backend.tasks.executor import TaskKind
 
 
 class TestFullToolLifecycle:
@@ -627,7 +630,7 @@ class TestUITools:
 class TestSubworkflowTools:
     """Test create_subworkflow and update_subworkflow.
 
-    The background builder thread is mocked — we test the synchronous
+    The task executor is mocked — we test the synchronous
     validation, DB creation, variable registration, and state transitions
     without making any LLM calls.
     """
@@ -701,12 +704,9 @@ class TestSubworkflowTools:
 
     # ── create_subworkflow — success path ────────────────────────────
 
-    @patch("src.backend.tools.workflow_analysis.create_subworkflow.threading.Thread")
-    def test_create_success(self, mock_thread_cls, workflow_store, test_user_id):
-        """Should create DB record, register variables, and spawn builder thread."""
-        mock_thread = MagicMock()
-        mock_thread_cls.return_value = mock_thread
-
+    @patch("src.backend.tools.workflow_analysis.create_subworkflow.task_executor")
+    def test_create_success(self, mock_executor, workflow_store, test_user_id):
+        """Should create DB record, register variables, and submit the builder job."""
         r = self.create_sub.execute(
             {
                 "name": "BMI Calculator",
@@ -746,19 +746,17 @@ class TestSubworkflowTools:
         assert "Height" in var_names
         assert "Weight" in var_names
 
-        # Verify background thread was spawned
-        mock_thread_cls.assert_called_once()
-        mock_thread.start.assert_called_once()
-        # Thread target should be _run_subworkflow_builder
-        call_kwargs = mock_thread_cls.call_args
-        assert call_kwargs.kwargs["daemon"] is True
-        assert "subworkflow-builder" in call_kwargs.kwargs["name"]
+        # Verify the builder job was submitted to the executor
+        mock_executor.submit.assert_called_once()
+        call = mock_executor.submit.call_args
+        assert call.args[0] == TaskKind.BUILDER
+        assert call.args[1] is _run_subworkflow_builder
+        assert call.kwargs["user_id"] == test_user_id
+        assert "subworkflow-builder" in call.kwargs["name"]
 
-    @patch("src.backend.tools.workflow_analysis.create_subworkflow.threading.Thread")
-    def test_create_empty_inputs(self, mock_thread_cls, workflow_store, test_user_id):
+    @patch("src.backend.tools.workflow_analysis.create_subworkflow.task_executor")
+    def test_create_empty_inputs(self, mock_executor, workflow_store, test_user_id):
         """Should succeed with no input variables."""
-        mock_thread_cls.return_value = MagicMock()
-
         r = self.create_sub.execute(
             {
                 "name": "Constant Workflow",
@@ -775,11 +773,9 @@ class TestSubworkflowTools:
         wf = workflow_store.get_workflow(r["workflow_id"], test_user_id)
         assert wf is not None
 
-    @patch("src.backend.tools.workflow_analysis.create_subworkflow.threading.Thread")
-    def test_create_skips_invalid_inputs(self, mock_thread_cls, workflow_store, test_user_id):
+    @patch("src.backend.tools.workflow_analysis.create_subworkflow.task_executor")
+    def test_create_skips_invalid_inputs(self, mock_executor, workflow_store, test_user_id):
         """Should skip malformed input entries without failing."""
-        mock_thread_cls.return_value = MagicMock()
-
         r = self.create_sub.execute(
             {
                 "name": "Partial Inputs",
@@ -860,12 +856,9 @@ class TestSubworkflowTools:
 
     # ── update_subworkflow — success path ────────────────────────────
 
-    @patch("src.backend.tools.workflow_analysis.update_subworkflow.threading.Thread")
-    def test_update_success(self, mock_thread_cls, workflow_store, test_user_id):
-        """Should mark as building, spawn updater thread, and return immediately."""
-        mock_thread = MagicMock()
-        mock_thread_cls.return_value = mock_thread
-
+    @patch("src.backend.tools.workflow_analysis.update_subworkflow.task_executor")
+    def test_update_success(self, mock_executor, workflow_store, test_user_id):
+        """Should mark as building, submit the updater job, and return immediately."""
         # Create a finished workflow (building=False)
         wf_id = f"wf_{uuid4().hex}"
         workflow_store.create_workflow(
@@ -891,24 +884,22 @@ class TestSubworkflowTools:
         wf = workflow_store.get_workflow(wf_id, test_user_id)
         assert wf.building is True
 
-        # Verify background thread was spawned
-        mock_thread_cls.assert_called_once()
-        mock_thread.start.assert_called_once()
-        call_kwargs = mock_thread_cls.call_args
-        assert call_kwargs.kwargs["daemon"] is True
-        assert "subworkflow-updater" in call_kwargs.kwargs["name"]
+        # Verify the updater job was submitted to the executor
+        mock_executor.submit.assert_called_once()
+        call = mock_executor.submit.call_args
+        assert call.args[0] == TaskKind.BUILDER
+        assert call.args[1] is _run_subworkflow_updater
+        assert "subworkflow-updater" in call.kwargs["name"]
 
     # ── full create → update lifecycle ───────────────────────────────
 
-    @patch("src.backend.tools.workflow_analysis.update_subworkflow.threading.Thread")
-    @patch("src.backend.tools.workflow_analysis.create_subworkflow.threading.Thread")
+    @patch("src.backend.tools.workflow_analysis.update_subworkflow.task_executor")
+    @patch("src.backend.tools.workflow_analysis.create_subworkflow.task_executor")
     def test_create_then_update_lifecycle(
-        self, mock_create_thread_cls, mock_update_thread_cls,
+        self, mock_create_executor, mock_update_executor,
         workflow_store, test_user_id,
     ):
         """Full lifecycle: create subworkflow, simulate build completion, then update."""
-        mock_create_thread_cls.return_value = MagicMock()
-        mock_update_thread_cls.return_value = MagicMock()
 
         # Step 1: Create subworkflow
         r1 = self.create_sub.execute(
@@ -938,7 +929,7 @@ class TestSubworkflowTools:
         assert r2["success"] is False
         assert r2["error_code"] == "STILL_BUILDING"
 
-        # Step 3: Simulate build completion (background thread would do this)
+        # Step 3: Simulate build completion (the builder job would do this)
         workflow_store.update_workflow(
             wf_id, test_user_id,
             building=False,